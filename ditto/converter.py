@@ -150,6 +150,11 @@ class Converter(object):
                 "warehouse": "warehouse.mdb",
             }
 
+        # Snapshot
+        #
+        elif self._from == "snapshot":
+            inputs = {"input_file": os.path.abspath(feeder)}
+
         # DEW
         # TODO....
         elif self._from == "dew":
@@ -3,22 +3,25 @@ from builtins import super, range, zip, round, map
 
 
 class GridLABDBase(object):
+    """Base class of the GridLAB-D objects generated from the schema (see gridlabd.py).
+
+    The property names of every class, its own and the ones of its ancestors, are
+    computed once when the class is generated. The values are stored in the slots of the
+    classes, or in the __dict__ of the objects for the properties which are not valid
+    Python identifiers (e.g. rating.summer.continuous), so that no schema state is
+    allocated per object.
+    """
+
+    __slots__ = ("__dict__",)
 
     _properties = []
+    _property_names = frozenset()
 
     def __init__(self, *args, **kwargs):
 
-        for p in self._build_properties():
-            self._properties = self._properties + p
-
         for k, v in kwargs.items():
             self[k] = v
 
-    def _build_properties(self):
-        for c in self.__class__.mro():
-            if c != self.__class__ and c != object:
-                yield c._properties
-
     def __getitem__(self, k):
         try:
             return getattr(self, "_{}".format(k))
@@ -28,8 +31,76 @@ class GridLABDBase(object):
             )
 
     def __setitem__(self, k, v):
-        if k not in [p["name"] for p in self._properties]:
+        if k not in self._property_names:
             raise AttributeError(
                 "Unable to set {} with {} on {}".format(k, v, self.__class__.__name__)
             )
         return setattr(self, "_{}".format(k), v)
+
+
+class GridLABDObjects(dict):
+    """GridLAB-D objects of a model by name, also indexed by class.
+
+    The references of the objects to other objects (configuration, conductors,
+    spacing) are resolved once with resolve(), after all the objects are added,
+    and then found in constant time with reference().
+    """
+
+    references = (
+        "configuration",
+        "spacing",
+        "conductor_A",
+        "conductor_B",
+        "conductor_C",
+        "conductor_N",
+        "conductor_1",
+        "conductor_2",
+    )
+
+    def __init__(self, *args, **kwargs):
+        self.classes = {}  # class name -> {name: object}
+        self._references = {}  # id of an object -> {property: object}
+        super().__init__()
+        self.update(*args, **kwargs)
+
+    def __setitem__(self, name, obj):
+        if name in self:
+            self.classes[type(self[name]).__name__].pop(name, None)
+        super().__setitem__(name, obj)
+        self.classes.setdefault(type(obj).__name__, {})[name] = obj
+
+    def __delitem__(self, name):
+        self.classes[type(self[name]).__name__].pop(name, None)
+        super().__delitem__(name)
+
+    def update(self, *args, **kwargs):
+        for name, obj in dict(*args, **kwargs).items():
+            self[name] = obj
+
+    def resolve(self):
+        """Resolve the references between the objects.
+
+        The objects of the classes without any reference property are skipped.
+        """
+        self._references = {}
+        for objects in self.classes.values():
+            if not objects:
+                continue
+            cls = type(next(iter(objects.values())))
+            keys = [k for k in self.references if k in cls._property_names]
+            if not keys:
+                continue
+            for obj in objects.values():
+                resolved = {}
+                for k in keys:
+                    try:
+                        target = self.get(obj[k])
+                    except (AttributeError, TypeError):
+                        continue
+                    if target is not None:
+                        resolved[k] = target
+                self._references[id(obj)] = resolved
+
+    def reference(self, obj, k):
+        """Return the object referenced by the property k of obj, or None."""
+        return self._references.get(id(obj), {}).get(k)
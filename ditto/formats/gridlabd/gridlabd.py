@@ -2,12 +2,16 @@ from __future__ import absolute_import, division, print_function
 from builtins import super, range, zip, round, map
 
 import os
+import re
 import json
 from collections import OrderedDict
 import networkx as nx
 from .base import GridLABDBase
 from ditto.compat import common_str
 
+# Names of the properties which can be stored in slots
+_IDENTIFIER = re.compile(r"^[A-Za-z][A-Za-z0-9_]*$")
+
 
 def __create():
     dir_path = os.path.dirname(os.path.realpath(__file__))
@@ -30,8 +34,21 @@ def __create():
         if parent is None:
             parent = GridLABDBase
 
+        # The property names and the slots are computed once per class
+        names = OrderedDict((p["name"], None) for p in properties["properties"])
+        slots = tuple(
+            common_str("_{}".format(name))
+            for name in names
+            if _IDENTIFIER.match(name) and name not in parent._property_names
+        )
         return type(
-            common_str(klass), (parent,), dict(_properties=properties["properties"])
+            common_str(klass),
+            (parent,),
+            dict(
+                _properties=properties["properties"],
+                _property_names=parent._property_names.union(names),
+                __slots__=slots,
+            ),
         )
 
     for klass in nx.topological_sort(G):
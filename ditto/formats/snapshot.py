@@ -0,0 +1,281 @@
+# -*- coding: utf-8 -*-
+"""This module defines the columnar snapshot format of DiTTo Stores.
+
+A snapshot is a directory holding:
+
+- header.json: the version, the classes, and the columns of each class,
+- objects.npy: the class of each object, in the insertion order of the Store,
+- strings.npy and string_offsets.npy: the string table (UTF-8 bytes and offsets),
+- one or a few .npy files per column.
+
+The objects of a class form a table with one column per trait. The values of a column
+are stored in typed NumPy arrays: bool, int64, float64 and complex128 values as they are,
+strings as indices in the string table, DiTTo objects (windings, wires, positions...) as
+indices in objects.npy, and lists as offsets into a child column holding their items.
+The phases held as Unicode traits are stored as the index of their value in the string
+table. The columns mixing several of these types keep the type of each value, and one
+child column per type. Any other value cannot be stored: nothing is ever unpickled or
+evaluated when reading a snapshot.
+"""
+
+from __future__ import absolute_import, division, print_function
+from builtins import super, range, zip, round, map
+
+import os
+import json
+
+import numpy as np
+
+from ditto.models.base import Unicode
+
+VERSION = 2
+
+# Marker of the traits which were never set (dynamic defaults not computed yet)
+MISSING = object()
+
+_INT64_MIN = np.iinfo(np.int64).min
+_INT64_MAX = np.iinfo(np.int64).max
+
+
+class StringTable(object):
+    """Table of the unique strings of a snapshot."""
+
+    def __init__(self, strings=None):
+        self.strings = strings if strings is not None else []
+        self.index = {s: i for i, s in enumerate(self.strings)}
+
+    def add(self, value):
+        i = self.index.get(value)
+        if i is None:
+            i = self.index[value] = len(self.strings)
+            self.strings.append(value)
+        return i
+
+    def save(self, path):
+        encoded = [s.encode("utf-8") for s in self.strings]
+        offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+        np.cumsum([len(s) for s in encoded], out=offsets[1:])
+        np.save(os.path.join(path, "strings.npy"), _blob(encoded))
+        np.save(os.path.join(path, "string_offsets.npy"), offsets)
+
+    @classmethod
+    def load(cls, path):
+        blob = np.load(os.path.join(path, "strings.npy")).tobytes()
+        offsets = np.load(os.path.join(path, "string_offsets.npy")).tolist()
+        return cls(
+            [blob[a:b].decode("utf-8") for a, b in zip(offsets[:-1], offsets[1:])]
+        )
+
+
+def _blob(chunks):
+    """Return the concatenation of the bytes chunks as a uint8 array."""
+    return np.frombuffer(b"".join(chunks), dtype=np.uint8)
+
+
+def _kind(value, ids):
+    """Return the kind of column able to hold value."""
+    if isinstance(value, (bool, np.bool_)):
+        return "bool"
+    if isinstance(value, (int, np.integer)):
+        if _INT64_MIN <= value <= _INT64_MAX:
+            return "int"
+        raise ValueError("Unable to store the integer {} in an int64".format(value))
+    if isinstance(value, float):
+        return "float"
+    if isinstance(value, complex):
+        return "complex"
+    if isinstance(value, str):
+        return "str"
+    if isinstance(value, list):
+        return "list"
+    if isinstance(value, Unicode) and isinstance(value.default_value, str):
+        return "unicode"
+    if id(value) in ids:
+        return "model"
+    raise ValueError("Unable to store a value of type {}".format(type(value).__name__))
+
+
+def encode_column(values, ids, strings):
+    """Encode the values of a column in NumPy arrays.
+
+    :param values: The values (None and MISSING are allowed)
+    :type values: list
+    :param ids: The index of the DiTTo objects of the Store, by id
+    :type ids: dict
+    :param strings: The string table of the snapshot
+    :type strings: StringTable
+    :returns: The specification of the column, and its arrays by name
+    :rtype: tuple
+    """
+    arrays = {}
+    missing = [v is MISSING for v in values]
+    null = [v is None for v in values]
+    if any(missing):
+        arrays["missing"] = np.array(missing, dtype=bool)
+    if any(null):
+        arrays["null"] = np.array(null, dtype=bool)
+
+    present = [v for v in values if v is not None and v is not MISSING]
+    kinds = set(_kind(v, ids) for v in present)
+    if not kinds:
+        kind = "none"
+    elif len(kinds) == 1:
+        kind = kinds.pop()
+    else:
+        kind = "mixed"
+    spec = {"kind": kind}
+    if arrays:
+        spec["masks"] = sorted(arrays)
+
+    if kind == "bool":
+        arrays["values"] = np.array(
+            [v is not None and v is not MISSING and bool(v) for v in values], dtype=bool
+        )
+    elif kind in ("int", "float", "complex"):
+        dtype = {"int": np.int64, "float": np.float64, "complex": np.complex128}[kind]
+        fill = dtype(0)
+        arrays["values"] = np.array(
+            [fill if v is None or v is MISSING else v for v in values], dtype=dtype
+        )
+    elif kind == "str":
+        arrays["values"] = np.array(
+            [-1 if v is None or v is MISSING else strings.add(v) for v in values],
+            dtype=np.int64,
+        )
+    elif kind == "unicode":
+        arrays["values"] = np.array(
+            [
+                -1 if v is None or v is MISSING else strings.add(v.default_value)
+                for v in values
+            ],
+            dtype=np.int64,
+        )
+    elif kind == "model":
+        arrays["values"] = np.array(
+            [-1 if v is None or v is MISSING else ids[id(v)] for v in values],
+            dtype=np.int64,
+        )
+    elif kind == "list":
+        items = []
+        offsets = [0]
+        for v in values:
+            if isinstance(v, list):
+                items.extend(v)
+            offsets.append(len(items))
+        arrays["offsets"] = np.array(offsets, dtype=np.int64)
+        spec["items"], item_arrays = encode_column(items, ids, strings)
+        for name, array in item_arrays.items():
+            arrays["items." + name] = array
+    elif kind == "mixed":
+        # The kind of each value (-1 if None or MISSING), and one child column per kind
+        spec["kinds"] = sorted(kinds)
+        codes = {k: c for c, k in enumerate(spec["kinds"])}
+        groups = {k: [] for k in spec["kinds"]}
+        values_kinds = []
+        for v in values:
+            if v is None or v is MISSING:
+                values_kinds.append(-1)
+            else:
+                k = _kind(v, ids)
+                values_kinds.append(codes[k])
+                groups[k].append(v)
+        arrays["kinds"] = np.array(values_kinds, dtype=np.int8)
+        spec["parts"] = {}
+        for k in spec["kinds"]:
+            spec["parts"][k], part_arrays = encode_column(groups[k], ids, strings)
+            for name, array in part_arrays.items():
+                arrays[k + "." + name] = array
+
+    return spec, arrays
+
+
+def decode_column(spec, arrays, size, objects, strings):
+    """Decode the values of a column from its NumPy arrays.
+
+    :param spec: The specification of the column
+    :type spec: dict
+    :param arrays: Function returning the array of the column with a given name
+    :type arrays: callable
+    :param size: The number of values of the column
+    :type size: int
+    :param objects: The DiTTo objects of the Store, by index
+    :type objects: list
+    :param strings: The strings of the string table, by index
+    :type strings: list
+    :returns: The values (None and MISSING included)
+    :rtype: list
+    """
+    kind = spec["kind"]
+    if kind == "none":
+        values = [None] * size
+    elif kind in ("bool", "int", "float", "complex"):
+        values = arrays("values").tolist()
+    elif kind == "str":
+        values = [strings[i] for i in arrays("values").tolist()]
+    elif kind == "unicode":
+        values = [
+            Unicode(strings[i]) if i >= 0 else None for i in arrays("values").tolist()
+        ]
+    elif kind == "model":
+        values = [objects[i] for i in arrays("values").tolist()]
+    elif kind == "list":
+        offsets = arrays("offsets").tolist()
+        items = decode_column(
+            spec["items"],
+            lambda name: arrays("items." + name),
+            offsets[-1],
+            objects,
+            strings,
+        )
+        values = [items[a:b] for a, b in zip(offsets[:-1], offsets[1:])]
+    elif kind == "mixed":
+        values_kinds = arrays("kinds").tolist()
+        parts = []
+        for c, k in enumerate(spec["kinds"]):
+            parts.append(
+                iter(
+                    decode_column(
+                        spec["parts"][k],
+                        lambda name, k=k: arrays(k + "." + name),
+                        values_kinds.count(c),
+                        objects,
+                        strings,
+                    )
+                )
+            )
+        values = [next(parts[c]) if c >= 0 else None for c in values_kinds]
+    else:
+        raise ValueError("Unknown column kind {}".format(kind))
+
+    if "null" in spec.get("masks", ()):
+        for i in np.flatnonzero(arrays("null")).tolist():
+            values[i] = None
+    if "missing" in spec.get("masks", ()):
+        for i in np.flatnonzero(arrays("missing")).tolist():
+            values[i] = MISSING
+    return values
+
+
+def write_header(path, header):
+    with open(os.path.join(path, "header.json"), "w") as f:
+        json.dump(header, f, indent=1, sort_keys=True)
+
+
+def is_snapshot(path):
+    """Return True if the directory path holds a snapshot, of any version."""
+    try:
+        with open(os.path.join(path, "header.json"), "r") as f:
+            header = json.load(f)
+    except (IOError, OSError, ValueError):
+        return False
+    return isinstance(header, dict) and "version" in header and "classes" in header
+
+
+def read_header(path):
+    with open(os.path.join(path, "header.json"), "r") as f:
+        header = json.load(f)
+    if header.get("version") != VERSION:
+        raise ValueError(
+            "Unsupported snapshot version {} in {}".format(header.get("version"), path)
+        )
+    return header
@@ -0,0 +1,214 @@
+# -*- coding: utf-8 -*-
+"""This module defines the tabular view of DiTTo Stores.
+
+The models of a Store are exported as one pandas DataFrame per model class (Line, Wire,
+Load, PhaseLoad, PowerTransformer, Winding...), with one row per model and one typed
+column per trait:
+
+- Float, Int, Bool and Complex traits are float64, Int64, boolean and complex128 columns,
+- Unicode traits are string columns,
+- the other traits (phases, impedance matrices, Any...) are object columns.
+
+The rows are indexed by id, the position of the model in the Store.
+The List traits holding DiTTo objects (wires, phase_loads, windings, positions...) are not
+columns of their owner: the objects they hold are rows of the table of their class, which
+refer to their owner with the parent_id, parent_class, parent_trait and parent_index columns.
+For instance, the wires of a line are the rows of the Wire table whose parent_id is the id
+of the line in the Line table.
+
+The tables can be converted to Apache Arrow tables if pyarrow is installed.
+"""
+
+from __future__ import absolute_import, division, print_function
+from builtins import super, range, zip, round, map
+
+import logging
+
+import numpy as np
+import pandas as pd
+import traitlets as T
+
+from ditto.models.base import DiTToHasTraits, LightweightModel, Unicode
+
+logger = logging.getLogger(__name__)
+
+# Columns added to the tables of the objects held by the List traits of other objects
+PARENT_COLUMNS = ("parent_id", "parent_class", "parent_trait", "parent_index")
+
+# Type of the columns of the traits, by trait type
+_DTYPES = (
+    (T.Bool, "boolean"),
+    (T.Int, "Int64"),
+    (T.Float, "float64"),
+    (T.Complex, "complex128"),
+    (T.Unicode, "string"),
+)
+
+# Marker of the traits which were never set (dynamic defaults not computed yet)
+_MISSING = object()
+
+
+def model_class(obj):
+    """Return the DiTTo model class of obj (the traitlets class for lightweight models)."""
+    if isinstance(obj, LightweightModel):
+        return obj._traits_class
+    return type(obj)
+
+
+def child_class(trait):
+    """Return the class of the DiTTo objects held by trait, or None if it does not hold DiTTo objects."""
+    if not isinstance(trait, T.List):
+        return None
+    klass = getattr(trait._trait, "klass", None)
+    if isinstance(klass, type) and issubclass(klass, DiTToHasTraits):
+        return klass
+    return None
+
+
+def column_dtype(trait):
+    """Return the type of the column of trait."""
+    for trait_type, dtype in _DTYPES:
+        if isinstance(trait, trait_type):
+            return dtype
+    return object
+
+
+def _plain(value):
+    """Replace the phases (Unicode traits) by their value."""
+    if isinstance(value, list):
+        return [_plain(v) for v in value]
+    if isinstance(value, Unicode):
+        return value.default_value
+    return value
+
+
+def _series(values, dtype, index):
+    if dtype == "complex128":
+        values = [np.nan if v is None else v for v in values]
+    try:
+        return pd.Series(values, index=index, dtype=dtype)
+    except (TypeError, ValueError):
+        # Values of unexpected types (set without validation)
+        return pd.Series(values, index=index, dtype=object)
+
+
+class ModelTables(object):
+    """Tables of the models of a Store, one per model class.
+
+    >>> tables = ModelTables(model)
+    >>> lines = tables["Line"]
+    >>> wires = tables["Wire"].join(lines[["name"]], on="parent_id", rsuffix="_line")
+
+    The tables are built in one pass over the models. Use Store.get_tables() to share
+    the tables, which are kept until the Store changes.
+    """
+
+    def __init__(self, model):
+        """Class CONSTRUCTOR"""
+        self.tables = {}
+        self.build(model)
+
+    def __getitem__(self, name):
+        if isinstance(name, type):
+            name = name.__name__
+        return self.tables[name]
+
+    def __contains__(self, name):
+        if isinstance(name, type):
+            name = name.__name__
+        return name in self.tables
+
+    def __iter__(self):
+        return iter(self.tables)
+
+    def __len__(self):
+        return len(self.tables)
+
+    def keys(self):
+        return self.tables.keys()
+
+    def items(self):
+        return self.tables.items()
+
+    def get(self, name, default=None):
+        if name in self:
+            return self[name]
+        return default
+
+    def build(self, model):
+        """Build the tables of the models of the Store model."""
+        models = model.models
+        ids = {id(obj): i for i, obj in enumerate(models)}
+
+        # Group the objects by class, and find the owners of the objects held by List traits
+        rows = {}
+        trait_values = {}
+        parents = {}
+        children = {}
+        for i, obj in enumerate(models):
+            cls = model_class(obj)
+            if cls not in rows:
+                rows[cls] = []
+                trait_values[cls] = []
+                children[cls] = [
+                    name
+                    for name, trait in sorted(cls.class_traits().items())
+                    if child_class(trait) is not None
+                ]
+            values = obj._trait_values
+            rows[cls].append(i)
+            trait_values[cls].append(values)
+            for name in children[cls]:
+                for index, child in enumerate(values.get(name) or ()):
+                    if id(child) in ids and id(child) not in parents:
+                        parents[id(child)] = (i, cls.__name__, name, index)
+
+        self.tables = {}
+        for cls, index in rows.items():
+            columns = {}
+            for name, trait in sorted(cls.class_traits().items()):
+                if name in children[cls]:
+                    continue
+                values = [v.get(name, _MISSING) for v in trait_values[cls]]
+                if isinstance(trait, T.List):
+                    values = [[] if v is _MISSING else _plain(v) for v in values]
+                else:
+                    values = [None if v is _MISSING else v for v in values]
+                columns[name] = _series(values, column_dtype(trait), index)
+
+            links = [parents.get(id(models[i])) for i in index]
+            if any(link is not None for link in links):
+                for c, (name, dtype) in enumerate(
+                    zip(PARENT_COLUMNS, ("Int64", "string", "string", "Int64"))
+                ):
+                    columns[name] = pd.Series(
+                        [None if link is None else link[c] for link in links],
+                        index=index,
+                        dtype=dtype,
+                    )
+
+            table = pd.DataFrame(columns, index=pd.Index(index, name="id"))
+            self.tables[cls.__name__] = table
+
+        logger.debug(
+            "Built {} tables from {} models".format(len(self.tables), len(models))
+        )
+
+    def to_arrow(self):
+        """Return the tables as Apache Arrow tables, by class name.
+
+        :returns: The Arrow tables
+        :rtype: dict
+        """
+        try:
+            import pyarrow as pa
+        except ImportError:
+            raise ImportError("pyarrow is required to export the tables to Arrow")
+        arrow_tables = {}
+        for name, table in self.tables.items():
+            # Arrow has no complex type
+            table = table.apply(
+                lambda c: c.astype(str) if c.dtype == "complex128" else c
+            )
+            arrow_tables[name] = pa.Table.from_pandas(table, preserve_index=True)
+        return arrow_tables
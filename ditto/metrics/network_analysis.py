@@ -5,6 +5,7 @@ from builtins import super, range, zip, round, map
 
 import logging
 import math
+import multiprocessing
 import time
 import logging
 import json
@@ -31,6 +32,106 @@ from ..readers.abstract_reader import AbstractReader
 
 logger = logging.getLogger(__name__)
 
+# NetworkAnalyzer used by the worker processes of compute_all_metrics_per_feeder
+_worker_analyzer = None
+
+
+def _init_worker(analyzer):
+    global _worker_analyzer
+    _worker_analyzer = analyzer
+
+
+def _analyze_feeder(task):
+    """
+    Computes the results of a feeder in a worker process (see compute_all_metrics_per_feeder).
+
+    :param task: Name of the feeder and indices of its objects in the model
+    :type task: tuple
+    :returns: The name of the feeder, its results and points, and the load distribution values with the index of their object
+    :rtype: tuple
+    """
+    feeder_name, indices = task
+    analyzer = _worker_analyzer
+    models = analyzer.model.models
+    analyzer.results = {feeder_name: analyzer.setup_results_data_structure(feeder_name)}
+    analyzer.load_distribution = []
+    load_distribution = []
+    for i in indices:
+        analyzer.analyze_object(models[i], feeder_name)
+        load_distribution.extend((i, x) for x in analyzer.load_distribution)
+        analyzer.load_distribution = []
+    return (
+        feeder_name,
+        analyzer.results[feeder_name],
+        analyzer.points.pop(feeder_name, None),
+        load_distribution,
+    )
+
+
+class DistanceTree(object):
+    """Weighted shortest path tree of a network from a single source.
+
+    The distances from the source, the parents and the depths of the nodes are computed
+    once (with Dijkstra's algorithm), and the distances and paths between the nodes are
+    then read from the tree.
+
+    .. note:: In a radial network, the paths of the tree are the shortest paths between any two nodes. In a meshed network, they are the paths through the tree.
+    """
+
+    def __init__(self, graph, source, weight="length"):
+        """Class CONSTRUCTOR."""
+        self.graph = graph
+        self.source = source
+        pred, self.distance = nx.dijkstra_predecessor_and_distance(
+            graph, source, weight=weight
+        )
+        self.parent = {}
+        self.depth = {source: 0}
+        # The nodes are settled after their parent (the first predecessor found)
+        for node in self.distance:
+            if node != source:
+                parent = pred[node][0]
+                self.parent[node] = parent
+                self.depth[node] = self.depth[parent] + 1
+
+    def __contains__(self, node):
+        return node in self.distance
+
+    def distance_to(self, node):
+        """Return the distance between the source and node."""
+        try:
+            return self.distance[node]
+        except KeyError:
+            raise nx.NetworkXNoPath(
+                "Node {} not reachable from {}".format(node, self.source)
+            )
+
+    def _common_ancestor(self, node1, node2):
+        while self.depth[node1] > self.depth[node2]:
+            node1 = self.parent[node1]
+        while self.depth[node2] > self.depth[node1]:
+            node2 = self.parent[node2]
+        while node1 != node2:
+            node1 = self.parent[node1]
+            node2 = self.parent[node2]
+        return node1
+
+    def distance_between(self, node1, node2):
+        """Return the distance between node1 and node2 along the tree."""
+        ancestor = self._common_ancestor(node1, node2)
+        return self.distance[node1] + self.distance[node2] - 2 * self.distance[ancestor]
+
+    def path(self, node1, node2):
+        """Return the list of the nodes between node1 and node2 (included) along the tree."""
+        ancestor = self._common_ancestor(node1, node2)
+        left = [node1]
+        while left[-1] != ancestor:
+            left.append(self.parent[left[-1]])
+        right = [node2]
+        while right[-1] != ancestor:
+            right.append(self.parent[right[-1]])
+        return left + right[-2::-1]
+
 
 class NetworkAnalyzer(object):
     """
@@ -173,6 +274,9 @@ class NetworkAnalyzer(object):
         self.node_feeder_mapping = {}
         self.points = {}
 
+        # Shortest path trees, by network and source (see distance_tree)
+        self._distance_trees = {}
+
         # This flag indicates whether we should compute the kva density metric using transformer objects
         # Default is True. If set to False, the `transformer_connected_kva` attribute of load objects will
         # be used. This enables fair comparison between networks where LV data is missing.
@@ -198,6 +302,46 @@ class NetworkAnalyzer(object):
         self.edge_equipment_name = nx.get_edge_attributes(
             self.G.graph, "equipment_name"
         )
+        self._distance_trees = {}
+
+    def distance_tree(self, *args):
+        """
+        Returns the shortest path tree (see DistanceTree) of a network from a source.
+        The tree is computed once and cached, such that all the distance and path metrics read it.
+
+        **Usage:**
+
+            >>> tree=network_analyzer.distance_tree(network, source)
+
+            With no arguments, the whole network and the source of the analyzer are used.
+            With one argument, the network is used with the source of the analyzer.
+
+        .. note:: If the source is not in the network, the network is extended with the shortest path between the source and the network (in the whole network), as done by the metrics.
+        """
+        if args:
+            if len(args) == 1:
+                _net = args[0]
+                _src = self.source
+            elif len(args) == 2:
+                _net, _src = args
+        else:
+            _net = self.G.graph
+            _src = self.source
+
+        key = (id(_net), _src)
+        if key in self._distance_trees and self._distance_trees[key][0] is _net:
+            return self._distance_trees[key][1]
+
+        _graph = _net
+        if not _net.has_node(_src):
+            _graph = _net.copy()
+            _sp = nx.shortest_path(self.G.graph, _src, list(_net.nodes())[0])
+            for n1, n2 in zip(_sp[:-1], _sp[1:]):
+                _graph.add_edge(n1, n2, length=self.G.graph[n1][n2]["length"])
+        tree = DistanceTree(_graph, _src)
+        # Keep a reference on the network to make sure the id is not reused
+        self._distance_trees[key] = (_net, tree)
+        return tree
 
     def add_feeder_information(
         self, feeder_names, feeder_nodes, substations, feeder_types
@@ -244,6 +388,7 @@ class NetworkAnalyzer(object):
                 "Cannot split the network into feeders because feeders are unknown. Call add_feeder_information first."
             )
 
+        self._distance_trees = {}
         for cpt, feeder_name in enumerate(self.feeder_names):
             feeder_node_list = self.feeder_nodes[cpt]
             self.feeder_networks[feeder_name] = self.G.graph.subgraph(feeder_node_list)
@@ -1034,8 +1179,15 @@ class NetworkAnalyzer(object):
                     hasattr(trans_obj, "to_element")
                     and trans_obj.to_element is not None
                 ):
-                    _net3 = _net.copy()
-                    if not _net3.has_node(trans_obj.to_element):
+                    if _net.has_node(trans_obj.to_element):
+                        # Read the path from the shortest path tree of the feeder
+                        self.results[feeder_name]["trans_cust_impedance_list"][
+                            obj.name
+                        ] = self.get_impedance_list_between_nodes(
+                            _net, trans_obj.to_element, obj.connecting_element, _src
+                        )
+                    else:
+                        _net3 = _net.copy()
                         _sp = nx.shortest_path(
                             self.G.graph, trans_obj.to_element, list(_net3.nodes())[0]
                         )
@@ -1043,11 +1195,11 @@ class NetworkAnalyzer(object):
                             _net3.add_edge(
                                 n1, n2, length=self.G.graph[n1][n2]["length"]
                             )
-                    self.results[feeder_name]["trans_cust_impedance_list"][
-                        obj.name
-                    ] = self.get_impedance_list_between_nodes(
-                        _net3, trans_obj.to_element, obj.connecting_element
-                    )
+                        self.results[feeder_name]["trans_cust_impedance_list"][
+                            obj.name
+                        ] = self.get_impedance_list_between_nodes(
+                            _net3, trans_obj.to_element, obj.connecting_element
+                        )
 
             # If the load is low voltage
             if hasattr(obj, "nominal_voltage") and obj.nominal_voltage is not None:
@@ -1232,20 +1384,10 @@ class NetworkAnalyzer(object):
 
                 # Get the primary
                 if hasattr(obj, "from_element") and obj.from_element is not None:
-                    _net2 = _net.copy()
-                    if not _net2.has_node(_src):
-                        _sp = nx.shortest_path(
-                            self.G.graph, _src, list(_net2.nodes())[0]
-                        )
-                        for n1, n2 in zip(_sp[:-1], _sp[1:]):
-                            _net2.add_edge(
-                                n1, n2, length=self.G.graph[n1][n2]["length"]
-                            )
-
                     self.results[feeder_name]["sub_trans_impedance_list"][
                         obj.name
                     ] = self.get_impedance_list_between_nodes(
-                        _net2, _src, obj.from_element
+                        _net, _src, obj.from_element, _src
                     )
 
                 # This section updates the maximum length of secondaries
@@ -1267,12 +1409,21 @@ class NetworkAnalyzer(object):
                             and load_obj.connecting_element is not None
                         ):
                             if self.G.graph.has_node(load_obj.connecting_element):
-                                length = nx.shortest_path_length(
-                                    self.G.graph,
-                                    obj.to_element,
-                                    load_obj.connecting_element,
-                                    weight="length",
-                                )
+                                tree = self.distance_tree()
+                                if (
+                                    obj.to_element in tree
+                                    and load_obj.connecting_element in tree
+                                ):
+                                    length = tree.distance_between(
+                                        obj.to_element, load_obj.connecting_element
+                                    )
+                                else:
+                                    length = nx.shortest_path_length(
+                                        self.G.graph,
+                                        obj.to_element,
+                                        load_obj.connecting_element,
+                                        weight="length",
+                                    )
                                 if (
                                     length
                                     > self.results[feeder_name][
@@ -1390,6 +1541,14 @@ class NetworkAnalyzer(object):
     def compute_all_metrics_per_feeder(self, **kwargs):
         """
         Computes all the available metrics for each feeder.
+
+        The feeders are independent, so they can be analyzed in parallel with processes=N.
+        Each worker process computes the results of one feeder at a time, and they are
+        merged in the same order as the serial computation, such that the results are identical.
+
+        >>> network_analyzer.compute_all_metrics_per_feeder(processes=4)
+
+        .. note:: With the spawn start method (Windows, macOS), the analyzer and its model are pickled once for each worker.
         """
         # Enables changing the flag
         if "compute_kva_density_with_transformers" in kwargs and isinstance(
@@ -1442,19 +1601,23 @@ class NetworkAnalyzer(object):
             if self.substations[k] is not None and len(self.substations[k]) > 0
         ]
 
-        # Setup the data structures for all feeders
-        self.results = {
-            k: self.setup_results_data_structure(k) for k in mv_feeder_names
-        }
+        processes = kwargs.get("processes")
+        if processes is not None and processes > 1 and len(mv_feeder_names) > 1:
+            self._analyze_feeders_in_parallel(mv_feeder_names, processes)
+        else:
+            # Setup the data structures for all feeders
+            self.results = {
+                k: self.setup_results_data_structure(k) for k in mv_feeder_names
+            }
 
-        # Loop over the objects in the model and analyze them
-        for obj in self.model.models:
-            # Get the feeder of this object if it exists
-            if hasattr(obj, "name"):
-                _feeder_ref = self.get_feeder(obj)
-                # If we have a valid name, analyze the object
-                if _feeder_ref is not None and _feeder_ref in mv_feeder_names:
-                    self.analyze_object(obj, _feeder_ref)
+            # Loop over the objects in the model and analyze them
+            for obj in self.model.models:
+                # Get the feeder of this object if it exists
+                if hasattr(obj, "name"):
+                    _feeder_ref = self.get_feeder(obj)
+                    # If we have a valid name, analyze the object
+                    if _feeder_ref is not None and _feeder_ref in mv_feeder_names:
+                        self.analyze_object(obj, _feeder_ref)
 
         # Do some post-processing of the results before returning them
         #
@@ -1686,6 +1849,40 @@ class NetworkAnalyzer(object):
                         * self.results[_feeder_ref]["sum_distribution_transformer_mva"]
                     ) / float(hull_surf_sqmile)
 
+    def _analyze_feeders_in_parallel(self, mv_feeder_names, processes):
+        """
+        Helper function for compute_all_metrics_per_feeder.
+        Sets up the results and analyzes the objects of the feeders in a pool of processes.
+        """
+        # Group the objects by feeder, in model order
+        feeder_objects = {k: [] for k in mv_feeder_names}
+        for i, obj in enumerate(self.model.models):
+            if hasattr(obj, "name"):
+                _feeder_ref = self.get_feeder(obj)
+                if _feeder_ref is not None and _feeder_ref in feeder_objects:
+                    feeder_objects[_feeder_ref].append(i)
+
+        self.results = {}
+        load_distribution = []
+        pool = multiprocessing.Pool(
+            processes, initializer=_init_worker, initargs=(self,)
+        )
+        try:
+            for feeder_name, results, points, distribution in pool.imap(
+                _analyze_feeder, list(feeder_objects.items())
+            ):
+                self.results[feeder_name] = results
+                if points is not None:
+                    self.points[feeder_name] = points
+                load_distribution.extend(distribution)
+        finally:
+            pool.close()
+            pool.join()
+
+        # Same order as if the objects were analyzed one by one
+        load_distribution.sort(key=lambda x: x[0])
+        self.load_distribution.extend(x for _, x in load_distribution)
+
     def compute_all_metrics(self, *args, **kwargs):
         """
         This function computes all the metrics for the whole network in a way that optimizes performance.
@@ -2134,10 +2331,13 @@ class NetworkAnalyzer(object):
                         (obj.from_element, obj.to_element)
                     ] = obj.name
 
-    def get_impedance_list_between_nodes(self, net, node1, node2):
-        """TODO"""
+    def get_impedance_list_between_nodes(self, net, node1, node2, source=None):
+        """
+        Returns the list of the positive sequence impedances of the lines between node1 and node2.
+        See list_lines_betweeen_nodes for the source argument.
+        """
         impedance_list = []
-        line_list = self.list_lines_betweeen_nodes(net, node1, node2)
+        line_list = self.list_lines_betweeen_nodes(net, node1, node2, source)
         for line in line_list:
             line_object = self.model[line]
             if (
@@ -2155,13 +2355,22 @@ class NetworkAnalyzer(object):
                     impedance_list.append(Z_plus)
         return impedance_list
 
-    def list_lines_betweeen_nodes(self, net, node1, node2):
+    def list_lines_betweeen_nodes(self, net, node1, node2, source=None):
         """
         The function takes a network and two nodes as inputs.
         It returns a list of Line names forming the shortest path between the two nodes.
+
+        If a source is given (or if net is the whole network), the path is read from the
+        shortest path tree of the network from the source (see distance_tree).
         """
+        if source is None and self.G is not None and net is self.G.graph:
+            source = self.source
+        tree = self.distance_tree(net, source) if source is not None else None
         # Compute the shortest path as a sequence of node names
-        path = nx.shortest_path(net, node1, node2)
+        if tree is not None and node1 in tree and node2 in tree:
+            path = tree.path(node1, node2)
+        else:
+            path = nx.shortest_path(net, node1, node2)
         # Transform it in a sequence of edges (n0,n1),(n1,n2),(n2,n3)...
         edge_list = [(a, b) for a, b in zip(path[:-1], path[1:])]
         # Compute the sequence of corresponding lines
@@ -2187,20 +2396,13 @@ class NetworkAnalyzer(object):
         else:
             _net = self.G.graph
             _src = self.source
-        _net = _net.copy()
-        if not _net.has_node(_src):
-            _sp = nx.shortest_path(self.G.graph, _src, list(_net.nodes())[0])
-            for n1, n2 in zip(_sp[:-1], _sp[1:]):
-                _net.add_edge(n1, n2, length=self.G.graph[n1][n2]["length"])
+        tree = self.distance_tree(_net, _src)
+        _net = tree.graph
         L = []
         for obj in self.model.models:
             if isinstance(obj, Regulator):
                 if _net.has_node(obj.from_element):
-                    L.append(
-                        nx.shortest_path_length(
-                            _net, _src, obj.from_element, weight="length"
-                        )
-                    )
+                    L.append(tree.distance_to(obj.from_element))
         if len(L) > 0:
             return np.mean(L)
         else:
@@ -2219,20 +2421,13 @@ class NetworkAnalyzer(object):
         else:
             _net = self.G.graph
             _src = self.source
-        _net = _net.copy()
-        if not _net.has_node(_src):
-            _sp = nx.shortest_path(self.G.graph, _src, list(_net.nodes())[0])
-            for n1, n2 in zip(_sp[:-1], _sp[1:]):
-                _net.add_edge(n1, n2, length=self.G.graph[n1][n2]["length"])
+        tree = self.distance_tree(_net, _src)
+        _net = tree.graph
         L = []
         for obj in self.model.models:
             if isinstance(obj, Capacitor):
                 if _net.has_node(obj.connecting_element):
-                    L.append(
-                        nx.shortest_path_length(
-                            _net, _src, obj.connecting_element, weight="length"
-                        )
-                    )
+                    L.append(tree.distance_to(obj.connecting_element))
         if len(L) > 0:
             return np.mean(L)
         else:
@@ -2251,21 +2446,14 @@ class NetworkAnalyzer(object):
         else:
             _net = self.G.graph
             _src = self.source
-        _net = _net.copy()
-        if not _net.has_node(_src):
-            _sp = nx.shortest_path(self.G.graph, _src, list(_net.nodes())[0])
-            for n1, n2 in zip(_sp[:-1], _sp[1:]):
-                _net.add_edge(n1, n2, length=self.G.graph[n1][n2]["length"])
+        tree = self.distance_tree(_net, _src)
+        _net = tree.graph
         L = []
         for obj in self.model.models:
             if isinstance(obj, Line) and obj.is_recloser == 1:
                 if hasattr(obj, "from_element") and obj.from_element is not None:
                     if _net.has_node(obj.from_element):
-                        L.append(
-                            nx.shortest_path_length(
-                                _net, _src, obj.from_element, weight="length"
-                            )
-                        )
+                        L.append(tree.distance_to(obj.from_element))
         if len(L) > 0:
             return np.mean(L)
         else:
@@ -2286,15 +2474,9 @@ class NetworkAnalyzer(object):
         else:
             _net = self.G.graph
             _src = self.source
-        dist = {}
-        _net = _net.copy()
-        if not _net.has_node(_src):
-            _sp = nx.shortest_path(self.G.graph, _src, list(_net.nodes())[0])
-            for n1, n2 in zip(_sp[:-1], _sp[1:]):
-                _net.add_edge(n1, n2, length=self.G.graph[n1][n2]["length"])
-        for node in _net.nodes():
-            dist[node] = nx.shortest_path_length(_net, _src, node, weight="length")
-        return np.max(list(dist.values())) * 0.000621371  # Convert length to miles
+        tree = self.distance_tree(_net, _src)
+        dist = [tree.distance_to(node) for node in tree.graph.nodes()]
+        return np.max(dist) * 0.000621371  # Convert length to miles
 
     def furtherest_node_miles_clever(self):
         """
@@ -2304,13 +2486,13 @@ class NetworkAnalyzer(object):
 
         .. warning:: Not working....
         """
-        dist = {}
-        for node in self.G.graph.nodes():
-            if nx.degree(self.G.graph, node) == 1:
-                dist[node] = nx.shortest_path_length(
-                    self.G.graph, self.source, node, weight="length"
-                )
-        return np.max(list(dist.values())) * 0.000621371  # Convert length to miles
+        tree = self.distance_tree()
+        dist = [
+            tree.distance_to(node)
+            for node, degree in self.G.graph.degree()
+            if degree == 1
+        ]
+        return np.max(dist) * 0.000621371  # Convert length to miles
 
     def lv_length_miles(self):
         """Returns the sum of the low voltage line lengths in miles."""
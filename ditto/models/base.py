@@ -2,6 +2,7 @@
 from __future__ import absolute_import, division, print_function
 from builtins import super, range, zip, round, map
 
+import copyreg
 import warnings
 from traitlets.traitlets import (
     ObserveHandler,
@@ -20,7 +21,19 @@ class DiTToHasTraits(T.HasTraits):
 
     response = T.Any(allow_none=True, help="default trait for managing return values")
 
+    def __new__(cls, model=None, *args, **kwargs):
+        # Stores created with lightweight=True hold slotted objects instead (see LightweightModel)
+        if getattr(model, "lightweight", False):
+            return object.__new__(lightweight_class(cls))
+        if issubclass(cls, LightweightModel):
+            if model is None:
+                # Bare instance (copy, pickle)
+                return object.__new__(cls)
+            return cls._traits_class(model, *args, **kwargs)
+        return super().__new__(cls, model, *args, **kwargs)
+
     def __init__(self, model, *args, **kwargs):
+        self._model = model
         model.model_store.append(self)
         self.build(model)
         super().__init__(*args, **kwargs)
@@ -32,10 +45,21 @@ class DiTToHasTraits(T.HasTraits):
                 warnings.warn("Duplicate name %s being set. Object overwritten." % name)
                 logger.debug("Duplicate name %s being set. Object overwritten." % name)
                 logger.debug(model.model_names[name], self)
-            model.model_names[name] = self
+            model.model_store.index_name(self, name)
         except AttributeError:
             pass
 
+    def notify_change(self, change):
+        # Keep the name index and the network of the Store in sync
+        model = getattr(self, "_model", None)
+        if model is not None and (
+            change["name"] == "name"
+            or model.model_store.network is not None
+            or model.model_store.tables is not None
+        ):
+            model.model_store.update(self, change["name"], change["old"], change["new"])
+        super().notify_change(change)
+
     def build(self, model):
         raise NotImplementedError(
             "Build function must be implemented by derived classes"
@@ -70,6 +94,230 @@ class DiTToHasTraits(T.HasTraits):
             return c(bunch)
 
 
+class LightweightModel(object):
+    """Base class of the lightweight counterparts of the DiTTo models.
+
+    A lightweight class is a subclass of a DiTTo model (isinstance checks and
+    type names are unchanged) whose traits are replaced by plain slots.
+    Attributes are read at plain attribute speed, and no per-object traitlets
+    dictionaries or notifications are involved.
+
+    Values are validated (and cast) by the traits of the model when they are set,
+    unless the Store was created with validate_on_set=False. In that case, call
+    validate() (or Store.validate_models()) to check them on demand.
+
+    As with traitlets, the traits with a dynamic default (lists...) are only
+    initialized when they are first accessed, so _trait_values only holds the
+    values which were set or accessed.
+
+    These objects are created by the models when they are given a Store
+    built with lightweight=True:
+
+    >>> model = Store(lightweight=True)
+    >>> node = Node(model, name="n1")
+    """
+
+    __slots__ = ()
+
+    _traits_class = None
+    _class_traits = {}
+    _trait_defaults = ()
+    _dynamic_traits = {}
+    _trait_validators = {}
+    _trait_slots = ()
+
+    # Do not run the traitlets cross validation when validating
+    _cross_validation_lock = True
+
+    def __init__(self, model, *args, **kwargs):
+        for name, default in self._trait_defaults:
+            object.__setattr__(self, name, default)
+        object.__setattr__(self, "_model", model)
+        model.model_store.append(self)
+        self.build(model)
+
+        unknown = {}
+        for name, value in kwargs.items():
+            if name in self._class_traits:
+                setattr(self, name, value)
+            else:
+                unknown[name] = value
+
+        # Other arguments are passed on to object.__init__, as with traitlets
+        try:
+            super(T.HasTraits, self).__init__(*args, **unknown)
+        except TypeError as e:
+            arg_s_list = [repr(arg) for arg in args]
+            for k, v in unknown.items():
+                arg_s_list.append("%s=%r" % (k, v))
+            warnings.warn(
+                "Passing unrecognized arguments to super({classname}).__init__({arg_s}).\n"
+                "{error}".format(
+                    classname=self.__class__.__name__,
+                    arg_s=", ".join(arg_s_list),
+                    error=e,
+                ),
+                DeprecationWarning,
+                stacklevel=2,
+            )
+
+    def __getattr__(self, name):
+        # Only called for the unset slots: initialize the dynamic defaults
+        trait = self._dynamic_traits.get(name)
+        if trait is None:
+            raise AttributeError(
+                "'{}' object has no attribute '{}'".format(type(self).__name__, name)
+            )
+        value = trait._validate(self, trait._dynamic_default_callable(self)())
+        object.__setattr__(self, name, value)
+        return value
+
+    def __setattr__(self, name, value):
+        if name in self._trait_validators:
+            validate, allow_none = self._trait_validators[name]
+            if (
+                validate is not None
+                and not (value is None and allow_none)
+                and getattr(self._model, "validate_on_set", True)
+            ):
+                value = validate(self, value)
+            model_store = self._model.model_store
+            if (
+                name == "name"
+                or model_store.network is not None
+                or model_store.tables is not None
+            ):
+                # Keep the name index, the network and the tables of the Store in sync
+                old = getattr(self, name)
+                object.__setattr__(self, name, value)
+                if old is not value:
+                    model_store.update(self, name, old, value)
+                return
+        object.__setattr__(self, name, value)
+
+    def __reduce__(self):
+        # The lightweight classes are built dynamically, so they are pickled
+        # through the model class they are built from
+        values = self._trait_values
+        for name in ("_model",) + tuple(getattr(self, "__dict__", ())):
+            try:
+                values[name] = object.__getattribute__(self, name)
+            except AttributeError:
+                pass
+        return (_rebuild_lightweight, (self._traits_class, values))
+
+    @property
+    def _trait_values(self):
+        values = {}
+        for name, slot in self._trait_slots:
+            try:
+                values[name] = slot.__get__(self)
+            except AttributeError:
+                pass
+        return values
+
+    @classmethod
+    def class_traits(cls, **metadata):
+        if not metadata:
+            return dict(cls._class_traits)
+        return cls._traits_class.class_traits(**metadata)
+
+    @classmethod
+    def class_trait_names(cls, **metadata):
+        return list(cls.class_traits(**metadata))
+
+    def traits(self, **metadata):
+        return self.class_traits(**metadata)
+
+    def trait_names(self, **metadata):
+        return self.class_trait_names(**metadata)
+
+    def has_trait(self, name):
+        return name in self._class_traits
+
+    def validate(self):
+        """Validate (and cast) the attributes against the traits of the model.
+
+        :raises: traitlets.TraitError if a value is not valid
+        """
+        for name, value in self._trait_values.items():
+            validate, allow_none = self._trait_validators[name]
+            if validate is None or (value is None and allow_none):
+                continue
+            object.__setattr__(self, name, validate(self, value))
+
+
+def _rebuild_lightweight(traits_class, values):
+    """Rebuild a lightweight model from the values returned by LightweightModel.__reduce__."""
+    obj = object.__new__(lightweight_class(traits_class))
+    for name, value in values.items():
+        object.__setattr__(obj, name, value)
+    return obj
+
+
+class LightweightMeta(type(DiTToHasTraits)):
+    """Metaclass of the lightweight classes.
+
+    The lightweight classes are built dynamically, so they are pickled
+    through the model class they are built from (see lightweight_class).
+    """
+
+
+def _reduce_lightweight_class(cls):
+    return lightweight_class, (cls._traits_class,)
+
+
+copyreg.pickle(LightweightMeta, _reduce_lightweight_class)
+
+
+_lightweight_classes = {}
+
+
+def lightweight_class(cls):
+    """Return the lightweight (slotted) counterpart of a DiTTo model class.
+
+    The class is built the first time it is requested, and the static default
+    values of the traits are computed once for all its instances.
+    """
+    if issubclass(cls, LightweightModel):
+        return cls
+    if cls in _lightweight_classes:
+        return _lightweight_classes[cls]
+
+    # Get the static default values from a bare traitlets instance
+    prototype = T.HasTraits.__new__(cls)
+    T.HasTraits.__init__(prototype)
+    class_traits = cls.class_traits()
+    trait_names = sorted(class_traits)
+
+    namespace = {
+        "__slots__": tuple(trait_names) + ("_model",),
+        "__module__": cls.__module__,
+        "__doc__": cls.__doc__,
+        "_traits_class": cls,
+        "_class_traits": class_traits,
+        "_trait_defaults": tuple(
+            (name, prototype._trait_values[name])
+            for name in trait_names
+            if name in prototype._trait_values
+        ),
+        "_dynamic_traits": {
+            name: trait
+            for name, trait in class_traits.items()
+            if name not in prototype._trait_values
+        },
+        "_trait_validators": {
+            name: (getattr(trait, "validate", None), trait.allow_none)
+            for name, trait in class_traits.items()
+        },
+    }
+
+    light = LightweightMeta(cls.__name__, (LightweightModel, cls), namespace)
+    light._trait_slots = tuple((name, light.__dict__[name]) for name in trait_names)
+    _lightweight_classes[cls] = light
+    return light
+
+
 class DiTToTraitType(T.TraitType):
 
     allow_none = True
@@ -23,27 +23,60 @@ logger = logging.getLogger(__name__)
 class Modifier:
     """Modifier class."""
 
-    def delete_element(self, model, obj):
-        """ Recursively delete an object from the model"""
+    # List attributes which do not hold DiTTo objects owned by the object
+    # TODO: Add type checking rather than looking at the attributes
+    _not_owned_lists = (
+        "reactances",
+        "phases",
+        "impedance_matrix",
+        "capacitance_matrix",
+    )
+
+    def owned_list_names(self, obj):
+        """Return the names of the List attributes of obj holding the objects it owns (wires, phase_loads, windings...)."""
+        names = []
         for attr in obj.traits():
             class_name = str(type(obj.traits()[attr])).strip("<>'").split(".")[-1]
-            if class_name == "List":
-                if (
-                    getattr(obj, attr) is None
-                    or getattr(obj, attr) is None
-                    or len(getattr(obj, attr)) == 0
-                    or attr == "reactances"
-                    or attr == "phases"
-                    or attr == "impedance_matrix"
-                    or attr == "capacitance_matrix"
-                ):  # Reactances (PowerTransformer) and phases (Node) are a special case of lists that aren't classes TODO: Add type checking rather than looking at the attributes
-                    continue
-                for element in getattr(obj, attr):
-                    # logger.debug('attr',attr,element)
-                    self.delete_element(model, element)
-        model.remove_element(
-            obj
-        )  # TODO: Improve this so the data isn't stored in a list
+            if class_name == "List" and attr not in self._not_owned_lists:
+                names.append(attr)
+        return names
+
+    def delete_element(self, model, obj):
+        """ Recursively delete an object from the model"""
+        return self.delete_elements(model, [obj])
+
+    def delete_elements(self, model, objs):
+        """Delete objects from the model, with all the objects they own (wires, phase_loads, windings...).
+
+        All the objects to delete are collected first, and then removed from the model in one go
+        (see Store.remove_elements). Either all of them are removed, or none if one of them is not in the model.
+
+        :param model: DiTTo model
+        :type model: Store
+        :param objs: The objects to delete
+        :type objs: iterable
+        :returns: The model
+        :rtype: Store
+        """
+        # Owned objects are removed before their owner, as with a recursive delete
+        collected = {}
+        list_names = {}
+        stack = [(obj, False) for obj in reversed(list(objs))]
+        while stack:
+            obj, expanded = stack.pop()
+            if expanded:
+                collected.setdefault(id(obj), obj)
+                continue
+            if id(obj) in collected:
+                continue
+            stack.append((obj, True))
+            if type(obj) not in list_names:
+                list_names[type(obj)] = self.owned_list_names(obj)
+            for attr in reversed(list_names[type(obj)]):
+                elements = getattr(obj, attr)
+                if elements is not None:
+                    stack.extend((element, False) for element in reversed(elements))
+        model.remove_elements(list(collected.values()))
         return model
 
     def copy(self, model, obj):
@@ -29,6 +29,117 @@ from ditto.network.network import Network
 logger = logging.getLogger(__name__)
 
 
+class UpstreamWalk(object):
+    """One walk of the network downstream of a node, recording for every node reached
+    its nearest upstream transformer and the lines between the node and this transformer.
+
+    The walk is an iterative depth first search of the directed network, so it is
+    not limited by the recursion limit on long radial feeders. The queries then take
+    constant time, except lines() which is linear in the number of lines returned.
+    """
+
+    def __init__(
+        self, model, digraph, edge_equipment, edge_equipment_name, source, previous=None
+    ):
+        """Class CONSTRUCTOR.
+
+        :param model: DiTTo model of the network
+        :type model: DiTTo model
+        :param digraph: Directed graph of the network
+        :type digraph: networkx.DiGraph
+        :param edge_equipment: Equipment types on the edges of the network
+        :type edge_equipment: dict
+        :param edge_equipment_name: Equipment names on the edges of the network
+        :type edge_equipment_name: dict
+        :param source: Name of the node where the walk starts
+        :type source: str
+        :param previous: Name of the node upstream of source, if any
+        :type previous: str
+        """
+        self.model = model
+        self.edge_equipment = edge_equipment
+        self.edge_equipment_name = edge_equipment_name
+
+        # Nodes in the order of the walk
+        self.order = []
+        # Name of the nearest upstream transformer of every node (None if there is none)
+        self.transformers = {}
+        # Lines between every node and its upstream transformer, as linked
+        # (line name, lines of the parent node) pairs shared between the nodes
+        self._lines = {}
+        self._secondary_voltages = {}
+
+        stack = [(source, previous)]
+        while stack:
+            node, parent = stack.pop()
+            self.order.append(node)
+            _type, name = self.edge(parent, node)
+            if _type == "PowerTransformer":
+                self.transformers[node] = name
+                self._lines[node] = None
+            else:
+                self.transformers[node] = self.transformers.get(parent)
+                lines = self._lines.get(parent)
+                self._lines[node] = (name, lines) if _type == "Line" else lines
+            for child in reversed(list(digraph.successors(node))):
+                stack.append((child, node))
+
+    def edge(self, from_node, to_node):
+        """Return the type and the name of the equipment between two nodes."""
+        for edge in ((from_node, to_node), (to_node, from_node)):
+            if edge in self.edge_equipment:
+                _type = self.edge_equipment[edge]
+                break
+        else:
+            return None, None
+        for edge in ((from_node, to_node), (to_node, from_node)):
+            if edge in self.edge_equipment_name:
+                return _type, self.edge_equipment_name[edge]
+        if _type in ("PowerTransformer", "Line"):
+            raise ValueError(
+                "Unable to find equipment between {_from} and {_to}".format(
+                    _from=from_node, _to=to_node
+                )
+            )
+        return _type, None
+
+    def transformer(self, node):
+        """Return the name of the nearest upstream transformer of a node."""
+        if node not in self.transformers:
+            raise ValueError("Node {} was not reached by the walk".format(node))
+        return self.transformers[node]
+
+    def lines(self, node):
+        """Return the names of the lines between a node and its nearest upstream transformer,
+        starting from the node.
+        """
+        if node not in self._lines:
+            raise ValueError("Node {} was not reached by the walk".format(node))
+        lines = []
+        cell = self._lines[node]
+        while cell is not None:
+            lines.append(cell[0])
+            cell = cell[1]
+        return lines
+
+    def nominal_voltage(self, node, voltage):
+        """Return the nominal voltage of a node: the secondary voltage of its nearest upstream
+        transformer, or the given voltage of the source of the walk if there is none.
+        """
+        name = self.transformer(node)
+        if name is None:
+            return voltage
+        if name not in self._secondary_voltages:
+            self._secondary_voltages[name] = min(
+                [
+                    w.nominal_voltage
+                    for w in self.model[name].windings
+                    if w.nominal_voltage is not None
+                ]
+            )
+        return self._secondary_voltages[name]
+
+
 class system_structure_modifier(Modifier):
     """This class implements all methods modifying the topology of a DiTTo model.
     The class inherits from the Modifier class and uses the DiTTo Network module.
@@ -83,21 +194,13 @@ class system_structure_modifier(Modifier):
             ):
                 self.source_voltage = x.nominal_voltage
 
-        # Build the graph...
-        # Note: This takes a while...
-        #
-        # TODO: Improve the graph build in the Network module. Tarek, any idea?
+        # Get the graph of the model, with the attributes set.
+        # It is only built if needed, and kept up to date as the model is modified.
         #
         # TODO: Combine with network_analyzer such that the network is not built multiple times.
         #
-        self.G = Network()
-        self.G.build(self.model, source=self.source)
-
-        self.model.set_names()
-        # Set the attributes in the graph
-        self.G.set_attributes(self.model)
-
         self.model.set_names()
+        self.G = self.model.get_network(source=self.source)
 
         # Equipment types and names on the edges
         self.edge_equipment = nx.get_edge_attributes(self.G.graph, "equipment")
@@ -105,6 +208,27 @@ class system_structure_modifier(Modifier):
             self.G.graph, "equipment_name"
         )
 
+    def upstream_walk(self, source=None, previous=None):
+        """Walk the network downstream of a node (the source by default).
+
+        :param source: Name of the node where the walk starts
+        :type source: str
+        :param previous: Name of the node upstream of source, if any
+        :type previous: str
+        :returns: The nearest upstream transformer and lines of every node reached
+        :rtype: UpstreamWalk
+        """
+        if source is None:
+            source = self.source
+        return UpstreamWalk(
+            self.model,
+            self.G.digraph,
+            self.edge_equipment,
+            self.edge_equipment_name,
+            source,
+            previous,
+        )
+
     def set_missing_coords_recur(self):
         """ Identify nodes that don't have coordinates set and set them to be the average of the existing position values of the neighboring nodes.
         If no adjacent nodes have positional values continue to compute recursively (via while loop)
@@ -215,6 +339,7 @@ class system_structure_modifier(Modifier):
         """This function sets the nominal voltage of the elements in the network.
         This is currently the fastest implementation available as of early January 2018.
         It uses a kind os message passing algorithm. A node passes its nominal voltage to its succesors but modify this value if there is a voltage transformation.
+        The network is walked once, without recursion (see UpstreamWalk).
 
         .. note:: This implementation is MUCH faster than looping over objects and looking for the secondary voltage of the upstream transformer.
         """
@@ -224,34 +349,10 @@ class system_structure_modifier(Modifier):
             previous = self.source
         else:
             node, voltage, previous = args
-        if (previous, node) in self.edge_equipment and self.edge_equipment[
-            (previous, node)
-        ] == "PowerTransformer":
-            trans_name = self.edge_equipment_name[(previous, node)]
-            new_value = min(
-                [
-                    w.nominal_voltage
-                    for w in self.model[trans_name].windings
-                    if w.nominal_voltage is not None
-                ]
-            )
-        elif (node, previous) in self.edge_equipment and self.edge_equipment[
-            (node, previous)
-        ] == "PowerTransformer":
-            trans_name = self.edge_equipment_name[(node, previous)]
-            new_value = min(
-                [
-                    w.nominal_voltage
-                    for w in self.model[trans_name].windings
-                    if w.nominal_voltage is not None
-                ]
-            )
-        else:
-            new_value = voltage
-        if hasattr(self.model[node], "nominal_voltage"):
-            self.model[node].nominal_voltage = new_value
-        for child in self.G.digraph.successors(node):
-            self.set_nominal_voltages_recur(child, new_value, node)
+        walk = self.upstream_walk(node, previous)
+        for node in walk.order:
+            if hasattr(self.model[node], "nominal_voltage"):
+                self.model[node].nominal_voltage = walk.nominal_voltage(node, voltage)
 
     def set_nominal_voltages_recur_line(self):
         """This function should be called after set_nominal_voltages_recur to set the nominal voltage of the lines, because set_nominal_voltages_recur only acts on the nodes.
@@ -748,6 +849,10 @@ class system_structure_modifier(Modifier):
         # These will be the starting points of the upstream walks in the graph
         connecting_elements = [load.connecting_element for load in load_list]
 
+        # Walk the network once to find the upstream transformer of every node,
+        # and the lines in between
+        walk = self.upstream_walk()
+
         # List of lists where we store the names of the lines between the loads and the upstream transformer.
         # We need to keep track of these to remove/add wires once we have the phase of the transformer
         line_names = []
@@ -757,79 +862,18 @@ class system_structure_modifier(Modifier):
 
         # For each connecting element...
         for idx, end_node in enumerate(connecting_elements):
+            transformer_name = walk.transformer(end_node)
+            if transformer_name is None:
+                raise ValueError(
+                    "Unable to find the upstream transformer of {}".format(
+                        load_list[idx].name
+                    )
+                )
+            transformer_names.append(transformer_name)
+            self.model[load_list[idx].name].upstream_transformer_name = transformer_name
+            line_names.append(walk.lines(end_node))
 
-            continu = True
-            line_names.append([])
-
-            # Find the upstream transformer by walking the graph upstream
-            while continu:
-
-                # Get predecessor node of current node in the DAG
-                from_node = next(self.G.digraph.predecessors(end_node))
-
-                # Look for the type of equipment that makes the connection between from_node and to_node
-                _type = None
-                if (from_node, end_node) in self.edge_equipment:
-                    _type = self.edge_equipment[(from_node, end_node)]
-                elif (end_node, from_node) in self.edge_equipment:
-                    _type = self.edge_equipment[(end_node, from_node)]
-
-                # It could be a Line, a Transformer...
-                # If it is a transformer, then we have found the upstream transformer...
-                if _type == "PowerTransformer":
-
-                    # ...we can then stop the loop...
-                    continu = False
-
-                    # ...and grab the transformer name to retrieve the data from the DiTTo object
-                    if (from_node, end_node) in self.edge_equipment_name:
-                        transformer_names.append(
-                            self.edge_equipment_name[(from_node, end_node)]
-                        )
-                        self.model[
-                            load_list[idx].name
-                        ].upstream_transformer_name = self.edge_equipment_name[
-                            (from_node, end_node)
-                        ]
-                    elif (end_node, from_node) in self.edge_equipment_name:
-                        transformer_names.append(
-                            self.edge_equipment_name[(end_node, from_node)]
-                        )
-                        self.model[
-                            load_list[idx].name
-                        ].upstream_transformer_name = self.edge_equipment_name[
-                            (end_node, from_node)
-                        ]
-                    # If we cannot find the object, raise an error because it sould not be the case...
-                    else:
-                        raise ValueError(
-                            "Unable to find equipment between {_from} and {_to}".format(
-                                _from=from_node, _to=end_node
-                            )
-                        )
-
-                # ...if it is a Line, store the name to modify the wires later, once the upstream transformer will be found
-                elif _type == "Line":
-                    if (from_node, end_node) in self.edge_equipment_name:
-                        line_names[-1].append(
-                            self.edge_equipment_name[(from_node, end_node)]
-                        )
-                    elif (end_node, from_node) in self.edge_equipment_name:
-                        line_names[-1].append(
-                            self.edge_equipment_name[(end_node, from_node)]
-                        )
-                    # Again, if we cannot find the object, raise an error because it sould not be the case...
-                    else:
-                        raise ValueError(
-                            "Unable to find equipment between {_from} and {_to}".format(
-                                _from=from_node, _to=end_node
-                            )
-                        )
-
-                # Go upstream...
-                end_node = from_node
-
-        # At this point, we exited the loop, so we have found the transformers for all the load objects
+        # At this point, we have found the transformers for all the load objects
         # Cast the list to a Numpy array first
         transformer_names = np.array(transformer_names)
 
@@ -894,7 +938,7 @@ class system_structure_modifier(Modifier):
                 # If the load has phase loads with phases that do not match the
                 # phase of the upstream transformer, then flag them...
                 if phase_load.phase not in phase:
-                    phase_load.drop = 1
+                    phase_load.drop = True
 
             # Then, take care of the lines...
             # Loop over all the lines in between the current load and transformer...
@@ -913,7 +957,7 @@ class system_structure_modifier(Modifier):
                         and wire.phase not in ["N", "N1", "N2"]
                         and wire.phase not in phase
                     ):
-                        wire.drop = 1
+                        wire.drop = True
 
             # It might be the case that we need to create new objects.
             # For example, we might have had a AB load and the upstream transformer turned out to be phase C
@@ -930,7 +974,7 @@ class system_structure_modifier(Modifier):
                     # Is there an even faster way???
                     new_phase_load = self.copy(self.model, load.phase_loads[0])
                     new_phase_load.phase = p
-                    new_phase_load.drop = 0
+                    new_phase_load.drop = False
                     load.phase_loads.append(new_phase_load)
 
                 # Work on the lines...
@@ -944,7 +988,7 @@ class system_structure_modifier(Modifier):
                     if p not in [wire.phase for wire in line_obj.wires]:
                         new_wire = self.copy(self.model, line_obj.wires[0])
                         new_wire.phase = p
-                        new_wire.drop = 0
+                        new_wire.drop = False
                         line_obj.wires.append(new_wire)
 
             n_real_phase_loads = sum([1 for pl in load.phase_loads if pl.drop != 1])
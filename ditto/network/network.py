@@ -12,6 +12,27 @@ from ditto.models.base import DiTToHasTraits
 
 logger = logging.getLogger(__name__)
 
+_class_attributes = {}
+
+
+def _model_attributes(model):
+    """Return the attributes of model which are copied on the graph, by name.
+
+    These are the public attributes of the subclass, not of the base class.
+    """
+    cls = type(model)
+    names = _class_attributes.get(cls)
+    if names is None:
+        names = _class_attributes[cls] = tuple(
+            attr for attr in set(dir(cls)) - set(dir(DiTToHasTraits)) if attr[0] != "_"
+        )
+    instance_names = [
+        attr
+        for attr in getattr(model, "__dict__", ())
+        if attr[0] != "_" and attr not in names and not hasattr(DiTToHasTraits, attr)
+    ]
+    return {attr: getattr(model, attr) for attr in names + tuple(instance_names)}
+
 
 class Network:
     def __init__(self):
@@ -26,6 +47,23 @@ class Network:
         self.attributes_set = (
             False  # Flag that indicates whether the attributes have been set or not.
         )
+        self.source = "sourcebus"
+        self._model = None  # Store whose changes are tracked (see track())
+        self._links = {}  # model -> edges it makes, as (u, v, kind)
+        self._owners = {}  # edge -> models making it, as {(model, kind): None}
+
+    @property
+    def digraph(self):
+        # The digraph is only recomputed when it is needed after the topology changed
+        if self._digraph_dirty:
+            self._update_digraph()
+        return self._digraph
+
+    @digraph.setter
+    def digraph(self, digraph):
+        self._digraph = digraph
+        self._digraph_dirty = False
+        self._upstream_transformers = None
 
     def provide_graphs(self, graph, digraph):
         """
@@ -45,79 +83,12 @@ class Network:
     # Nicolas modification: Added source in the args for bfs
     def build(self, model, source="sourcebus"):
         self.graph = nx.Graph()
-        graph_edges = set()
-        graph_nodes = set()
+        self._links = {}
+        self._owners = {}
+        self.attributes_set = False
+        self.source = source
         for i in model.models:
-
-            # Nicolas modification: I need the type of object that connects the nodes to postprocess the center tap loads
-            #
-            if hasattr(i, "name") and i.name is not None:
-                object_type = type(i).__name__
-
-            if (
-                hasattr(i, "from_element")
-                and i.from_element is not None
-                and hasattr(i, "to_element")
-                and i.to_element is not None
-            ):
-
-                if hasattr(i, "length") and i.length is not None:
-                    length = i.length
-                else:
-                    length = 0  # Default if we do not have a valid length.
-
-                # The following ugly code that repeats itself multiple times in build()
-                # was a desperate attempt to speed up the network build method.
-                # Does not make much difference though...
-                #
-                # TODO: Improve the performance of this function if possible. Otherwise, revert to pretty code
-                #
-                a = len(graph_nodes)
-                graph_nodes.add(i.to_element)
-                b = len(graph_nodes)
-                if b == a + 1:
-                    # if not i.to_element in graph_nodes:
-                    self.graph.add_node(i.to_element)
-                    # graph_nodes.add(i.to_element)
-                a = len(graph_nodes)
-                graph_nodes.add(i.from_element)
-                b = len(graph_nodes)
-                if b == a + 1:
-                    # if not i.from_element in graph_nodes:
-                    self.graph.add_node(i.from_element)
-                    # graph_nodes.add(i.from_element)
-
-                self.graph.add_edge(
-                    i.from_element,
-                    i.to_element,
-                    equipment=object_type,
-                    equipment_name=i.name,
-                    length=length,
-                )
-                graph_edges.add((i.from_element, i.to_element))
-
-            if hasattr(i, "connecting_element") and i.connecting_element is not None:
-                a = len(graph_nodes)
-                graph_nodes.add(i.connecting_element)
-                b = len(graph_nodes)
-                if b == a + 1:
-                    # if not i.connecting_element in graph_nodes:
-                    self.graph.add_node(i.connecting_element)
-                    # graph_nodes.add(i.connecting_element)
-                a = len(graph_nodes)
-                graph_nodes.add(i.name)
-                b = len(graph_nodes)
-                if b == a + 1:
-                    # if not i.name in graph_nodes:
-                    self.graph.add_node(i.name)
-                    # graph_nodes.add(i.name)
-                a = len(graph_edges)
-                graph_edges.add((i.connecting_element, i.name))
-                b = len(graph_edges)
-                if b == a + 1:
-                    # if not (i.connecting_element,i.name) in graph_edges:
-                    self.graph.add_edge(*(i.connecting_element, i.name))
-                    # graph_edges.add((i.connecting_element,i.name))
+            self.add_model(i)
 
         # Nicolas modification: Calling to_directed() on NetworkX undirected graph gives a directed graph with edges in both direction
         # a-b gives a->b and a<-b, which is not what we want
@@ -125,28 +96,143 @@ class Network:
         # self.digraph = self.graph.to_directed()
         #
         # Using the bfs_order method:
-        self.digraph = nx.DiGraph()
-        self.digraph.add_edges_from(list(self.bfs_order(source=source)))
+        self._update_digraph()
 
-        edge_equipment = nx.get_edge_attributes(self.graph, "equipment")
-        edge_equipment_name = nx.get_edge_attributes(self.graph, "equipment_name")
-        for edge in edge_equipment:
-            if self.digraph.has_edge(*edge):
-                self.digraph[edge[0]][edge[1]]["equipment"] = edge_equipment[edge]
-            elif self.digraph.has_edge(*edge[::-1]):
-                self.digraph[edge[1]][edge[0]]["equipment"] = edge_equipment[edge]
+        self.is_built = True
 
-        for edge in edge_equipment_name:
-            if self.digraph.has_edge(*edge):
-                self.digraph[edge[0]][edge[1]]["equipment_name"] = edge_equipment_name[
-                    edge
-                ]
-            elif self.digraph.has_edge(*edge[::-1]):
-                self.digraph[edge[1]][edge[0]]["equipment_name"] = edge_equipment_name[
-                    edge
-                ]
+    def track(self, model):
+        """Keep the graph up to date with the changes made to the models of the Store model.
 
-        self.is_built = True
+        The Network must have been built from model. Afterwards, the nodes and edges are
+        updated when models are added, removed or changed (from_element, to_element,
+        connecting_element, name...), and the digraph is only recomputed when it is used.
+        """
+        self._model = model
+        model.model_store.network = self
+
+    def set_source(self, source):
+        """Change the source of the digraph, which is recomputed when it is next used."""
+        if source != self.source:
+            self.source = source
+            self._digraph_dirty = True
+
+    def add_model(self, model):
+        """Add the nodes and edges made by model to the graph."""
+        name = getattr(model, "name", None)
+        edges = []
+        from_element = getattr(model, "from_element", None)
+        to_element = getattr(model, "to_element", None)
+        if from_element is not None and to_element is not None:
+            edges.append((from_element, to_element, "from_to"))
+        connecting_element = getattr(model, "connecting_element", None)
+        if connecting_element is not None and name is not None:
+            edges.append((connecting_element, name, "connecting"))
+
+        if edges:
+            self._links[model] = edges
+            for u, v, kind in edges:
+                # Same node order as the previous build: to_element first
+                for node in (v, u) if kind == "from_to" else (u, v):
+                    if node not in self.graph:
+                        self.graph.add_node(node)
+                        self._refresh_node(node)
+                self._owners.setdefault(frozenset((u, v)), {})[(model, kind)] = None
+                if not self.graph.has_edge(u, v):
+                    self.graph.add_edge(u, v)
+                self._refresh_edge(u, v)
+            self._digraph_dirty = True
+        if name is not None and name in self.graph:
+            self._refresh_node(name)
+
+    def remove_model(self, model):
+        """Remove the nodes and edges made by model from the graph."""
+        edges = self._links.pop(model, ())
+        for u, v, kind in edges:
+            key = frozenset((u, v))
+            owners = self._owners[key]
+            del owners[(model, kind)]
+            if not owners:
+                del self._owners[key]
+            self._refresh_edge(u, v)
+        if edges:
+            self._digraph_dirty = True
+        name = getattr(model, "name", None)
+        if name is not None and name in self.graph:
+            self._refresh_node(name)
+
+    def update_model(self, model, name, old, new):
+        """Update the graph after the attribute name of model changed from old to new."""
+        if name in ("from_element", "to_element", "connecting_element", "name"):
+            self.remove_model(model)
+            if name == "name" and old is not None and old in self.graph:
+                self._refresh_node(old)
+            self.add_model(model)
+        else:
+            for u, v, kind in self._links.get(model, ()):
+                if self.attributes_set or name == "length":
+                    self._refresh_edge(u, v)
+            model_name = getattr(model, "name", None)
+            if model_name is not None and model_name in self.graph:
+                self._refresh_node(model_name)
+
+    def _refresh_edge(self, u, v):
+        """Set the data of the edge (u, v) from the models making it."""
+        owners = self._owners.get(frozenset((u, v)))
+        if not owners:
+            if self.graph.has_edge(u, v):
+                self.graph.remove_edge(u, v)
+            # Only connected nodes are in the graph
+            for node in (u, v):
+                if node in self.graph and self.graph.degree(node) == 0:
+                    self.graph.remove_node(node)
+            return
+        if not self.graph.has_edge(u, v):
+            # Removed from the graph directly (e.g. remove_open_switches)
+            return
+        data = self.graph[u][v]
+        data.clear()
+        for model, kind in owners:
+            if kind == "from_to":
+                length = getattr(model, "length", None)
+                data["equipment"] = type(model).__name__
+                data["equipment_name"] = model.name
+                data["length"] = length if length is not None else 0
+            if self.attributes_set:
+                data.update(_model_attributes(model))
+        if not self._digraph_dirty and self._digraph is not None:
+            for edge in ((u, v), (v, u)):
+                if self._digraph.has_edge(*edge):
+                    digraph_data = self._digraph[edge[0]][edge[1]]
+                    digraph_data.clear()
+                    digraph_data.update(data)
+
+    def _refresh_node(self, node):
+        """Set the data of node from the models named after it."""
+        if not self.attributes_set or self._model is None:
+            return
+        data = self.graph.nodes[node]
+        data.clear()
+        for model in self._model.model_store.find_all(node):
+            self.class_map[node] = type(model).__name__
+            data.update(_model_attributes(model))
+        if (
+            not self._digraph_dirty
+            and self._digraph is not None
+            and node in self._digraph
+        ):
+            digraph_data = self._digraph.nodes[node]
+            digraph_data.clear()
+            digraph_data.update(data)
+
+    def _update_digraph(self):
+        digraph = nx.DiGraph()
+        digraph.add_edges_from(list(self.bfs_order(source=self.source)))
+        for u, v, data in digraph.edges(data=True):
+            data.update(self.graph[u][v])
+        if self.attributes_set:
+            for node, data in digraph.nodes(data=True):
+                data.update(self.graph.nodes[node])
+        self.digraph = digraph
 
     """
         This is useful if the base graph has been modified (e.g. deleting edges)
@@ -247,13 +333,12 @@ class Network:
                 object_type = type(i).__name__
                 self.class_map[i.name] = object_type
 
+                # only set attributes from the subclass, not the base class
+                attributes = None
                 if i.name in graph_nodes:
-                    for attr in tuple(
-                        set(dir(i)) - set(dir(DiTToHasTraits))
-                    ):  # only set attributes from the subclass, not the base class
-                        if attr[0] != "_":
-                            self.graph.nodes[i.name][attr] = getattr(i, attr)
-                            self.digraph.nodes[i.name][attr] = getattr(i, attr)
+                    attributes = _model_attributes(i)
+                    self.graph.nodes[i.name].update(attributes)
+                    self.digraph.nodes[i.name].update(attributes)
 
                 if (
                     hasattr(i, "from_element")
@@ -261,61 +346,27 @@ class Network:
                     and hasattr(i, "to_element")
                     and i.to_element is not None
                 ):
-                    if (i.from_element, i.to_element) in graph_edges:
-                        for attr in tuple(
-                            set(dir(i)) - set(dir(DiTToHasTraits))
-                        ):  # only set attributes from the subclass, not the base class
-                            if attr[0] != "_":
-                                self.graph[i.from_element][i.to_element][
-                                    attr
-                                ] = getattr(i, attr)
-                                self.digraph[i.from_element][i.to_element][
-                                    attr
-                                ] = getattr(i, attr)
-
-                    if (i.to_element, i.from_element) in graph_edges:
-                        for attr in tuple(
-                            set(dir(i)) - set(dir(DiTToHasTraits))
-                        ):  # only set attributes from the subclass, not the base class
-                            if attr[0] != "_":
-                                self.graph[i.to_element][i.from_element][
-                                    attr
-                                ] = getattr(i, attr)
-                                self.digraph[i.to_element][i.from_element][
-                                    attr
-                                ] = getattr(i, attr)
+                    for edge in (
+                        (i.from_element, i.to_element),
+                        (i.to_element, i.from_element),
+                    ):
+                        if edge in graph_edges:
+                            if attributes is None:
+                                attributes = _model_attributes(i)
+                            self.graph[edge[0]][edge[1]].update(attributes)
+                            self.digraph[edge[0]][edge[1]].update(attributes)
 
                 if (
                     hasattr(i, "connecting_element")
                     and i.connecting_element is not None
                 ):
                     if (i.connecting_element, i.name) in graph_edges:
-                        for attr in tuple(
-                            set(dir(i)) - set(dir(DiTToHasTraits))
-                        ):  # only set attributes from the subclass, not the base class
-                            if attr[0] != "_":
-                                if self.graph.has_edge(i.connecting_element, i.name):
-                                    self.graph[i.connecting_element][i.name][
-                                        attr
-                                    ] = getattr(i, attr)
-                                else:
-                                    self.graph.add_edge(
-                                        i.connecting_element, i.name, length=0
-                                    )
-                                    self.graph[i.connecting_element][i.name][
-                                        attr
-                                    ] = getattr(i, attr)
-                                if self.digraph.has_edge(i.connecting_element, i.name):
-                                    self.digraph[i.connecting_element][i.name][
-                                        attr
-                                    ] = getattr(i, attr)
-                                else:
-                                    self.digraph.add_edge(
-                                        i.connecting_element, i.name, length=0
-                                    )
-                                    self.digraph[i.connecting_element][i.name][
-                                        attr
-                                    ] = getattr(i, attr)
+                        if attributes is None:
+                            attributes = _model_attributes(i)
+                        for graph in (self.graph, self.digraph):
+                            if not graph.has_edge(i.connecting_element, i.name):
+                                graph.add_edge(i.connecting_element, i.name, length=0)
+                            graph[i.connecting_element][i.name].update(attributes)
 
         self.attributes_set = True
 
@@ -345,21 +396,38 @@ class Network:
                         self.digraph.remove_edge(m.from_element, m.to_element)
                     if self.digraph.has_edge(m.to_element, m.from_element):
                         self.digraph.remove_edge(m.to_element, m.from_element)
+        self._upstream_transformers = None
 
-    def get_upstream_transformer(self, model, node):
+    def upstream_transformers(self):
+        """Return the name of the first transformer upstream of every node of the digraph (None if there is none).
+
+        The names are found in one pass down the digraph, and kept until the digraph changes.
 
-        curr_node = node
-        curr = list(self.digraph.predecessors(node))
-        edge_equipment = nx.get_edge_attributes(self.digraph, "equipment")
-        edge_equipment_name = nx.get_edge_attributes(self.digraph, "equipment_name")
-        # import pdb; pdb.set_trace()
-        while curr != []:
-            edge_type = edge_equipment[(curr[0], curr_node)]
-            if edge_type == "PowerTransformer":
-                return edge_equipment_name[(curr[0], curr_node)]
-            curr_node = curr[0]  # assuming that the network is a DAG
-            curr = list(self.digraph.predecessors(curr_node))
-        return None
+        :returns: The names of the upstream transformers, by node
+        :rtype: dict
+        """
+        digraph = self.digraph  # Recomputed first if the topology changed
+        if self._upstream_transformers is None:
+            transformers = {}
+            for node in nx.topological_sort(digraph):
+                transformers[node] = None
+                for parent in digraph.predecessors(node):
+                    # assuming that the network is a tree
+                    data = digraph[parent][node]
+                    if data.get("equipment") == "PowerTransformer":
+                        transformers[node] = data.get("equipment_name")
+                    else:
+                        transformers[node] = transformers[parent]
+                    break
+            self._upstream_transformers = transformers
+        return self._upstream_transformers
+
+    def get_upstream_transformer(self, model, node):
+        """Return the name of the first transformer upstream of node, or None."""
+        transformers = self.upstream_transformers()
+        if node not in transformers:
+            raise nx.NetworkXError("The node {} is not in the digraph.".format(node))
+        return transformers[node]
 
     def get_all_elements_downstream(self, model, source):
         """Returns all the DiTTo objects which location is downstream of a given node.
@@ -463,19 +531,15 @@ class Network:
         return internal_edges
 
     def find_cycles(self):
-        duplicate_cycles = list(nx.simple_cycles(self.digraph))
-        all_cycles = set()
-        final_cycles = []
-        for i in duplicate_cycles:
-            sorted = []
-            for node in i:
-                sorted.append(node)
-            sorted.sort()
-            sorted = tuple(sorted)
-            if not (sorted in all_cycles):
-                all_cycles.add(sorted)
-                final_cycles.append(i)
-        return final_cycles
+        """Return the loops of the network, as lists of nodes.
+
+        The loops are the fundamental cycles of a spanning tree of the undirected graph
+        (see networkx.cycle_basis): every loop of the network is a combination of them,
+        and they are found in linear time in the number of edges. The loops are sorted
+        by their nodes, so that they do not come in hash order.
+        """
+        cycles = [cycle for cycle in nx.cycle_basis(self.graph) if len(cycle) > 2]
+        return sorted(cycles, key=lambda cycle: sorted(map(str, cycle)))
 
     def order_by_phase(self, edge):
         deg_1 = len(self.graph.nodes[edge[0]]["phases"])
@@ -484,57 +548,52 @@ class Network:
             return [edge[1], edge[0]]
         return [edge[0], edge[1]]
 
+    def edge_name(self, u, v):
+        """Return the name of the equipment making the edge (u, v) of the graph."""
+        data = self.graph[u][v]
+        # Only the edges of the digraph have all the attributes of their equipment
+        return data.get("name", data.get("equipment_name"))
+
     def middle_single_phase(self, nodes):
-        at_1p_section = False
-        cnt = 0
-        max_cnt = 0
-        pos_max_cnt = -1
-        min_phase = 1000
-        for i in range(len(nodes)):
-            # logger.debug('phaselen:')
-            # logger.debug(len(self.graph.nodes[nodes[i]]['phases']))
-            if (not "phases" in self.graph.nodes[nodes[i]]) or self.graph.nodes[
-                nodes[i]
-            ]["phases"] == None:
-                pos = rand.randint(0, len(nodes) - 2)
-                order1 = tuple([nodes[pos], nodes[pos + 1]])
-                order2 = tuple([nodes[pos + 1], nodes[pos]])
-                if order1 in self.graph.edges():
-                    return self.graph[order1[0]][order1[1]]["name"]
-                else:
-                    return self.graph[order2[0]][order2[1]]["name"]
-            if len(self.graph.nodes[nodes[i]]["phases"]) < min_phase:
-                min_phase = len(self.graph.nodes[nodes[i]]["phases"])
-        # logger.debug(min_phase)
-        for i in range(len(nodes)):
-            node = nodes[i]
-            if at_1p_section and len(self.graph.nodes[node]["phases"]) > min_phase:
-                if cnt > max_cnt:
-                    max_cnt = cnt
-                    pos_max_cnt = i - 1
-                cnt = 0
-                at_1p_section = False
-            if len(self.graph.nodes[node]["phases"]) == min_phase:
-                cnt = cnt + 1
-                at_1p_section = True
-        if cnt > 0 and cnt > max_cnt:
-            pos_max_cnt = (
-                len(nodes) - 2
-            )  # Shift by 1 to avoid any index out of bounds issues.
-            cnt = max_cnt = cnt
-
-        if pos_max_cnt > -1:
-            order1 = tuple(
-                [nodes[pos_max_cnt - max_cnt / 2], nodes[pos_max_cnt - max_cnt / 2 + 1]]
-            )
-            order2 = tuple(
-                [nodes[pos_max_cnt - max_cnt / 2 + 1], nodes[pos_max_cnt - max_cnt / 2]]
-            )
-            if order1 in self.graph.edges():
-                logger.debug(order1)
-                return self.graph[order1[0]][order1[1]]["name"]
-            else:
-                logger.debug(order2)
-                return self.graph[order2[0]][order2[1]]["name"]
+        """Return the name of the edge in the middle of the longest single phase section
+        of the loop `nodes`, as returned by find_cycles.
+
+        The loop is first rotated to begin at its first multi-phase node in name order,
+        and oriented towards its neighbour first in name order, so that the edge does not
+        depend on the node the cycle basis starts the loop at. If the phases of a node
+        are unknown, the loop is cut in its middle.
+        """
+        phases = {}
+        for node in nodes:
+            node_phases = self.graph.nodes[node].get("phases")
+            if node_phases is None:
+                phases = dict.fromkeys(nodes, 0)
+                break
+            phases[node] = len(node_phases)
+        min_phase = min(phases.values())
+        multi_phase = [node for node in nodes if phases[node] > min_phase]
+        start = nodes.index(min(multi_phase or nodes, key=str))
+        nodes = list(nodes[start:]) + list(nodes[:start])
+        if str(nodes[-1]) < str(nodes[1]):
+            nodes = nodes[:1] + nodes[:0:-1]
+
+        if not multi_phase:
+            # The whole loop is a single phase section
+            pos_max_cnt, max_cnt = 0, len(nodes)
         else:
-            return ()
+            # The loop begins at a multi-phase node, so no section wraps around its end
+            pos_max_cnt, max_cnt = -1, 0
+            cnt = 0
+            for i, node in enumerate(nodes):
+                if phases[node] > min_phase:
+                    cnt = 0
+                    continue
+                cnt += 1
+                if cnt > max_cnt:
+                    pos_max_cnt, max_cnt = i - cnt + 1, cnt
+        # The section of max_cnt nodes has max_cnt + 1 edges, counting the ones to the
+        # multi-phase nodes at its ends: cut the one in the middle.
+        middle = pos_max_cnt + max_cnt // 2
+        edge = (nodes[middle - 1], nodes[middle])
+        logger.debug(edge)
+        return self.edge_name(*edge)
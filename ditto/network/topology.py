@@ -0,0 +1,331 @@
+"""This module defines a compact, array-backed topology of DiTTo models.
+
+The Topology class is an alternative to the Network class for very large models.
+The nodes are numbered, the adjacency is stored in CSR form in NumPy arrays, and the
+equipment, equipment_name and length of the edges are stored as columns.
+It exposes the traversal methods of Network (bfs_order, get_upstream_transformer,
+get_all_elements_downstream, find_internal_edges...), and networkx graphs are only
+created when to_network() is called.
+"""
+
+from __future__ import absolute_import, division, print_function
+from builtins import super, range, zip, round, map
+
+import logging
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+def _bfs(indptr, indices, edge_index, size, source):
+    """Breadth first search on a CSR adjacency, one level at a time.
+
+    The nodes are visited in the same order as networkx.bfs_edges, given the same
+    neighbor order.
+
+    :returns: The levels (arrays of node ids), and the parent and parent edge of the nodes (-1 if not visited)
+    :rtype: tuple
+    """
+    visited = np.zeros(size, dtype=bool)
+    parent = np.full(size, -1, dtype=np.int64)
+    parent_edge = np.full(size, -1, dtype=np.int64)
+    frontier = np.array([source], dtype=np.int64)
+    visited[frontier] = True
+    levels = [frontier]
+    while True:
+        starts = indptr[frontier]
+        counts = indptr[frontier + 1] - starts
+        total = counts.sum()
+        if total == 0:
+            break
+        # Positions of the neighbors of the frontier, in frontier order
+        offsets = np.repeat(starts - np.cumsum(counts) + counts, counts) + np.arange(
+            total
+        )
+        neighbors = indices[offsets]
+        new = ~visited[neighbors]
+        if not new.any():
+            break
+        neighbors = neighbors[new]
+        parents = np.repeat(frontier, counts)[new]
+        edges = edge_index[offsets][new]
+        # The first node reaching a neighbor is its parent
+        _, first = np.unique(neighbors, return_index=True)
+        first.sort()
+        frontier = neighbors[first]
+        parent[frontier] = parents[first]
+        parent_edge[frontier] = edges[first]
+        visited[frontier] = True
+        levels.append(frontier)
+    return levels, parent, parent_edge
+
+
+def _csr(sources, targets, edges, size):
+    """Return the CSR adjacency (indptr, indices, edge_index) of the given arcs.
+
+    The neighbors of each node are kept in the order of the arcs.
+    """
+    order = np.lexsort((edges, sources))
+    indptr = np.zeros(size + 1, dtype=np.int64)
+    np.cumsum(np.bincount(sources, minlength=size), out=indptr[1:])
+    return indptr, targets[order], edges[order]
+
+
+class Topology(object):
+    """Compact topology of a DiTTo model.
+
+    The graph is the same as the one built by Network.build: the lines, transformers...
+    connect their from_element and to_element, and the objects with a connecting_element
+    are connected to it. The traversals follow the same order as networkx.
+
+    >>> topology = Topology()
+    >>> topology.build(model, source="sourcebus")
+    >>> topology.get_upstream_transformer(model, "load_node")
+
+    The traversal trees are computed once per source and cached.
+    """
+
+    def __init__(self):
+        self.node_names = []  # Node id -> name
+        self.node_ids = {}  # Name -> node id
+        self.edge_u = np.zeros(0, dtype=np.int64)
+        self.edge_v = np.zeros(0, dtype=np.int64)
+        self.equipment = np.zeros(0, dtype=object)
+        self.equipment_name = np.zeros(0, dtype=object)
+        self.length = np.zeros(0)
+        self.from_to = np.zeros(0, dtype=bool)  # Edges made by a from and to element
+        self.indptr = np.zeros(1, dtype=np.int64)
+        self.indices = np.zeros(0, dtype=np.int64)
+        self.edge_index = np.zeros(0, dtype=np.int64)
+        self.source = "sourcebus"
+        self.is_built = False
+        self._trees = {}
+
+    def build(self, model, source="sourcebus"):
+        """Build the topology from the models of the Store model."""
+        node_ids = {}
+        u = []
+        v = []
+        from_to = []
+        equipment = []
+        equipment_name = []
+        length = []
+        for i in model.models:
+            name = getattr(i, "name", None)
+            from_element = getattr(i, "from_element", None)
+            to_element = getattr(i, "to_element", None)
+            if from_element is not None and to_element is not None:
+                # Same node order as Network.build
+                b = node_ids.setdefault(to_element, len(node_ids))
+                a = node_ids.setdefault(from_element, len(node_ids))
+                u.append(a)
+                v.append(b)
+                from_to.append(True)
+                equipment.append(type(i).__name__)
+                equipment_name.append(name)
+                edge_length = getattr(i, "length", None)
+                length.append(edge_length if edge_length is not None else 0)
+            connecting_element = getattr(i, "connecting_element", None)
+            if connecting_element is not None and name is not None:
+                a = node_ids.setdefault(connecting_element, len(node_ids))
+                b = node_ids.setdefault(name, len(node_ids))
+                u.append(a)
+                v.append(b)
+                from_to.append(False)
+                equipment.append(None)
+                equipment_name.append(None)
+                length.append(0)
+
+        self.node_ids = node_ids
+        self.node_names = list(node_ids)
+        size = len(node_ids)
+        u = np.array(u, dtype=np.int64)
+        v = np.array(v, dtype=np.int64)
+        from_to = np.array(from_to, dtype=bool)
+
+        # Parallel arcs make a single edge, at the position of the first one,
+        # with the attributes of the last line, transformer...
+        keys = np.minimum(u, v) * size + np.maximum(u, v)
+        _, first, inverse = np.unique(keys, return_index=True, return_inverse=True)
+        rank = np.empty(len(first), dtype=np.int64)
+        rank[np.argsort(first)] = np.arange(len(first))
+        edge_of_arc = rank[inverse.ravel()]
+        self.edge_u = np.empty(len(first), dtype=np.int64)
+        self.edge_v = np.empty(len(first), dtype=np.int64)
+        self.edge_u[edge_of_arc[first]] = u[first]
+        self.edge_v[edge_of_arc[first]] = v[first]
+
+        self.equipment = np.full(len(first), None, dtype=object)
+        self.equipment_name = np.full(len(first), None, dtype=object)
+        self.length = np.zeros(len(first))
+        arcs = np.flatnonzero(from_to)[::-1]
+        _, last = np.unique(edge_of_arc[arcs], return_index=True)
+        arcs = arcs[last]
+        edges = edge_of_arc[arcs]
+        self.equipment[edges] = np.array(equipment, dtype=object)[arcs]
+        self.equipment_name[edges] = np.array(equipment_name, dtype=object)[arcs]
+        self.length[edges] = np.array(length, dtype=float)[arcs]
+        self.from_to = np.zeros(len(first), dtype=bool)
+        self.from_to[edges] = True
+
+        # Both directions, except for the self loops
+        edge_ids = np.arange(len(first), dtype=np.int64)
+        loop = self.edge_u == self.edge_v
+        self.indptr, self.indices, self.edge_index = _csr(
+            np.concatenate((self.edge_u, self.edge_v[~loop])),
+            np.concatenate((self.edge_v, self.edge_u[~loop])),
+            np.concatenate((edge_ids, edge_ids[~loop])),
+            size,
+        )
+        self.source = source
+        self._trees = {}
+        self.is_built = True
+
+    def _tree(self, source=None):
+        """Return the BFS tree from source (the source of the topology by default).
+
+        :returns: The levels, the parent and parent edge of the nodes, and the upstream transformer edge of the nodes (-1 if none)
+        :rtype: tuple
+        """
+        if source is None:
+            source = self.source
+        tree = self._trees.get(source)
+        if tree is None:
+            levels, parent, parent_edge = _bfs(
+                self.indptr,
+                self.indices,
+                self.edge_index,
+                len(self.node_names),
+                self.node_ids[source],
+            )
+            upstream = np.full(len(self.node_names), -1, dtype=np.int64)
+            for level in levels[1:]:
+                edges = parent_edge[level]
+                upstream[level] = np.where(
+                    self.equipment[edges] == "PowerTransformer",
+                    edges,
+                    upstream[parent[level]],
+                )
+            tree = self._trees[source] = (levels, parent, parent_edge, upstream)
+        return tree
+
+    def bfs_order(self, source="sourcebus"):
+        levels, parent, _, _ = self._tree(source)
+        if len(levels) == 1:
+            return set()
+        children = np.concatenate(levels[1:])
+        names = self.node_names
+        return set(
+            (names[p], names[c])
+            for p, c in zip(parent[children].tolist(), children.tolist())
+        )
+
+    def upstream_transformers(self):
+        """Return the name of the first transformer upstream of every node of the tree (None if there is none)."""
+        levels, _, _, upstream = self._tree()
+        names = self.node_names
+        transformers = {}
+        for node in np.concatenate(levels).tolist():
+            edge = upstream[node]
+            transformers[names[node]] = (
+                None if edge == -1 else self.equipment_name[edge]
+            )
+        return transformers
+
+    def get_upstream_transformer(self, model, node):
+        """Return the name of the first transformer upstream of node, or None."""
+        _, _, _, upstream = self._tree()
+        edge = upstream[self.node_ids[node]]
+        if edge == -1:
+            return None
+        return self.equipment_name[edge]
+
+    def get_all_elements_downstream(self, model, source):
+        """Returns all the DiTTo objects which location is downstream of a given node.
+
+        As with Network, the tree is directed from the source of the topology.
+        """
+        model.set_names()
+        levels, parent, parent_edge, _ = self._tree()
+        nodes = np.concatenate(levels)
+        size = len(self.node_names)
+
+        # Children of the nodes in the tree, in visiting order
+        children = nodes[1:]
+        indptr, indices, edge_index = _csr(
+            parent[children], children, parent_edge[children], size
+        )
+        levels, _, edges = _bfs(
+            indptr, indices, edge_index, size, self.node_ids[source]
+        )
+        if len(levels) == 1:
+            return []
+        downstream = np.concatenate(levels)
+        edges = edges[downstream[1:]]
+
+        _elts = set(self.node_names[i] for i in downstream.tolist())
+        _elts.update(n for n in self.equipment_name[edges] if n is not None)
+
+        _obj = []
+        for x in _elts:
+            try:
+                _obj.append(model[x])
+            except:
+                raise ValueError("Unable to get DiTTo object with name {}".format(x))
+        return _obj
+
+    def find_internal_edges(self, nodeset):
+        """Find all edges that have both edges in the set of provided nodes"""
+        inside = np.zeros(len(self.node_names), dtype=bool)
+        ids = [self.node_ids[n] for n in nodeset if n in self.node_ids]
+        inside[ids] = True
+        edges = inside[self.edge_u] & inside[self.edge_v] & self.from_to
+        return set(self.equipment_name[edges].tolist())
+
+    def get_nodes(self):
+        return list(self.node_names)
+
+    def to_network(self, source=None):
+        """Return a Network with the networkx graphs of the topology.
+
+        :param source: Source of the digraph (the source of the topology if None)
+        :type source: str
+        :returns: The Network, with the edge attributes set by Network.build
+        :rtype: ditto.network.network.Network
+        """
+        import networkx as nx
+        from ditto.network.network import Network
+
+        if source is None:
+            source = self.source
+        graph = nx.Graph()
+        graph.add_nodes_from(self.node_names)
+        names = self.node_names
+        for a, b, from_to, equipment, equipment_name, length in zip(
+            self.edge_u.tolist(),
+            self.edge_v.tolist(),
+            self.from_to.tolist(),
+            self.equipment,
+            self.equipment_name,
+            self.length.tolist(),
+        ):
+            if from_to:
+                graph.add_edge(
+                    names[a],
+                    names[b],
+                    equipment=equipment,
+                    equipment_name=equipment_name,
+                    length=length,
+                )
+            else:
+                graph.add_edge(names[a], names[b])
+        digraph = nx.DiGraph()
+        digraph.add_edges_from(list(self.bfs_order(source)))
+        for a, b, data in digraph.edges(data=True):
+            data.update(graph[a][b])
+
+        network = Network()
+        network.provide_graphs(graph, digraph)
+        network.source = source
+        return network
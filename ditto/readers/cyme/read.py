@@ -4,6 +4,7 @@ import logging
 import math
 import cmath
 import os
+from collections import OrderedDict
 from functools import reduce
 from six import string_types
 
@@ -11,6 +12,13 @@ import numpy as np
 
 # Ditto imports
 from ditto.readers.abstract_reader import AbstractReader
+from ditto.readers.cyme.section_index import SectionIndex
+from ditto.readers.cyme.section_decoder import (
+    SectionRows,
+    SectionTable,
+    decode_section,
+    split_rows,
+)
 from ditto.store import Store
 from ditto.models.position import Position
 from ditto.models.node import Node
@@ -197,6 +205,10 @@ class Reader(AbstractReader):
         # Set the Network Type to be None. This is set in the parse_sections() function
         self.network_type = None
 
+        # Section indexes of the files, built the first time a file is opened
+        self.section_indexes = {}
+        self.content_objects = None
+
         # Header_mapping.
         #
         # Modify this structure if the headers of your CYME version are not the default one.
@@ -319,7 +331,7 @@ class Reader(AbstractReader):
         # Replace the old mapping by the new one
         self.header_mapping = new_mapping
 
-    def get_file_content(self, filename):
+    def get_file_content(self, filename, obj_list=None):
         """
         Open the requested file and returns the content.
         For convinience, filename can be either the full file path or:
@@ -327,6 +339,16 @@ class Reader(AbstractReader):
             -'network': Will get the content of the network file given in the constructor
             -'equipment': Will get the content of the equipment file given in the constructor
             -'load': Will get the content of the load file given in the constructor
+
+        Each file is scanned only once to build an index of its sections (see SectionIndex).
+        If obj_list is provided, the content is restricted to the sections of these objects,
+        otherwise the whole file is returned. The parser helpers refuse to parse objects
+        which are not in obj_list, since their sections would silently be missing.
+
+        :param filename: File path or shortcut
+        :type filename: str
+        :param obj_list: Objects of interest that exist in the mapping. Optional. Default=None
+        :type obj_list: list
         """
         # Shortcut mapping
         if filename == "network":
@@ -336,16 +358,31 @@ class Reader(AbstractReader):
         elif filename == "load":
             filename = os.path.join(self.data_folder_path, self.load_filename)
 
-        # Open the file and get the content
-        try:
-            with open(filename, "r") as f:
-                content_ = f.readlines()
-        except:
-            logger.warning("Unable to open file {name}".format(name=filename))
-            content_ = []
-            pass
-
-        self.content = iter(content_)
+        # Index the file the first time we see it
+        if filename not in self.section_indexes:
+            try:
+                self.section_indexes[filename] = SectionIndex(filename)
+            except:
+                logger.warning("Unable to open file {name}".format(name=filename))
+                self.section_indexes[filename] = None
+
+        index = self.section_indexes[filename]
+        self.content_objects = None if obj_list is None else set(obj_list)
+        if index is None:
+            self.content = iter([])
+        elif obj_list is None:
+            self.content = index.iter_lines()
+        else:
+            headers = []
+            for obj in obj_list:
+                if not obj in self.header_mapping:
+                    raise ValueError(
+                        "{obj} is not a valid object name for the object<->header mapping.{mapp}".format(
+                            obj=obj, mapp=self.header_mapping
+                        )
+                    )
+                headers.extend(self.header_mapping[obj])
+            self.content = index.iter_lines(headers)
 
     def phase_mapping(self, CYME_value):
         """
@@ -752,17 +789,30 @@ class Reader(AbstractReader):
         Takes as input the list of objects we want to parse as well as the list of attributes we want to extract.
         Also takes the default positions of the attributes (mapping).
         The function returns a list of dictionaries, where each dictionary contains the values of the desired attributes of a CYME object.
+
+        .. note:: This is a thin adapter over table_parser_helper which decodes the section in columns.
         """
-        if isinstance(attribute_list, list):
-            attribute_list = np.array(attribute_list)
+        table = self.table_parser_helper(
+            line, obj_list, attribute_list, mapping, *args, **kwargs
+        )
 
-        if not isinstance(attribute_list, np.ndarray):
-            raise ValueError("Could not cast attribute list to Numpy array.")
+        if table is None:
+            return {}
 
-        if args and isinstance(args[0], dict):
-            additional_information = args[0]
-        else:
-            additional_information = {}
+        return table.to_dict()
+
+    def table_parser_helper(
+        self, line, obj_list, attribute_list, mapping, *args, **kwargs
+    ):
+        """
+        .. warning:: This is a helper function for the parsers. Do not use directly.
+
+        Same as parser_helper, but returns the section as a SectionTable (one Numpy column per attribute)
+        instead of a dictionary of dictionaries. Returns None if the line is not the header of one of the objects.
+        The optional additional information dictionary becomes the constants of the table.
+        """
+        if not isinstance(attribute_list, (list, tuple, np.ndarray)):
+            raise ValueError("Could not cast attribute list to Numpy array.")
 
         # This is in the case of multiple Format= lines
         if (
@@ -772,98 +822,34 @@ class Reader(AbstractReader):
         else:
             additional_attributes = []
 
-        result = {}
+        # The sections of the objects must have been requested in get_file_content
+        if self.content_objects is not None and not self.content_objects.issuperset(
+            obj_list
+        ):
+            raise ValueError(
+                "{objs} were not requested in get_file_content ({requested}).".format(
+                    objs=[x for x in obj_list if x not in self.content_objects],
+                    requested=sorted(self.content_objects),
+                )
+            )
+
+        # Headers are of the form [HEADER]
+        if "[" not in line:
+            return None
 
         # Check the presence of headers in the given line
         checks = [self.check_object_in_line(line, obj) for obj in obj_list]
 
         # If we have a least one
         if any(checks):
-            # Get the next line
-            next_line = next(self.content)
-
-            # If the next line provides the format, then grab it
-            if "format" in next_line.lower():
-                try:
-                    mapping = {}
-                    arg_list = next_line.split("=")[1]
-                    arg_list = arg_list.split(",")
-                    # Put everything in lower case
-                    arg_list = map(lambda x: x.lower().strip("\r\n"), arg_list)
-                    arg_list = map(lambda x: x.strip("\n"), arg_list)
-                    arg_list = map(lambda x: x.strip("\r"), arg_list)
-
-                    # We want the attributes in the attribute list
-                    for idx, arg in enumerate(arg_list):
-                        temp = np.argwhere(arg == attribute_list).flatten()
-                        if len(temp) == 1:
-                            idx2 = temp[0]
-                            mapping[attribute_list[idx2]] = idx
-                except:
-                    pass
-
-                next_line = next(self.content)
-
-            # At this point, we should have the mapping for the parameters of interest
-            # while next_line[0] not in ['[','',' ','\n','\r\n']:
-            while len(next_line) > 2:
-                if "=" not in next_line.lower():
-
-                    data = next_line.split(",")
-
-                    ID = data[0].strip()
-
-                    if len(data) > 1:
-
-                        while ID in result:
-                            ID += "*"
-                        result[ID] = {}
-
-                        for k in attribute_list:
-                            try:
-                                result[ID][k] = data[mapping[k]]
-                            except:
-                                pass
-
-                        result[ID].update(additional_information)
-                elif additional_attributes is not None and additional_attributes != []:
-                    try:
-                        mapping = {}
-                        arg_list = next_line.split("=")[1]
-                        arg_list = arg_list.split(",")
-                        # Put everything in lower case
-                        arg_list = map(lambda x: x.lower().strip("\r\n"), arg_list)
-                        arg_list = map(lambda x: x.strip("\n"), arg_list)
-                        arg_list = map(lambda x: x.strip("\r"), arg_list)
-
-                        if isinstance(additional_attributes, list):
-                            additional_attributes = np.array(additional_attributes)
-
-                        if not isinstance(additional_attributes, np.ndarray):
-                            raise ValueError(
-                                "Could not cast attribute list to Numpy array."
-                            )
-
-                        # We want the attributes in the attribute list
-                        for idx, arg in enumerate(arg_list):
-                            temp = np.argwhere(arg == additional_attributes).flatten()
-                            if len(temp) == 1:
-                                idx2 = temp[0]
-                                mapping[additional_attributes[idx2]] = idx
-                        attribute_list = additional_attributes
-                        additional_attributes = []
-                    except:
-                        logger.warning(
-                            "Attempted to apply additional attributes but failed"
-                        )
-                        pass
-
-                try:
-                    next_line = next(self.content)
-                except StopIteration:
-                    break
+            table = decode_section(
+                self.content, attribute_list, mapping, additional_attributes
+            )
+            if args and isinstance(args[0], dict):
+                table.constants = args[0]
+            return table
 
-        return result
+        return None
 
     def parse(self, model, **kwargs):
         """
@@ -959,7 +945,7 @@ class Reader(AbstractReader):
         These specify the interconnection points for a substation
         """
         model.set_names()
-        self.get_file_content("network")
+        self.get_file_content("network", ["subnetwork_connections"])
         mapp_subnetwork_connections = {"nodeid": 1}
         self.subnetwork_connections = {}
         for line in self.content:
@@ -980,7 +966,7 @@ class Reader(AbstractReader):
     def parse_head_nodes(self, model):
         """ This parses the [HEADNODES] objects and is used to build Feeder_metadata DiTTo objects which define the feeder names and feeder headnodes"""
         # Open the network file
-        self.get_file_content("network")
+        self.get_file_content("network", ["headnodes"])
         mapp = {
             "nodeid": 0,
             "networkid": 1,
@@ -999,7 +985,7 @@ class Reader(AbstractReader):
     def parse_sources(self, model):
         """Parse the sources."""
         # Open the network file
-        self.get_file_content("network")
+        self.get_file_content("network", ["source", "source_equivalent"])
 
         mapp = {"sourceid": 0, "nodeid": 2, "networkid": 3, "desiredvoltage": 4}
         mapp_source_equivalent = {
@@ -1051,7 +1037,7 @@ class Reader(AbstractReader):
                 )
             )
 
-        self.get_file_content("equipment")
+        self.get_file_content("equipment", ["substation"])
 
         for line in self.content:
             subs.update(
@@ -1291,7 +1277,7 @@ class Reader(AbstractReader):
         self._nodes = []
 
         # Open the network file
-        self.get_file_content("network")
+        self.get_file_content("network", ["node"])
 
         # Default mapp (positions if all fields are present in the format)
         mapp = {
@@ -1328,7 +1314,7 @@ class Reader(AbstractReader):
                     **kwargs
                 )
             )
-        self.get_file_content("network")
+        self.get_file_content("network", ["node_connector"])
         for line in self.content:
             node_connectors.update(
                 self.parser_helper(
@@ -1535,7 +1521,7 @@ class Reader(AbstractReader):
         """
         self.feeder_section_mapping = {}
         self.section_feeder_mapping = {}
-        self.section_phase_mapping = {}
+        self.section_phase_mapping = SectionRows()
 
         self.network_data = {}
 
@@ -1543,154 +1529,168 @@ class Reader(AbstractReader):
         format_feeder = None
         _netID = None
 
-        job_is_done = False
-
         # Open the network file
-        self.get_file_content("network")
+        self.get_file_content("network", ["section"])
 
-        # Loop over the network file
+        # Grab the lines of the section section (until the next blank line)
+        lines = []
         for line in self.content:
-
-            # This will stop reading the file if we have already worked on the sections
-            if job_is_done:
+            if "[SECTION]" in line:
+                for line in self.content:
+                    if len(line) <= 2:
+                        break
+                    lines.append(line)
                 break
 
-            # Find the section section
-            if "[SECTION]" in line:
+        # The section data is decoded in bulk between the control lines
+        # (formats and feeders) which all contain a '=' symbol
+        start = 0
+        for idx, line in enumerate(lines):
+            if "=" not in line:
+                continue
 
-                job_is_done = True
+            # First, we grab the format used to define sections
+            if "format_section" in line.lower():
+                self.parse_section_rows(lines[start:idx], format_section, _netID)
+                format_section = list(
+                    map(
+                        lambda x: x.strip(),
+                        map(lambda x: x.lower(), line.split("=")[1].split(",")),
+                    )
+                )
 
-                line = next(self.content)
-                # Until we meet the next section header, work...
-                while len(line) > 2 and (
-                    line[0] != "["
-                    or line[0] != " "
-                    or line[0] != "\n"
-                    or line[0] != "\t\n"
+            # Then, we grab the format used to define feeders
+            elif (
+                "format_feeder" in line.lower()
+                or "format_substation" in line.lower()
+                or "format_generalnetwork" in line.lower()
+            ):
+                self.parse_section_rows(lines[start:idx], format_section, _netID)
+                format_feeder = list(
+                    map(
+                        lambda x: x.strip(),
+                        map(lambda x: x.lower(), line.split("=")[1].split(",")),
+                    )
+                )
+
+            # If we have a new feeder declaration
+            elif len(line) >= 7 and (
+                line[:7].lower() == "feeder="
+                or line[:11].lower() == "substation="
+                or line[:15].lower() == "generalnetwork="
+            ):
+                self.parse_section_rows(lines[start:idx], format_section, _netID)
+                if (
+                    line[:7].lower() == "feeder="
+                    or line[:15].lower() == "generalnetwork="
                 ):
+                    self.network_type = "feeder"
+                if line[:11].lower() == "substation=":
+                    self.network_type = "substation"
 
-                    # First, we grab the format used to define sections
-                    if "format_section" in line.lower():
-                        format_section = list(
-                            map(
-                                lambda x: x.strip(),
-                                map(lambda x: x.lower(), line.split("=")[1].split(",")),
-                            )
-                        )
+                # We should have a format for sections and feeders,
+                # otherwise, raise an error...
+                if format_section is None:
+                    raise ValueError("No format for sections.")
 
-                    # Then, we grab the format used to define feeders
-                    elif (
-                        "format_feeder" in line.lower()
-                        or "format_substation" in line.lower()
-                        or "format_generalnetwork" in line.lower()
-                    ):
-                        format_feeder = list(
-                            map(
-                                lambda x: x.strip(),
-                                map(lambda x: x.lower(), line.split("=")[1].split(",")),
-                            )
-                        )
+                if format_feeder is None:
+                    raise ValueError("No format for feeders.")
 
-                    # If we have a new feeder declaration
-                    elif len(line) >= 7 and (
-                        line[:7].lower() == "feeder="
-                        or line[:11].lower() == "substation="
-                        or line[:11].lower() == "substation="
-                        or line[:15].lower() == "generalnetwork="
-                    ):
-                        if (
-                            line[:7].lower() == "feeder="
-                            or line[:15].lower() == "generalnetwork="
-                        ):
-                            self.network_type = "feeder"
-                        if line[:11].lower() == "substation=":
-                            self.network_type = "substation"
+                # Get the feeder data (everything after the '=' symbol)
+                feeder_data = line.split("=")[1].split(",")
 
-                        # We should have a format for sections and feeders,
-                        # otherwise, raise an error...
-                        if format_section is None:
-                            raise ValueError("No format for sections.")
+                # Check that the data obtained have the same length as the format provided
+                # otherwise, raise an error...
+                if len(feeder_data) != len(format_feeder):
+                    raise ValueError(
+                        "Feeder/substation data length {a} does not match feeder format length {b}.".format(
+                            a=len(feeder_data), b=len(format_feeder)
+                        )
+                    )
 
-                        if format_feeder is None:
-                            raise ValueError("No format for feeders.")
+                # Check that we have a networkid in the format
+                # otherwise, raise an error...
+                if "networkid" not in format_feeder:
+                    raise ValueError(
+                        "Cannot find the networkid in format: " + str(format_feeder)
+                    )
 
-                        # Get the feeder data (everything after the '=' symbol)
-                        feeder_data = line.split("=")[1].split(",")
+                # Check that we have a sectionid in the format
+                # otherwise, raise an error...
+                if "sectionid" not in format_section:
+                    raise ValueError(
+                        "Cannot find the sectionid in format: " + str(format_section)
+                    )
 
-                        # Check that the data obtained have the same length as the format provided
-                        # otherwise, raise an error...
-                        if len(feeder_data) != len(format_feeder):
-                            raise ValueError(
-                                "Feeder/substation data length {a} does not match feeder format length {b}.".format(
-                                    a=len(feeder_data), b=len(format_feeder)
-                                )
-                            )
+                # We should be able to get the networkid from the feeder data.
+                _netID = feeder_data[format_feeder.index("networkid")].lower()
 
-                        # Check that we have a networkid in the format
-                        # otherwise, raise an error...
-                        if "networkid" not in format_feeder:
-                            raise ValueError(
-                                "Cannot find the networkid in format: "
-                                + str(format_feeder)
-                            )
+                # First, we store all the feeder data in the network_data structure
+                self.network_data[_netID] = {}
+                for key, value in zip(format_feeder, feeder_data):
+                    self.network_data[_netID][key] = value
 
-                        # Check that we have a sectionid in the format
-                        # otherwise, raise an error...
-                        if "sectionid" not in format_section:
-                            raise ValueError(
-                                "Cannot find the sectionid in format: "
-                                + str(format_section)
-                            )
+                # Then, we create a new entry in feeder_section_mapping
+                self.feeder_section_mapping[_netID] = []
 
-                        # We should be able to get the networkid from the feeder data.
-                        _netID = feeder_data[format_feeder.index("networkid")].lower()
+            # Otherwise, we have a section with a '=' in its data
+            else:
+                continue
 
-                        # First, we store all the feeder data in the network_data structure
-                        self.network_data[_netID] = {}
-                        for key, value in zip(format_feeder, feeder_data):
-                            self.network_data[_netID][key] = value
+            start = idx + 1
 
-                        # Then, we create a new entry in feeder_section_mapping
-                        self.feeder_section_mapping[_netID] = []
+        self.parse_section_rows(lines[start:], format_section, _netID)
 
-                    # Otherwise, we should have a new section...
-                    else:
-                        # If we have no networkid at this point, raise an error
-                        # Note: If CYME allows sections to be define without
-                        # a network, remove this safety check
-                        #
-                        if _netID is None:
-                            raise ValueError(
-                                "No network ID available when reading line \n" + line
-                            )
-                        # Extract the data for this section
-                        section_data = list(map(lambda x: x.strip(), line.split(",")))
+    def parse_section_rows(self, lines, format_section, network_id):
+        """
+        .. warning:: This is a helper function for parse_sections. Do not use directly.
 
-                        # Check length coherence...
-                        if len(section_data) != len(format_section):
-                            raise ValueError(
-                                "Section data length {a} does not match section format length {b}.".format(
-                                    a=len(section_data), b=len(format_section)
-                                )
-                            )
+        Decode in bulk a block of section data lines belonging to the same network
+        and add them to section_phase_mapping and section_feeder_mapping.
 
-                        # Grab the sectionid
-                        _sectionID = section_data[
-                            format_section.index("sectionid")
-                        ].lower()
+        :param lines: Section data lines
+        :type lines: list
+        :param format_section: Section format (lowercase attribute names)
+        :type format_section: list
+        :param network_id: ID of the network of the sections
+        :type network_id: str
+        """
+        if not lines:
+            return
 
-                        # Create a new entry in section_phase_mapping
-                        self.section_phase_mapping[_sectionID] = {}
+        # If we have no networkid at this point, raise an error
+        # Note: If CYME allows sections to be define without
+        # a network, remove this safety check
+        #
+        if network_id is None:
+            raise ValueError("No network ID available when reading line \n" + lines[0])
+
+        # Check length coherence...
+        table = split_rows(lines, min_width=1)
+        if table.shape[1] != len(format_section) or np.any(table[:, -1] == None):
+            for line in lines:
+                if line.count(",") + 1 != len(format_section):
+                    raise ValueError(
+                        "Section data length {a} does not match section format length {b}.".format(
+                            a=line.count(",") + 1, b=len(format_section)
+                        )
+                    )
 
-                        # Populate this new entry
-                        for key, value in zip(format_section, section_data):
-                            self.section_phase_mapping[_sectionID][key] = value
+        table = np.frompyfunc(str.strip, 1, 1)(table)
 
-                        # And finally, add a new entry to section_feeder_mapping
-                        self.section_feeder_mapping[_sectionID] = _netID
+        # Grab the sectionids
+        ids = np.frompyfunc(str.lower, 1, 1)(
+            table[:, format_section.index("sectionid")]
+        )
 
-                    # Finally, move on to next line
-                    line = next(self.content)
+        columns = OrderedDict()
+        for idx, key in enumerate(format_section):
+            columns[key] = table[:, idx]
+        section_table = SectionTable(ids, columns)
+
+        # Create the new entries in section_phase_mapping and section_feeder_mapping
+        self.section_phase_mapping.add_table(section_table)
+        self.section_feeder_mapping.update(dict.fromkeys(ids.tolist(), network_id))
 
     def parse_lines(self, model):
         """
@@ -1830,7 +1830,7 @@ class Reader(AbstractReader):
 
         self.balanced_lines = {}
         self.unbalanced_lines = {}
-        self.settings = {}
+        self.settings = SectionRows()
         self.spacings = {}
         self.conductors = {}
         self.concentric_neutral_cable = {}
@@ -1883,7 +1883,22 @@ class Reader(AbstractReader):
         #####################################################
         #
         # Open the network file
-        self.get_file_content("network")
+        self.get_file_content(
+            "network",
+            [
+                "overhead_unbalanced_line_settings",
+                "overhead_line_settings",
+                "overhead_byphase_settings",
+                "underground_line_settings",
+                "switch_settings",
+                "sectionalizer_settings",
+                "fuse_settings",
+                "recloser_settings",
+                "breaker_settings",
+                "network_protector_settings",
+                "section",
+            ],
+        )
 
         # Loop over the network file
         for line in self.content:
@@ -1894,15 +1909,15 @@ class Reader(AbstractReader):
             #                                       #
             #########################################
             #
-            self.settings = self.update_dict(
-                self.settings,
-                self.parser_helper(
+            self.settings.add_table(
+                self.table_parser_helper(
                     line,
                     ["overhead_unbalanced_line_settings"],
                     ["sectionid", "coordx", "coordy", "linecableid", "length"],
                     mapp_overhead,
                     {"type": "overhead_unbalanced"},
                 ),
+                merge=True,
             )
 
             #########################################
@@ -1911,15 +1926,15 @@ class Reader(AbstractReader):
             #                                       #
             #########################################
             #
-            self.settings = self.update_dict(
-                self.settings,
-                self.parser_helper(
+            self.settings.add_table(
+                self.table_parser_helper(
                     line,
                     ["overhead_line_settings"],
                     ["sectionid", "coordx", "coordy", "linecableid", "length"],
                     mapp_overhead,
                     {"type": "overhead_balanced"},
                 ),
+                merge=True,
             )
 
             #########################################
@@ -1928,9 +1943,8 @@ class Reader(AbstractReader):
             #                                       #
             #########################################
             #
-            self.settings = self.update_dict(
-                self.settings,
-                self.parser_helper(
+            self.settings.add_table(
+                self.table_parser_helper(
                     line,
                     ["overhead_byphase_settings"],
                     [
@@ -1950,6 +1964,7 @@ class Reader(AbstractReader):
                     mapp_overhead_byphase,
                     {"type": "overhead_unbalanced"},
                 ),
+                merge=True,
             )
 
             #########################################
@@ -1958,15 +1973,15 @@ class Reader(AbstractReader):
             #                                       #
             #########################################
             #
-            self.settings = self.update_dict(
-                self.settings,
-                self.parser_helper(
+            self.settings.add_table(
+                self.table_parser_helper(
                     line,
                     ["underground_line_settings"],
                     ["sectionid", "coordx", "coordy", "linecableid", "length", "amps"],
                     mapp_underground,
                     {"type": "underground"},
                 ),
+                merge=True,
             )
 
             #########################################
@@ -1975,15 +1990,15 @@ class Reader(AbstractReader):
             #                                       #
             #########################################
             #
-            self.settings = self.update_dict(
-                self.settings,
-                self.parser_helper(
+            self.settings.add_table(
+                self.table_parser_helper(
                     line,
                     ["switch_settings"],
                     ["sectionid", "coordx", "coordy", "eqid", "closedphase"],
                     mapp_switch,
                     {"type": "switch"},
                 ),
+                merge=True,
             )
 
             #########################################
@@ -1992,15 +2007,15 @@ class Reader(AbstractReader):
             #                                       #
             #########################################
             #
-            self.settings = self.update_dict(
-                self.settings,
-                self.parser_helper(
+            self.settings.add_table(
+                self.table_parser_helper(
                     line,
                     ["sectionalizer_settings"],
                     ["sectionid", "coordx", "coordy", "eqid"],
                     mapp_sectionalizer,
                     {"type": "sectionalizer"},
                 ),
+                merge=True,
             )
 
             #########################################
@@ -2009,15 +2024,15 @@ class Reader(AbstractReader):
             #                                       #
             #########################################
             #
-            self.settings = self.update_dict(
-                self.settings,
-                self.parser_helper(
+            self.settings.add_table(
+                self.table_parser_helper(
                     line,
                     ["fuse_settings"],
                     ["sectionid", "coordx", "coordy", "eqid"],
                     mapp_switch,  # Same as switches
                     {"type": "fuse"},
                 ),
+                merge=True,
             )
 
             #########################################
@@ -2026,15 +2041,15 @@ class Reader(AbstractReader):
             #                                       #
             #########################################
             #
-            self.settings = self.update_dict(
-                self.settings,
-                self.parser_helper(
+            self.settings.add_table(
+                self.table_parser_helper(
                     line,
                     ["recloser_settings"],
                     ["sectionid", "coordx", "coordy", "eqid"],
                     mapp_switch,  # Same as switches
                     {"type": "recloser"},
                 ),
+                merge=True,
             )
 
             #########################################
@@ -2043,15 +2058,15 @@ class Reader(AbstractReader):
             #                                       #
             #########################################
             #
-            self.settings = self.update_dict(
-                self.settings,
-                self.parser_helper(
+            self.settings.add_table(
+                self.table_parser_helper(
                     line,
                     ["breaker_settings"],
                     ["sectionid", "coordx", "coordy", "eqid", "closedphase"],
                     mapp_switch,  # Same as switches
                     {"type": "breaker"},
                 ),
+                merge=True,
             )
 
             #########################################
@@ -2060,15 +2075,15 @@ class Reader(AbstractReader):
             #                                       #
             #########################################
             #
-            self.settings = self.update_dict(
-                self.settings,
-                self.parser_helper(
+            self.settings.add_table(
+                self.table_parser_helper(
                     line,
                     ["network_protector_settings"],
                     ["sectionid", "coordx", "coordy", "eqid", "closedphase"],
                     mapp_switch,  # Same as switches
                     {"type": "network_protector"},
                 ),
+                merge=True,
             )
 
             #########################################
@@ -2077,14 +2092,14 @@ class Reader(AbstractReader):
             #                                       #
             #########################################
             #
-            self.settings = self.update_dict(
-                self.settings,
-                self.parser_helper(
+            self.settings.add_table(
+                self.table_parser_helper(
                     line,
                     ["section"],
                     ["sectionid", "fromnodeid", "tonodeid", "phase"],
                     mapp_section,
                 ),
+                merge=True,
             )
 
         #####################################################
@@ -2094,7 +2109,23 @@ class Reader(AbstractReader):
         #####################################################
         #
         # Open the equipment file
-        self.get_file_content("equipment")
+        self.get_file_content(
+            "equipment",
+            [
+                "line",
+                "unbalanced_line",
+                "spacing_table",
+                "conductor",
+                "concentric_neutral_cable",
+                "cable",
+                "switch",
+                "fuse",
+                "recloser",
+                "sectionalizer",
+                "breaker",
+                "network_protector",
+            ],
+        )
 
         # Loop over the equipment file
         for line in self.content:
@@ -3787,7 +3818,9 @@ class Reader(AbstractReader):
         #####################################################
         #
         # Open the network file
-        self.get_file_content("network")
+        self.get_file_content(
+            "network", ["serie_capacitor_settings", "shunt_capacitor_settings"]
+        )
 
         # Loop over the network file
         for line in self.content:
@@ -3843,7 +3876,7 @@ class Reader(AbstractReader):
         #####################################################
         #
         # Open the equipment file
-        self.get_file_content("equipment")
+        self.get_file_content("equipment", ["serie_capacitor", "shunt_capacitor"])
 
         # Loop over the equipment file
         for line in self.content:
@@ -4219,7 +4252,17 @@ class Reader(AbstractReader):
         #####################################################
         #
         # Open the network file
-        self.get_file_content("network")
+        self.get_file_content(
+            "network",
+            [
+                "auto_transformer_settings",
+                "grounding_transformer_settings",
+                "three_winding_auto_transformer_settings",
+                "three_winding_transformer_settings",
+                "transformer_settings",
+                "phase_shifter_transformer_settings",
+            ],
+        )
 
         # Loop over the network file
         for line in self.content:
@@ -4372,7 +4415,16 @@ class Reader(AbstractReader):
         #####################################################
         #
         # Open the equipment file
-        self.get_file_content("equipment")
+        self.get_file_content(
+            "equipment",
+            [
+                "auto_transformer",
+                "grounding_transformer",
+                "three_winding_auto_transformer",
+                "three_winding_transformer",
+                "transformer",
+            ],
+        )
 
         # Loop over the equipment file
         for line in self.content:
@@ -4944,7 +4996,7 @@ class Reader(AbstractReader):
         #####################################################
         #
         # Open the network file
-        self.get_file_content("network")
+        self.get_file_content("network", ["regulator_settings"])
 
         # Loop over the network file
         for line in self.content:
@@ -4983,7 +5035,7 @@ class Reader(AbstractReader):
         #####################################################
         #
         # Open the network file
-        self.get_file_content("equipment")
+        self.get_file_content("equipment", ["regulator"])
 
         # Loop over the network file
         for line in self.content:
@@ -5239,9 +5291,9 @@ class Reader(AbstractReader):
             "constantpowerpq": 22,
         }
 
-        self.loads = {}
-        self.customer_loads = {}
-        self.customer_class = {}
+        self.loads = SectionRows()
+        self.customer_loads = SectionRows()
+        self.customer_class = SectionRows()
 
         #####################################################
         #                                                   #
@@ -5250,7 +5302,7 @@ class Reader(AbstractReader):
         #####################################################
         #
         # Open the network file
-        self.get_file_content("load")
+        self.get_file_content("load", ["loads", "customer_loads", "customer_class"])
 
         # Loop over the load file
         for line in self.content:
@@ -5261,14 +5313,13 @@ class Reader(AbstractReader):
             #                                       #
             #########################################
             #
-            self.loads.update(
-                self.parser_helper(
-                    line,
-                    ["loads"],
-                    ["sectionid", "devicenumber", "loadtype", "connection"],
-                    mapp_loads,
-                )
+            table = self.table_parser_helper(
+                line,
+                ["loads"],
+                ["sectionid", "devicenumber", "loadtype", "connection"],
+                mapp_loads,
             )
+            self.loads.add_table(table)
 
             #########################################
             #                                       #
@@ -5276,27 +5327,26 @@ class Reader(AbstractReader):
             #                                       #
             #########################################
             #
-            self.customer_loads.update(
-                self.parser_helper(
-                    line,
-                    ["customer_loads"],
-                    [
-                        "sectionid",
-                        "devicenumber",
-                        "loadtype",
-                        "customernumber",
-                        "customertype",
-                        "loadmodelid",
-                        "valuetype",
-                        "loadphase",
-                        "value1",
-                        "value2",
-                        "connectedkva",
-                        "numberofcustomer",
-                    ],
-                    mapp_customer_loads,
-                )
+            table = self.table_parser_helper(
+                line,
+                ["customer_loads"],
+                [
+                    "sectionid",
+                    "devicenumber",
+                    "loadtype",
+                    "customernumber",
+                    "customertype",
+                    "loadmodelid",
+                    "valuetype",
+                    "loadphase",
+                    "value1",
+                    "value2",
+                    "connectedkva",
+                    "numberofcustomer",
+                ],
+                mapp_customer_loads,
             )
+            self.customer_loads.add_table(table)
 
             #########################################
             #                                       #
@@ -5304,26 +5354,25 @@ class Reader(AbstractReader):
             #                                       #
             #########################################
             #
-            self.customer_class.update(
-                self.parser_helper(
-                    line,
-                    ["customer_class"],
-                    [
-                        "id",
-                        "constantpower",
-                        "constantcurrent",
-                        "constantimpedance",
-                        "powerfactor",
-                        "constantimpedancezp",
-                        "constantimpedancezq",
-                        "constantcurrentip",
-                        "constantcurrentiq",
-                        "constantpowerpp",
-                        "constantpowerpq",
-                    ],
-                    mapp_customer_class,
-                )
+            table = self.table_parser_helper(
+                line,
+                ["customer_class"],
+                [
+                    "id",
+                    "constantpower",
+                    "constantcurrent",
+                    "constantimpedance",
+                    "powerfactor",
+                    "constantimpedancezp",
+                    "constantimpedancezq",
+                    "constantcurrentip",
+                    "constantcurrentiq",
+                    "constantpowerpp",
+                    "constantpowerpq",
+                ],
+                mapp_customer_class,
             )
+            self.customer_class.add_table(table)
 
         duplicate_loads = set()
         for sectionID in self.customer_loads.keys():
@@ -5646,7 +5695,17 @@ class Reader(AbstractReader):
         #####################################################
         #
         # Open the network file
-        self.get_file_content("network")
+        self.get_file_content(
+            "network",
+            [
+                "converter",
+                "converter_control_settings",
+                "photovoltaic_settings",
+                "bess_settings",
+                "long_term_dynamics_curve_ext",
+                "dggenerationmodel",
+            ],
+        )
 
         # Loop over the network file
         for line in self.content:
@@ -5792,7 +5851,7 @@ class Reader(AbstractReader):
         #####################################################
         #
         # Open the equipment file
-        self.get_file_content("equipment")
+        self.get_file_content("equipment", ["bess"])
 
         # Loop over the equipment file
         for line in self.content:
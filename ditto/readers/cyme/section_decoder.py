@@ -0,0 +1,381 @@
+# -*- coding: utf-8 -*-
+
+import logging
+from collections import OrderedDict
+from itertools import repeat
+
+try:
+    from collections.abc import Mapping
+except ImportError:
+    from collections import Mapping
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class SectionTable(object):
+    """
+    Columnar representation of a CYME section.
+
+    ids is a Numpy array with the object IDs (duplicated IDs get a '*' suffix, as in the reader).
+    columns is an ordered dictionary {attribute: Numpy object array}.
+    A None entry in a column means that the attribute is not available for this row.
+    constants is a dictionary of values shared by all the rows (ex: {'type': 'underground'}).
+    """
+
+    def __init__(self, ids, columns, constants=None):
+        """
+            Class CONSTRUCTOR.
+        """
+        self.ids = ids
+        self.columns = columns
+        if constants is None:
+            constants = {}
+        self.constants = constants
+
+    def __len__(self):
+        return len(self.ids)
+
+    def __getitem__(self, attribute):
+        return self.columns[attribute]
+
+    def __contains__(self, attribute):
+        return attribute in self.columns
+
+    def to_dict(self, additional_information=None):
+        """
+        Convert the table to the dictionary of dictionaries returned by Reader.parser_helper.
+
+        :param additional_information: Values added to every row. Optional. Default=the constants of the table
+        :type additional_information: dict
+        :returns: {ID: {attribute: value}}
+        :rtype: dict
+        """
+        if additional_information is None:
+            additional_information = self.constants
+
+        rows = [{} for _ in range(len(self.ids))]
+        for attribute, column in self.columns.items():
+            for row, value in zip(rows, column):
+                if value is not None:
+                    row[attribute] = value
+
+        if additional_information:
+            for row in rows:
+                row.update(additional_information)
+
+        return dict(zip(self.ids.tolist(), rows))
+
+    def rows(self):
+        """
+        Returns read-only views of the rows of the table, without copying the columns.
+        The views behave like the dictionaries returned by to_dict (the constants included).
+
+        :returns: {ID: SectionRow}
+        :rtype: SectionRows
+        """
+        rows = SectionRows()
+        rows.add_table(self)
+        return rows
+
+
+class SectionRow(Mapping):
+    """
+    Read-only dictionary view of a row of one or several SectionTables.
+
+    When the row is made of several tables (see SectionRows.add_table), the values of the last
+    table win, as with Reader.update_dict.
+    """
+
+    __slots__ = ("_cells",)
+
+    def __init__(self, cells):
+        """
+            Class CONSTRUCTOR.
+        """
+        # Sequence of (table, row index)
+        self._cells = cells
+
+    def __getitem__(self, key):
+        for table, i in reversed(self._cells):
+            if key in table.constants:
+                return table.constants[key]
+            column = table.columns.get(key)
+            if column is not None:
+                value = column[i]
+                if value is not None:
+                    return value
+        raise KeyError(key)
+
+    def __contains__(self, key):
+        try:
+            self[key]
+        except KeyError:
+            return False
+        return True
+
+    def __iter__(self):
+        seen = set()
+        for table, i in self._cells:
+            for key, column in table.columns.items():
+                if key not in seen and column[i] is not None:
+                    seen.add(key)
+                    yield key
+            for key in table.constants:
+                if key not in seen:
+                    seen.add(key)
+                    yield key
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+    def __repr__(self):
+        return "SectionRow({})".format(dict(self.items()))
+
+
+class SectionRows(Mapping):
+    """
+    Read-only {ID: SectionRow} mapping over the rows of several SectionTables.
+
+    Only the position of each row is stored, the SectionRow views are created when they are accessed.
+    This replaces the dictionaries of dictionaries built by Reader.parser_helper without creating
+    one object per row.
+    """
+
+    def __init__(self):
+        """
+            Class CONSTRUCTOR.
+        """
+        self._tables = []
+        # ID -> (table number, row index) of the last table containing the ID
+        self._positions = {}
+        # ID -> list of (table number, row index) for the rows merged over several tables
+        self._merged = {}
+
+    def add_table(self, table, merge=False):
+        """
+        Add the rows of a table.
+
+        With merge=False, rows with an existing ID are replaced (as with dict.update).
+        With merge=True, they are extended with the new values (as with Reader.update_dict).
+
+        :param table: Table to add. Can be None
+        :type table: SectionTable
+        :param merge: Merge the rows with the same ID. Optional. Default=False
+        :type merge: bool
+        :returns: self
+        :rtype: SectionRows
+        """
+        if table is None:
+            return self
+
+        number = len(self._tables)
+        self._tables.append(table)
+        ids = table.ids.tolist()
+
+        common = self._positions.keys() & ids
+        if common:
+            for i, ID in enumerate(ids):
+                if ID not in common:
+                    continue
+                if merge:
+                    cells = self._merged.pop(ID, None) or [self._positions[ID]]
+                    self._merged[ID] = cells + [(number, i)]
+                else:
+                    self._merged.pop(ID, None)
+
+        self._positions.update(zip(ids, zip(repeat(number), range(len(ids)))))
+        return self
+
+    def __getitem__(self, ID):
+        cells = self._merged.get(ID)
+        if cells is None:
+            number, i = self._positions[ID]
+            return SectionRow(((self._tables[number], i),))
+        return SectionRow(tuple((self._tables[number], i) for number, i in cells))
+
+    def __contains__(self, ID):
+        return ID in self._positions
+
+    def __iter__(self):
+        return iter(self._positions)
+
+    def __len__(self):
+        return len(self._positions)
+
+
+def format_to_mapping(format_line, attribute_list):
+    """
+    Build the {attribute: position} mapping from a FORMAT_xxx= line.
+    Only the attributes in attribute_list are kept.
+
+    :param format_line: CYME format line (ex: 'FORMAT_NODE=NodeID,CoordX,CoordY')
+    :type format_line: str
+    :param attribute_list: Attributes of interest
+    :type attribute_list: list
+    :returns: Mapping between attributes and positions
+    :rtype: dict
+    """
+    arg_list = format_line.split("=")[1].split(",")
+    arg_list = [x.lower().strip("\r\n") for x in arg_list]
+
+    # An argument mapping to several attributes is ambiguous and ignored
+    wanted = {}
+    for attribute in attribute_list:
+        wanted[attribute] = attribute not in wanted
+
+    mapping = {}
+    for idx, arg in enumerate(arg_list):
+        if wanted.get(arg, False):
+            mapping[arg] = idx
+    return mapping
+
+
+def unique_ids(ids):
+    """
+    Append '*' to the duplicated IDs until they are all unique.
+    The first occurence of an ID is left unchanged.
+
+    :param ids: List of IDs
+    :type ids: list
+    :returns: Numpy array of unique IDs
+    :rtype: numpy.ndarray
+    """
+    ids = np.array(ids, dtype=object)
+    if len(set(ids)) == len(ids):
+        return ids
+
+    seen = set()
+    for i, ID in enumerate(ids):
+        while ID in seen:
+            ID += "*"
+        seen.add(ID)
+        ids[i] = ID
+    return ids
+
+
+def split_rows(lines, min_width=2):
+    """
+    Split the data rows of a block and return them as a 2D Numpy object array padded with None.
+    Rows with less than min_width values are skipped.
+
+    The block is split in bulk: the rows are joined and the text is split once on the commas,
+    line endings being turned into separators. The values are the same as with line.split(',')
+    (the last value of a row keeps its line ending).
+    """
+    empty = np.empty((0, 0), dtype=object)
+    if not lines:
+        return empty
+
+    lines = np.array(lines, dtype=object)
+    widths = (
+        np.fromiter(
+            map(str.count, lines, repeat(",")), dtype=np.int64, count=len(lines)
+        )
+        + 1
+    )
+    keep = widths >= min_width
+    if not keep.all():
+        lines = lines[keep]
+        widths = widths[keep]
+    if len(lines) == 0:
+        return empty
+
+    values = "".join(lines).replace("\n", "\n,").split(",")
+    values = np.array(values[: widths.sum()], dtype=object)
+
+    width = widths.max()
+    if (widths == width).all():
+        return values.reshape(len(lines), width)
+
+    table = np.full((len(lines), width), None, dtype=object)
+    table[np.arange(width)[None, :] < widths[:, None]] = values
+    return table
+
+
+def decode_section(content, attribute_list, mapping, additional_attributes=None):
+    """
+    Decode a CYME section into a SectionTable.
+
+    content should be an iterator positioned right after the section header.
+    It is consumed until the blank line ending the section.
+    If the first line is a FORMAT_xxx= line, it replaces the default mapping.
+    If additional_attributes is provided, the first FORMAT_xxx= line found inside the section
+    switches the attributes of interest to additional_attributes for the following rows.
+
+    :param content: Iterator over the lines of the file
+    :type content: iterator
+    :param attribute_list: Attributes of interest
+    :type attribute_list: list
+    :param mapping: Default positions of the attributes
+    :type mapping: dict
+    :param additional_attributes: Attributes of interest after a format change. Optional. Default=None
+    :type additional_attributes: list
+    :returns: Table of the section
+    :rtype: SectionTable
+    """
+    attribute_list = list(attribute_list)
+    if additional_attributes is None:
+        additional_attributes = []
+    else:
+        additional_attributes = list(additional_attributes)
+
+    # Grab the raw lines of the section
+    lines = []
+    for line in content:
+        if len(line) <= 2:
+            break
+        lines.append(line)
+
+    # If the first line provides the format, then grab it
+    if lines and "format" in lines[0].lower():
+        try:
+            mapping = format_to_mapping(lines[0], attribute_list)
+        except:
+            mapping = {}
+        lines = lines[1:]
+
+    # Split the section into blocks of data rows sharing the same format
+    blocks = [(attribute_list, mapping, [])]
+    for line in lines:
+        if "=" not in line:
+            blocks[-1][2].append(line)
+        elif additional_attributes:
+            try:
+                new_mapping = format_to_mapping(line, additional_attributes)
+                blocks.append((additional_attributes, new_mapping, []))
+                additional_attributes = []
+            except:
+                logger.warning("Attempted to apply additional attributes but failed")
+
+    all_attributes = []
+    for attributes, _, _ in blocks:
+        for attribute in attributes:
+            if attribute not in all_attributes:
+                all_attributes.append(attribute)
+
+    ids = []
+    columns = OrderedDict((attribute, []) for attribute in all_attributes)
+    for attributes, block_mapping, block_lines in blocks:
+        table = split_rows(block_lines)
+        n_rows, width = table.shape
+        if n_rows == 0:
+            continue
+
+        ids.extend(x.strip() for x in table[:, 0])
+
+        for attribute in all_attributes:
+            idx = block_mapping.get(attribute)
+            if attribute in attributes and idx is not None and idx < width:
+                columns[attribute].append(table[:, idx])
+            else:
+                columns[attribute].append(np.full(n_rows, None, dtype=object))
+
+    for attribute, chunks in columns.items():
+        if chunks:
+            columns[attribute] = np.concatenate(chunks)
+        else:
+            columns[attribute] = np.empty(0, dtype=object)
+
+    return SectionTable(unique_ids(ids), columns)
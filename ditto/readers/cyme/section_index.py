@@ -0,0 +1,127 @@
+# -*- coding: utf-8 -*-
+
+import io
+import logging
+from collections import OrderedDict
+
+logger = logging.getLogger(__name__)
+
+
+class SectionIndex(object):
+    """
+    Byte offset index of the sections of a CYME ASCII file.
+
+    The file is scanned once when the index is built. Every line of the form ``[HEADER]``
+    opens a new section which runs until the next header (or the end of the file).
+    The index keeps, for each header, the list of (start, end) byte offsets of the blocks
+    using this header, so that the parsers can read only the sections they need.
+
+    **Usage:**
+
+    >>> index = SectionIndex("network.txt")
+    >>> for line in index.iter_lines(["[NODE]"]):
+    ...     print(line)
+    """
+
+    # Size of the blocks read when streaming a section
+    chunk_size = 1 << 20
+
+    def __init__(self, filename):
+        """
+            Class CONSTRUCTOR.
+        """
+        self.filename = filename
+        self.sections = OrderedDict()
+        self.size = 0
+        self.build()
+
+    def build(self):
+        """
+        Scan the file and record the byte range of each section.
+        """
+        self.sections = OrderedDict()
+        header = None
+        start = 0
+        offset = 0
+        with open(self.filename, "rb") as f:
+            for raw_line in f:
+                stripped = raw_line.strip()
+                if stripped[:1] == b"[" and stripped[-1:] == b"]":
+                    if header is not None:
+                        self.sections[header].append((start, offset))
+                    header = stripped.decode("utf-8", "replace")
+                    self.sections.setdefault(header, [])
+                    start = offset
+                offset += len(raw_line)
+        if header is not None:
+            self.sections[header].append((start, offset))
+        self.size = offset
+
+    def headers(self):
+        """
+        Returns the list of section headers found in the file, in file order.
+        """
+        return list(self.sections.keys())
+
+    def find(self, headers):
+        """
+        Returns the sorted byte ranges of all the sections matching one of the given headers.
+
+        A section matches if one of the headers is contained in the section header line.
+        This is the same test as Reader.check_object_in_line.
+
+        :param headers: Header strings (ex: ['[SECTION]'])
+        :type headers: list
+        :returns: List of (start, end) byte offsets
+        :rtype: list
+        """
+        ranges = []
+        for header, blocks in self.sections.items():
+            if any(h in header for h in headers):
+                ranges.extend(blocks)
+        return sorted(ranges)
+
+    def iter_lines(self, headers=None):
+        """
+        Lazily yield the text lines of the sections matching the given headers.
+        If headers is None, the whole file is returned.
+
+        Lines are decoded the same way as a file opened in text mode, so they
+        end with a single '\\n' whatever the line terminator used in the file.
+        The sections are streamed by blocks of chunk_size bytes.
+
+        :param headers: Header strings (ex: ['[SECTION]']). Optional. Default=None
+        :type headers: list
+        :returns: Generator of lines
+        :rtype: generator
+        """
+        if headers is None:
+            with open(self.filename, "r") as f:
+                for line in f:
+                    yield line
+            return
+
+        ranges = self.find(headers)
+        if not ranges:
+            return
+
+        with open(self.filename, "rb") as f:
+            for start, end in ranges:
+                f.seek(start)
+                remaining = end - start
+                pending = b""
+                while remaining > 0:
+                    block = f.read(min(self.chunk_size, remaining))
+                    if not block:
+                        break
+                    remaining -= len(block)
+                    block = pending + block
+
+                    # Keep the last partial line for the next block
+                    cut = block.rfind(b"\n") + 1 if remaining > 0 else len(block)
+                    pending = block[cut:]
+                    for line in io.TextIOWrapper(io.BytesIO(block[:cut])):
+                        yield line
+                if pending:
+                    for line in io.TextIOWrapper(io.BytesIO(pending)):
+                        yield line
@@ -0,0 +1,220 @@
+# -*- coding: utf-8 -*-
+"""This module defines a streaming reader of GridLAB-D .glm files.
+
+The files are read one line at a time, and the objects and schedules are yielded as soon
+as their block is closed, so the text of the model is never held in memory:
+
+- #include directives are followed recursively, relative to the directory of the
+  including file (or to the working directory),
+- macros defined with #define or #set are substituted where they are used as ${NAME},
+- // comments are removed, except inside quoted values,
+- the statements are split on white spaces, except inside quoted values (which keep
+  their quotes), and end with ;, {, } or the end of the line,
+- objects nested in an object are yielded after it, with their parent set to its name.
+
+>>> for block in GLMReader("./model.glm").blocks():
+...     print(block.kind, block.name, block.properties)
+"""
+
+from __future__ import absolute_import, division, print_function
+from builtins import super, range, zip, round, map
+
+import os
+import re
+import logging
+
+logger = logging.getLogger(__name__)
+
+_TOKEN = re.compile(r"//.*|\"[^\"]*\"?|'[^']*'?|[{};]|[^\s{};\"']+")
+_MACRO = re.compile(r"\$\{([^}]+)\}")
+_DIRECTIVE = re.compile(r"#\s*(\w+)\s*(.*)")
+
+# Markers of the end of the lines in the token stream
+_NEWLINE = object()
+
+
+class GLMBlock(object):
+    """A block of a .glm file.
+
+    For an object, name is the header of the block (e.g. node:12) and properties are the
+    (name, value) pairs of its statements. For a schedule, rows are the tokens of its
+    statements, including the ones of its nested blocks.
+    """
+
+    __slots__ = ("kind", "name", "properties", "rows", "children")
+
+    def __init__(self, kind, name=None):
+        """Class CONSTRUCTOR"""
+        self.kind = kind
+        self.name = name
+        self.properties = []
+        self.rows = []
+        self.children = []
+
+    def get(self, name, default=None):
+        """Return the last value of the property name."""
+        for k, v in reversed(self.properties):
+            if k == name:
+                return v
+        return default
+
+
+class GLMReader(object):
+    """Streaming reader of a .glm file and of the files it includes."""
+
+    def __init__(self, input_file, macros=None):
+        """Class CONSTRUCTOR
+
+        :param input_file: Path of the .glm file
+        :type input_file: str
+        :param macros: Macros defined before reading the file, by name
+        :type macros: dict
+        """
+        self.input_file = input_file
+        self.macros = dict(macros) if macros is not None else {}
+
+    def lines(self, path=None, _included=()):
+        """Yield the lines of the file once the directives are processed and the macros substituted."""
+        if path is None:
+            path = self.input_file
+        if os.path.abspath(path) in _included:
+            raise ValueError("{} includes itself".format(path))
+        _included = _included + (os.path.abspath(path),)
+        with open(path, "r") as f:
+            for line in f:
+                stripped = line.strip()
+                if stripped[:1] == "#":
+                    match = _DIRECTIVE.match(stripped)
+                    if match is None:
+                        continue
+                    directive, argument = match.groups()
+                    argument = self.substitute(argument.strip())
+                    if directive == "include":
+                        for included in self.lines(
+                            self.find_include(argument.strip("\"'<>"), path), _included
+                        ):
+                            yield included
+                    elif directive in ("define", "set"):
+                        name, _, value = argument.partition("=")
+                        self.macros[name.strip()] = value.strip().strip("\"'")
+                    else:
+                        logger.debug("Ignoring the directive {}".format(stripped))
+                    continue
+                yield self.substitute(line)
+
+    def find_include(self, name, including_file):
+        """Return the path of an included file, relative to the including file or to the working directory."""
+        path = os.path.join(os.path.dirname(including_file), name)
+        if os.path.exists(path) or os.path.exists(name) is False:
+            return path
+        return name
+
+    def substitute(self, line):
+        """Replace the macros used in line by their values."""
+        if "${" not in line:
+            return line
+        return _MACRO.sub(lambda m: self.macros.get(m.group(1), m.group(0)), line)
+
+    def tokens(self):
+        """Yield the tokens of the file, and _NEWLINE at the end of every line."""
+        for line in self.lines():
+            for token in _TOKEN.findall(line):
+                if token[:2] == "//":
+                    break
+                yield token
+            yield _NEWLINE
+
+    def statements(self):
+        """Yield the statements of the file as (tokens, terminator) pairs.
+
+        The terminator is "{" when the statement opens a block, "}" when it closes one
+        (with the tokens of the last statement of the block, if any), and ";" otherwise.
+        """
+        statement = []
+        pending = None  # Statement ended by the end of a line, unless a block follows
+        for token in self.tokens():
+            if token is _NEWLINE:
+                if statement:
+                    if pending is not None:
+                        yield pending, ";"
+                    pending, statement = statement, []
+                continue
+            if token == "{":
+                if not statement and pending is not None:
+                    statement = pending
+                elif pending is not None:
+                    yield pending, ";"
+                pending = None
+                yield statement, "{"
+                statement = []
+            elif token == ";" or token == "}":
+                if pending is not None:
+                    yield pending, ";"
+                    pending = None
+                if token == ";":
+                    if statement:
+                        yield statement, ";"
+                else:
+                    yield statement, "}"
+                statement = []
+            else:
+                if pending is not None:
+                    yield pending, ";"
+                    pending = None
+                statement.append(token)
+        if pending is not None:
+            yield pending, ";"
+        if statement:
+            yield statement, ";"
+
+    def blocks(self):
+        """Yield the objects and the schedules of the file, as GLMBlock, as soon as they are closed."""
+        stack = []
+        for tokens, terminator in self.statements():
+            if terminator == "{":
+                kind = tokens[0] if tokens else None
+                name = tokens[1] if len(tokens) > 1 else None
+                stack.append(GLMBlock(kind, name))
+                continue
+            if tokens and stack:
+                self.add_statement(stack, tokens)
+            if terminator == "}":
+                if not stack:
+                    logger.debug("Unbalanced }} in {}".format(self.input_file))
+                    continue
+                block = stack.pop()
+                if block.kind == "object":
+                    if stack and stack[-1].kind == "object":
+                        stack[-1].children.append(block)
+                    else:
+                        for b in self.flatten(block):
+                            yield b
+                elif block.kind == "schedule" and not any(
+                    b.kind == "schedule" for b in stack
+                ):
+                    yield block
+        if stack:
+            logger.debug("Unclosed blocks at the end of {}".format(self.input_file))
+
+    def add_statement(self, stack, tokens):
+        """Add a statement to the innermost object or schedule block."""
+        for block in reversed(stack):
+            if block.kind == "schedule":
+                block.rows.append(tokens)
+                return
+            if block.kind == "object":
+                if stack[-1] is block and len(tokens) > 1:
+                    block.properties.append((tokens[0], tokens[1]))
+                return
+
+    def flatten(self, block):
+        """Yield an object, then the objects nested in it, with their parent set."""
+        yield block
+        name = block.get("name")
+        if name is None and block.name is not None and ":" in block.name:
+            name = block.name
+        for child in block.children:
+            if name is not None and child.get("parent") is None:
+                child.properties.insert(0, ("parent", name))
+            for b in self.flatten(child):
+                yield b
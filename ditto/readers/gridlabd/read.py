@@ -36,9 +36,11 @@ from ditto.models.phase_winding import PhaseWinding
 
 from ditto.formats.gridlabd import gridlabd
 from ditto.formats.gridlabd import base
+from ditto.formats.gridlabd.base import GridLABDObjects
 from ditto.models.base import Unicode
 
 from ..abstract_reader import AbstractReader
+from .glm import GLMReader
 
 logger = logging.getLogger(__name__)
 
@@ -50,7 +52,6 @@ class Reader(AbstractReader):
     """
     register_names = ["glm", "gridlabd"]
 
-    all_gld_objects = {}
     all_api_objects = {}
 
     def __init__(self, **kwargs):
@@ -497,126 +498,56 @@ class Reader(AbstractReader):
         delta_datetime = timedelta(minutes=1)
         sub_datetime = origin_datetime - delta_datetime
 
-        inputfile = open(self.input_file, "r")
-        all_rows = inputfile.readlines()
-        curr_object = None
-        curr_schedule = None
-        ignore_elements = False
-        found_schedule = False
-        all_includes = []
+        self.all_gld_objects = GridLABDObjects()
         all_schedules = {}
-        for row in all_rows:
-            if row[:8] == "#include":
-                entries = row.split()
-                location = entries[1].strip('"')
-                include_file = open(location, "r")
-                include_rows = include_file.readlines()
-                all_includes = all_includes + include_rows
-        all_rows = all_rows + all_includes
-        for row in all_rows:
-            row = row.strip()
-
-            if row[:2] == "//":
-                continue
-            entries = row.split()
-            if len(entries) > 0 and entries[0] == "object":
-                if curr_object is None:
-                    obj = entries[1].split(":")
-                    obj_class = obj[0]
-                    if (
-                        obj_class == "house"
-                        or obj_class == "solar"
-                        or obj_class == "inverter"
-                        or obj_class == "waterheater"
-                        or obj_class == "climate"
-                        or obj_class == "ZIPload"
-                        or obj_class == "tape.recorder"
-                        or obj_class == "player"
-                        or obj_class == "tape.collector"
-                        or obj_class == "tape.group_recorder"
-                        or obj_class == "recorder"
-                    ):
-                        continue
-                    curr_object = getattr(gridlabd, obj_class)()
-                    if len(obj) > 1:
-                        curr_object["name"] = obj_class + ":" + obj[1]
-                else:
-                    ignore_elements = True
-
-            elif len(entries) > 0 and entries[0] == "schedule":
-                if curr_schedule is None:
-                    schedule = entries[1]
-                    schedule_bracket_cnt = 1
-                curr_schedule = schedule
-
-            else:
-                if curr_object == None and curr_schedule == None:
-                    continue
-                if curr_object != None:
-                    entries = row.split()
-                    if len(entries) > 1:
-                        element = entries[0]
-                        value = entries[1]
-                        if value[-1] == ";":
-                            value = value[:-1]
-                        if len(entries) > 2:
-                            units = entries[2]
-                            # TODO: Deal with units correctly
-                            # print element,value,units
-                            # if units[0] =='k':
-                            #    value = value/1000.0
-                        # Assuming no nested objects for now.
-                        curr_object[element] = value
-
-                    if len(row) >= 1:
-                        if row[-1] == "}" or row[-2:] == "};":
-                            if ignore_elements:  # Assumes only one layer of nesting
-                                ignore_elements = False
-                            else:
-                                try:
-                                    self.all_gld_objects[
-                                        curr_object["name"]
-                                    ] = curr_object
-                                    curr_object = None
-                                except:
-
-                                    if (
-                                        curr_object["from"] != None
-                                        and curr_object["to"] != None
-                                    ):
-                                        curr_object["name"] = (
-                                            curr_object["from"]
-                                            + "-"
-                                            + curr_object["to"]
-                                        )
-                                        self.all_gld_objects[
-                                            curr_object["name"]
-                                        ] = curr_object
-
-                                    else:
-                                        logger.debug("Warning object missing a name")
-                                    curr_object = None
-                if curr_schedule != None:
-                    row = row.strip(";")
-                    entries = row.split()
-                    if len(entries) > 5 and not found_schedule:
+        for block in GLMReader(self.input_file).blocks():
+            if block.kind == "schedule":
+                for entries in block.rows:
+                    if len(entries) > 5:
                         cron = " ".join(entries[:-1])
                         value = entries[-1]
                         iter = croniter(cron, sub_datetime)
                         if iter.get_next(datetime) == origin_datetime:
-                            found_schedule = True
-                            all_schedules[curr_schedule] = value
-
-                    if len(row) >= 1:
-                        if row[-1] == "}":
-                            schedule_bracket_cnt = schedule_bracket_cnt - 1
-                        if row[0] == "{":
-                            schedule_bracket_cnt = schedule_bracket_cnt + 1
-                        if schedule_bracket_cnt == 0:
-                            curr_schedule = None
-                            found_schedule = False
+                            all_schedules[block.name] = value
+                            break
+                continue
+
+            if block.name is None:
+                continue
+            obj = block.name.split(":")
+            obj_class = obj[0]
+            if (
+                obj_class == "house"
+                or obj_class == "solar"
+                or obj_class == "inverter"
+                or obj_class == "waterheater"
+                or obj_class == "climate"
+                or obj_class == "ZIPload"
+                or obj_class == "tape.recorder"
+                or obj_class == "player"
+                or obj_class == "tape.collector"
+                or obj_class == "tape.group_recorder"
+                or obj_class == "recorder"
+            ):
+                continue
+            curr_object = getattr(gridlabd, obj_class)()
+            if len(obj) > 1:
+                curr_object["name"] = obj_class + ":" + obj[1]
+            for element, value in block.properties:
+                # TODO: Deal with units correctly
+                curr_object[element] = value
+
+            try:
+                self.all_gld_objects[curr_object["name"]] = curr_object
+            except:
+                if curr_object["from"] != None and curr_object["to"] != None:
+                    curr_object["name"] = curr_object["from"] + "-" + curr_object["to"]
+                    self.all_gld_objects[curr_object["name"]] = curr_object
+                else:
+                    logger.debug("Warning object missing a name")
 
         logger.debug(all_schedules)
+        self.all_gld_objects.resolve()
         for obj_name, obj in self.all_gld_objects.items():
             obj_type = type(obj).__name__
 
@@ -724,188 +655,187 @@ class Reader(AbstractReader):
 
                 try:
                     # Even though the transformer may be ABCN, (ie there's a neutral on the wire) we assume a delta primary doesn't connect the the neutral wire.
-                    config_name1 = obj["configuration"]
-                    for config_name, config in self.all_gld_objects.items():
-                        if config_name == config_name1:
-                            try:
-                                conn = config["connect_type"]
-                                # Assume a grounded Wye - Wye connection has a neutral on both sides
-                                if conn == 1 or conn == "WYE_WYE":
-                                    winding1.connection_type = "Y"
-                                    winding2.connection_type = "Y"
-
-                                # Assume that the secondary on a delta-delta has a grounding neutral, but the high side doesn't
-                                if conn == 2 or conn == "DELTA_DELTA":
-                                    winding1.connection_type = "D"
-                                    winding2.connection_type = "D"
-
-                                # Assume that the secondary on a delta-wye has a grounding neutral, but the high side doesn't
-                                if conn == 3 or conn == "DELTA_GWYE":
-                                    winding1.connection_type = "D"
-                                    winding2.connection_type = "Y"
-
-                                # For a single phase transformer, no connection type is specified. It steps from a single phase and neutral to a single phase and neutral
-                                if conn == 4 or conn == "SINGLE_PHASE":
-                                    pass  # The phase is already covered by the "phases" attribute
-
-                                # For a single phase center tapped transformer no connection type is specified. Its steps from a single phase and neutral to a neutral and two low voltage lines
-                                if conn == 5 or conn == "SINGLE_PHASE_CENTER_TAPPED":
-                                    num_windings = 3
-                                    winding2.phase_windings[
-                                        0
-                                    ].phase = (
-                                        "A"
-                                    )  # Assume that only one phase from A/B/C was assigned to the winding. TODO replace with 2 to represent secondaries.
-
-                                    pw3 = PhaseWinding(model)
-                                    pw3.phase = (
-                                        "B"
-                                    )  # TODO replace with 2 to represent secondaries.
-                                    winding3.phase_windings.append(pw3)
-                            except AttributeError:
-                                pass
+                    config = self.all_gld_objects.reference(obj, "configuration")
+                    if config is not None:
+                        try:
+                            conn = config["connect_type"]
+                            # Assume a grounded Wye - Wye connection has a neutral on both sides
+                            if conn == 1 or conn == "WYE_WYE":
+                                winding1.connection_type = "Y"
+                                winding2.connection_type = "Y"
+
+                            # Assume that the secondary on a delta-delta has a grounding neutral, but the high side doesn't
+                            if conn == 2 or conn == "DELTA_DELTA":
+                                winding1.connection_type = "D"
+                                winding2.connection_type = "D"
+
+                            # Assume that the secondary on a delta-wye has a grounding neutral, but the high side doesn't
+                            if conn == 3 or conn == "DELTA_GWYE":
+                                winding1.connection_type = "D"
+                                winding2.connection_type = "Y"
+
+                            # For a single phase transformer, no connection type is specified. It steps from a single phase and neutral to a single phase and neutral
+                            if conn == 4 or conn == "SINGLE_PHASE":
+                                pass  # The phase is already covered by the "phases" attribute
+
+                            # For a single phase center tapped transformer no connection type is specified. Its steps from a single phase and neutral to a neutral and two low voltage lines
+                            if conn == 5 or conn == "SINGLE_PHASE_CENTER_TAPPED":
+                                num_windings = 3
+                                winding2.phase_windings[
+                                    0
+                                ].phase = (
+                                    "A"
+                                )  # Assume that only one phase from A/B/C was assigned to the winding. TODO replace with 2 to represent secondaries.
+
+                                pw3 = PhaseWinding(model)
+                                pw3.phase = (
+                                    "B"
+                                )  # TODO replace with 2 to represent secondaries.
+                                winding3.phase_windings.append(pw3)
+                        except AttributeError:
+                            pass
 
-                            try:
-                                install_type = config["install_type"]
-                                api_transformer.install_type = install_type
-                            except AttributeError:
-                                pass
+                        try:
+                            install_type = config["install_type"]
+                            api_transformer.install_type = install_type
+                        except AttributeError:
+                            pass
 
-                            try:
-                                noloadloss = config["no_load_loss"]
-                                api_transformer.noload_loss = float(noloadloss)
-                            except AttributeError:
-                                pass
+                        try:
+                            noloadloss = config["no_load_loss"]
+                            api_transformer.noload_loss = float(noloadloss)
+                        except AttributeError:
+                            pass
 
-                            try:
-                                high_voltage = config["primary_voltage"]
-                                winding1.nominal_voltage = float(high_voltage)
-                            except AttributeError:
-                                pass
+                        try:
+                            high_voltage = config["primary_voltage"]
+                            winding1.nominal_voltage = float(high_voltage)
+                        except AttributeError:
+                            pass
 
-                            try:
-                                low_voltage = config["secondary_voltage"]
-                                winding2.nominal_voltage = float(low_voltage)
-                                if num_windings == 3:
-                                    winding3.nominal_voltage = float(low_voltage)
-                            except AttributeError:
-                                pass
+                        try:
+                            low_voltage = config["secondary_voltage"]
+                            winding2.nominal_voltage = float(low_voltage)
+                            if num_windings == 3:
+                                winding3.nominal_voltage = float(low_voltage)
+                        except AttributeError:
+                            pass
 
+                        try:
+                            resistance = float(config["resistance"])
+                            if num_windings == 2:
+                                winding1.resistance = resistance / 2.0
+                                winding2.resistance = resistance / 2.0
+                            if num_windings == 3:
+                                winding1.resistance = resistance / 2.0
+                                winding2.resistance = (
+                                    resistance
+                                )  # Using power flow approximation from "Electric Power Distribution Handbook" by Short page 188
+                                winding3.resistance = resistance
+
+                        except AttributeError:
+                            pass
+
+                        failed_reactance = True
+
+                        reactances = []
+                        try:
+                            reactance = float(config["reactance"])
+                            failed_reactance = False
+                            reactance1 = reactance
+                            reactances.append(
+                                reactance1
+                            )  # TODO: Change documentation to reflect that we aren't indicating the from-to relation in reactances.
+                            # reactances.append((0,1,reactance1))
+                            if (
+                                num_windings == 3
+                            ):  # TODO: Change documentation to reflect that we aren't indicating the from-to relation in reactances.
+                                reactance2 = complex(config["impedance1"])
+                                reactances.append(reactance2.imag)
+                                reactance3 = complex(config["impedance2"])
+                                reactances.append(reactance3.imag)
+
+                        except AttributeError:
+                            if (
+                                not failed_reactance
+                            ):  # Should only fail if there are three windings in the system
+                                reactance = float(config["reactance"])
+                                reactances[0] = 0.8 * reactance
+                                reactances.append(
+                                    0.4 * reactance
+                                )  # Using power flow approximation from "Electric Power Distribution Handbook" by Short page 188 of transformer with no center tap
+                                reactances.append(0.4 * reactance)
+
+                        if failed_reactance:
                             try:
-                                resistance = float(config["resistance"])
+                                impedance = complex(config["impedance"])
+                                resistance = impedance.real
+                                reactance = impedance.imag
                                 if num_windings == 2:
+                                    winding1.resistance
                                     winding1.resistance = resistance / 2.0
                                     winding2.resistance = resistance / 2.0
+                                    reactances.append(reactance)
+
                                 if num_windings == 3:
                                     winding1.resistance = resistance / 2.0
                                     winding2.resistance = (
                                         resistance
                                     )  # Using power flow approximation from "Electric Power Distribution Handbook" by Short page 188
                                     winding3.resistance = resistance
-
-                            except AttributeError:
-                                pass
-
-                            failed_reactance = True
-
-                            reactances = []
-                            try:
-                                reactance = float(config["reactance"])
-                                failed_reactance = False
-                                reactance1 = reactance
-                                reactances.append(
-                                    reactance1
-                                )  # TODO: Change documentation to reflect that we aren't indicating the from-to relation in reactances.
-                                # reactances.append((0,1,reactance1))
-                                if (
-                                    num_windings == 3
-                                ):  # TODO: Change documentation to reflect that we aren't indicating the from-to relation in reactances.
-                                    reactance2 = complex(config["impedance1"])
-                                    reactances.append(reactance2.imag)
-                                    reactance3 = complex(config["impedance2"])
-                                    reactances.append(reactance3.imag)
-
-                            except AttributeError:
-                                if (
-                                    not failed_reactance
-                                ):  # Should only fail if there are three windings in the system
-                                    reactance = float(config["reactance"])
-                                    reactances[0] = 0.8 * reactance
+                                    reactances.append(0.8 * reactance)
                                     reactances.append(
                                         0.4 * reactance
                                     )  # Using power flow approximation from "Electric Power Distribution Handbook" by Short page 188 of transformer with no center tap
                                     reactances.append(0.4 * reactance)
-
-                            if failed_reactance:
-                                try:
-                                    impedance = complex(config["impedance"])
-                                    resistance = impedance.real
-                                    reactance = impedance.imag
-                                    if num_windings == 2:
-                                        winding1.resistance
-                                        winding1.resistance = resistance / 2.0
-                                        winding2.resistance = resistance / 2.0
-                                        reactances.append(reactance)
-
-                                    if num_windings == 3:
-                                        winding1.resistance = resistance / 2.0
-                                        winding2.resistance = (
-                                            resistance
-                                        )  # Using power flow approximation from "Electric Power Distribution Handbook" by Short page 188
-                                        winding3.resistance = resistance
-                                        reactances.append(0.8 * reactance)
-                                        reactances.append(
-                                            0.4 * reactance
-                                        )  # Using power flow approximation from "Electric Power Distribution Handbook" by Short page 188 of transformer with no center tap
-                                        reactances.append(0.4 * reactance)
-                                except AttributeError:
-                                    pass
-
-                            if len(reactances) > 0:
-                                for x in reactances:
-                                    api_transformer.reactances.append(x)
-
-                            try:
-                                power_rating = float(config["power_rating"]) * 1000
-                                winding1.rated_power = power_rating
-                                if num_windings == 3:
-                                    winding2.rated_power = power_rating / 2.0
-                                    winding3.rated_power = power_rating / 2.0
-                                else:
-                                    winding2.rated_power = power_rating
-                            except AttributeError:
-                                pass
-                            try:
-                                power_rating = float(config["powerA_rating"]) * 1000
-                                winding1.rated_power = power_rating
-                                if num_windings == 3:
-                                    winding2.rated_power = power_rating / 2.0
-                                    winding3.rated_power = power_rating / 2.0
-                                else:
-                                    winding2.rated_power = power_rating
                             except AttributeError:
                                 pass
 
-                            try:
-                                power_rating = float(config["powerB_rating"]) * 1000
-                                winding1.rated_power = power_rating
-                                if num_windings == 3:
-                                    winding2.rated_power = power_rating / 2.0
-                                    winding3.rated_power = power_rating / 2.0
-                                else:
-                                    winding2.rated_power = power_rating
-                            except AttributeError:
-                                pass
-                            try:
-                                power_rating = float(config["powerC_rating"]) * 1000
-                                winding1.rated_power = power_rating
-                                if num_windings == 3:
-                                    winding2.rated_power = power_rating / 2.0
-                                    winding3.rated_power = power_rating / 2.0
-                                else:
-                                    winding2.rated_power = power_rating
-                            except AttributeError:
-                                pass
+                        if len(reactances) > 0:
+                            for x in reactances:
+                                api_transformer.reactances.append(x)
+
+                        try:
+                            power_rating = float(config["power_rating"]) * 1000
+                            winding1.rated_power = power_rating
+                            if num_windings == 3:
+                                winding2.rated_power = power_rating / 2.0
+                                winding3.rated_power = power_rating / 2.0
+                            else:
+                                winding2.rated_power = power_rating
+                        except AttributeError:
+                            pass
+                        try:
+                            power_rating = float(config["powerA_rating"]) * 1000
+                            winding1.rated_power = power_rating
+                            if num_windings == 3:
+                                winding2.rated_power = power_rating / 2.0
+                                winding3.rated_power = power_rating / 2.0
+                            else:
+                                winding2.rated_power = power_rating
+                        except AttributeError:
+                            pass
+
+                        try:
+                            power_rating = float(config["powerB_rating"]) * 1000
+                            winding1.rated_power = power_rating
+                            if num_windings == 3:
+                                winding2.rated_power = power_rating / 2.0
+                                winding3.rated_power = power_rating / 2.0
+                            else:
+                                winding2.rated_power = power_rating
+                        except AttributeError:
+                            pass
+                        try:
+                            power_rating = float(config["powerC_rating"]) * 1000
+                            winding1.rated_power = power_rating
+                            if num_windings == 3:
+                                winding2.rated_power = power_rating / 2.0
+                                winding3.rated_power = power_rating / 2.0
+                            else:
+                                winding2.rated_power = power_rating
+                        except AttributeError:
+                            pass
 
                 except AttributeError:
                     pass
@@ -1515,44 +1445,20 @@ class Reader(AbstractReader):
                 except AttributeError:
                     pass
 
+                config = self.all_gld_objects.reference(obj, "configuration")
+                conductors = {}
                 try:
-                    config_name = obj["configuration"]
-                    config = self.all_gld_objects[config_name]
-                    conductors = {}
-                    num_phases = 0
-                    try:
-                        conna = config["conductor_A"]
-                        api_wire = Wire(model)
-                        api_wire.phase = "A"
-                        conductors[api_wire] = conna
-                    except AttributeError:
-                        pass
-                    try:
-                        connb = config["conductor_B"]
-                        api_wire = Wire(model)
-                        api_wire.phase = "B"
-                        conductors[api_wire] = connb
-                    except AttributeError:
-                        pass
-                    try:
-                        connc = config["conductor_C"]
-                        api_wire = Wire(model)
-                        api_wire.phase = "C"
-                        conductors[api_wire] = connc
-                    except AttributeError:
-                        pass
-                    try:
-                        connn = config["conductor_N"]
-                        api_wire = Wire(model)
-                        api_wire.phase = "N"
-                        conductors[api_wire] = connn
-                    except AttributeError:
-                        pass
+                    for phase in ["A", "B", "C", "N"]:
+                        conductor = self.all_gld_objects.reference(
+                            config, "conductor_" + phase
+                        )
+                        if conductor is not None:
+                            api_wire = Wire(model)
+                            api_wire.phase = phase
+                            conductors[api_wire] = conductor
 
                     # Pass by reference so the conductors are updated in dictionary when api_wire is changed
-                    for api_wire in conductors:
-                        cond_name = conductors[api_wire]
-                        conductor = self.all_gld_objects[cond_name]
+                    for api_wire, conductor in conductors.items():
                         try:
                             api_wire.diameter = float(
                                 conductor["diameter"]
@@ -1580,32 +1486,28 @@ class Reader(AbstractReader):
                         except AttributeError:
                             pass
 
-                    spacing_name = None
-                    try:
-                        spacing_name = config["spacing"]
-                    except AttributeError:
-                        pass
-                    if spacing_name is not None:
-                        spacing = self.all_gld_objects[spacing_name]
+                    spacing = self.all_gld_objects.reference(config, "spacing")
+                    if spacing is not None:
                         self.compute_spacing(spacing, conductors)
                 except AttributeError:
                     pass
 
                 impedance_matrix = [[0 for i in range(3)] for j in range(3)]
                 impedance_matrix_direct = False
-                try:
-                    impedance_matrix[0][0] = config["z11"]
-                    impedance_matrix[0][1] = config["z12"]
-                    impedance_matrix[0][2] = config["z13"]
-                    impedance_matrix[1][0] = config["z21"]
-                    impedance_matrix[1][1] = config["z22"]
-                    impedance_matrix[1][2] = config["z23"]
-                    impedance_matrix[2][0] = config["z31"]
-                    impedance_matrix[2][1] = config["z32"]
-                    impedance_matrix[2][1] = config["z33"]
-                    impedance_matrix_direct = True
-                except AttributeError:
-                    pass
+                if config is not None:
+                    try:
+                        impedance_matrix[0][0] = config["z11"]
+                        impedance_matrix[0][1] = config["z12"]
+                        impedance_matrix[0][2] = config["z13"]
+                        impedance_matrix[1][0] = config["z21"]
+                        impedance_matrix[1][1] = config["z22"]
+                        impedance_matrix[1][2] = config["z23"]
+                        impedance_matrix[2][0] = config["z31"]
+                        impedance_matrix[2][1] = config["z32"]
+                        impedance_matrix[2][1] = config["z33"]
+                        impedance_matrix_direct = True
+                    except AttributeError:
+                        pass
 
                 if not impedance_matrix_direct:
                     impedance_matrix = self.compute_matrix(list(conductors.keys()))
@@ -1658,54 +1560,35 @@ class Reader(AbstractReader):
                 except AttributeError:
                     pass
 
+                config = self.all_gld_objects.reference(obj, "configuration")
+                conductors = {}
                 try:
-                    config_name = obj["configuration"]
-                    config = self.all_gld_objects[config_name]
-                    conductors = {}
-                    num_phases = 0
-                    try:
-                        conn1 = config["conductor_1"]
-                        num_phases = num_phases + 1
-                        api_wire = Wire(model)
-                        # api_wire.phase='1' TODO: set the triplex phases to be 1 and 2
-                        api_wire.phase = "A"
-                        conductors[api_wire] = conn1
-                    except AttributeError:
-                        pass
-                    try:
-                        conn2 = config["conductor_2"]
-                        num_phases = num_phases + 1
-                        api_wire = Wire(model)
-                        # api_wire.phase='2' TODO: set the triplex phases to be 1 and 2
-                        api_wire.phase = "B"
-                        conductors[api_wire] = conn2
-                    except AttributeError:
-                        pass
-
-                    try:
-                        conn1 = config["conductor_N"]
-                        num_phases = num_phases + 1
-                        api_wire = Wire(model)
-                        api_wire.phase = "N"
-                        conductors[api_wire] = conn2
-                    except AttributeError:
-                        pass
+                    # TODO: set the triplex phases to be 1 and 2
+                    for key, phase in [
+                        ("conductor_1", "A"),
+                        ("conductor_2", "B"),
+                        ("conductor_N", "N"),
+                    ]:
+                        conductor = self.all_gld_objects.reference(config, key)
+                        if conductor is not None:
+                            api_wire = Wire(model)
+                            api_wire.phase = phase
+                            conductors[api_wire] = conductor
 
-                    try:
-                        api_wire.insulation_thickness = (
-                            float(config["insulation_thickness"]) / 39.3701
-                        )
-                    except AttributeError:
-                        pass
+                    if conductors:
+                        try:
+                            api_wire.insulation_thickness = (
+                                float(config["insulation_thickness"]) / 39.3701
+                            )
+                        except AttributeError:
+                            pass
 
-                    try:
-                        api_wire.diameter = float(config["diameter"]) / 39.3701
-                    except AttributeError:
-                        pass
+                        try:
+                            api_wire.diameter = float(config["diameter"]) / 39.3701
+                        except AttributeError:
+                            pass
 
-                    for api_wire in conductors:
-                        cond_name = conductors[api_wire]
-                        conductor = self.all_gld_objects[cond_name]
+                    for api_wire, conductor in conductors.items():
                         try:
                             api_wire.gmr = (
                                 float(conductor["geometric_mean_radius"]) / 3.28084
@@ -1726,14 +1609,15 @@ class Reader(AbstractReader):
                     pass
                 impedance_matrix = [[0 for i in range(2)] for j in range(2)]
                 impedance_matrix_direct = False
-                try:
-                    impedance_matrix[0][0] = config["z11"]
-                    impedance_matrix[0][1] = config["z12"]
-                    impedance_matrix[1][0] = config["z21"]
-                    impedance_matrix[1][1] = config["z22"]
-                    impedance_matrix_direct = True
-                except AttributeError:
-                    pass
+                if config is not None:
+                    try:
+                        impedance_matrix[0][0] = config["z11"]
+                        impedance_matrix[0][1] = config["z12"]
+                        impedance_matrix[1][0] = config["z21"]
+                        impedance_matrix[1][1] = config["z22"]
+                        impedance_matrix_direct = True
+                    except AttributeError:
+                        pass
 
                 if not impedance_matrix_direct:
                     impedance_matrix = self.compute_secondary_matrix(
@@ -1768,48 +1652,21 @@ class Reader(AbstractReader):
                 except AttributeError:
                     pass
 
+                config = self.all_gld_objects.reference(obj, "configuration")
+                conductors = {}
                 try:
-                    config_name = obj["configuration"]
-                    config = self.all_gld_objects[config_name]
-                    conductors = {}
-                    num_phases = 0
-                    try:
-                        conna = config["conductor_A"]
-                        num_phases = num_phases + 1
-                        api_wire = Wire(model)
-                        api_wire.phase = "A"
-                        conductors[api_wire] = conna
-                    except AttributeError:
-                        pass
-                    try:
-                        connb = config["conductor_B"]
-                        num_phases = num_phases + 1
-                        api_wire = Wire(model)
-                        api_wire.phase = "B"
-                        conductors[api_wire] = connb
-                    except AttributeError:
-                        pass
-                    try:
-                        connc = config["conductor_C"]
-                        num_phases = num_phases + 1
-                        api_wire = Wire(model)
-                        api_wire.phase = "C"
-                        conductors[api_wire] = connc
-                    except AttributeError:
-                        pass
-                    try:
-                        connn = config["conductor_N"]
-                        api_wire = Wire(model)
-                        api_wire.phase = "N"
-                        conductors[api_wire] = connn
-                    except AttributeError:
-                        pass
+                    for phase in ["A", "B", "C", "N"]:
+                        conductor = self.all_gld_objects.reference(
+                            config, "conductor_" + phase
+                        )
+                        if conductor is not None:
+                            api_wire = Wire(model)
+                            api_wire.phase = phase
+                            conductors[api_wire] = conductor
 
                     # Neutral may be concentric for underground cables or may be a separate wire
                     # TODO: consider other attributes of underground cables?
-                    for api_wire in conductors:
-                        cond_name = conductors[api_wire]
-                        conductor = self.all_gld_objects[cond_name]
+                    for api_wire, conductor in conductors.items():
                         # set gmr to be the conductor gmr for underground cables
                         try:
                             api_wire.gmr = float(conductor["conductor_gmr"])
@@ -1838,14 +1695,9 @@ class Reader(AbstractReader):
                         except AttributeError:
                             pass
 
-                    spacing_name = None
-                    try:
-                        spacing_name = config["spacing"]
-                    except AttributeError:
-                        pass
-                    if spacing_name is not None:
+                    spacing = self.all_gld_objects.reference(config, "spacing")
+                    if spacing is not None:
                         # Assume all wires are 6 feet under by default
-                        spacing = self.all_gld_objects[spacing_name]
                         lookup = ["A", "B", "C", "N"]
                         rev_lookup = {"A": 0, "B": 1, "C": 2, "N": 3, "E": 4}
                         num_dists = len(lookup)
@@ -2034,19 +1886,20 @@ class Reader(AbstractReader):
 
                 impedance_matrix = [[0 for i in range(3)] for j in range(3)]
                 impedance_matrix_direct = False
-                try:
-                    impedance_matrix[0][0] = config["z11"]
-                    impedance_matrix[0][1] = config["z12"]
-                    impedance_matrix[0][2] = config["z13"]
-                    impedance_matrix[1][0] = config["z21"]
-                    impedance_matrix[1][1] = config["z22"]
-                    impedance_matrix[1][2] = config["z23"]
-                    impedance_matrix[2][0] = config["z31"]
-                    impedance_matrix[2][1] = config["z32"]
-                    impedance_matrix[2][1] = config["z33"]
-                    impedance_matrix_direct = True
-                except AttributeError:
-                    pass
+                if config is not None:
+                    try:
+                        impedance_matrix[0][0] = config["z11"]
+                        impedance_matrix[0][1] = config["z12"]
+                        impedance_matrix[0][2] = config["z13"]
+                        impedance_matrix[1][0] = config["z21"]
+                        impedance_matrix[1][1] = config["z22"]
+                        impedance_matrix[1][2] = config["z23"]
+                        impedance_matrix[2][0] = config["z31"]
+                        impedance_matrix[2][1] = config["z32"]
+                        impedance_matrix[2][1] = config["z33"]
+                        impedance_matrix_direct = True
+                    except AttributeError:
+                        pass
 
                 if not impedance_matrix_direct:
                     impedance_matrix = self.compute_matrix(list(conductors.keys()))
@@ -2231,175 +2084,174 @@ class Reader(AbstractReader):
                     pass
 
                 try:
-                    config_name1 = obj["configuration"]
-                    for config_name, config in self.all_gld_objects.items():
-                        if config_name == config_name1:
-
-                            for tap_phase in ["A", "B", "C"]:
-                                try:
-                                    tap = config["tap_pos_%s" % tap_phase]
-                                    if (
-                                        winding2.phase_windings is None
-                                    ):  # i.e. no phases were listed even though they are there. Should only need to check winding2 (not both windings) since the phases are populated at the same time.
-                                        winding1.phase_windings = []
-                                        winding2.phase_windings = []
-
-                                    index = None
-                                    for i in range(len(winding2.phase_windings)):
-                                        if (
-                                            winding2.phase_windings[i].phase
-                                            == tap_phase
-                                        ):
-                                            index = i
-                                            break
-                                    if index is None:
-                                        pw1 = PhaseWinding(model)
-                                        pw1.phase = tap_phase
-                                        winding1.phase_windings.append(pw1)
-                                        pw2 = PhaseWinding(model)
-                                        pw2.phase = tap_phase
-                                        winding2.phase_windings.append(pw2)
-                                        index = len(winding2.phase_windings) - 1
-
-                                    winding2.phase_windings[index].tap_position = int(
-                                        tap
-                                    )
-
-                                except AttributeError:
-                                    pass
-
-                            for r_comp_phase in ["A", "B", "C"]:
-                                try:
-                                    r_comp = config[
-                                        "compensator_r_setting_%s" % r_comp_phase
-                                    ]
-                                    if (
-                                        winding2.phase_windings is None
-                                    ):  # i.e. no phases were listed even though they are there. Should only need to check winding2 (not both windings) since the phases are populated at the same time.
-                                        winding1.phase_windings = []
-                                        winding2.phase_windings = []
-
-                                    index = None
-                                    for i in range(len(winding2.phase_windings)):
-                                        if (
-                                            winding2.phase_windings[i].phase
-                                            == r_comp_phase
-                                        ):
-                                            index = i
-                                            break
-                                    if index is None:
-                                        pw1 = PhaseWinding(model)
-                                        pw1.phase = r_comp_phase
-                                        winding1.phase_windings.append(pw1)
-                                        pw2 = PhaseWinding(model)
-                                        pw2.phase = r_comp_phase
-                                        winding2.phase_windings.append(
-                                            pw2
-                                        )  # Add the phase in for winding 1 as well
-                                        index = len(windings2.phase_windings) - 1
-
-                                    winding2.phase_windings[
-                                        index
-                                    ].compensator_r = float(r_comp)
+                    config = self.all_gld_objects.reference(obj, "configuration")
+                    if config is not None:
 
-                                except AttributeError:
-                                    pass
+                        for tap_phase in ["A", "B", "C"]:
+                            try:
+                                tap = config["tap_pos_%s" % tap_phase]
+                                if (
+                                    winding2.phase_windings is None
+                                ):  # i.e. no phases were listed even though they are there. Should only need to check winding2 (not both windings) since the phases are populated at the same time.
+                                    winding1.phase_windings = []
+                                    winding2.phase_windings = []
 
-                            for x_comp_phase in ["A", "B", "C"]:
-                                try:
-                                    x_comp = config[
-                                        "compensator_x_setting_%s" % x_comp_phase
-                                    ]
+                                index = None
+                                for i in range(len(winding2.phase_windings)):
                                     if (
-                                        winding2.phase_windings is None
-                                    ):  # i.e. no phases were listed even though they are there. Should only need to check winding2 (not both windings) since the phases are populated at the same time.
-                                        winding1.phase_windings = []
-                                        winding2.phase_windings = []
-
-                                    index = None
-                                    for i in range(len(winding2.phase_windings)):
-                                        if (
-                                            winding2.phase_windings[i].phase
-                                            == x_comp_phase
-                                        ):
-                                            index = i
-                                            break
-                                    if index is None:
-                                        pw1 = PhaseWinding(model)
-                                        pw1.phase = x_comp_phase
-                                        winding1.phase_windings.append(pw1)
-                                        pw2 = PhaseWinding(model)
-                                        pw2.phase = x_comp_phase
-                                        winding2.phase_windings.append(
-                                            pw2
-                                        )  # Add the phase in for winding 1 as well
-                                        index = len(windings2.phase_windings) - 1
-
-                                    winding2.phase_windings[
-                                        index
-                                    ].compensator_x = float(x_comp)
+                                        winding2.phase_windings[i].phase
+                                        == tap_phase
+                                    ):
+                                        index = i
+                                        break
+                                if index is None:
+                                    pw1 = PhaseWinding(model)
+                                    pw1.phase = tap_phase
+                                    winding1.phase_windings.append(pw1)
+                                    pw2 = PhaseWinding(model)
+                                    pw2.phase = tap_phase
+                                    winding2.phase_windings.append(pw2)
+                                    index = len(winding2.phase_windings) - 1
+
+                                winding2.phase_windings[index].tap_position = int(
+                                    tap
+                                )
 
-                                except AttributeError:
-                                    pass
+                            except AttributeError:
+                                pass
 
+                        for r_comp_phase in ["A", "B", "C"]:
                             try:
-                                conn = config["connect_type"]
-
-                                if conn == 1 or conn == "WYE_WYE":
-                                    winding1.connection_type = "Y"
-                                    winding2.connection_type = "Y"
+                                r_comp = config[
+                                    "compensator_r_setting_%s" % r_comp_phase
+                                ]
+                                if (
+                                    winding2.phase_windings is None
+                                ):  # i.e. no phases were listed even though they are there. Should only need to check winding2 (not both windings) since the phases are populated at the same time.
+                                    winding1.phase_windings = []
+                                    winding2.phase_windings = []
 
-                                # Version of GLD this is based on only has Wye-Wye regulators
+                                index = None
+                                for i in range(len(winding2.phase_windings)):
+                                    if (
+                                        winding2.phase_windings[i].phase
+                                        == r_comp_phase
+                                    ):
+                                        index = i
+                                        break
+                                if index is None:
+                                    pw1 = PhaseWinding(model)
+                                    pw1.phase = r_comp_phase
+                                    winding1.phase_windings.append(pw1)
+                                    pw2 = PhaseWinding(model)
+                                    pw2.phase = r_comp_phase
+                                    winding2.phase_windings.append(
+                                        pw2
+                                    )  # Add the phase in for winding 1 as well
+                                    index = len(windings2.phase_windings) - 1
+
+                                winding2.phase_windings[
+                                    index
+                                ].compensator_r = float(r_comp)
 
                             except AttributeError:
                                 pass
 
+                        for x_comp_phase in ["A", "B", "C"]:
                             try:
-                                api_regulator.delay = float(config["time_delay"])
-                            except AttributeError:
-                                pass
+                                x_comp = config[
+                                    "compensator_x_setting_%s" % x_comp_phase
+                                ]
+                                if (
+                                    winding2.phase_windings is None
+                                ):  # i.e. no phases were listed even though they are there. Should only need to check winding2 (not both windings) since the phases are populated at the same time.
+                                    winding1.phase_windings = []
+                                    winding2.phase_windings = []
 
-                            try:
-                                api_regulator.bandwidth = float(config["band_width"])
-                            except AttributeError:
-                                pass
+                                index = None
+                                for i in range(len(winding2.phase_windings)):
+                                    if (
+                                        winding2.phase_windings[i].phase
+                                        == x_comp_phase
+                                    ):
+                                        index = i
+                                        break
+                                if index is None:
+                                    pw1 = PhaseWinding(model)
+                                    pw1.phase = x_comp_phase
+                                    winding1.phase_windings.append(pw1)
+                                    pw2 = PhaseWinding(model)
+                                    pw2.phase = x_comp_phase
+                                    winding2.phase_windings.append(
+                                        pw2
+                                    )  # Add the phase in for winding 1 as well
+                                    index = len(windings2.phase_windings) - 1
+
+                                winding2.phase_windings[
+                                    index
+                                ].compensator_x = float(x_comp)
 
-                            try:
-                                api_regulator.bandcenter = float(config["band_center"])
                             except AttributeError:
                                 pass
 
-                            try:
-                                api_regulator.highstep = int(config["raise_taps"])
-                            except AttributeError:
-                                pass
+                        try:
+                            conn = config["connect_type"]
 
-                            try:
-                                api_regulator.lowstep = int(config["lower_taps"])
-                            except AttributeError:
-                                pass
+                            if conn == 1 or conn == "WYE_WYE":
+                                winding1.connection_type = "Y"
+                                winding2.connection_type = "Y"
 
-                            try:
-                                api_regulator.pt_ratio = float(
-                                    config["power_transducer_ratio"]
-                                )
-                            except AttributeError:
-                                pass
+                            # Version of GLD this is based on only has Wye-Wye regulators
 
-                            try:
-                                api_regulator.ct_ratio = float(
-                                    config["current_transducer_ratio"]
-                                )
-                            except AttributeError:
-                                pass
+                        except AttributeError:
+                            pass
 
-                            try:
-                                # wire_map = {'A':1,'B':2,'C':3} #Only take one phase (GLD seems to have 3 sometimes)
-                                api_regulator.pt_phase = config["PT_phase"].strip('"')[
-                                    0
-                                ]  # wire_map[config['PT_phase'].strip('"')[0]]
-                            except AttributeError:
-                                pass
+                        try:
+                            api_regulator.delay = float(config["time_delay"])
+                        except AttributeError:
+                            pass
+
+                        try:
+                            api_regulator.bandwidth = float(config["band_width"])
+                        except AttributeError:
+                            pass
+
+                        try:
+                            api_regulator.bandcenter = float(config["band_center"])
+                        except AttributeError:
+                            pass
+
+                        try:
+                            api_regulator.highstep = int(config["raise_taps"])
+                        except AttributeError:
+                            pass
+
+                        try:
+                            api_regulator.lowstep = int(config["lower_taps"])
+                        except AttributeError:
+                            pass
+
+                        try:
+                            api_regulator.pt_ratio = float(
+                                config["power_transducer_ratio"]
+                            )
+                        except AttributeError:
+                            pass
+
+                        try:
+                            api_regulator.ct_ratio = float(
+                                config["current_transducer_ratio"]
+                            )
+                        except AttributeError:
+                            pass
+
+                        try:
+                            # wire_map = {'A':1,'B':2,'C':3} #Only take one phase (GLD seems to have 3 sometimes)
+                            api_regulator.pt_phase = config["PT_phase"].strip('"')[
+                                0
+                            ]  # wire_map[config['PT_phase'].strip('"')[0]]
+                        except AttributeError:
+                            pass
 
                 except AttributeError:
                     pass
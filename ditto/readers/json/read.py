@@ -3,6 +3,7 @@
 from __future__ import absolute_import, division, print_function
 from builtins import super, range, zip, round, map
 
+import gzip
 import json_tricks
 
 # TODO: remove numpy dependency here
@@ -60,6 +61,25 @@ class_mapping = {
     "numpy.float64": numpy.float64,
 }
 
+ditto_classes = [
+    "PowerSource",
+    "Photovoltaic",
+    "Node",
+    "Line",
+    "Winding",
+    "PowerTransformer",
+    "Position",
+    "Wire",
+    "PhaseWinding",
+    "Load",
+    "PhaseLoad",
+    "Capacitor",
+    "PhaseCapacitor",
+    "Feeder_metadata",
+    "Regulator",
+    "Storage",
+]
+
 
 class Reader(AbstractReader):
     """JSON-->DiTTo Reader class
@@ -119,6 +139,11 @@ class Reader(AbstractReader):
 
     .. TODO:: Better format?
 
+    The reader also accepts the streaming format written by the JSON writer, with
+    the metadata on the first line and then one object per line. It is used for the
+    .jsonl and .jsonl.gz files, or when streaming=True is given. Gzipped files are
+    decompressed on the fly.
+
     Author: Nicolas Gensollen. January 2018
     """
 
@@ -131,330 +156,340 @@ class Reader(AbstractReader):
         else:
             raise ValueError("No input file provided to the reader.")
 
+        # Streaming format: one JSON object per line (.jsonl or .jsonl.gz files by default)
+        if "streaming" in kwargs:
+            self.streaming = kwargs["streaming"]
+        else:
+            name = self.input_file
+            if name.endswith(".gz"):
+                name = name[:-3]
+            self.streaming = name.endswith(".jsonl")
+
+    def open_input_file(self):
+        """Open the input file for reading, decompressing it on the fly if it is gzipped."""
+        with open(self.input_file, "rb") as f:
+            gzipped = f.read(2) == b"\x1f\x8b"
+        if gzipped:
+            return gzip.open(self.input_file, "rt")
+        return open(self.input_file, "r")
+
     def parse(self, model):
-        """Parse a JSON file to a DiTTo model."""
-        # Open the input file and get the data
-        with open(self.input_file, "r") as f:
-            input_data = json_tricks.load(f)
-
-        ditto_classes = [
-            "PowerSource",
-            "Photovoltaic",
-            "Node",
-            "Line",
-            "Winding",
-            "PowerTransformer",
-            "Position",
-            "Wire",
-            "PhaseWinding",
-            "Load",
-            "PhaseLoad",
-            "Capacitor",
-            "PhaseCapacitor",
-            "Feeder_metadata",
-            "Regulator",
-            "Storage",
-        ]
+        """Parse a JSON file to a DiTTo model.
 
+        With the streaming format, the objects are parsed one line at a time, and the
+        whole document is never loaded in memory.
+        """
         # Create a new empty model
         self.model = model
 
-        if "model" not in input_data:
-            raise ValueError("No model found in the JSON file provided")
-
-        if not isinstance(input_data["model"], list):
-            raise TypeError("Model in JSON file should be a list of objects.")
-
-        # Loop over the objects...
-        for _object in input_data["model"]:
-
-            # Get the class of the element
-            _class = _object["class"]
-
-            # If it is a second level or third level class, ignore the object
-            # These objects will be created when handling the first level object
-            # Ex: When creating a PowerTransformer, corresponding Windings and
-            # PhaseWindings will be created
-            if _class in [
-                "Winding",
-                "PhaseWinding",
-                "Wire",
-                "PhaseCapacitor",
-                "Position",
-                "PhaseLoad",
-            ]:
-                continue
-
-            # Use the class to instantiate the proper DiTTo object
-            # Ex: PowerTransformer
-
-            if _object["class"] in class_mapping:
-                api_object = class_mapping[_object["class"]](self.model)
+        with self.open_input_file() as f:
+            if self.streaming:
+                for line in f:
+                    if not line.strip():
+                        continue
+                    _object = json_tricks.loads(line)
+                    # The first line holds the metadata
+                    if "class" not in _object:
+                        continue
+                    self.parse_object(_object)
             else:
-                raise ValueError(
-                    "Class {cl} is not supported by DiTTo.".format(cl=_object["class"])
-                )
+                input_data = json_tricks.load(f)
 
-            # Loop over the object properties.
-            # Ex: name, postion...
-            for object_property, property_value in _object.items():
+                if "model" not in input_data:
+                    raise ValueError("No model found in the JSON file provided")
 
-                if object_property != "class":
+                if not isinstance(input_data["model"], list):
+                    raise TypeError("Model in JSON file should be a list of objects.")
 
-                    # Get the type of the property
-                    property_type = property_value["class"]
+                # Loop over the objects...
+                for _object in input_data["model"]:
+                    self.parse_object(_object)
 
-                    # Depending on this type, there are a few different scenarios...
-                    # First, if it is a list...
-                    # Ex: list of windings
-                    if property_type == "list":
+        print("Finished reading from json")
 
-                        # Create the list for this property
-                        list_first_level = []
+    def parse_object(self, _object):
+        """Create the DiTTo object described by a JSON object of the model."""
 
-                        # Loop over the element in the list
-                        # Ex: element will be a dict {'class':Winding, 'rated_power':{'class':'float','value':10},...}
-                        for element in property_value["value"]:
+        # Get the class of the element
+        _class = _object["class"]
 
-                            # Get the type of each element
-                            # Ex: Winding
-                            element_type = element["class"]
+        # If it is a second level or third level class, ignore the object
+        # These objects will be created when handling the first level object
+        # Ex: When creating a PowerTransformer, corresponding Windings and
+        # PhaseWindings will be created
+        if _class in [
+            "Winding",
+            "PhaseWinding",
+            "Wire",
+            "PhaseCapacitor",
+            "Position",
+            "PhaseLoad",
+        ]:
+            return
+
+        # Use the class to instantiate the proper DiTTo object
+        # Ex: PowerTransformer
+
+        if _object["class"] in class_mapping:
+            api_object = class_mapping[_object["class"]](self.model)
+        else:
+            raise ValueError(
+                "Class {cl} is not supported by DiTTo.".format(cl=_object["class"])
+            )
 
-                            # Again, there are multiple possibilities
-                            # First, it could be a DiTTo object.
+        # Loop over the object properties.
+        # Ex: name, postion...
+        for object_property, property_value in _object.items():
+
+            if object_property != "class":
+
+                # Get the type of the property
+                property_type = property_value["class"]
+
+                # Depending on this type, there are a few different scenarios...
+                # First, if it is a list...
+                # Ex: list of windings
+                if property_type == "list":
+
+                    # Create the list for this property
+                    list_first_level = []
+
+                    # Loop over the element in the list
+                    # Ex: element will be a dict {'class':Winding, 'rated_power':{'class':'float','value':10},...}
+                    for element in property_value["value"]:
+
+                        # Get the type of each element
+                        # Ex: Winding
+                        element_type = element["class"]
+
+                        # Again, there are multiple possibilities
+                        # First, it could be a DiTTo object.
+                        # Ex: Winding
+                        if element_type in ditto_classes:
+
+                            # Instanciate the proper DiTTo object
                             # Ex: Winding
-                            if element_type in ditto_classes:
+                            api_object_one_level_deep = class_mapping[element_type](
+                                self.model
+                            )
 
-                                # Instanciate the proper DiTTo object
-                                # Ex: Winding
-                                api_object_one_level_deep = class_mapping[element_type](
-                                    self.model
-                                )
+                            # Loop over the winding properties
+                            # Ex: rated_power...
+                            for element_property, element_value in element.items():
 
-                                # Loop over the winding properties
-                                # Ex: rated_power...
-                                for element_property, element_value in element.items():
+                                if element_property != "class":
 
-                                    if element_property != "class":
+                                    # Get the type of the property
+                                    # Ex: float
+                                    nested_element_type = element_value["class"]
 
-                                        # Get the type of the property
-                                        # Ex: float
-                                        nested_element_type = element_value["class"]
+                                    # If it is a list...
+                                    if nested_element_type == "list":
 
-                                        # If it is a list...
-                                        if nested_element_type == "list":
+                                        # Create empty list to store the elements
+                                        list_second_level = []
 
-                                            # Create empty list to store the elements
-                                            list_second_level = []
+                                        # Loop over the elements...
+                                        for element_deep in element_value["value"]:
 
-                                            # Loop over the elements...
-                                            for element_deep in element_value["value"]:
+                                            # Get the class
+                                            element_deep_class = element_deep["class"]
 
-                                                # Get the class
-                                                element_deep_class = element_deep[
-                                                    "class"
-                                                ]
+                                            # If it is a DiTTo object
+                                            if element_deep_class in ditto_classes:
 
-                                                # If it is a DiTTo object
-                                                if element_deep_class in ditto_classes:
+                                                # Create the proper object
+                                                api_object_two_level_deep = class_mapping[
+                                                    element_deep_class
+                                                ](
+                                                    self.model
+                                                )
 
-                                                    # Create the proper object
-                                                    api_object_two_level_deep = class_mapping[
-                                                        element_deep_class
-                                                    ](
-                                                        self.model
-                                                    )
+                                                # And loop over its attributes
+                                                for (
+                                                    nested_object_property,
+                                                    nested_object_property_value,
+                                                ) in element_deep.items():
 
-                                                    # And loop over its attributes
-                                                    for (
-                                                        nested_object_property,
-                                                        nested_object_property_value,
-                                                    ) in element_deep.items():
+                                                    if (
+                                                        nested_object_property
+                                                        != "class"
+                                                    ):
 
+                                                        # At this point, it should be either a complex...
                                                         if (
-                                                            nested_object_property
-                                                            != "class"
+                                                            nested_object_property_value[
+                                                                "class"
+                                                            ]
+                                                            == "complex"
                                                         ):
 
-                                                            # At this point, it should be either a complex...
-                                                            if (
-                                                                nested_object_property_value[
-                                                                    "class"
-                                                                ]
-                                                                == "complex"
-                                                            ):
-
-                                                                setattr(
-                                                                    api_object_two_level_deep,
-                                                                    nested_object_property,
-                                                                    complex(
-                                                                        nested_object_property_value[
-                                                                            "value"
-                                                                        ][
-                                                                            0
-                                                                        ],
-                                                                        nested_object_property_value[
-                                                                            "value"
-                                                                        ][
-                                                                            1
-                                                                        ],
-                                                                    ),
-                                                                )
-
-                                                            # ...or a standard type
-                                                            elif (
-                                                                nested_object_property_value[
-                                                                    "class"
-                                                                ]
-                                                                != "NoneType"
-                                                            ):
-
-                                                                setattr(
-                                                                    api_object_two_level_deep,
-                                                                    nested_object_property,
-                                                                    class_mapping[
-                                                                        nested_object_property_value[
-                                                                            "class"
-                                                                        ]
-                                                                    ](
-                                                                        nested_object_property_value[
-                                                                            "value"
-                                                                        ]
-                                                                    ),
-                                                                )
-
-                                                    # Add the DiTTo object to the list
-                                                    list_second_level.append(
-                                                        api_object_two_level_deep
-                                                    )
-
-                                                # if it is a complex number, cast and add to the list
-                                                elif element_deep_class == "complex":
+                                                            setattr(
+                                                                api_object_two_level_deep,
+                                                                nested_object_property,
+                                                                complex(
+                                                                    nested_object_property_value[
+                                                                        "value"
+                                                                    ][
+                                                                        0
+                                                                    ],
+                                                                    nested_object_property_value[
+                                                                        "value"
+                                                                    ][
+                                                                        1
+                                                                    ],
+                                                                ),
+                                                            )
+
+                                                        # ...or a standard type
+                                                        elif (
+                                                            nested_object_property_value[
+                                                                "class"
+                                                            ]
+                                                            != "NoneType"
+                                                        ):
 
-                                                    list_second_level.append(
-                                                        complex(
-                                                            element_deep["value"][0],
-                                                            element_deep["value"][1],
-                                                        )
+                                                            setattr(
+                                                                api_object_two_level_deep,
+                                                                nested_object_property,
+                                                                class_mapping[
+                                                                    nested_object_property_value[
+                                                                        "class"
+                                                                    ]
+                                                                ](
+                                                                    nested_object_property_value[
+                                                                        "value"
+                                                                    ]
+                                                                ),
+                                                            )
+
+                                                # Add the DiTTo object to the list
+                                                list_second_level.append(
+                                                    api_object_two_level_deep
+                                                )
+
+                                            # if it is a complex number, cast and add to the list
+                                            elif element_deep_class == "complex":
+
+                                                list_second_level.append(
+                                                    complex(
+                                                        element_deep["value"][0],
+                                                        element_deep["value"][1],
                                                     )
+                                                )
 
-                                                # If it is a standard type, cast and add to the list
-                                                elif element_deep_class != "NoneType":
+                                            # If it is a standard type, cast and add to the list
+                                            elif element_deep_class != "NoneType":
 
-                                                    list_second_level.append(
-                                                        class_mapping[
-                                                            element_deep_class
-                                                        ](element_deep["value"])
+                                                list_second_level.append(
+                                                    class_mapping[element_deep_class](
+                                                        element_deep["value"]
                                                     )
+                                                )
 
-                                            # Set the object attribute with the list we just built
-                                            setattr(
-                                                api_object_one_level_deep,
-                                                element_property,
-                                                list_second_level,
-                                            )
+                                        # Set the object attribute with the list we just built
+                                        setattr(
+                                            api_object_one_level_deep,
+                                            element_property,
+                                            list_second_level,
+                                        )
 
-                                        # Or, it could be a complex number
-                                        elif nested_element_type == "complex":
+                                    # Or, it could be a complex number
+                                    elif nested_element_type == "complex":
 
-                                            setattr(
-                                                api_object_one_level_deep,
-                                                element_property,
-                                                complex(
-                                                    element_value["value"][0],
-                                                    element_value["value"][1],
-                                                ),
-                                            )
+                                        setattr(
+                                            api_object_one_level_deep,
+                                            element_property,
+                                            complex(
+                                                element_value["value"][0],
+                                                element_value["value"][1],
+                                            ),
+                                        )
 
-                                        # Or, None or standard types
-                                        elif nested_element_type != "NoneType":
+                                    # Or, None or standard types
+                                    elif nested_element_type != "NoneType":
 
-                                            setattr(
-                                                api_object_one_level_deep,
-                                                element_property,
-                                                class_mapping[nested_element_type](
-                                                    element_value["value"]
-                                                ),
-                                            )
+                                        setattr(
+                                            api_object_one_level_deep,
+                                            element_property,
+                                            class_mapping[nested_element_type](
+                                                element_value["value"]
+                                            ),
+                                        )
 
-                                # Append the DiTTo object to the first level list
-                                list_first_level.append(api_object_one_level_deep)
+                            # Append the DiTTo object to the first level list
+                            list_first_level.append(api_object_one_level_deep)
 
-                            # If it is a list, this should be a matrix stored as a list of lists
-                            elif element_type == "list":
+                        # If it is a list, this should be a matrix stored as a list of lists
+                        elif element_type == "list":
 
-                                # Create an empty inner list
-                                inner_list = []
+                            # Create an empty inner list
+                            inner_list = []
 
-                                # Loop over the elements
-                                for element_deep in element["value"]:
+                            # Loop over the elements
+                            for element_deep in element["value"]:
 
-                                    # They could be complex numbers
-                                    if element_deep["class"] == "complex":
+                                # They could be complex numbers
+                                if element_deep["class"] == "complex":
 
-                                        inner_list.append(
-                                            complex(
-                                                element_deep["value"][0],
-                                                element_deep["value"][1],
-                                            )
+                                    inner_list.append(
+                                        complex(
+                                            element_deep["value"][0],
+                                            element_deep["value"][1],
                                         )
+                                    )
 
-                                    # Or standard numbers (int or float)
-                                    elif element_deep["class"] != "NoneType":
+                                # Or standard numbers (int or float)
+                                elif element_deep["class"] != "NoneType":
 
-                                        inner_list.append(
-                                            class_mapping[element_deep["class"]](
-                                                element_deep["value"]
-                                            )
+                                    inner_list.append(
+                                        class_mapping[element_deep["class"]](
+                                            element_deep["value"]
                                         )
+                                    )
 
-                                # Add the row to the matrix
-                                list_first_level.append(inner_list)
+                            # Add the row to the matrix
+                            list_first_level.append(inner_list)
 
-                            # Or, it could be a complex number (handled in a list format)
-                            elif element_type == "complex":
+                        # Or, it could be a complex number (handled in a list format)
+                        elif element_type == "complex":
 
-                                list_first_level.append(
-                                    complex(element["value"][0], element["value"][1])
-                                )
+                            list_first_level.append(
+                                complex(element["value"][0], element["value"][1])
+                            )
 
-                            # Or it's a ditto base element
-                            elif "ditto." in element_type:
+                        # Or it's a ditto base element
+                        elif "ditto." in element_type:
 
-                                base_type = element_type.split(".")[-1]
-                                list_first_level.append(
-                                    eval(base_type)(element["value"])
-                                )
+                            base_type = element_type.split(".")[-1]
+                            list_first_level.append(eval(base_type)(element["value"]))
 
-                            # Otherwise, it is either None or a standard type
-                            elif element_type != "NoneType":
+                        # Otherwise, it is either None or a standard type
+                        elif element_type != "NoneType":
 
-                                list_first_level.append(
-                                    class_mapping[element_type](element["value"])
-                                )
+                            list_first_level.append(
+                                class_mapping[element_type](element["value"])
+                            )
 
-                        # Finally, set the attribute
-                        setattr(api_object, object_property, list_first_level)
+                    # Finally, set the attribute
+                    setattr(api_object, object_property, list_first_level)
 
-                    # Otherwise, if it is a complex number,
-                    # the representation used is a list [nb.real,nb.imag]
-                    elif property_type == "complex":
+                # Otherwise, if it is a complex number,
+                # the representation used is a list [nb.real,nb.imag]
+                elif property_type == "complex":
 
-                        setattr(
-                            api_object,
-                            object_property,
-                            complex(
-                                property_value["value"][0], property_value["value"][1]
-                            ),
-                        )
+                    setattr(
+                        api_object,
+                        object_property,
+                        complex(property_value["value"][0], property_value["value"][1]),
+                    )
 
-                    # If it is None, there is nothing to do
-                    # Otherwise, it is a standard type like int, float, str...
-                    elif property_type != "NoneType":
+                # If it is None, there is nothing to do
+                # Otherwise, it is a standard type like int, float, str...
+                elif property_type != "NoneType":
 
-                        setattr(
-                            api_object,
-                            object_property,
-                            class_mapping[property_type](property_value["value"]),
-                        )
-        print("Finished reading from json")
+                    setattr(
+                        api_object,
+                        object_property,
+                        class_mapping[property_type](property_value["value"]),
+                    )
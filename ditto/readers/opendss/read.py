@@ -13,6 +13,9 @@ import numpy as np
 
 import logging
 import time
+import shutil
+import tempfile
+import multiprocessing
 from six import string_types
 from functools import reduce
 
@@ -43,6 +46,9 @@ from ditto.models.feeder_metadata import Feeder_metadata
 
 from ditto.models.base import Unicode
 
+from ditto.readers.snapshot.read import Reader as SnapshotReader
+from ditto.writers.snapshot.write import Writer as SnapshotWriter
+
 logger = logging.getLogger(__name__)
 
 
@@ -73,6 +79,22 @@ class Reader(AbstractReader):
 
     The reader uses OpenDSSDirect heavily. <https://github.com/NREL/OpenDSSDirect.py>
     For more information on this package contact Dheepak Krishnamurthy.
+
+    **Multi-feeder master files:**
+
+    When the master file only redirects to independent feeder master files (each one
+    creating its own circuit), the feeders can be parsed in parallel, each one in its
+    own worker process with its own OpenDSS engine:
+
+    >>> my_reader=Reader(master_file='./master.dss', parallel=True, processes=8)
+
+    The feeder master files can also be given explicitly with feeder_master_files.
+    The feeders must not have objects with the same names, or parse raises a
+    ValueError, unless prefix_feeder_names is set: the names of the objects of each
+    feeder are then prefixed with the name of the feeder (e.g. 'IEEE13Nodeckt_sourcebus').
+    The bus coordinates of a feeder are read from the file given to its BusCoords
+    command, or from the buscoord.dss file next to its master file.
+    The other commands of the top-level master file are ignored.
     """
 
     register_names = ["dss", "opendss", "OpenDSS", "DSS"]
@@ -117,7 +139,30 @@ class Reader(AbstractReader):
         # self.DSS_file_names={'Nodes': 'buscoords.dss',
         #                     'master': 'master.dss'}
 
+        # Independent feeders parsed in parallel
+        if "feeder_master_files" in kwargs:
+            self.feeder_master_files = kwargs["feeder_master_files"]
+        else:
+            self.feeder_master_files = None
+        self.parallel = kwargs.get("parallel", False)
+        self.processes = kwargs.get("processes", None)
+        self.prefix_feeder_names = kwargs.get("prefix_feeder_names", False)
+        self.feeder_reader_kwargs = {
+            k: v
+            for k, v in kwargs.items()
+            if k
+            not in [
+                "master_file",
+                "buscoordinates_file",
+                "feeder_master_files",
+                "parallel",
+                "processes",
+                "prefix_feeder_names",
+            ]
+        }
+
         self.is_opendssdirect_built = False
+        self._dss_classes = {}
         self.all_object_names = []
         logger.info("OpenDSS--->DiTTo reader instanciated")
 
@@ -146,11 +191,31 @@ class Reader(AbstractReader):
         :param string: String of the OpenDSS command to execute (ex: 'New Transformer.T1 ...')
         :type string: str
         """
+        # The command can change the circuit
+        self._dss_classes = {}
         try:
             return dss.run_command(string)
         except:
             logger.error("Unable to execute the following command: \n" + string)
 
+    def dss_class_to_dict(self, class_name):
+        """Return the properties of all the objects of an OpenDSS class.
+
+        The class is extracted from OpenDSS the first time it is requested, and the
+        result is shared by all the parsers until the circuit is built again or an
+        OpenDSS command is executed with function().
+
+        :param class_name: Name of the OpenDSS class (ex: 'Line'). The keys of the result use the same case.
+        :type class_name: str
+        :returns: The properties of the objects, by object name (ex: 'Line.line1')
+        :rtype: dict
+
+        .. warning:: The result is shared, so it should not be modified.
+        """
+        if class_name not in self._dss_classes:
+            self._dss_classes[class_name] = _dss_class_to_dict(class_name)
+        return self._dss_classes[class_name]
+
     def phase_mapping(self, dss_phase):
         """Map the phases of OpenDSS (1, 2, or 3) into DiTTo phases ('A', 'B', or 'C').
 
@@ -224,6 +289,14 @@ class Reader(AbstractReader):
         :returns: 1 for success, -1 for failure
         :rtype: int
         """
+        feeder_master_files = self.feeder_master_files
+        if feeder_master_files is None and self.parallel:
+            feeder_master_files = self.find_feeder_master_files(
+                self.DSS_file_names["master"]
+            )
+        if feeder_master_files:
+            return self.parse_feeders_in_parallel(model, feeder_master_files, **kwargs)
+
         start = time.time()
         self.source_name = "Sourcebus"
         # In order to parse, we need that opendssdirect was previously run
@@ -255,41 +328,228 @@ class Reader(AbstractReader):
 
         return 1
 
+    def find_feeder_master_files(self, master_file):
+        """Find the independent feeder master files of a multi-feeder master file.
+
+        :param master_file: Path to the top-level master file
+        :type master_file: str
+        :returns: The files redirected (or compiled) by master_file which create their own circuit. Empty if there are less than two of them, or if master_file creates a circuit itself.
+        :rtype: list
+        """
+        directory = os.path.dirname(os.path.abspath(master_file))
+        feeder_master_files = []
+        for words in _dss_commands(master_file):
+            if _new_circuit_name(words) is not None:
+                return []
+            if words[0].lower() in ["redirect", "compile"] and len(words) > 1:
+                path = os.path.join(directory, words[1].strip("\"'"))
+                if os.path.isfile(path) and _circuit_name(path) is not None:
+                    feeder_master_files.append(path)
+        # A single circuit is a single feeder
+        if len(feeder_master_files) < 2:
+            return []
+        return feeder_master_files
+
+    def parse_feeders_in_parallel(self, model, feeder_master_files, **kwargs):
+        """Parse independent feeders in a pool of processes and merge them in model.
+
+        Each feeder master file is compiled by the OpenDSS engine of a worker process,
+        and parsed to a Store which is sent back as a snapshot (see ditto.formats.snapshot).
+        The feeder_name of the objects is set to the name of the circuit of their feeder,
+        and their substation_name (if not set) to the bus of the power source of the feeder.
+        The names of the objects are prefixed with the name of their feeder if
+        prefix_feeder_names is set (see prefix_names).
+
+        :raises ValueError: if objects of different feeders have the same name, and prefix_feeder_names is not set
+
+        :param model: DiTTo model
+        :type model: DiTTo model
+        :param feeder_master_files: Paths to the feeder master files
+        :type feeder_master_files: list
+        :returns: 1 for success
+        :rtype: int
+        """
+        parse_kwargs = {k: v for k, v in kwargs.items() if k != "feeder_file"}
+        if "feeder_file" in kwargs:
+            self.feeder_file = kwargs["feeder_file"]
+            self.parse_feeder_metadata(model)
+
+        # Feeder of the objects named so far, to detect the names shared between feeders
+        name_feeders = dict.fromkeys(model.model_names)
+        snapshot_directory = tempfile.mkdtemp()
+        tasks = [
+            (
+                type(self),
+                os.path.abspath(feeder_master_file),
+                self.feeder_reader_kwargs,
+                parse_kwargs,
+                model.lightweight,
+                model.validate_on_set,
+                os.path.join(snapshot_directory, "feeder_{}".format(i)),
+            )
+            for i, feeder_master_file in enumerate(feeder_master_files)
+        ]
+        pool = multiprocessing.Pool(self.processes)
+        try:
+            for feeder_master_file, snapshot in zip(
+                feeder_master_files, pool.imap(_parse_feeder, tasks)
+            ):
+                start = len(model.models)
+                SnapshotReader(input_file=snapshot).parse(model)
+                feeder_name = _circuit_name(feeder_master_file)
+                if feeder_name is None:
+                    feeder_name = os.path.splitext(
+                        os.path.basename(feeder_master_file)
+                    )[0]
+                objects = model.models[start:]
+                if self.prefix_feeder_names:
+                    self.prefix_names(objects, feeder_name)
+                self.set_feeder_names(objects, feeder_name)
+                self.check_feeder_names(objects, feeder_name, name_feeders)
+                logger.info(
+                    "Feeder {name} parsed from {filename}".format(
+                        name=feeder_name, filename=feeder_master_file
+                    )
+                )
+        finally:
+            pool.close()
+            pool.join()
+            shutil.rmtree(snapshot_directory, ignore_errors=True)
+
+        return 1
+
+    def prefix_names(self, objects, feeder_name):
+        """Prefix the names of the objects of a feeder, and the references to them, with
+        the name of the feeder.
+
+        The references are the attributes of _NAME_REFERENCES whose value is the name of
+        one of the objects.
+        """
+        names = {obj.name for obj in objects if getattr(obj, "name", None)}
+        prefix = feeder_name + "_"
+        for obj in objects:
+            for attr in _NAME_REFERENCES:
+                value = getattr(obj, attr, None)
+                if isinstance(value, string_types) and value in names:
+                    setattr(obj, attr, prefix + value)
+
+    def check_feeder_names(self, objects, feeder_name, name_feeders):
+        """Raise a ValueError if objects of the feeder are named like objects of another one.
+
+        :param name_feeders: Feeder of the objects named so far, updated with the objects
+        :type name_feeders: dict
+        """
+        shared = {}
+        for obj in objects:
+            name = getattr(obj, "name", None)
+            if not name:
+                continue
+            if name in name_feeders and name_feeders[name] != feeder_name:
+                shared[name] = name_feeders[name]
+            else:
+                name_feeders[name] = feeder_name
+        if shared:
+            names = ", ".join(
+                name if other is None else "{} ({})".format(name, other)
+                for name, other in sorted(shared.items())
+            )
+            raise ValueError(
+                "Objects of feeder {feeder} have the same names as objects of other "
+                "feeders: {names}. Set prefix_feeder_names to prefix the names of the "
+                "objects with the name of their feeder.".format(
+                    feeder=feeder_name, names=names
+                )
+            )
+
+    def set_feeder_names(self, objects, feeder_name):
+        """Set the feeder_name and substation_name of the objects of a feeder.
+
+        The substation_name is only set when it is empty, to the bus of the power
+        source of the feeder. The feeder metadata of the feeder is renamed after it.
+        """
+        substation_name = None
+        for obj in objects:
+            if isinstance(obj, PowerSource) and obj.is_sourcebus:
+                substation_name = obj.connecting_element
+                break
+
+        for obj in objects:
+            if isinstance(obj, Feeder_metadata):
+                obj.name = feeder_name
+                continue
+            if obj.has_trait("feeder_name"):
+                obj.feeder_name = feeder_name
+            if (
+                substation_name is not None
+                and obj.has_trait("substation_name")
+                and not obj.substation_name
+            ):
+                obj.substation_name = substation_name
+
+    def get_bus_kv_bases(self):
+        """Return the kV base of all the buses of the circuit.
+
+        The buses are activated by index, in the order of AllBusNames, which avoids
+        looking them up by name in OpenDSS.
+
+        :returns: The kV bases by bus name (lower case)
+        :rtype: dict
+        """
+        kv_bases = {}
+        for i, bus_name in enumerate(dss.Circuit.AllBusNames()):
+            dss.Circuit.SetActiveBusi(i)
+            kv_bases[bus_name.lower()] = dss.Bus.kVBase()
+        return kv_bases
+
     def set_nominal_voltages(self, model):
         """Loop over the buses and set the kv base.
         Then loop over the objects and set the kv base using the connecting element.
         .. warning: This has to be called last in parse.
         """
         model.set_names()
-        AllBusNames = dss.Circuit.AllBusNames()
-        for bus_name in AllBusNames:
-            # Set the active bus
-            dss.Circuit.SetActiveBus(bus_name)
+        for bus_name, kv_base in self.get_bus_kv_bases().items():
             # Set the nominal voltage of the corresponding node in the DiTTo Model
             try:
-                model[bus_name.lower()].nominal_voltage = (
-                    dss.Bus.kVBase() * math.sqrt(3) * 10 ** 3
+                model[bus_name].nominal_voltage = (
+                    kv_base * math.sqrt(3) * 10 ** 3
                 )  # DiTTo in volts
             except:
                 print("Could not set nominal voltage for bus {b}".format(b=bus_name))
                 pass
 
+        # The attributes of the objects only depend on their class
+        class_attributes = {}
         for obj in model.models:
-            if hasattr(obj, "nominal_voltage") and obj.nominal_voltage is None:
+            cls = type(obj)
+            if cls not in class_attributes:
+                class_attributes[cls] = (
+                    hasattr(cls, "nominal_voltage"),
+                    hasattr(cls, "connecting_element"),
+                    hasattr(cls, "from_element"),
+                    issubclass(cls, (PowerTransformer, Regulator)),
+                )
+            (
+                has_nominal_voltage,
+                has_connecting_element,
+                has_from_element,
+                has_windings,
+            ) = class_attributes[cls]
+
+            if has_nominal_voltage and obj.nominal_voltage is None:
                 # If the object has a connecting_element attribute
-                if hasattr(obj, "connecting_element"):
+                if has_connecting_element:
                     try:
                         obj.nominal_voltage = model[
                             obj.connecting_element
                         ].nominal_voltage
                     except:
                         pass
-                elif hasattr(obj, "from_element"):
+                elif has_from_element:
                     try:
                         obj.nominal_voltage = model[obj.from_element].nominal_voltage
                     except:
                         pass
-            elif isinstance(obj, PowerTransformer) or isinstance(obj, Regulator):
+            elif has_windings:
                 # Get the from_element
                 _from = obj.from_element
                 # Get the to_element
@@ -341,7 +601,7 @@ class Reader(AbstractReader):
         :returns: 1 for success, -1 for failure
         :rtype: int
         """
-        sources = _dss_class_to_dict("Vsource")
+        sources = self.dss_class_to_dict("Vsource")
 
         for source_name, source_data in sources.items():
 
@@ -580,7 +840,7 @@ class Reader(AbstractReader):
                     buses[name]["positions"] = [X, Y]
 
         # Extract the line data
-        lines = _dss_class_to_dict("line")
+        lines = self.dss_class_to_dict("line")
 
         # Loop over the lines to get the phases
         for name, data in lines.items():
@@ -658,7 +918,7 @@ class Reader(AbstractReader):
                 buses[b2_name]["phases"] = np.unique(buses[b2_name]["phases"]).tolist()
 
         # Extract the transformer data
-        transformers = _dss_class_to_dict("transformer")
+        transformers = self.dss_class_to_dict("transformer")
         # Loop over the transformers to get the phases
         for name, data in transformers.items():
 
@@ -695,7 +955,7 @@ class Reader(AbstractReader):
                     ).tolist()
 
         # Extract the load data
-        loads = _dss_class_to_dict("load")
+        loads = self.dss_class_to_dict("load")
         # Loop over the loads to get the phases
         for name, data in loads.items():
             # Parse bus1 data
@@ -774,19 +1034,19 @@ class Reader(AbstractReader):
         # Here, we get all the line names which have a fuse
         # Even if a fuse is disabled we identify it as a fuse.
         # If the line is disabled we ignore it unless it's a switch
-        fuses = _dss_class_to_dict("Fuse")
+        fuses = self.dss_class_to_dict("Fuse")
         fuses_names = [
             d["MonitoredObj"].lower().split(".")[1] for name, d in fuses.items()
         ]
 
         # In the same way, reclosers are also attached to line objects
-        reclosers = _dss_class_to_dict("recloser")
+        reclosers = self.dss_class_to_dict("recloser")
         reclosers_names = [
             d["MonitoredObj"].lower().split(".")[1] for name, d in reclosers.items()
         ]
 
         start = time.time()
-        lines = _dss_class_to_dict("Line")
+        lines = self.dss_class_to_dict("Line")
 
         middle = time.time()
         logger.debug("Line class to dataframe= {}".format(middle - start))
@@ -827,7 +1087,7 @@ class Reader(AbstractReader):
 
             # If we have a valid linecode, try to get the data
             if linecode is not None:
-                linecodes = _dss_class_to_dict("linecode")
+                linecodes = self.dss_class_to_dict("linecode")
                 if "linecode." + linecode.lower() in linecodes:
                     linecode_data = linecodes["linecode." + linecode.lower()]
                 else:
@@ -1078,7 +1338,7 @@ class Reader(AbstractReader):
             # If we have a geometry code, try to get the corresponding data
             if line_geometry_code is not None:
                 try:
-                    line_geometries = _dss_class_to_dict("linegeometry")
+                    line_geometries = self.dss_class_to_dict("linegeometry")
                     this_line_geometry = line_geometries[
                         "linegeometry.{}".format(line_geometry_code)
                     ]
@@ -1272,8 +1532,8 @@ class Reader(AbstractReader):
                     is_cable = False
                     if this_line_wireData_code is not None:
                         try:
-                            all_wire_data = _dss_class_to_dict("wiredata")
-                            CNData = _dss_class_to_dict("CNData")
+                            all_wire_data = self.dss_class_to_dict("wiredata")
+                            CNData = self.dss_class_to_dict("CNData")
                             for cnname, cnvalues in CNData.items():
                                 if this_line_wireData_code == cnname.split(".")[1]:
                                     is_cable = True
@@ -1457,7 +1717,7 @@ class Reader(AbstractReader):
 
                     # Concentric Neutral
                     if is_cable == True:
-                        cndata = _dss_class_to_dict("CNData")
+                        cndata = self.dss_class_to_dict("CNData")
                         if cndata is not None:
                             for name, data in cndata.items():
                                 try:
@@ -1542,7 +1802,7 @@ class Reader(AbstractReader):
         :rtype: int
         """
 
-        transformers = _dss_class_to_dict("transformer")
+        transformers = self.dss_class_to_dict("transformer")
         self._transformers = []
 
         for name, data in transformers.items():
@@ -1789,7 +2049,7 @@ class Reader(AbstractReader):
                     except:
                         pass
 
-                    regulators = _dss_class_to_dict("RegControl")
+                    regulators = self.dss_class_to_dict("RegControl")
                     for reg_name, reg_data in regulators.items():
 
                         if (
@@ -1843,8 +2103,8 @@ class Reader(AbstractReader):
         :returns: 1 for success, -1 for failure
         :rtype: int
         """
-        regulators = _dss_class_to_dict("RegControl")
-        transformers = _dss_class_to_dict("Transformer")
+        regulators = self.dss_class_to_dict("RegControl")
+        transformers = self.dss_class_to_dict("Transformer")
         self._regulators = []
 
         for name, data in regulators.items():
@@ -2167,8 +2427,8 @@ class Reader(AbstractReader):
         :returns: 1 for success, -1 for failure
         :rtype: int
         """
-        capacitors = _dss_class_to_dict("capacitor")
-        cap_control = _dss_class_to_dict("CapControl")
+        capacitors = self.dss_class_to_dict("capacitor")
+        cap_control = self.dss_class_to_dict("CapControl")
         self._capacitors = []
 
         for name, data in capacitors.items():
@@ -2376,7 +2636,7 @@ class Reader(AbstractReader):
         :returns: 1 for success, -1 for failure
         :rtype: int
         """
-        loads = _dss_class_to_dict("Load")
+        loads = self.dss_class_to_dict("Load")
         self._loads = []
 
         for name, data in loads.items():
@@ -2605,7 +2865,7 @@ class Reader(AbstractReader):
 
     def parse_storage(self, model):
         """Parse the storages."""
-        storages = _dss_class_to_dict("storage")
+        storages = self.dss_class_to_dict("storage")
 
         for name, data in storages.items():
 
@@ -2763,3 +3023,111 @@ class Reader(AbstractReader):
 
 def _dss_class_to_dict(class_name):
     return dss.utils.class_to_dataframe(class_name).to_dict(orient="index")
+
+
+def _dss_commands(dss_file):
+    """Yield the commands of a DSS file as lists of words, without the comments."""
+    with open(dss_file, "r") as f:
+        in_comment = False
+        for line in f:
+            line = line.strip()
+            if in_comment:
+                if "*/" not in line:
+                    continue
+                in_comment = False
+                line = line.split("*/", 1)[1]
+            elif line.startswith("/*"):
+                in_comment = "*/" not in line
+                line = line.split("*/", 1)[1] if not in_comment else ""
+            words = line.split("!")[0].split("//")[0].split()
+            if words:
+                yield words
+
+
+def _new_circuit_name(words):
+    """Return the name of the circuit created by a command, or None."""
+    if (
+        len(words) > 1
+        and words[0].lower() == "new"
+        and words[1].lower().startswith("circuit.")
+    ):
+        return words[1].split(".", 1)[1]
+    return None
+
+
+def _circuit_name(dss_file, visited=None):
+    """Return the name of the circuit created by a DSS file (or the files it redirects to), or None."""
+    if visited is None:
+        visited = set()
+    visited.add(os.path.abspath(dss_file))
+    directory = os.path.dirname(dss_file)
+    for words in _dss_commands(dss_file):
+        name = _new_circuit_name(words)
+        if name is not None:
+            return name
+        if words[0].lower() in ["redirect", "compile"] and len(words) > 1:
+            path = os.path.join(directory, words[1].strip("\"'"))
+            if os.path.isfile(path) and os.path.abspath(path) not in visited:
+                name = _circuit_name(path, visited)
+                if name is not None:
+                    return name
+    return None
+
+
+def _buscoordinates_file(dss_file):
+    """Return the bus coordinates file of a feeder master file.
+
+    This is the file given to its BusCoords command, or buscoord.dss next to it.
+    """
+    directory = os.path.dirname(dss_file)
+    for words in _dss_commands(dss_file):
+        if words[0].lower() == "buscoords" and len(words) > 1:
+            return os.path.join(directory, words[1].strip("\"'"))
+    return os.path.join(directory, "buscoord.dss")
+
+
+# Attributes of the models holding the name of an object, prefixed with the names
+# (see Reader.prefix_names)
+_NAME_REFERENCES = (
+    "name",
+    "from_element",
+    "to_element",
+    "connecting_element",
+    "connected_transformer",
+    "upstream_transformer_name",
+    "transformer",
+    "measuring_element",
+    "substation_name",
+    "substation",
+    "headnode",
+)
+
+
+def _parse_feeder(task):
+    """Parse a feeder master file in a worker process (see Reader.parse_feeders_in_parallel).
+
+    :returns: The path of the snapshot of the Store of the feeder
+    :rtype: str
+    """
+    (
+        reader_class,
+        master_file,
+        reader_kwargs,
+        parse_kwargs,
+        lightweight,
+        validate_on_set,
+        path,
+    ) = task
+    model = Store(lightweight=lightweight, validate_on_set=validate_on_set)
+    reader = reader_class(
+        master_file=master_file,
+        buscoordinates_file=_buscoordinates_file(master_file),
+        **reader_kwargs
+    )
+    # Start from an empty OpenDSS engine
+    reader.function("clear")
+    reader.parse(model, **parse_kwargs)
+    SnapshotWriter(
+        output_path=os.path.dirname(path), filename=os.path.basename(path)
+    ).write(model)
+    return path
@@ -0,0 +1 @@
+from .read import Reader as SnapshotReader
@@ -0,0 +1,122 @@
+# coding: utf8
+
+from __future__ import absolute_import, division, print_function
+from builtins import super, range, zip, round, map
+
+import os
+import logging
+import importlib
+
+import numpy as np
+
+from ditto.readers.abstract_reader import AbstractReader
+from ditto.models.base import DiTToHasTraits, LightweightModel
+from ditto.formats.snapshot import MISSING, StringTable, decode_column, read_header
+
+logger = logging.getLogger(__name__)
+
+
+class Reader(AbstractReader):
+    """Snapshot-->DiTTo Reader class
+
+    The reader loads a snapshot written by the snapshot writer (see ditto.formats.snapshot)
+    back into a Store, without going through the source model again.
+
+    >>> Reader(input_file="./Model.snapshot").parse(model)
+
+    The values are set on the models without validating them again, since they were
+    valid when the snapshot was written. Stores created with lightweight=True are the
+    fastest to load.
+
+    Only the DiTTo models of the ditto.models package are imported from the header of
+    the snapshot, and no value is unpickled.
+    """
+
+    register_names = ["snapshot", "Snapshot"]
+
+    def __init__(self, **kwargs):
+        """Class CONSTRUCTOR"""
+        super().__init__(**kwargs)
+
+        if "input_file" in kwargs:
+            self.input_file = kwargs["input_file"]
+        else:
+            raise ValueError("No input file provided to the reader.")
+
+    def load_array(self, name):
+        """Load an array of the snapshot."""
+        return np.load(os.path.join(self.input_file, name + ".npy"))
+
+    def model_class(self, module_name, name):
+        """Return the DiTTo model class of the header of the snapshot."""
+        if not module_name.startswith("ditto.models."):
+            raise ValueError(
+                "Unable to load the class {}.{}: not a DiTTo model".format(
+                    module_name, name
+                )
+            )
+        cls = getattr(importlib.import_module(module_name), name, None)
+        if not (isinstance(cls, type) and issubclass(cls, DiTToHasTraits)):
+            raise ValueError(
+                "Unable to load the class {}.{}: not a DiTTo model".format(
+                    module_name, name
+                )
+            )
+        return cls
+
+    def parse(self, model):
+        """Load the snapshot in the DiTTo model."""
+        self.model = model
+        header = read_header(self.input_file)
+        strings = StringTable.load(self.input_file).strings
+
+        classes = [
+            self.model_class(table["module"], table["name"])
+            for table in header["classes"]
+        ]
+
+        # Create the objects first, in the insertion order of the snapshot,
+        # since the values can refer to any of them
+        class_ids = self.load_array("objects")
+        objects = [classes[c](model) for c in class_ids.tolist()]
+        default_names = [getattr(obj, "name", None) for obj in objects]
+
+        # Keep the network of the Store up to date if it is tracked
+        notify = model.model_store.network is not None
+
+        for c, table in enumerate(header["classes"]):
+            rows = [objects[i] for i in np.flatnonzero(class_ids == c).tolist()]
+            if len(rows) != table["size"]:
+                raise ValueError(
+                    "Corrupted snapshot: {} objects of class {} instead of {}".format(
+                        len(rows), table["name"], table["size"]
+                    )
+                )
+            for name, spec in table["columns"].items():
+                values = decode_column(
+                    spec,
+                    lambda part: self.load_array("{}.{}.{}".format(c, name, part)),
+                    len(rows),
+                    objects,
+                    strings,
+                )
+                for obj, value in zip(rows, values):
+                    if value is MISSING:
+                        continue
+                    if notify:
+                        setattr(obj, name, value)
+                    elif isinstance(obj, LightweightModel):
+                        object.__setattr__(obj, name, value)
+                    else:
+                        obj._trait_values[name] = value
+
+        if not notify:
+            # The values were set without notifying the Store: update the name index
+            for obj, default_name in zip(objects, default_names):
+                name = getattr(obj, "name", None)
+                if name is not default_name:
+                    model.model_store.update(obj, "name", default_name, name)
+
+        logger.debug(
+            "Read a snapshot of {} models from {}".format(len(objects), self.input_file)
+        )
@@ -1,55 +1,276 @@
 # Remove this import since it works only for Windows...
 # import win32com.client
 import pandas as pd
+import numpy as np
 import os
+import shutil
+import hashlib
+import tempfile
+from multiprocessing import cpu_count
+from multiprocessing.pool import ThreadPool
 
+from ditto.formats.snapshot import (
+    VERSION,
+    StringTable,
+    encode_column,
+    decode_column,
+    write_header,
+    read_header,
+)
 from . import pandas_access as mdb
 
 
+def write_cache(df, path):
+    """
+    Write a table in the cache directory path, with the columnar encoding of the
+    snapshots (see ditto.formats.snapshot): nothing is pickled.
+    Return False if the values of the table cannot be encoded.
+    """
+    if not df.index.equals(pd.RangeIndex(len(df))):
+        return False
+    strings = StringTable()
+    columns = []
+    arrays = {}
+    try:
+        for c, (name, series) in enumerate(df.items()):
+            spec, column_arrays = encode_column(series.tolist(), {}, strings)
+            columns.append({"name": name, "dtype": str(series.dtype), "spec": spec})
+            for part, array in column_arrays.items():
+                arrays["{}.{}".format(c, part)] = array
+    except ValueError:
+        return False
+
+    # Write the table in a temporary directory first, so that a table is either
+    # fully in the cache or not at all
+    parent = os.path.dirname(path)
+    try:
+        os.makedirs(parent)
+    except OSError:
+        if not os.path.isdir(parent):
+            raise
+    tmp = tempfile.mkdtemp(dir=parent)
+    try:
+        strings.save(tmp)
+        for name, array in arrays.items():
+            np.save(os.path.join(tmp, name + ".npy"), array)
+        write_header(tmp, {"version": VERSION, "size": len(df), "columns": columns})
+        os.rename(tmp, path)
+    except OSError:
+        shutil.rmtree(tmp, ignore_errors=True)
+        if not os.path.isdir(path):
+            raise
+    return True
+
+
+def read_cache(path):
+    """
+    Read a table written by write_cache in the cache directory path.
+    """
+    header = read_header(path)
+    strings = StringTable.load(path).strings
+    data = {}
+    for c, column in enumerate(header["columns"]):
+        values = decode_column(
+            column["spec"],
+            lambda part: np.load(os.path.join(path, "{}.{}.npy".format(c, part))),
+            header["size"],
+            [],
+            strings,
+        )
+        data[column["name"]] = pd.Series(values, dtype=column["dtype"])
+    return pd.DataFrame(data, columns=[column["name"] for column in header["columns"]])
+
+
+class SynergiTables(object):
+    """
+    Dictionary of the MDB tables used by Synergi, loaded on first access.
+    """
+
+    def __init__(self, parser):
+        """
+        Class constructor.
+        """
+        self.parser = parser
+        self.tables = {}
+
+    def __contains__(self, table):
+        return table in self.tables or self.parser.find_database(table) is not None
+
+    def __getitem__(self, table):
+        if table not in self.tables:
+            if self.parser.find_database(table) is None:
+                raise KeyError(table)
+            self.tables[table] = self.parser.LoadTable(table)
+        return self.tables[table]
+
+    def __setitem__(self, table, df):
+        self.tables[table] = df
+
+    def __iter__(self):
+        return iter(self.keys())
+
+    def keys(self):
+        keys = []
+        for table_list in self.parser.table_lists.values():
+            keys.extend(table for table in table_list if table not in keys)
+        return keys
+
+
 class DbParser:
     """
     Class implementing the reading of the MDB tables used by Synergi.
+
+    The tables are exported from the MDB files when they are first accessed in
+    SynergiDictionary. The tables which are known to be needed can be given with
+    the tables argument (a dictionary of column lists by table name, or None to read
+    all the columns of a table). They are then exported in parallel, and only the
+    given columns are read.
+
+    If a cache directory is given, the tables are cached on disk, keyed by the hash
+    of the MDB file, and read from there when the same database is read again.
+    The tables are cached as NumPy arrays (see write_cache), and never unpickled.
     """
 
     def __init__(self, input_file, **kwargs):
         """
         Class constructor.
         """
-        self.SynergiDictionary = {}
+        self.SynergiDictionary = SynergiTables(self)
         self.paths = {}
         self.paths["Synergi File"] = input_file
 
         if "warehouse" in kwargs:
             self.paths["warehouse"] = kwargs["warehouse"]
 
+        if "tables" in kwargs:
+            self.tables = kwargs["tables"]
+        else:
+            self.tables = {}
+
+        if "cache_dir" in kwargs:
+            self.cache_dir = kwargs["cache_dir"]
+        else:
+            self.cache_dir = None
+
+        if "processes" in kwargs:
+            self.processes = kwargs["processes"]
+        else:
+            self.processes = cpu_count()
+
+        self.table_lists = {}
+        self.schemas = {}
+        self.hashes = {}
+
         self.ParseSynergiDatabase()
 
     def ParseSynergiDatabase(self):
         """
-        Use Pandas Access to convert the MDB tables to Pandas DataFrames.
+        List the tables of the MDB files, and use Pandas Access to convert the
+        required tables to Pandas DataFrames.
         """
         print("Opening synergie database - ", self.paths["Synergi File"])
-        table_list = mdb.list_tables(self.paths["Synergi File"])
+        self.table_lists["Synergi File"] = mdb.list_tables(self.paths["Synergi File"])
 
-        table_list_warehouse = []
         if "warehouse" in self.paths:
             print("Opening warehouse database - ", self.paths["warehouse"])
-            table_list_warehouse = mdb.list_tables(self.paths["warehouse"])
+            self.table_lists["warehouse"] = mdb.list_tables(self.paths["warehouse"])
 
-        for table in table_list:
-            self.SynergiDictionary[table] = self.ToLowerCase(
-                mdb.read_table(self.paths["Synergi File"], table)
-            )
+        tables = [
+            table
+            for table in self.tables
+            if table not in self.SynergiDictionary.tables
+            and self.find_database(table) is not None
+        ]
+        # Hash and read the schemas of the databases before exporting their tables
+        # in parallel
+        for database in set(self.find_database(table) for table in tables):
+            if self.cache_dir is not None:
+                self.FileHash(database)
+            self.Schema(database)
+        if len(tables) > 1 and self.processes > 1:
+            pool = ThreadPool(min(self.processes, len(tables)))
+            try:
+                dataframes = pool.map(self.LoadTable, tables)
+            finally:
+                pool.close()
+        else:
+            dataframes = [self.LoadTable(table) for table in tables]
+        for table, df in zip(tables, dataframes):
+            self.SynergiDictionary[table] = df
+        return
+
+    def find_database(self, table):
+        """
+        Return the database holding the given table.
+        The tables of the warehouse take precedence over the ones of the Synergi file.
+        """
+        for database in ("warehouse", "Synergi File"):
+            if table in self.table_lists.get(database, []):
+                return database
+        return None
+
+    def LoadTable(self, table):
+        """
+        Read a table from the cache, or export it from its MDB file.
+        """
+        database = self.find_database(table)
+        columns = self.tables.get(table)
 
-        for table in table_list_warehouse:
-            self.SynergiDictionary[table] = self.ToLowerCase(
-                mdb.read_table(self.paths["warehouse"], table)
+        cache_file = None
+        if self.cache_dir is not None:
+            if columns is not None:
+                columns = sorted(columns)
+            key = hashlib.sha1(repr((table, columns)).encode("utf-8")).hexdigest()
+            cache_file = os.path.join(self.cache_dir, self.FileHash(database), key)
+            if os.path.isdir(cache_file):
+                try:
+                    return read_cache(cache_file)
+                except (ValueError, KeyError, OSError):
+                    # Cache of another version of DiTTo, or corrupted
+                    shutil.rmtree(cache_file, ignore_errors=True)
+
+        path = self.paths[database]
+        kwargs = {"converters_from_schema": False}
+        if self.Schema(database).get(table):
+            kwargs["dtype"] = self.Schema(database)[table]
+        if columns is not None:
+            kwargs["usecols"] = lambda column: column in columns
+
+        df = self.ToLowerCase(mdb.read_table(path, table, **kwargs))
+
+        if cache_file is not None:
+            write_cache(df, cache_file)
+        return df
+
+    def Schema(self, database):
+        """
+        Return the Pandas schema of the tables of the given database.
+        """
+        if database not in self.schemas:
+            self.schemas[database] = mdb.to_pandas_schema(
+                mdb.read_schema(self.paths[database])
             )
-        return
+        return self.schemas[database]
+
+    def FileHash(self, database):
+        """
+        Return the SHA1 hash of the content of the given database.
+        """
+        if database not in self.hashes:
+            hasher = hashlib.sha1()
+            with open(self.paths[database], "rb") as f:
+                for chunk in iter(lambda: f.read(1 << 20), b""):
+                    hasher.update(chunk)
+            self.hashes[database] = hasher.hexdigest()
+        return self.hashes[database]
 
     def ToLowerCase(self, df):
         """
         This function converts all the input data to lower case.
         """
-        df = df.apply(lambda x: x.str.lower() if x.dtype == "object" else x)
+        df = df.apply(
+            lambda x: x.str.lower()
+            if x.dtype == "object" or pd.api.types.is_string_dtype(x.dtype)
+            else x
+        )
         return df
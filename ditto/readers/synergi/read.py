@@ -40,6 +40,251 @@ from ditto.readers.synergi.length_units import convert_length_unit, SynergiValue
 logger = logging.getLogger(__name__)
 
 
+# Tables and columns of the Synergi databases read by the reader
+SYNERGI_TABLES = {
+    "InstFeeders": [
+        "FeederId",
+        "SubstationId",
+        "NominalKvll",
+        "ConnectionType",
+        "BusVoltageLevel",
+        "PosSequenceResistance",
+        "PosSequenceReactance",
+        "ZeroSequenceResistance",
+        "ZeroSequenceReactance",
+        "ByPhVoltDegPh1",
+    ],
+    "Node": ["NodeId", "X", "Y"],
+    "SAI_Equ_Control": ["LengthUnits"],
+    "InstSection": [
+        "SectionId",
+        "SectionLength_MUL",
+        "AveHeightAboveGround_MUL",
+        "Note_",
+        "PhaseConductorId",
+        "PhaseConductor2Id",
+        "PhaseConductor3Id",
+        "NeutralConductorId",
+        "ConfigurationId",
+        "SectionPhases",
+        "FeederId",
+        "FromNodeId",
+        "ToNodeId",
+        "IsFromEndOpen",
+        "IsToEndOpen",
+        "AmpRating",
+        "Description",
+    ],
+    "InstPrimaryTransformers": [
+        "UniqueDeviceId",
+        "SectionId",
+        "TransformerType",
+        "ConnectedPhases",
+        "HighSideNearFromNode",
+        "HighSideConnectionCode",
+        "LowSideConnectionCode",
+        "TertConnectCode",
+    ],
+    "InstDTrans": [
+        "DTranId",
+        "SectionId",
+        "HighSideConnCode",
+        "LowSideConnCode",
+        "ConnPhases",
+    ],
+    "InstSubstationTransformers": [
+        "NominalKvll",
+        "TransformerType",
+        "BusVoltageLevel",
+        "ByPhVoltDegPh1",
+    ],
+    "DevTransformers": [
+        "TransformerName",
+        "HighSideRatedKv",
+        "LowSideRatedKv",
+        "TransformerRatedKva",
+        "EmergencyKvaRating",
+        "IsThreePhaseUnit",
+        "NoLoadLosses",
+        "PTRatio",
+        "EnableTertiary",
+        "TertiaryKva",
+        "TertiaryRatedKv",
+        "PercentImpedance",
+        "PercentResistance",
+        "HighVoltageConnectionCode",
+        "LowVoltageConnectionCode",
+        "TertiaryConnectionCode",
+    ],
+    "InstReclosers": [
+        "SectionId",
+        "UniqueDeviceId",
+        "AmpRating",
+        "RecloserIsOpen",
+        "InterruptRatingAmps",
+    ],
+    "InstSwitches": ["SectionId", "UniqueDeviceId", "SwitchType", "SwitchIsOpen"],
+    "DevSwitches": ["SwitchName", "ContinuousCurrentRating", "EmergencyCurrentRating"],
+    "InstFuses": [
+        "SectionId",
+        "UniqueDeviceId",
+        "AmpRating",
+        "CutoffAmps",
+        "ConnectedPhases",
+        "FuseIsOpen",
+    ],
+    "InstProtectiveDevices": ["SectionId", "UniqueDeviceId", "ConnectedPhases"],
+    "DevProtectiveDevices": [
+        "ProtectiveDeviceTypeName",
+        "ProtectiveDeviceType",
+        "ContinuousCurrentRating",
+        "EmergencyCurrentRating",
+        "InterruptCurrentRating",
+    ],
+    "DevConfig": [
+        "ConfigName",
+        "Position1_X_MUL",
+        "Position1_Y_MUL",
+        "Position2_X_MUL",
+        "Position2_Y_MUL",
+        "Position3_X_MUL",
+        "Position3_Y_MUL",
+        "Neutral_X_MUL",
+        "Neutral_Y_MUL",
+    ],
+    "DevConductors": [
+        "ActualImpedance",
+        "CableGMR_MUL",
+        "Diameter_SUL",
+        "CableResistance_PerLUL",
+        "ConductorName",
+        "PosSequenceResistance_PerLUL",
+        "PosSequenceReactance_PerLUL",
+        "ZeroSequenceResistance_PerLUL",
+        "ZeroSequenceReactance_PerLUL",
+        "PosSequenceAdmittance_PerLUL",
+        "ZeroSequenceAdmittance_PerLUL",
+        "ContinuousCurrentRating",
+        "InterruptCurrentRating",
+        "CableConNeutStrandDiameter_SUL",
+        "CableConNeutResistance_PerLUL",
+        "CableConNeutStrandCount",
+        "CableDiamOutside_SUL",
+        "CableDiamOverInsul_SUL",
+    ],
+    "Loads": [
+        "SectionId",
+        "Phase1Kw",
+        "Phase2Kw",
+        "Phase3Kw",
+        "Phase1Kvar",
+        "Phase2Kvar",
+        "Phase3Kvar",
+        "Phase1Kva",
+        "Phase2Kva",
+        "Phase3Kva",
+    ],
+    "InstCapacitors": [
+        "SectionId",
+        "UniqueDeviceId",
+        "RatedKv",
+        "ConnectionType",
+        "TimeDelaySec",
+        "PrimaryControlMode",
+        "Module1CapSwitchCloseValue",
+        "Module1CapSwitchTripValue",
+        "CapacitorPTRatio",
+        "CapacitorCTRating",
+        "FixedKvarPhase1",
+        "FixedKvarPhase2",
+        "FixedKvarPhase3",
+        "Module1KvarPerPhase",
+        "MeteringPhase",
+        "ConnectedPhases",
+    ],
+    "InstRegulators": [
+        "UniqueDeviceId",
+        "TimeDelaySec",
+        "TapLimiterHighSetting",
+        "TapLimiterLowSetting",
+        "ForwardBWDialPhase1",
+        "ForwardBWDialPhase2",
+        "ForwardBWDialPhase3",
+        "ForwardVoltageSettingPhase1",
+        "ForwardVoltageSettingPhase2",
+        "ForwardVoltageSettingPhase3",
+        "SectionId",
+        "ConnectedPhases",
+        "RegulatorType",
+        "NearFromNode",
+        "TapsNearFromNode",
+    ],
+    "DevRegulators": [
+        "RegulatorName",
+        "PTRatio",
+        "CTRating",
+        "RegulatorRatedVoltage",
+        "RegulatorRatedKva",
+        "NoLoadLosses",
+        "ConnectionCode",
+        "PercentZOnRegulatorBase",
+        "RegulatorXRRatio",
+    ],
+    "InstLargeCust": [
+        "UniqueDeviceId",
+        "SectionId",
+        "LoadPhase1Kw",
+        "LoadPhase2Kw",
+        "LoadPhase3Kw",
+        "LoadPhase1Kvar",
+        "LoadPhase2Kvar",
+        "LoadPhase3Kvar",
+        "GenType",
+        "GenPhase1Kw",
+        "GenPhase2Kw",
+        "GenPhase3Kw",
+        "GenPhase1Kvar",
+        "GenPhase2Kvar",
+        "GenPhase3Kvar",
+        "Category",
+    ],
+    "InstDGens": [
+        "SectionId",
+        "DGenType",
+        "DGenVoltSet",
+        "SpecPowerFactorPct",
+        "Phase1Kw",
+        "Phase1Kvar",
+        "Phase2Kw",
+        "Phase2Kvar",
+        "Phase3Kw",
+        "Phase3Kvar",
+    ],
+    "InstGenerators": [
+        "SectionId",
+        "UniqueDeviceId",
+        "ConnectedPhases",
+        "MeteringPhase",
+        "GeneratorType",
+        "VoltageSetting",
+        "PQPowerFactorPercentage",
+        "GenPhase1Kw",
+        "GenPhase1Kvar",
+        "GenPhase2Kw",
+        "GenPhase2Kvar",
+        "GenPhase3Kw",
+        "GenPhase3Kvar",
+    ],
+    "DevGenerators": [
+        "GeneratorName",
+        "GeneratorType",
+        "KvRating",
+        "KwRating",
+        "PercentPFRating",
+    ],
+}
+
+
 def create_mapping(keys, values, remove_spaces=False):
     """
     Helper function for parse.
@@ -57,6 +302,18 @@ def create_mapping(keys, values, remove_spaces=False):
         return {k: v for k, v in zip(keys, values)}
 
 
+def create_index(keys):
+    """
+    Helper function for parse.
+    Maps each key to the list of the rows holding it (empty if keys is None).
+    """
+    index = {}
+    if keys is not None:
+        for idx, key in enumerate(keys):
+            index.setdefault(key, []).append(idx)
+    return index
+
+
 class Reader(AbstractReader):
     """
     Synergi Reader class.
@@ -70,6 +327,10 @@ class Reader(AbstractReader):
         >>> r = Reader(input_file="path_to_your_mdb_file", warehouse="path_to_your_warehouse_mdb_file")
         >>> r.parse(m)
 
+    - With a cache of the tables, making the next reads of the same databases faster:
+        >>> r = Reader(input_file="path_to_your_mdb_file", cache_dir="path_to_the_cache")
+        >>> r.parse(m)
+
     **Authors:**
     - Xiangqi Zhu
     - Nicolas Gensollen
@@ -96,6 +357,12 @@ class Reader(AbstractReader):
         else:
             self.ware_house_input_file = "warehouse.mdb"
 
+        # Directory where the tables of the databases are cached
+        if "cache_dir" in kwargs:
+            self.cache_dir = kwargs["cache_dir"]
+        else:
+            self.cache_dir = None
+
         self.SynergiData = None
         self.node_nominal_voltage_mapping = dict()
         self.feeder_substation_mapping = dict()
@@ -129,10 +396,15 @@ class Reader(AbstractReader):
                 os.path.dirname(self.input_file), self.ware_house_input_file
             )
             self.SynergiData = DbParser(
-                self.input_file, warehouse=self.ware_house_input_file
+                self.input_file,
+                warehouse=self.ware_house_input_file,
+                tables=SYNERGI_TABLES,
+                cache_dir=self.cache_dir,
             )
         else:
-            self.SynergiData = DbParser(self.input_file)
+            self.SynergiData = DbParser(
+                self.input_file, tables=SYNERGI_TABLES, cache_dir=self.cache_dir
+            )
 
         ####################################################################################
         ####################################################################################
@@ -201,7 +473,9 @@ class Reader(AbstractReader):
         # add subtrans to feeder ID
         FeederId_subtrans = list(set(list(LineFeederId)) - set(FeederId))
 
-        FeederId = FeederId.append(pd.Series(FeederId_subtrans), ignore_index=True)
+        FeederId = pd.concat(
+            [FeederId, pd.Series(FeederId_subtrans)], ignore_index=True
+        )
 
         FromNodeId = self.get_data("InstSection", "FromNodeId")
         ToNodeId = self.get_data("InstSection", "ToNodeId")
@@ -225,6 +499,9 @@ class Reader(AbstractReader):
         for idx, section in enumerate(LineID):
             self.section_from_to_mapping[section] = (FromNodeId[idx], ToNodeId[idx])
 
+        # Index of the sections, to find the sections of the devices
+        section_index = {section: idx for idx, section in enumerate(LineID)}
+
         ###### Transformer ##################
         TransformerId = self.get_data("InstPrimaryTransformers", "UniqueDeviceId")
         TransformerSectionId = self.get_data("InstPrimaryTransformers", "SectionId")
@@ -263,23 +540,23 @@ class Reader(AbstractReader):
         #            TransformerSectionId = TransformerSectionId.append(pd.Series(LineID[idx]), ignore_index=True)
 
         # wenbo added for subtransmission
-        NominalKvll_src = NominalKvll_src.append(
-            SubstationTransformerV, ignore_index=True
+        NominalKvll_src = pd.concat(
+            [NominalKvll_src, SubstationTransformerV], ignore_index=True
         )
 
         # wenbo added: BusVoltage level
         SubstationTransformerVoltageLevel = self.get_data(
             "InstSubstationTransformers", "BusVoltageLevel"
         )
-        BusVoltageLevel = BusVoltageLevel.append(
-            SubstationTransformerVoltageLevel, ignore_index=True
+        BusVoltageLevel = pd.concat(
+            [BusVoltageLevel, SubstationTransformerVoltageLevel], ignore_index=True
         )
 
         SubtransByPhVoltDegPh1 = self.get_data(
             "InstSubstationTransformers", "ByPhVoltDegPh1"
         )
-        ByPhVoltDegPh1 = ByPhVoltDegPh1.append(
-            SubtransByPhVoltDegPh1, ignore_index=True
+        ByPhVoltDegPh1 = pd.concat(
+            [ByPhVoltDegPh1, SubtransByPhVoltDegPh1], ignore_index=True
         )
 
         ## Transformer Setting ##
@@ -394,6 +671,13 @@ class Reader(AbstractReader):
             "DevProtectiveDevices", "InterruptCurrentRating"
         )
 
+        # Rows of the switching and protection devices, by section
+        recloser_index = create_index(recloser_sectionID)
+        switch_index = create_index(switch_sectionID)
+        fuse_index = create_index(fuse_sectionID)
+        protective_device_index = create_index(protective_device_sectionID)
+        protective_device_type_index = create_index(ProtectiveDeviceTypeName)
+
         ## Configuration ########
         ConfigName = self.get_data("DevConfig", "ConfigName")
         Position1_X_MUL = self.get_data("DevConfig", "Position1_X_MUL")
@@ -605,46 +889,44 @@ class Reader(AbstractReader):
         PVGenPhase3Kvar = self.get_data("InstLargeCust", "GenPhase3Kvar")
         # wenbo added: for large cust there there are 3 types (C = cogenerator; D= DG-PV; L=load)
         LargeCustType = self.get_data("InstLargeCust", "Category")
-        for i, x in enumerate(LargeCustType):
-            if x.upper() == "L" or x.upper() == "C":
-                LoadName = LoadName.append(
-                    pd.Series(LargeCustDeviceId[i]), ignore_index=True
-                )
-                Phase1Kw = Phase1Kw.append(
-                    pd.Series(LargeCustLoadPhase1Kw[i]), ignore_index=True
-                )
-                Phase2Kw = Phase2Kw.append(
-                    pd.Series(LargeCustLoadPhase2Kw[i]), ignore_index=True
-                )
-                Phase3Kw = Phase3Kw.append(
-                    pd.Series(LargeCustLoadPhase3Kw[i]), ignore_index=True
-                )
-                Phase1Kvar = Phase1Kvar.append(
-                    pd.Series(LargeCustLoadPhase1Kvar[i]), ignore_index=True
-                )
-                Phase2Kvar = Phase2Kvar.append(
-                    pd.Series(LargeCustLoadPhase2Kvar[i]), ignore_index=True
-                )
-                Phase3Kvar = Phase3Kvar.append(
-                    pd.Series(LargeCustLoadPhase3Kvar[i]), ignore_index=True
-                )
-        #                Phase1Kva = Phase1Kva.append(pd.Series(LargeCustLoadPhase1Kva[i]),ignore_index=True)
-        #                Phase2Kva = Phase2Kva.append(pd.Series(LargeCustLoadPhase2Kva[i]),ignore_index=True)
-        #                Phase3Kva = Phase3Kva.append(pd.Series(LargeCustLoadPhase3Kva[i]),ignore_index=True)
+        # Positions of the large customers, by device ID
+        large_cust_index = {}
+        for idx, device_id in enumerate(LargeCustDeviceId):
+            large_cust_index.setdefault(device_id, []).append(idx)
+
+        # Add the large customer loads to the loads
+        is_load = LargeCustType.str.upper().isin(["L", "C"])
+        LoadName = pd.concat([LoadName, LargeCustDeviceId[is_load]], ignore_index=True)
+        Phase1Kw = pd.concat(
+            [Phase1Kw, LargeCustLoadPhase1Kw[is_load]], ignore_index=True
+        )
+        Phase2Kw = pd.concat(
+            [Phase2Kw, LargeCustLoadPhase2Kw[is_load]], ignore_index=True
+        )
+        Phase3Kw = pd.concat(
+            [Phase3Kw, LargeCustLoadPhase3Kw[is_load]], ignore_index=True
+        )
+        Phase1Kvar = pd.concat(
+            [Phase1Kvar, LargeCustLoadPhase1Kvar[is_load]], ignore_index=True
+        )
+        Phase2Kvar = pd.concat(
+            [Phase2Kvar, LargeCustLoadPhase2Kvar[is_load]], ignore_index=True
+        )
+        Phase3Kvar = pd.concat(
+            [Phase3Kvar, LargeCustLoadPhase3Kvar[is_load]], ignore_index=True
+        )
+
         # drop 0 load
-        indx = []
-        for i, x in enumerate(LoadName):
-            if Phase1Kw[i] == 0 and Phase2Kw[i] == 0 and Phase3Kw[i] == 0:
-                indx.append(i)
+        nonzero = (Phase1Kw != 0) | (Phase2Kw != 0) | (Phase3Kw != 0)
 
-        LoadName = pd.Series(list(LoadName.drop(index=indx)))
+        LoadName = LoadName[nonzero].reset_index(drop=True)
 
-        Phase1Kw = pd.Series(list(Phase1Kw.drop(index=indx)))
-        Phase2Kw = pd.Series(list(Phase2Kw.drop(index=indx)))
-        Phase3Kw = pd.Series(list(Phase3Kw.drop(index=indx)))
-        Phase1Kvar = pd.Series(list(Phase1Kvar.drop(index=indx)))
-        Phase2Kvar = pd.Series(list(Phase2Kvar.drop(index=indx)))
-        Phase3Kvar = pd.Series(list(Phase3Kvar.drop(index=indx)))
+        Phase1Kw = Phase1Kw[nonzero].reset_index(drop=True)
+        Phase2Kw = Phase2Kw[nonzero].reset_index(drop=True)
+        Phase3Kw = Phase3Kw[nonzero].reset_index(drop=True)
+        Phase1Kvar = Phase1Kvar[nonzero].reset_index(drop=True)
+        Phase2Kvar = Phase2Kvar[nonzero].reset_index(drop=True)
+        Phase3Kvar = Phase3Kvar[nonzero].reset_index(drop=True)
 
         ## Adding Distributed Gen PV ####
 
@@ -818,10 +1100,11 @@ class Reader(AbstractReader):
         ####################################################################################
         #
         print("--> Parsing Lines...")
+        device_sections = set(RegulatorSectionId) | set(TransformerSectionId)
         for i, obj in enumerate(LineID):
 
             ## Do not parse sections with regulators or Transformers to Lines
-            if obj in RegulatorSectionId.values or obj in TransformerSectionId.values:
+            if obj in device_sections:
                 continue
 
             # Create a DiTTo Line object
@@ -900,11 +1183,11 @@ class Reader(AbstractReader):
             eqt_open = None
 
             # Recloser
-            if recloser_sectionID is not None and obj in recloser_sectionID.values:
-                idd = np.argwhere(recloser_sectionID.values == obj).flatten()
+            if obj in recloser_index:
+                idd = recloser_index[obj]
 
                 # Set the is_recloser flag to True
-                api_line.is_recloser = 1
+                api_line.is_recloser = True
 
                 # Get the interrupting rating (to be used in the wires)
                 if len(idd) == 1:
@@ -913,11 +1196,11 @@ class Reader(AbstractReader):
                     eqt_open = RecloserIsOpen[idd[0]]
 
             # Switch
-            if switch_sectionID is not None and obj in switch_sectionID.values:
-                idd_db = np.argwhere(switch_sectionID.values == obj).flatten()
+            if obj in switch_index:
+                idd_db = switch_index[obj]
 
                 # Set the is_switch flag to True
-                api_line.is_switch = 1
+                api_line.is_switch = True
 
                 # Get the current ratings (to be used in the wires)
                 if len(idd_db) == 1:
@@ -929,8 +1212,8 @@ class Reader(AbstractReader):
                     eqt_open = SwitchIsOpen[idd_db[0]]
 
             # Fuse
-            if fuse_sectionID is not None and obj in fuse_sectionID.values:
-                idd = np.argwhere(fuse_sectionID.values == obj).flatten()
+            if obj in fuse_index:
+                idd = fuse_index[obj]
 
                 # Set the is_fuse flag to True
                 api_line.is_fuse = True
@@ -942,23 +1225,19 @@ class Reader(AbstractReader):
                     eqt_open = fuse_is_open[idd[0]]
 
             # Protection Devices
-            if (
-                protective_device_sectionID is not None
-                and obj in protective_device_sectionID.values
-            ):
-                idd = np.argwhere(protective_device_sectionID.values == obj).flatten()
+            if obj in protective_device_index:
+                idd = protective_device_index[obj]
 
                 # Get the type of protector
                 if len(idd) == 1:
 
                     if (
                         protective_device_deviceID[idd[0]]
-                        in ProtectiveDeviceTypeName.values
+                        in protective_device_type_index
                     ):
-                        eqt_id = np.argwhere(
-                            ProtectiveDeviceTypeName.values
-                            == protective_device_deviceID[idd[0]]
-                        ).flatten()
+                        eqt_id = protective_device_type_index[
+                            protective_device_deviceID[idd[0]]
+                        ]
 
                         if len(eqt_id) == 1:
 
@@ -1032,7 +1311,7 @@ class Reader(AbstractReader):
                 if api_line.is_recloser == 1:
 
                     # Set the flag to True if the line has been identified as a Recloser
-                    api_wire.is_recloser = 1
+                    api_wire.is_recloser = True
 
                     # Set the ampacity
                     api_wire.ampacity = float(
@@ -1049,13 +1328,13 @@ class Reader(AbstractReader):
                     )  # Value should already be in amps
 
                     # Set the is_open flag
-                    api_wire.is_open = int(eqt_open)
+                    api_wire.is_open = bool(eqt_open)
 
                 # Is_switch
                 if api_line.is_switch == 1:
 
                     # Set the flag to True if the line has been identified as a Switch
-                    api_wire.is_switch = 1
+                    api_wire.is_switch = True
 
                     # Set the ampacity
                     api_wire.ampacity = float(
@@ -1068,7 +1347,7 @@ class Reader(AbstractReader):
                     )  # Value should already be in amps
 
                     # Set the is_open flag
-                    api_wire.is_open = int(eqt_open)
+                    api_wire.is_open = bool(eqt_open)
 
                 # Is_fuse
                 if api_line.is_fuse is True:
@@ -1092,7 +1371,7 @@ class Reader(AbstractReader):
                     )  # Value should already be in amps
 
                     # Set the is_open flag
-                    api_wire.is_open = int(eqt_open)
+                    api_wire.is_open = bool(eqt_open)
 
                 # Is_sectionalizer
                 if api_line.is_sectionalizer is True:
@@ -1642,11 +1921,7 @@ class Reader(AbstractReader):
                 ]
 
             # Find out the from and to elements which are available in the sections
-            Count = None
-            for k, section in enumerate(LineID):
-                if TransformerSectionId[i] == section:
-                    Count = k
-                    break
+            Count = section_index.get(TransformerSectionId[i])
 
             # If no section found, print a warning
             if Count is None:
@@ -1850,24 +2125,17 @@ class Reader(AbstractReader):
                 api_load.feeder_name = self.section_feeder_mapping[obj]
 
             # Find the section for this load
-            Count = None
-            for k, section in enumerate(LineID):
-                if obj == section:
-                    Count = k
-                    break
+            Count = section_index.get(obj)
 
             # if no section is found, go to large customer check
             if Count is None:
                 # large customer load need to map the section ID
-                for idx1, obj1 in enumerate(LargeCustDeviceId):
-                    if obj == obj1:
-                        for k, section in enumerate(LineID):
-                            if LargeCustSectionId[idx1] == section:
-                                Count = k
-                                api_load.feeder_name = self.section_feeder_mapping[
-                                    LargeCustSectionId[idx1]
-                                ]
-                                break
+                for idx1 in large_cust_index.get(obj, []):
+                    if LargeCustSectionId[idx1] in section_index:
+                        Count = section_index[LargeCustSectionId[idx1]]
+                        api_load.feeder_name = self.section_feeder_mapping[
+                            LargeCustSectionId[idx1]
+                        ]
 
             # Wenbo added:
             if api_load.feeder_name in self.feeder_substation_mapping:
@@ -2123,11 +2391,7 @@ class Reader(AbstractReader):
             api_cap.pt_phase = MeteringPhase[i].upper()
 
             ## Find the connecting bus of the capacitor through the section
-            Count = None
-            for k, section in enumerate(LineID):
-                if CapacitorSectionId[i] == section:
-                    Count = k
-                    break
+            Count = section_index.get(CapacitorSectionId[i])
 
             # If no section found, print a warning
             if Count is None:
@@ -2353,11 +2617,7 @@ class Reader(AbstractReader):
                 api_regulator.windings.append(w)
 
             ## Set the from and to elements through the sections
-            Count = None
-
-            for idx, section in enumerate(LineID):
-                if RegulatorSectionId[i] == section:
-                    Count = idx
+            Count = section_index.get(RegulatorSectionId[i])
 
             # If no section found, print a warning
             if Count is None:
@@ -2422,11 +2682,7 @@ class Reader(AbstractReader):
                 api_PV.reactive_rating = reactive_rating_pv * 10 ** 3  # DiTTo in Watts
 
                 ## Set the from and to elements through the sections
-                Count = None
-                for k, section in enumerate(LineID):
-                    if PVSectionId[i] == section:
-                        Count = k
-                        break
+                Count = section_index.get(PVSectionId[i])
 
                 # If no section found, print a warning
                 if Count is None:
@@ -2457,10 +2713,7 @@ class Reader(AbstractReader):
                     api_PV.feeder_name = self.section_feeder_mapping[obj]
 
                 # Set the Connecting element
-                Count2 = None
-                for k2, section in enumerate(LineID):
-                    if GeneratorSectionID[idx] == section:
-                        Count2 = k2
+                Count2 = section_index.get(GeneratorSectionID[idx])
 
                 if Count2 is None:
                     print("WARNING: No section found for PV {}".format(obj))
@@ -2535,10 +2788,7 @@ class Reader(AbstractReader):
                 api_PV.reactive_rating = reactive_rating_pv * 10 ** 3  # DiTTo in Watts
 
                 # Set the Connecting element
-                Count2 = None
-                for k2, section in enumerate(LineID):
-                    if DSectionID[idx] == section:
-                        Count2 = k2
+                Count2 = section_index.get(DSectionID[idx])
 
                 if Count2 is None:
                     print("WARNING: No section found for PV {}".format(obj))
@@ -2614,11 +2864,7 @@ class Reader(AbstractReader):
                 api_PV.reactive_rating = reactive_rating_pv * 10 ** 3  # DiTTo in Watts
 
                 ## Set the from and to elements through the sections
-                Count = None
-                for k, section in enumerate(LineID):
-                    if PVSectionId[i] == section:
-                        Count = k
-                        break
+                Count = section_index.get(PVSectionId[i])
 
                 # If no section found, print a warning
                 if Count is None:
@@ -2723,10 +2969,7 @@ class Reader(AbstractReader):
                 api_PV.reactive_rating = reactive_rating_pv * 10 ** 3  # DiTTo in Watts
 
                 # set the connecting element:
-                Count1 = None
-                for k1, section in enumerate(LineID):
-                    if GeneratorSectionID[idx] == section:
-                        Count1 = k1
+                Count1 = section_index.get(GeneratorSectionID[idx])
                 if Count1 is None:
                     print("WARNING: No section found for PV {}".format(obj))
                 if Count1 is not None:
@@ -2822,10 +3065,7 @@ class Reader(AbstractReader):
                             ]
 
                         # Set the Connecting element
-                        Count2 = None
-                        for k2, section in enumerate(LineID):
-                            if GeneratorSectionID[idx] == section:
-                                Count2 = k2
+                        Count2 = section_index.get(GeneratorSectionID[idx])
 
                         if Count2 is None:
                             print("WARNING: No section found for PV {}".format(obj))
@@ -2903,10 +3143,7 @@ class Reader(AbstractReader):
                 api_PV.reactive_rating = reactive_rating_pv * 10 ** 3  # DiTTo in Watts
 
                 # Set the Connecting element
-                Count2 = None
-                for k2, section in enumerate(LineID):
-                    if DSectionID[idx] == section:
-                        Count2 = k2
+                Count2 = section_index.get(DSectionID[idx])
 
                 if Count2 is None:
                     print("WARNING: No section found for PV {}".format(obj))
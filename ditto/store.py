@@ -21,22 +21,238 @@ from __future__ import absolute_import, division, print_function
 from builtins import super, range, zip, round, map
 
 import uuid
+import heapq
 import logging
 import types
 from functools import partial
 from .network.network import Network
+from .network.topology import Topology
 
 from .core import DiTToBase, DiTToTypeError
 from .modify.modify import Modifier
 from .models.node import Node
+from .models.base import LightweightModel
 
 logger = logging.getLogger(__name__)
 
 
+def _indexed_name(model):
+    """Return the name of model without going through the traitlets machinery."""
+    if isinstance(model, LightweightModel):
+        return getattr(model, "name", None)
+    return getattr(model, "_trait_values", {}).get("name")
+
+
+class ModelStore(object):
+    """Container holding the DiTTo models of a Store.
+
+    The models are kept in insertion order, partitioned by class, with a name index.
+    Adding, removing and looking up a model by name are O(1), and iterating over the
+    models of a given type only visits the classes matching that type.
+
+    The name index is kept in sync automatically when the name of a model changes.
+    When several models share a name, the last one named wins (as with Store.set_names)
+    and the other ones are kept aside so that they are found again if the winner is removed.
+
+    When network is set (see Network.track), the models added, removed or changed
+    are also reported to it so that its graph is kept up to date.
+
+    When tables or topology are set (see Store.get_tables and Store.get_network), they
+    are dropped as soon as a model is added, removed or changed, so that they are built
+    again when next used.
+    """
+
+    def __init__(self):
+        self._models = {}  # id -> model, in insertion order
+        self._sequence = {}  # id -> insertion number
+        self._buckets = {}  # class -> {id: model}, in insertion order
+        self._counter = 0
+        self._snapshot = None
+        self.names = {}  # name -> model
+        self._shadowed_names = {}  # name -> models hidden by a duplicate name
+        self.network = None
+        self.tables = None
+        self.topology = None
+
+    def __len__(self):
+        return len(self._models)
+
+    def __iter__(self):
+        return iter(self.snapshot())
+
+    def __contains__(self, model):
+        return id(model) in self._models
+
+    def snapshot(self):
+        """Return all the models, in insertion order, as a tuple."""
+        if self._snapshot is None:
+            self._snapshot = tuple(self._models.values())
+        return self._snapshot
+
+    def append(self, model):
+        key = id(model)
+        if key in self._models:
+            return
+        self._models[key] = model
+        self._sequence[key] = self._counter
+        self._counter += 1
+        self._buckets.setdefault(type(model), {})[key] = model
+        self._snapshot = None
+        self.tables = None
+        self.topology = None
+
+        name = _indexed_name(model)
+        if name is not None:
+            self.index_name(model, name)
+        if self.network is not None:
+            self.network.add_model(model)
+
+    def remove(self, model):
+        key = id(model)
+        if key not in self._models:
+            raise ValueError("{} is not in the model store".format(model))
+        del self._models[key]
+        del self._sequence[key]
+        bucket = self._buckets[type(model)]
+        del bucket[key]
+        if not bucket:
+            del self._buckets[type(model)]
+        self._snapshot = None
+        self.tables = None
+        self.topology = None
+
+        name = _indexed_name(model)
+        if name is not None:
+            self.unindex_name(model, name)
+        if self.network is not None:
+            self.network.remove_model(model)
+
+    def remove_many(self, models):
+        """Remove several models at once.
+
+        The models are checked first: if one of them is not in the store, none is removed.
+        The containers are compacted once when many models are removed.
+        """
+        removed = {}
+        for model in models:
+            key = id(model)
+            if key not in self._models:
+                raise ValueError("{} is not in the model store".format(model))
+            removed[key] = model
+        if not removed:
+            return
+
+        if len(removed) > len(self._models) // 4:
+            # Rebuild the containers instead of deleting the models one by one
+            self._models = {k: m for k, m in self._models.items() if k not in removed}
+            self._sequence = {
+                k: n for k, n in self._sequence.items() if k not in removed
+            }
+            for cls in set(type(m) for m in removed.values()):
+                bucket = {
+                    k: m for k, m in self._buckets[cls].items() if k not in removed
+                }
+                if bucket:
+                    self._buckets[cls] = bucket
+                else:
+                    del self._buckets[cls]
+        else:
+            for key, model in removed.items():
+                del self._models[key]
+                del self._sequence[key]
+                bucket = self._buckets[type(model)]
+                del bucket[key]
+                if not bucket:
+                    del self._buckets[type(model)]
+        self._snapshot = None
+        self.tables = None
+        self.topology = None
+
+        for model in removed.values():
+            name = _indexed_name(model)
+            if name is not None:
+                self.unindex_name(model, name)
+            if self.network is not None:
+                self.network.remove_model(model)
+
+    def iter_models(self, type=None):
+        """Iterate over the models which are instances of type, in insertion order."""
+        if type is None or type is object:
+            for m in self.snapshot():
+                yield m
+            return
+
+        buckets = [b for k, b in self._buckets.items() if issubclass(k, type)]
+        if len(buckets) == 1:
+            for m in list(buckets[0].values()):
+                yield m
+        elif len(buckets) > 1:
+            sequence = self._sequence
+            merged = heapq.merge(
+                *[[(sequence[k], m) for k, m in b.items()] for b in buckets],
+                key=lambda x: x[0]
+            )
+            for _, m in list(merged):
+                yield m
+
+    def count(self, type):
+        """Return the number of models which are instances of type."""
+        return sum(len(b) for k, b in self._buckets.items() if issubclass(k, type))
+
+    def index_name(self, model, name):
+        """Register model under name. The last model named wins."""
+        current = self.names.get(name)
+        # Unnamed models (empty name) are not worth keeping aside
+        if current is not None and current is not model and name:
+            self._shadowed_names.setdefault(name, []).append(current)
+        self.names[name] = model
+
+    def unindex_name(self, model, name):
+        """Unregister model from name, falling back on a shadowed model if any."""
+        shadowed = self._shadowed_names.get(name, [])
+        if self.names.get(name) is model:
+            if shadowed:
+                self.names[name] = shadowed.pop()
+            else:
+                del self.names[name]
+        else:
+            for i, m in enumerate(shadowed):
+                if m is model:
+                    del shadowed[i]
+                    break
+        if not shadowed:
+            self._shadowed_names.pop(name, None)
+
+    def update(self, model, name, old, new):
+        """Report that the attribute name of model changed from old to new."""
+        if id(model) not in self._models:
+            return
+        self.tables = None
+        self.topology = None
+        if name == "name":
+            if old is not None:
+                self.unindex_name(model, old)
+            if new is not None:
+                self.index_name(model, new)
+        if self.network is not None:
+            self.network.update_model(model, name, old, new)
+
+    def find_all(self, name):
+        """Return all the models named name, in insertion order."""
+        models = list(self._shadowed_names.get(name, []))
+        if name in self.names:
+            models.append(self.names[name])
+        return sorted(models, key=lambda m: self._sequence[id(m)])
+
+    def reset_names(self):
+        self.names = {}
+        self._shadowed_names = {}
+
+
 class Store(object):
     """The Store class holds all functions supported in the transformation.
 
-    The Store stores all the instances of objects of different classes in a list
+    The Store stores all the instances of objects of different classes in a ModelStore
 
     Examples
     --------
@@ -46,15 +262,24 @@ class Store(object):
     >>> M
     <ditto.Store(elements=0, models=0)>
 
+    With lightweight=True, the models created in the Store are slotted objects
+    (see ditto.models.base.LightweightModel) with the same attributes but without
+    the traitlets machinery. This is useful for very large models.
+    With validate_on_set=False, their values are not validated when they are set,
+    and validate_models() can be used to check them on demand.
+
+    >>> M = ditto.Store(lightweight=True)
+
     """
 
     __store_factory = dict
 
-    def __init__(self):
+    def __init__(self, lightweight=False, validate_on_set=True):
 
+        self.lightweight = lightweight
+        self.validate_on_set = validate_on_set
         self._cim_store = self.__store_factory()
-        self._model_store = list()
-        self._model_names = {}
+        self._model_store = ModelStore()
         self._network = Network()
 
     def __repr__(self):
@@ -67,10 +292,10 @@ class Store(object):
         )
 
     def __getitem__(self, k):
-        return self._model_names[k]
+        return self._model_store.names[k]
 
     def __setitem__(self, k, v):
-        self._model_names[k] = v
+        self._model_store.index_name(v, k)
 
     def iter_elements(self, type=DiTToBase):
 
@@ -85,13 +310,7 @@ class Store(object):
                 yield e
 
     def iter_models(self, type=None):
-
-        if type == None:
-            type = object
-
-        for m in self.models:
-            if isinstance(m, type):
-                yield m
+        return self._model_store.iter_models(type)
 
     @property
     def elements(self):
@@ -99,11 +318,24 @@ class Store(object):
 
     @property
     def models(self):
-        return tuple(m for m in self.model_store)
+        return self._model_store.snapshot()
 
     def remove_element(self, element):
         self._model_store.remove(element)
 
+    def remove_elements(self, elements):
+        """Remove several elements at once. If one of them is not in the Store, none is removed."""
+        self._model_store.remove_many(elements)
+
+    def validate_models(self):
+        """Validate the values of the lightweight models against their traits.
+
+        Models are validated when their attributes are set, so this is only
+        useful with lightweight=True and validate_on_set=False.
+        """
+        for m in self.iter_models(LightweightModel):
+            m.validate()
+
     def add_element(self, element):
         if not isinstance(element, DiTToBase):
             raise DiTToTypeError(
@@ -114,17 +346,76 @@ class Store(object):
             self.cim_store[element.UUID] = element
 
     def set_names(self):
-        """ All objects with a name field included in a dictionary which maps the name to the object. Set in set_name() on the object itself if the object has a name. The dictionary is reset to empty first"""
-        self._model_names = {}
+        """All objects with a name field included in a dictionary which maps the name to the object. Set in set_name() on the object itself if the object has a name. The dictionary is reset to empty first
+
+        .. note:: The name index is kept in sync automatically when names change, so calling this is only needed to rebuild it from scratch.
+        """
+        self._model_store.reset_names()
         for m in self.models:
             m.set_name(self)
 
     def build_networkx(self, source=None):
+        """Build the Network of the Store from its models.
+
+        The Network is then kept up to date as models are added, removed or changed,
+        so it does not need to be built again after the model is modified.
+        """
         if source is not None:
             self._network.build(self, source)
         else:
             self._network.build(self)
         self._network.set_attributes(self)
+        self._network.track(self)
+
+    def get_network(self, source=None, backend="networkx"):
+        """Return the Network of the Store, with its digraph directed from source.
+
+        The Network is only built if it was not built and kept up to date yet.
+        With backend="csr", the array-backed Topology of the Store is returned instead.
+        It has the traversal methods of the Network but no networkx graphs, and is built
+        again when next used once a model is added, removed or changed.
+
+        :param source: Name of the source node (the current source of the Network if None)
+        :type source: str
+        :param backend: "networkx" for the Network, or "csr" for the Topology
+        :type backend: str
+        :returns: The Network or the Topology of the Store
+        :rtype: ditto.network.network.Network or ditto.network.topology.Topology
+        """
+        if backend == "csr":
+            topology = self._model_store.topology
+            if topology is None:
+                topology = Topology()
+                topology.build(
+                    self, source if source is not None else self._network.source
+                )
+                self._model_store.topology = topology
+            elif source is not None:
+                topology.source = source  # The trees are cached per source
+            return topology
+        if backend != "networkx":
+            raise ValueError("Unknown network backend {}".format(backend))
+        if not self._network.is_built or self._model_store.network is not self._network:
+            self.build_networkx(source if source is not None else self._network.source)
+        elif source is not None:
+            self._network.set_source(source)
+        return self._network
+
+    def get_tables(self):
+        """Return the tables of the models of the Store, one pandas DataFrame per model class.
+
+        The tables are built once, and shared until a model is added, removed or changed.
+        Changes made in place to the lists held by the models (wires, windings...) are
+        not detected.
+
+        :returns: The tables of the Store
+        :rtype: ditto.formats.tables.ModelTables
+        """
+        if self._model_store.tables is None:
+            from .formats.tables import ModelTables
+
+            self._model_store.tables = ModelTables(self)
+        return self._model_store.tables
 
     def print_networkx(self):
         logger.debug("Printing Nodes...")
@@ -135,21 +426,31 @@ class Store(object):
         # self._network.print_attrs()
 
     def delete_cycles(self):
-        """ First convert graph to directed graph (doubles the edges hence creating length 2 cycles)
-        Then find cycles of length greater than 2
+        """Find the loops of the network (see Network.find_cycles), and break each of them
         Use heuristic of removing edge in the middle of the longest single phase section of the loop
-        If no single phase sections, remove edge the furthest from the source
+        The loops are found again after they were broken, until none is left
         """
-        for i in self._network.find_cycles():
-            if len(i) > 2:
+        network = self.get_network()
+        modifier = Modifier()
+        cycles = network.find_cycles()
+        while cycles:
+            deleted = False
+            for i in cycles:
+                # The loop may already be broken by an edge deleted for another one
+                edges = zip(i, i[1:] + i[:1])
+                if not all(network.graph.has_edge(u, v) for u, v in edges):
+                    continue
                 logger.debug("Detected cycle {cycle}".format(cycle=i))
-                edge = self._network.middle_single_phase(i)
-                for j in self.models:
-                    if hasattr(j, "name") and j.name == edge:
-                        logger.debug("deleting " + edge)
-                        modifier = Modifier()
-                        modifier.delete_element(self, j)
-        self.build_networkx()
+                edge = network.middle_single_phase(i)
+                elements = self._model_store.find_all(edge)
+                if elements:
+                    logger.debug("deleting " + edge)
+                    modifier.delete_elements(self, elements)
+                    deleted = True
+            if not deleted:
+                break
+            cycles = network.find_cycles()
+        self.get_network()
 
     def direct_from_source(self, source="sourcebus"):
         ordered_nodes = self._network.bfs_order(source)
@@ -171,30 +472,39 @@ class Store(object):
                     i.to_element = tmp
 
     def delete_disconnected_nodes(self):
-        for i in self.models:
-            if isinstance(i, Node) and hasattr(i, "name") and i.name is not None:
-                connected_nodes = self._network.get_nodes()
+        connected_nodes = set(self._network.get_nodes())
+        disconnected = []
+        unnamed = []
+        for i in self.iter_models(Node):
+            if hasattr(i, "name") and i.name is not None:
                 if not i.name in connected_nodes:
                     logger.debug("deleting " + i.name)
-                    modifier = Modifier()
-                    modifier.delete_element(self, i)
+                    disconnected.append(i)
 
-            if isinstance(i, Node) and hasattr(i, "name") and i.name is None:
-                self.remove_element(i)
-        self.build_networkx()  # Should be redundant since the networkx graph is only build on connected elements
+            if hasattr(i, "name") and i.name is None:
+                unnamed.append(i)
+        modifier = Modifier()
+        modifier.delete_elements(self, disconnected)
+        self.remove_elements(unnamed)
+        self.get_network()  # The network is kept up to date as the nodes are deleted
 
-    def set_node_voltages(self):
+    def set_node_voltages(self, backend="networkx"):
         self.set_names()
-        for i in self.models:
-            if isinstance(i, Node) and hasattr(i, "name") and i.name is not None:
-                upstream_transformer = self._network.get_upstream_transformer(
-                    self, i.name
-                )
+        # The upstream transformers are found in one pass (see Network.upstream_transformers)
+        if backend == "networkx":
+            network = self._network
+        else:
+            network = self.get_network(backend=backend)
+        voltages = {}
+        for i in self.iter_models(Node):
+            if hasattr(i, "name") and i.name is not None:
+                upstream_transformer = network.get_upstream_transformer(self, i.name)
                 try:
-                    upstream_voltage = (
-                        self[upstream_transformer].windings[-1].nominal_voltage
-                    )
-                    i.nominal_voltage = upstream_voltage
+                    if upstream_transformer not in voltages:
+                        voltages[upstream_transformer] = (
+                            self[upstream_transformer].windings[-1].nominal_voltage
+                        )
+                    i.nominal_voltage = voltages[upstream_transformer]
                 except KeyError:
                     pass
 
@@ -211,7 +521,7 @@ class Store(object):
 
     @property
     def model_names(self):
-        return self._model_names
+        return self._model_store.names
 
 
 class EnvAttributeIntercepter(object):
@@ -1,11 +1,17 @@
 # -*- coding: utf-8 -*-
 
 import hashlib
+import heapq
 import math
+import multiprocessing
+import os
+import pickle
+import re
+import tempfile
 import cmath
 from datetime import datetime
 import copy
-from functools import reduce
+from functools import reduce, wraps
 import logging
 
 import networkx as nx
@@ -34,10 +40,238 @@ from ditto.writers.abstract_writer import AbstractWriter
 logger = logging.getLogger(__name__)
 
 
+def canonical_code(value):
+    """Return a hashable key of an equipment code, equal for equal codes.
+
+    The codes are either strings (the CSV line of the equipment) or dictionaries
+    of parameters (line and cable codes).
+    """
+    if isinstance(value, dict):
+        return frozenset((k, canonical_code(v)) for k, v in value.items())
+    if isinstance(value, list):
+        return tuple(canonical_code(v) for v in value)
+    return value
+
+
+class EquipmentCatalog(dict):
+    """Dictionary of equipment codes by ID, indexed by code.
+
+    The writer groups the equipment which have the same parameters under the same ID.
+    Looking up the IDs of a code with find() takes constant time instead of a scan
+    of all the codes already written.
+    """
+
+    def __init__(self):
+        """Class CONSTRUCTOR."""
+        super(EquipmentCatalog, self).__init__()
+        self._rank = {}
+        self._ids = {}
+
+    def __setitem__(self, ID, code):
+        if ID in self:
+            ids = self._ids[canonical_code(self[ID])]
+            ids.remove(ID)
+        else:
+            self._rank[ID] = len(self._rank)
+        super(EquipmentCatalog, self).__setitem__(ID, code)
+        ids = self._ids.setdefault(canonical_code(code), [])
+        ids.append(ID)
+        if len(ids) > 1 and self._rank[ids[-2]] > self._rank[ID]:
+            ids.sort(key=self._rank.get)
+
+    def find(self, code):
+        """Return the IDs of the given code, in insertion order.
+
+        :param code: The equipment code
+        :type code: str or dict
+        :returns: The IDs of the equal codes of the catalog
+        :rtype: list
+        """
+        return list(self._ids.get(canonical_code(code), []))
+
+
+class SectionBuffer(object):
+    """List of lines of a section of the network file, spilled to disk past max_size bytes.
+
+    The lines are appended while looping over the DiTTo objects, and read back in the
+    same order when the section is written. With a max_size of 0, the lines go to
+    disk from the start.
+    """
+
+    def __init__(self, max_size):
+        """Class CONSTRUCTOR."""
+        self.file = tempfile.SpooledTemporaryFile(max_size=max_size, mode="w+b")
+        if max_size == 0:
+            # A max_size of 0 means no limit for a SpooledTemporaryFile
+            self.file.rollover()
+        self.size = 0
+
+    def append(self, line):
+        self.file.write(line.encode("utf-8") + b"\n")
+        self.size += 1
+
+    def __len__(self):
+        return self.size
+
+    def __iter__(self):
+        self.file.seek(0)
+        for line in self.file:
+            yield line[:-1].decode("utf-8")
+        self.file.seek(0, 2)
+
+    def close(self):
+        self.file.close()
+
+
+# Placeholder returned by a recorded call, replaced by the result of the call when
+# it is replayed
+PLACEHOLDER = "\x00{}\x00"
+PLACEHOLDER_PATTERN = re.compile("\x00([0-9]+)\x00")
+
+
+def shared(method):
+    """Decorate the Writer methods updating the state shared by all the DiTTo objects.
+
+    This state is the equipment catalogs, the lines of the sections of the network
+    file and the sections of each feeder. When the objects of a feeder are rendered
+    in a worker process, the calls to these methods are recorded instead, and
+    replayed by the main process in the order of the model (see
+    Writer.render_network_objects). A recorded call returns a placeholder of its
+    result, which the following calls of the same object can only pass around or
+    concatenate to strings.
+    """
+
+    @wraps(method)
+    def wrapper(self, *args, **kwargs):
+        if self.recorder is None:
+            return method(self, *args, **kwargs)
+        return self.recorder.record(method.__name__, args, kwargs)
+
+    return wrapper
+
+
+def replace_placeholders(value, results):
+    """Replace the placeholders of the arguments of a recorded call with the results
+    of the calls replayed before it.
+
+    A placeholder standing alone is replaced by the result itself, a placeholder
+    within a string by the result converted to a string.
+    """
+    if isinstance(value, str):
+        match = PLACEHOLDER_PATTERN.match(value)
+        if match is not None and match.end() == len(value):
+            return results[int(match.group(1))]
+        return PLACEHOLDER_PATTERN.sub(lambda m: str(results[int(m.group(1))]), value)
+    if isinstance(value, (list, tuple)):
+        return type(value)(replace_placeholders(v, results) for v in value)
+    if isinstance(value, dict):
+        return {
+            replace_placeholders(k, results): replace_placeholders(v, results)
+            for k, v in value.items()
+        }
+    return value
+
+
+class CallRecorder(object):
+    """Calls to the shared methods of a Writer, recorded in a worker process.
+
+    The calls made while rendering an object are pickled with the index of the object
+    to a temporary file, so that the memory of the worker does not grow with the size
+    of its feeder.
+    """
+
+    def __init__(self):
+        """Class CONSTRUCTOR."""
+        self.file = tempfile.NamedTemporaryFile(suffix=".pkl", delete=False)
+        self.index = None
+        self.calls = []
+
+    def start(self, index):
+        """Record the calls made for the object of the given index."""
+        self.index = index
+        self.calls = []
+
+    def record(self, name, args, kwargs):
+        self.calls.append((name, args, kwargs))
+        return PLACEHOLDER.format(len(self.calls) - 1)
+
+    def stop(self):
+        if len(self.calls) > 0:
+            pickle.dump((self.index, self.calls), self.file, pickle.HIGHEST_PROTOCOL)
+        self.calls = []
+
+    def close(self):
+        """Close the file of the calls and return its path."""
+        self.file.close()
+        return self.file.name
+
+
+def read_calls(path):
+    """Yield the (index, calls) records of a CallRecorder file, and delete the file."""
+    try:
+        with open(path, "rb") as f:
+            while True:
+                try:
+                    yield pickle.load(f)
+                except EOFError:
+                    return
+    finally:
+        os.remove(path)
+
+
+# Writer and model used by the worker processes of Writer.render_network_objects
+_worker_writer = None
+_worker_model = None
+
+
+def _init_worker(writer, model):
+    global _worker_writer, _worker_model
+    _worker_writer = writer
+    _worker_model = model
+
+
+def _render_feeder(indices):
+    """
+    Renders the objects of a feeder in a worker process (see Writer.render_network_objects).
+
+    :param indices: Indices of the objects of the feeder in the model
+    :type indices: list
+    :returns: The path of the file of the calls recorded for the objects
+    :rtype: str
+    """
+    writer = _worker_writer
+    models = _worker_model.models
+    recorder = writer.recorder = CallRecorder()
+    try:
+        for index in indices:
+            recorder.start(index)
+            writer.render_network_object(models[index], _worker_model)
+            recorder.stop()
+    except Exception:
+        os.remove(recorder.close())
+        raise
+    finally:
+        writer.recorder = None
+    return recorder.close()
+
+
 class Writer(AbstractWriter):
     """
         DiTTo--->CYME Writer class
 
+        The objects of the network file can be rendered feeder by feeder, each feeder
+        in a worker process. The workers record the updates of the equipment catalogs
+        and of the sections, which are replayed in the order of the model, so that the
+        written files are the same as when rendering the objects one by one:
+
+        >>> my_writer=Writer(output_path='./', parallel=True, processes=8)
+
+        The lines of the sections of the files can also be spilled to temporary files
+        past section_buffer_size bytes instead of being held in memory until the files
+        are written (with a size of 0, they go to disk from the start):
+
+        >>> my_writer=Writer(output_path='./', section_buffer_size=2**20)
+
         Author: Nicolas Gensollen. October 2017
     """
 
@@ -47,8 +281,266 @@ class Writer(AbstractWriter):
         # Call super
         super(Writer, self).__init__(**kwargs)
 
+        # Size (in bytes) of each section of the network and load files kept in
+        # memory. When set, the sections are spilled to temporary files past this
+        # size instead of being held in memory until the files are written. With
+        # a size of 0, they are written to the temporary files from the start.
+        if "section_buffer_size" in kwargs:
+            self.section_buffer_size = kwargs["section_buffer_size"]
+        else:
+            self.section_buffer_size = None
+        if self.section_buffer_size is not None and self.section_buffer_size < 0:
+            raise ValueError(
+                "Invalid section_buffer_size {}".format(self.section_buffer_size)
+            )
+
+        # Feeders rendered in parallel
+        self.parallel = kwargs.get("parallel", False)
+        self.processes = kwargs.get("processes", None)
+
+        # Recorder of the calls to the shared methods, in a worker process
+        self.recorder = None
+
         logger.info("DiTTo--->CYME writer successfuly instanciated.")
 
+    def new_string_list(self):
+        """Return an empty list of lines for a section of the network file."""
+        if self.section_buffer_size is None:
+            return []
+        return SectionBuffer(self.section_buffer_size)
+
+    @shared
+    def append_line(self, section, line):
+        """Append a line to a section of the network file (see write_network_file)."""
+        self.string_lists[section].append(line)
+
+    @shared
+    def add_node_ID(self, node_ID):
+        self.node_IDs.add(node_ID)
+
+    @shared
+    def add_missing_node(self, node_ID, node_string):
+        """Add a node to the network file if it was not added yet."""
+        if node_ID not in self.node_IDs:
+            self.node_IDs.add(node_ID)
+            self.node_string_list.append(node_string)
+
+    @shared
+    def add_source(self, node_ID, voltage):
+        self.sources[node_ID] = voltage
+
+    @shared
+    def add_substation(self, substation):
+        self.substations.append(substation)
+
+    @shared
+    def add_irradiance_profile(self, label, location):
+        self.irradiance_profiles[label] = location
+
+    @shared
+    def add_feeder_section_ID(self, section_ID, feeder_name, substation_name):
+        """Add a section ID to a feeder."""
+        if feeder_name is not None:
+            self.section_feeder_mapping.setdefault(feeder_name, set()).add(section_ID)
+            if substation_name is not None:
+                self.section_headnode_mapping[feeder_name] = substation_name
+
+    @shared
+    def add_line_section_ID(self, section_ID, feeder_name, substation_name):
+        """Add the section ID of a line to its feeder, and return it.
+
+        The duplicate lines between the same nodes get a "*" appended to their ID.
+        """
+        if feeder_name is not None and feeder_name in self.section_feeder_mapping:
+            while section_ID in self.section_feeder_mapping[feeder_name]:
+                section_ID = section_ID + "*"
+                if len(section_ID) > 64:
+                    hasher = hashlib.sha1()
+                    hasher.update(section_ID.encode("utf-8"))
+                    section_ID = hasher.hexdigest()
+        if len(section_ID) > 64:
+            hasher = hashlib.sha1()
+            hasher.update(section_ID.encode("utf-8"))
+            section_ID = hasher.hexdigest()
+        self.add_feeder_section_ID(section_ID, feeder_name, substation_name)
+        return section_ID
+
+    def network_ID(self, obj):
+        """Return the network of the sections of an object, and if it is a substation.
+
+        The network of an object inside a substation is its substation_name, with a
+        'substation_' prefix to distinguish substations from feeders. Otherwise, it is
+        its feeder_name. When the object has neither, it is None.
+        """
+        if hasattr(obj, "is_substation") and obj.is_substation == 1:
+            if (
+                hasattr(obj, "substation_name")
+                and obj.substation_name is not None
+                and obj.substation_name != ""
+            ):
+                return "substation_{}".format(obj.substation_name), True
+        elif (
+            hasattr(obj, "feeder_name")
+            and obj.feeder_name is not None
+            and obj.feeder_name != ""
+        ):
+            return obj.feeder_name, False
+        return None, False
+
+    @shared
+    def add_section(
+        self,
+        section,
+        network_ID,
+        substation=False,
+        unique=False,
+        carry=True,
+        network_section=None,
+    ):
+        """Add a section line to the network file.
+
+        :param section: The section line
+        :type section: str
+        :param network_ID: The network of the section (see network_ID)
+        :type network_ID: str
+        :param substation: True if the network is a substation
+        :type substation: bool
+        :param unique: Only add the section if it was not added yet
+        :type unique: bool
+        :param carry: When network_ID is None, add the section to the network of the previous section. Otherwise, use network_ID for the next sections without one.
+        :type carry: bool
+        :param network_section: The line added to the network, if it is not section
+        :type network_section: str
+        """
+        if unique and section in self.section_lines:
+            return
+        self.section_lines.add(section)
+        if carry:
+            if network_ID is None:
+                network_ID = self.last_network_ID
+                if network_ID is None:
+                    raise ValueError(
+                        "The section {} does not belong to any network".format(section)
+                    )
+            self.last_network_ID = network_ID
+        if substation:
+            self.network_have_substations = True
+        if network_ID is None:
+            return
+        if network_ID not in self.section_line_feeder_mapping:
+            self.section_line_feeder_mapping[network_ID] = self.new_string_list()
+        if network_section is None:
+            network_section = section
+        self.section_line_feeder_mapping[network_ID].append(network_section)
+
+    @shared
+    def equipment_ID(self, catalog, code):
+        """Return the ID of a code of the given catalog, adding the code if it is new.
+
+        The IDs of these catalogs are numbered from 1.
+        """
+        catalog = getattr(self, catalog)
+        for k in catalog.find(code):
+            return k
+        ID = len(catalog) + 1
+        catalog[ID] = code
+        return ID
+
+    @shared
+    def add_conductor(self, name, code):
+        if name not in self.conductors:
+            self.conductors[name] = code
+
+    @shared
+    def conductor_ID(self, code):
+        """Return the ID of a conductor without name, adding the conductor if it is new."""
+        ID = None
+        for k in self.conductors.find(code):
+            ID = k
+        if ID is None:
+            self.ID_cond += 1
+            self.conductors["conductor_{}".format(self.ID_cond)] = code
+            ID = self.ID_cond
+        return ID
+
+    @shared
+    def protective_device_IDs(self, catalog, name, code):
+        """Return the IDs of a switch, fuse, recloser or breaker code, separated by commas.
+
+        The code is added to the catalog under the given name, unless the name is
+        already used by another code. In this case, the IDs of the equal codes are
+        returned if there are some.
+        """
+        catalog = getattr(self, catalog)
+        if name in catalog and catalog[name] != code:
+            IDs = catalog.find(code)
+            if len(IDs) > 0:
+                return ",".join(str(k) for k in IDs)
+        if name not in catalog or catalog[name] != code:
+            catalog[name] = code
+        return name
+
+    @shared
+    def cable_IDs(self, code, name=None):
+        """Return the IDs of a cable code, separated by commas, adding the code if it is new.
+
+        A code with a name is added under its name.
+        """
+        if name is not None:
+            self.cablecodes[name] = code
+            return name
+        if len(self.cablecodes) > 0:
+            IDs = self.cablecodes.find(code)
+            if len(IDs) > 0:
+                return ",".join("cable_" + str(k) for k in IDs)
+        self.ID_cable += 1
+        self.cablecodes["cable" + str(self.ID_cable)] = code
+        return "cable_" + str(self.ID_cable)
+
+    @shared
+    def overhead_line_IDs(self, code, name=None):
+        """Return the IDs of an overhead line code, separated by commas, adding the code if it is new.
+
+        A code with a name is added under its name.
+        """
+        if name is not None:
+            self.linecodes_overhead[name] = code
+            return name
+        if len(self.linecodes_overhead) == 0:
+            self.ID_line += 1
+            self.linecodes_overhead[self.ID_line] = code
+            return "line_" + str(self.ID_line)
+        IDs = self.linecodes_overhead.find(code)
+        if len(IDs) > 0:
+            return ",".join(str(k) for k in IDs)
+        self.ID_line += 1
+        self.linecodes_overhead["line_" + str(self.ID_line)] = code
+        return "line_" + str(self.ID_line)
+
+    @shared
+    def bess_ID(self, code):
+        """Return the ID of a BESS code, adding the code if it is new."""
+        if code not in self.bess_codes:
+            self.ID_bess += 1
+            self.bess_codes[code] = "BESS_" + str(self.ID_bess)
+        return self.bess_codes[code]
+
+    def replay(self, calls):
+        """Replay the calls to the shared methods recorded for an object in a worker process."""
+        results = []
+        for name, args, kwargs in calls:
+            args = replace_placeholders(args, results)
+            kwargs = replace_placeholders(kwargs, results)
+            results.append(getattr(self, name)(*args, **kwargs))
+
+    def close_string_lists(self):
+        """Close the SectionBuffers of the files."""
+        string_lists = list(self.string_lists.values())
+        string_lists.extend(self.section_line_feeder_mapping.values())
+        for string_list in string_lists:
+            if isinstance(string_list, SectionBuffer):
+                string_list.close()
+
     def connection_configuration_mapping(self, value):
         """
         Map the connection configuration from DiTTo to CYME.
@@ -230,16 +722,43 @@ class Writer(AbstractWriter):
 
         write_network_file must be called before write_equipment_file since the linecodes dictionary is built here and is needed for the equipment file.
         """
-        self.section_line_list = []
-        self.node_string_list = []
-        self.node_connector_string_list = []
+        # Lines of the sections of the network file, by section
+        self.string_lists = {
+            name: self.new_string_list()
+            for name in [
+                "node",
+                "bus",  # Only used for nodes - not nodes derived from PV, Loads or Capacitors
+                "intermediate_node",
+                "source",
+                "overhead",
+                "overhead_byphase",
+                "underground",
+                "switch",
+                "fuse",
+                "recloser",
+                "breaker",
+                "capacitor",
+                "two_windings_transformer",
+                "three_windings_transformer",
+                "regulator",
+                "converter",
+                "converter_control",
+                "pv_settings",
+                "bess_settings",
+                "dg_generation",
+                "node_connector",
+                "load",  # Lines of the load file
+                "customer_load",
+            ]
+        }
+        self.node_string_list = self.string_lists["node"]
+        self.node_connector_string_list = self.string_lists["node_connector"]
         self.node_connector_string_mapping = (
             {}
         )  # A mapping of the node and index to the section
-        self.bus_string_list = (
-            []
-        )  # Only used for nodes - not nodes derived from PV, Loads or Capacitors
-        self.nodeID_list = []
+        self.bus_string_list = self.string_lists["bus"]
+        self.section_lines = set()
+        self.node_IDs = set()
         self.sectionID_list = []
         self.section_feeder_mapping = {}
         self.section_line_feeder_mapping = {}
@@ -251,15 +770,18 @@ class Writer(AbstractWriter):
         else:
             self.verbose = False
 
-        # Writing the load file
-        if self.verbose:
-            logger.info("Writing the load file...")
-        self.write_load_file(model, **kwargs)
+        try:
+            # Writing the load file
+            if self.verbose:
+                logger.info("Writing the load file...")
+            self.write_load_file(model, **kwargs)
 
-        # Writing the network file
-        if self.verbose:
-            logger.info("Writing the network file...")
-        self.write_network_file(model, **kwargs)
+            # Writing the network file
+            if self.verbose:
+                logger.info("Writing the network file...")
+            self.write_network_file(model, **kwargs)
+        finally:
+            self.close_string_lists()
 
         # Writing the equipment file
         if self.verbose:
@@ -281,51 +803,52 @@ class Writer(AbstractWriter):
         self.network_have_substations = False
 
         # Lists for storing strings
-        source_string_list = []
-        overhead_string_list = []
-        overhead_byphase_string_list = []
-        underground_string_list = []
-        switch_string_list = []
-        fuse_string_list = []
-        recloser_string_list = []
-        breaker_string_list = []
-        capacitor_string_list = []
-        two_windings_transformer_string_list = []
-        three_windings_transformer_string_list = []
-        regulator_string_list = []
-        converter_string_list = []
-        converter_control_string_list = []
-        pv_settings_string_list = []
-        bess_settings_string_list = []
-        dg_generation_string_list = []
+        source_string_list = self.string_lists["source"]
+        overhead_string_list = self.string_lists["overhead"]
+        overhead_byphase_string_list = self.string_lists["overhead_byphase"]
+        underground_string_list = self.string_lists["underground"]
+        switch_string_list = self.string_lists["switch"]
+        fuse_string_list = self.string_lists["fuse"]
+        recloser_string_list = self.string_lists["recloser"]
+        breaker_string_list = self.string_lists["breaker"]
+        capacitor_string_list = self.string_lists["capacitor"]
+        two_windings_transformer_string_list = self.string_lists[
+            "two_windings_transformer"
+        ]
+        three_windings_transformer_string_list = self.string_lists[
+            "three_windings_transformer"
+        ]
+        regulator_string_list = self.string_lists["regulator"]
+        converter_string_list = self.string_lists["converter"]
+        converter_control_string_list = self.string_lists["converter_control"]
+        pv_settings_string_list = self.string_lists["pv_settings"]
+        bess_settings_string_list = self.string_lists["bess_settings"]
+        dg_generation_string_list = self.string_lists["dg_generation"]
+
+        # Network of the last section added (see add_section)
+        self.last_network_ID = None
 
         # The linecodes dictionary is used to group lines which have the same properties
         # (impedance matrix, ampacity...)
         # This dictionary will be outputed in write_equipment_file
-        ID = 0
-        self.linecodes_overhead = {}
-        ID_cable = 0
-        self.cablecodes = {}
-        ID_cap = 0
-        self.capcodes = {}
-        ID_trans = 0
-        self.two_windings_trans_codes = {}
-        ID_reg = 0
-        self.reg_codes = {}
-        ID_trans_3w = 0
-        self.three_windings_trans_codes = {}
-        ID_cond = 0
+        self.ID_line = 0
+        self.linecodes_overhead = EquipmentCatalog()
+        self.ID_cable = 0
+        self.cablecodes = EquipmentCatalog()
+        self.capcodes = EquipmentCatalog()
+        self.two_windings_trans_codes = EquipmentCatalog()
+        self.reg_codes = EquipmentCatalog()
+        self.three_windings_trans_codes = EquipmentCatalog()
+        self.ID_cond = 0
         self.bess_codes = {}
-        ID_bess = 0
-        self.conductors = {}
-        self.switchcodes = {}
-        self.fusecodes = {}
-        self.reclosercodes = {}
-        self.breakercodes = {}
+        self.ID_bess = 0
+        self.conductors = EquipmentCatalog()
+        self.switchcodes = EquipmentCatalog()
+        self.fusecodes = EquipmentCatalog()
+        self.reclosercodes = EquipmentCatalog()
+        self.breakercodes = EquipmentCatalog()
         self.irradiance_profiles = {}
 
-        intermediate_nodes = []
-
         self.sources = {}
 
         self.substations = []
@@ -399,4147 +922,3318 @@ class Writer(AbstractWriter):
                         ] = hasher.hexdigest()
 
             # Loop over the DiTTo objects
-            for i in model.models:
+            self.render_network_objects(model)
 
-                if hasattr(i, "drop") and i.drop == 1:
-                    continue
-
-                # If we get a PowerSource object
-                #
-                if isinstance(i, PowerSource):
-                    # Check that the PowerSouce object is an external power source
-                    if hasattr(i, "is_sourcebus") and i.is_sourcebus == 1:
-                        # Empty new source string
-                        new_source_string = ""
-                        self.substations.append({})
+            # Write everything to the network file
+            #
+            # HEADER
+            #
+            f.write("[GENERAL]\n")
 
-                        if (
-                            hasattr(i, "connecting_element")
-                            and i.connecting_element is not None
-                        ):
-                            self.sources[i.connecting_element] = None
-                            new_source_string += i.connecting_element
-                            self.substations[-1][
-                                "connecting_element"
-                            ] = i.connecting_element
-                        else:
-                            continue
+            # DATE
+            #
+            current_date = datetime.now().strftime("%B %d, %Y at %H:%M:%S")
+            f.write("DATE={}\n".format(current_date))
 
-                        if (
-                            hasattr(i, "nominal_voltage")
-                            and i.nominal_voltage is not None
-                        ):
-                            new_source_string += "," + str(i.nominal_voltage * 10 ** -3)
-                            self.sources[i.connecting_element] = str(
-                                i.nominal_voltage * 10 ** -3
-                            )
-                            self.substations[-1]["KVLL"] = str(
-                                i.nominal_voltage * 10 ** -3
-                            )
-                        elif (
-                            hasattr(i, "connecting_element")
-                            and i.connecting_element is not None
-                            and i.connecting_element in model.model_names
-                            and hasattr(model[i.connecting_element], "nominal_voltage")
-                            and model[i.connecting_element].nominal_voltage is not None
-                        ):
-                            voltage = model[i.connecting_element].nominal_voltage
-                            new_source_string += "," + str(voltage * 10 ** -3)
-                            self.sources[i.connecting_element] = str(voltage * 10 ** -3)
-                            self.substations[-1]["KVLL"] = str(voltage * 10 ** -3)
-                        else:
-                            new_source_string += ","
+            # CYME version
+            #
+            f.write("CYME_VERSION=8.02\n")
 
-                        if hasattr(i, "phase_angle") and i.phase_angle is not None:
-                            new_source_string += "," + str(i.phase_angle)
-                            new_source_string += "," + str(i.phase_angle - 120)
-                            new_source_string += "," + str(i.phase_angle + 120)
-                            self.substations[-1]["phase_angle"] = str(i.phase_angle)
-                        else:
-                            new_source_string += ",,,"
+            # Unit system
+            #
+            f.write("\n[SI]\n")
 
-                        if (
-                            hasattr(i, "positive_sequence_impedance")
-                            and i.positive_sequence_impedance is not None
-                        ):
-                            new_source_string += (
-                                ","
-                                + str(i.positive_sequence_impedance.real)
-                                + ","
-                                + str(i.positive_sequence_impedance.imag)
-                            )
-                            self.substations[-1]["R1"] = str(
-                                i.positive_sequence_impedance.real
-                            )
-                            self.substations[-1]["X1"] = str(
-                                i.positive_sequence_impedance.imag
-                            )
-                        else:
-                            new_source_string += ",,"
+            # Nodes
+            #
+            f.write("\n[NODE]\n")
+            f.write("FORMAT_NODE=NodeID,CoordX,CoordY\n")
 
-                        if (
-                            hasattr(i, "zero_sequence_impedance")
-                            and i.zero_sequence_impedance is not None
-                        ):
-                            new_source_string += (
-                                ","
-                                + str(i.zero_sequence_impedance.real)
-                                + ","
-                                + str(i.zero_sequence_impedance.imag)
-                            )
-                            self.substations[-1]["R0"] = str(
-                                i.zero_sequence_impedance.real
-                            )
-                            self.substations[-1]["X0"] = str(
-                                i.zero_sequence_impedance.imag
-                            )
-                        else:
-                            new_source_string += ",,"
+            for node_string in self.node_string_list:
+                f.write(node_string + "\n")
 
-                        if (
-                            hasattr(i, "negative_sequence_impedance")
-                            and i.negative_sequence_impedance is not None
-                        ):
-                            new_source_string += (
-                                ","
-                                + str(i.negative_sequence_impedance.real)
-                                + ","
-                                + str(i.negative_sequence_impedance.imag)
-                            )
-                        elif (
-                            hasattr(i, "zero_sequence_impedance")
-                            and i.zero_sequence_impedance is not None
-                        ):
-                            new_source_string += (
-                                ","
-                                + str(i.zero_sequence_impedance.real)
-                                + ","
-                                + str(i.zero_sequence_impedance.imag)
-                            )
-                        else:
-                            new_source_string += ",,"
+            if len(self.bus_string_list) > 0:
+                f.write("FORMAT_NODE=NodeID,CoordX1,CoordY1,CoordX2,CoordY2,Width\n")
+                for bus_string in self.bus_string_list:
+                    f.write(bus_string + "\n")
 
-                        # OperatingVoltages
-                        try:
-                            new_source_string += ",{v},{v},{v},0".format(
-                                v=i.nominal_voltage * 10 ** -3
-                            )
-                        except:
-                            new_source_string += ",,,,0"
-                            pass
+            # Intermediate nodes
+            #
+            f.write("\n[INTERMEDIATE NODES]\n")
+            f.write("FORMAT_INTERMEDIATENODE=SectionID,SeqNumber,CoordX,CoordY\n")
 
-                        if hasattr(i, "rated_power") and i.rated_power is not None:
-                            self.substations[-1]["MVA"] = str(i.rated_power * 10 ** -6)
+            for intermediate_node_string in self.string_lists["intermediate_node"]:
+                f.write(intermediate_node_string + "\n")
 
-                        if new_source_string != "":
-                            source_string_list.append(new_source_string)
+            # Sources
+            #
+            f.write("\n[SOURCE]\n")
+            f.write("FORMAT_SOURCE=SourceID,DeviceNumber,NodeID,NetworkID\n")
+            k = 0
+            self.substation_IDs = {}
 
-                # If we get a Node object
-                #
-                if isinstance(i, Node):
+            for _source, _voltage in self.sources.items():
+                # _source should be the name of the headnode for one feeder_metadata object
+                # TODO: Find a better way to find it
+                for obj in model.models:
+                    if isinstance(obj, Feeder_metadata) and obj.headnode == _source:
+                        sourceID = obj.headnode + "_src"
+                        nodeID = obj.headnode
+                        NetworkID = obj.name
+                k += 1
+                for j, sub in enumerate(self.substations):
+                    if sub["connecting_element"] == _source:
+                        self.substations[j]["sub_ID"] = "sub_" + str(k)
+                self.substation_IDs[_source] = "sub{}".format(k)
+                f.write(
+                    "sub_{k},sub_{k},{nodeID},{NetID}\n".format(
+                        sourceID=sourceID, k=k, nodeID=nodeID, NetID=NetworkID
+                    )
+                )
 
-                    # Empty new node string
-                    new_node_string = ""
+            f.write("\n[HEADNODES]\n")
+            f.write("FORMAT_HEADNODES=NodeID,NetworkID\n")
+            # k=0
+            # for source_string in source_string_list:
+            #    k+=1
+            #    nodeID=source_string.split(',')[0]
+            #    f.write('{nodeID},{NetID}\n'.format(nodeID=nodeID, NetID=k))
+            for f_name, section_l in self.section_feeder_mapping.items():
+                #                for kk in model.models:
+                #                   if isinstance(kk,Feeder_metadata):
+                #                       print(kk.name, kk.headnode)
+                # import pdb;pdb.set_trace()
+                if f_name != "":
+                    head = model[
+                        f_name
+                    ].headnode  # self.section_headnode_mapping[f_name]
+                    f.write("{nodeID},{NetID}\n".format(nodeID=head, NetID=f_name))
 
-                    # Empty new bus string (for bus representations of nodes with two coords)
-                    new_bus_string = ""
+            # Source equivalent
+            #
+            f.write("\n[SOURCE EQUIVALENT]\n")
+            f.write(
+                "FORMAT_SOURCEEQUIVALENT=NodeID,Voltage,OperatingAngle1,OperatingAngle2,OperatingAngle3,PositiveSequenceResistance,PositiveSequenceReactance,ZeroSequenceResistance,ZeroSequenceReactance,NegativeSequenceResistance,NegativeSequenceReactance,OperatingVoltage1,OperatingVoltage2,OperatingVoltage3,ImpedanceUnit\n"
+            )
 
-                    # Name
-                    if hasattr(i, "name") and i.name is not None:
-                        self.nodeID_list.append(i.name)
-                    else:
-                        continue
+            id_from_source = []
+            for source_string in source_string_list:
+                id_from_source.append(source_string.split(",")[0])
+                f.write(source_string + "\n")
 
-                    # CoordX and CoordY
+            for f_name, section_l in self.section_line_feeder_mapping.items():
+                if f_name != "subtransmission" and "substation" not in f_name:
+                    temp = model[f_name]
                     if (
-                        hasattr(i, "positions")
-                        and i.positions is not None
-                        and len(i.positions) == 1
-                    ):
-                        new_node_string += i.name
-                        try:
-                            new_node_string += "," + str(i.positions[0].long)
-                        except:
-                            new_node_string += ",0"
-                            pass
-
-                        try:
-                            new_node_string += "," + str(i.positions[0].lat)
-                        except:
-                            new_node_string += ",0"
-                            pass
-                    elif (
-                        hasattr(i, "positions")
-                        and i.positions is not None
-                        and len(i.positions) >= 2
+                        hasattr(temp, "nominal_voltage")
+                        and temp.nominal_voltage is not None
                     ):
-                        new_bus_string += i.name
-                        try:
-                            new_bus_string += "," + str(i.positions[0].long)
-                        except:
-                            new_bus_string += ",0"
-                            pass
-
-                        try:
-                            new_bus_string += "," + str(i.positions[0].lat)
-                        except:
-                            new_bus_string += ",0"
-                            pass
-
-                        try:
-                            new_bus_string += "," + str(i.positions[-1].long)
-                        except:
-                            new_bus_string += ",0"
-                            pass
-
-                        try:
-                            new_bus_string += "," + str(i.positions[-1].lat)
-                        except:
-                            new_bus_string += ",0"
-                            pass
-                        new_bus_string += ",2"  # Set width of 2
-                        for j in range(1, len(i.positions) - 1):
-                            sectionid = ""
-                            if (i.name, j - 1) in self.node_connector_string_mapping:
-                                sectionid = self.node_connector_string_mapping[
-                                    (i.name, j - 1)
-                                ]
-                            new_node_connector_string = "{n},{x},{y},{s}".format(
-                                n=i.name,
-                                x=i.positions[j].long,
-                                y=i.positions[j].lat,
-                                s=sectionid,
-                            )
-                            self.node_connector_string_list.append(
-                                new_node_connector_string
+                        volt = temp.nominal_voltage * 10 ** -3
+                    else:
+                        volt = model[temp.headnode].nominal_voltage * 10 ** -3
+                    if temp.headnode not in id_from_source:
+                        f.write(
+                            "{node_id},{voltage},{angle1},{angle2},{angle3},{R1},{X1},{R0},{X0},{R2},{X2},{voltage},{voltage},{voltage},0\n".format(
+                                node_id=temp.headnode,
+                                voltage=volt,
+                                angle1=temp.operating_angle1,
+                                angle2=temp.operating_angle2,
+                                angle3=temp.operating_angle3,
+                                R1=temp.positive_sequence_resistance,
+                                X1=temp.positive_sequence_reactance,
+                                R0=temp.zero_sequence_resistance,
+                                X0=temp.zero_sequence_reactance,
+                                R2=temp.negative_sequence_resistance,
+                                X2=temp.negative_sequence_reactance,
                             )
+                        )
 
-                    else:
-                        new_node_string += i.name
-                        new_node_string += ",0,0"
+            # Sections
+            #
+            f.write("\n[SECTION]\n")
 
-                    # Add the node string to the list
-                    if new_node_string != "":
-                        self.node_string_list.append(new_node_string)
+            # Always write the SECTION format
+            f.write(
+                "FORMAT_SECTION=SectionID,FromNodeID,FromNodeIndex,ToNodeID,ToNodeIndex,Phase,SubNetworkId\n"
+            )
 
-                    if new_bus_string != "":
-                        self.bus_string_list.append(new_bus_string)
+            # Always write the FEEDER format
+            f.write("FORMAT_FEEDER=NetworkID,HeadNodeID,CoordSet\n")
 
-                # If we get a Line object
-                #
-                if isinstance(i, Line):
-
-                    matching_list = {
-                        "overhead": overhead_string_list,
-                        "by_phase": overhead_byphase_string_list,
-                        "underground": underground_string_list,
-                        "switch": switch_string_list,
-                        "fuse": fuse_string_list,
-                        "recloser": recloser_string_list,
-                        "breaker": breaker_string_list,
-                    }
-
-                    # Empty new strings for sections and overhead lines
-                    new_section_line = ""
-                    new_line_string = ""
-                    line_type = "overhead"  # Line type is set to overhead by default
-
-                    # Name
-                    if hasattr(i, "name") and i.name is not None:
-
-                        # Get the type
-                        #
-                        # (In DiTTo, a line object can be used to represent overhead and underground lines,
-                        # as well as switches and fuses).
-                        #
-                        if hasattr(i, "line_type"):
-
-                            # if i.line_type is None:
-
-                            # Fuses and reclosers are modelled in OpenDSS as an object monitoring a line.
-                            # In RNM, this dummy line is actually a switch, meaning that we have in DiTTo
-                            # line objects where is_switch==1 AND is_fuse==1 (or is_recloser==1)
-                            # We want to output these as fuses or reclosers, not as switches
-                            # Hence the following:
-                            # if hasattr(i, 'is_fuse') and i.is_fuse==1:
-                            #    line_type='fuse'
-
-                            # elif hasattr(i, 'is_recloser') and i.is_recloser==1:
-                            #    line_type='recloser'
-                            # ONLY if line is not a fuse nor a recloser, but is a switch do we output a switch...
-                            # elif hasattr(i, 'is_switch') and i.is_switch==1:
-                            #    line_type='switch'
-
-                            if i.line_type is not None:
-                                if i.line_type.lower() == "underground":
-                                    line_type = "underground"
-
-                            if (
-                                hasattr(i, "nominal_voltage")
-                                and i.nominal_voltage is not None
-                                and i.nominal_voltage < 600
-                            ):
-                                line_type = "underground"  # for triplex lines
+            # If we have subtransmission, then write the TRANSMISSIONLINE format
+            if "subtransmission" in self.section_line_feeder_mapping:
+                f.write("FORMAT_TRANSMISSIONLINE=NetworkID,HeadNodeID,CoordSet\n")
 
-                        if hasattr(i, "is_fuse") and i.is_fuse == 1:
-                            line_type = "fuse"
+            # If we have a substation (have to have "substation in the name...),
+            # then write the SUBSTATION format
+            if self.network_have_substations:
+                f.write("FORMAT_SUBSTATION=NetworkID,HeadNodeID,CoordSet\n")
 
-                        elif hasattr(i, "is_recloser") and i.is_recloser == 1:
-                            line_type = "recloser"
+            #####################################
+            #  TO REMOVE ????????
+            ####################################
+            #
+            # k=0
+            # for source_string in source_string_list:
+            #    k+=1
+            #    f.write('FEEDER={NetID},{HeadNodeID},{coordset}\n'.format(NetID=k,HeadNodeID=source_string.split(',')[0],coordset=0))
 
-                        elif hasattr(i, "is_breaker") and i.is_breaker == 1:
-                            line_type = "breaker"
+            #    section_list=self.merge_regulators(self.section_line_list)
+            #    for section_line in section_list:
+            #        f.write(section_line+'\n')
+            #######################################
 
-                        # ONLY if line is not a fuse nor a recloser, but is a switch do we output a switch...
-                        elif hasattr(i, "is_switch") and i.is_switch == 1:
-                            line_type = "switch"
+            for f_name, section_l in self.section_line_feeder_mapping.items():
+                if "substation" in f_name:
+                    head = ""
+                else:
+                    head = model[
+                        f_name
+                    ].headnode  # self.section_headnode_mapping[f_name]
+                # If we are considering the subtransmission network, use TRANSMISSIONLINE
+                if f_name == "subtransmission":
+                    f.write(
+                        "TRANSMISSIONLINE={NetID},{HeadNodeID},{coordset}\n".format(
+                            NetID=f_name, HeadNodeID=head, coordset=1
+                        )
+                    )
+                    subnetID = ""
+                # If substation is in the name of the "feeder", then use SUBSTATION
+                elif "substation" in f_name:
+                    f.write(
+                        "SUBSTATION={NetID},{HeadNodeID},{coordset}\n".format(
+                            NetID=f_name.split("ation_")[1], HeadNodeID=head, coordset=1
+                        )
+                    )
+                    subnetID = f_name.split("ation_")[1]
+                # Otherwise, it should be an actual feeder, so use FEEDER
+                else:
+                    f.write(
+                        "FEEDER={NetID},{HeadNodeID},{coordset}\n".format(
+                            NetID=f_name, HeadNodeID=head, coordset=1
+                        )
+                    )
+                    subnetID = ""
+                # Then, write all the sections belonging to this subnetwork
+                for sec in section_l:
+                    f.write(sec + ",{}".format(subnetID) + "\n")
 
-                        # From element for sections
-                        if (
-                            hasattr(i, "from_element")
-                            and i.from_element is not None
-                            and hasattr(i, "to_element")
-                            and i.to_element is not None
-                        ):
-                            new_section_ID = "{f}_{t}".format(
-                                f=i.from_element, t=i.to_element
-                            )
-                            if hasattr(i, "feeder_name") and i.feeder_name is not None:
-                                if i.feeder_name in self.section_feeder_mapping:
-                                    while (
-                                        new_section_ID
-                                        in self.section_feeder_mapping[i.feeder_name]
-                                    ):
-                                        new_section_ID = (
-                                            new_section_ID + "*"
-                                        )  # This is used to deal with duplicate lines from same from and to nodes
-                                        if len(new_section_ID) > 64:
-                                            hasher = hashlib.sha1()
-                                            hasher.update(
-                                                new_section_ID.encode("utf-8")
-                                            )
-                                            new_section_ID = hasher.hexdigest()
-                            if len(new_section_ID) > 64:
-                                hasher = hashlib.sha1()
-                                hasher.update(new_section_ID.encode("utf-8"))
-                                new_section_ID = hasher.hexdigest()
-                            new_line_string += new_section_ID
-                            from_index = 0
-                            to_index = 0
+            # Subnetworks
+            #
+            # Use subnetworks only for substations
+            # TODO: Let the user specify what should be subnetworked...
+            #
+            if self.network_have_substations:
+                f.write("\n[SUBNETWORKS]\n")
+                f.write(
+                    "FORMAT_SUBNETWORKS=SubNetID,Angle,X,Y,Height,Length,SymbolID,SubNetTypeID,Version,SymbolReferenceSize,TextReferenceSize,CoordSet\n"
+                )
+                for f_name, section_l in self.section_line_feeder_mapping.items():
+                    if "substation" in f_name:
+                        # We need to find the X,Y coordinates for the subnetwork
+                        # (CASE 1) - First, we try setting these coordinates as the average of the LV elements.
+                        # (CASE 2) - If this does not work, we try using the average of all the substation elements.
+                        # (CASE 3) - If this does not work either, we try using the global average (all Nodes in the system), such that
+                        # the subnetwork is more or less in the middle of the system.
+                        # (CASE 4) - Finally, if nothing works, set the coordinates as (0,0)...
+                        defaultX = []
+                        defaultY = []
+                        by_nominal_voltage_X = {}
+                        by_nominal_voltage_Y = {}
+                        all_coordsX = []
+                        all_coordsY = []
+                        #
+                        # TODO: Better way to do this???
+                        #
+                        for obj in model.models:
+                            # (CASE 3) - Just append all Node's valid coordinates to all_coordsX and all_coordsY
                             if (
-                                hasattr(i, "from_element_connection_index")
-                                and i.from_element_connection_index is not None
+                                isinstance(obj, Node)
+                                and len(obj.positions) > 0
+                                and obj.positions[0] is not None
+                                and obj.positions[0].lat is not None
+                                and obj.positions[0].long is not None
                             ):
-                                from_index = i.from_element_connection_index
+                                all_coordsX.append(obj.positions[0].long)
+                                all_coordsY.append(obj.positions[0].lat)
+                            # (CASE 1) - Since we don't know what the LV value is beforehand, we store all coordinates by nominal voltage
+                            # in the dictionaries by_nominal_voltage_X and by_nominal_voltage_Y.
                             if (
-                                hasattr(i, "to_element_connection_index")
-                                and i.to_element_connection_index is not None
+                                isinstance(obj, Node)
+                                and obj.substation_name == f_name.split("ation_")[1]
+                                and obj.is_substation_connection == 1
                             ):
-                                to_index = i.to_element_connection_index
-                            new_section_line = "{id},{f},{fi},{t},{ti}".format(
-                                id=new_section_ID,
-                                f=i.from_element,
-                                fi=from_index,
-                                t=i.to_element,
-                                ti=to_index,
-                            )
-                            if hasattr(i, "feeder_name") and i.feeder_name is not None:
-                                if i.feeder_name in self.section_feeder_mapping:
-                                    self.section_feeder_mapping[i.feeder_name].append(
-                                        new_section_ID
-                                    )
+                                if obj.nominal_voltage is not None:
+                                    if (
+                                        len(obj.positions) > 0
+                                        and obj.positions[0] is not None
+                                    ):
+                                        if (
+                                            obj.positions[0].lat is not None
+                                            and obj.positions[0].long is not None
+                                        ):
+                                            if (
+                                                obj.nominal_voltage
+                                                in by_nominal_voltage_X
+                                                and obj.nominal_voltage
+                                                in by_nominal_voltage_Y
+                                            ):
+                                                by_nominal_voltage_X[
+                                                    obj.nominal_voltage
+                                                ].append(obj.positions[0].long)
+                                                by_nominal_voltage_Y[
+                                                    obj.nominal_voltage
+                                                ].append(obj.positions[0].lat)
+                                            else:
+                                                by_nominal_voltage_X[
+                                                    obj.nominal_voltage
+                                                ] = [obj.positions[0].long]
+                                                by_nominal_voltage_Y[
+                                                    obj.nominal_voltage
+                                                ] = [obj.positions[0].lat]
+                                # (CASE 2) - If the nominal voltage was None, then add the coordinates to the default list
                                 else:
-                                    self.section_feeder_mapping[i.feeder_name] = [
-                                        new_section_ID
-                                    ]
-                                if (
-                                    hasattr(i, "substation_name")
-                                    and i.substation_name is not None
-                                ):
-                                    self.section_headnode_mapping[
-                                        i.feeder_name
-                                    ] = i.substation_name
+                                    if (
+                                        len(obj.positions) > 0
+                                        and obj.positions[0] is not None
+                                    ):
+                                        if (
+                                            obj.positions[0].lat is not None
+                                            and obj.positions[0].long is not None
+                                        ):
+                                            defaultX.append(obj.positions[0].long)
+                                            defaultY.append(obj.positions[0].lat)
+                        # (CASE 1)
+                        if len(list(by_nominal_voltage_X.keys())) > 0:
+                            low_voltage = min(list(by_nominal_voltage_X.keys()))
+                            Xs = by_nominal_voltage_X[low_voltage]
+                            Ys = by_nominal_voltage_Y[low_voltage]
+                        # (CASE 2)
                         else:
-                            raise ValueError(
-                                "Line {name} does not have from and to.".format(
-                                    name=i.name
+                            Xs = defaultX
+                            Ys = defaultY
+                        # If we were able to sample some coordinates, take the average
+                        if len(Xs) > 0 and len(Ys) > 0:
+                            X = np.mean(Xs)
+                            Y = np.mean(Ys) + 50 / 2.0
+                        # (CASE 3)
+                        elif len(all_coordsX) > 0 and len(all_coordsY) > 0:
+                            X = np.mean(all_coordsX)
+                            Y = np.mean(all_coordsY)
+                        # (CASE 4) - Otherwise, set to 0,0 (best effort...)
+                        else:
+                            logger.warning(
+                                "Could not find any coordinate for substation {s}. Setting the subnetwork coordinates to (0,0)...".format(
+                                    s=f_name
                                 )
                             )
+                            X = 0
+                            Y = 0
+                        f.write(
+                            "{NetID},0,{X},{Y},{Height},{Length},-1,Geographically Referenced,-1,5,0.251957,1\n".format(
+                                NetID=f_name.split("ation_")[1],
+                                X=X,
+                                Y=Y,
+                                Height=50.00,
+                                Length=50.00,
+                            )
+                        )
 
-                        if (
-                            hasattr(i, "positions")
-                            and i.positions is not None
-                            and len(i.positions) > 0
-                        ):
-                            for seg_number, position in enumerate(i.positions):
-                                intermediate_nodes.append(
-                                    [
-                                        new_section_ID,
-                                        seg_number,
-                                        position.long,
-                                        position.lat,
-                                    ]
-                                )
-
-                        # Phases of the section
+            # Subnetwork Connections
+            #
+            # Use subnetwork connections only for substations
+            # TODO: Let the user specify what should be subnetworked
+            if self.network_have_substations:
+                f.write("\n[SUBNETWORK CONNECTIONS]\n")
+                f.write(
+                    "FORMAT_SUBNETWORKCONNECTIONS=SubNetID,NodeID,ConnectorCoordX,ConnectorCoordY\n"
+                )
+                for f_name, section_l in self.section_line_feeder_mapping.items():
+                    if "substation" in f_name:
+                        # We need to find all the connections between the subnetwork and the rest of the system
+                        # Use the "is_substation_connection" attribute of Node objects
                         #
-                        new_section_line += ","
-                        phases = []
-                        cond_id = {}
-                        if hasattr(i, "wires") and i.wires is not None:
-                            i.wires = [w for w in i.wires if w.drop != 1]
-                            for wire in i.wires:
-
-                                if hasattr(wire, "phase") and wire.phase is not None:
-                                    # Do not count the neutral(s)...
-                                    if wire.phase in ["A", "B", "C"]:
-                                        new_section_line += wire.phase
-                                        phases.append(wire.phase)
-
-                                new_code = ""
-                                if (
-                                    hasattr(wire, "diameter")
-                                    and wire.diameter is not None
-                                ):
-                                    new_code += ",{}".format(wire.diameter)
+                        # TODO: Better way to do this???
+                        for obj in model.models:
+                            if (
+                                isinstance(obj, Node)
+                                and obj.is_substation_connection == 1
+                                and obj.substation_name == f_name.split("ation_")[1]
+                            ):
+                                # We also need the coordinates of this connection.
+                                # Use the coordinates of the Node
+                                if obj.positions is not None and len(obj.positions) > 0:
+                                    X = obj.positions[0].long
+                                    Y = obj.positions[0].lat
+                                # If we don't have coordinates, then set to (0,0)....
                                 else:
-                                    new_code += ","
+                                    X = 0
+                                    Y = 0
+                                f.write(
+                                    "{NetID},{NodeID},{X},{Y}\n".format(
+                                        NetID=f_name.split("ation_")[1],
+                                        NodeID=obj.name,
+                                        X=X,
+                                        Y=Y,
+                                    )
+                                )
 
-                                if hasattr(wire, "gmr") and wire.gmr is not None:
-                                    new_code += ",{}".format(wire.gmr)
+            # Overhead lines
+            #
+            if len(overhead_string_list) > 0:
+                f.write("\n[OVERHEADLINE SETTING]\n")
+                f.write(
+                    "FORMAT_OVERHEADLINESETTING=SectionID,LineCableID,Length,ConnectionStatus\n"
+                )
+                for overhead_string in overhead_string_list:
+                    f.write(overhead_string + "\n")
 
-                                # These calculations require no neutral wire as output (since these equations assume no kron reduction)
-                                # They serve the purpose of getting the impedance matrix output in CYME to match the impedance matrix from DiTTo
-                                # NOTE: a 2x2 impedance matrix is probably derived from R1, R0, X1, X0 and isn't actually a 2-wire or even a kron reduced matrix.
-                                # To get the cross-terms to match would require a kron reduction, often of imaginary wire resistances to get the cross-terms to match
-                                # For that reason, we let CYME apply the cross terms with their default spacing. This may cause some differences in the powerflow
-                                # i.e. WARNING - 2x2 matrix cross terms won't match
+            # Overhead by phase lines
+            #
+            if len(overhead_byphase_string_list) > 0:
+                f.write("\n[OVERHEAD BYPHASE SETTING]\n")
+                f.write(
+                    "FORMAT_OVERHEADBYPHASESETTING=SectionID,DeviceNumber,CondID_A,CondID_B,CondID_C,CondID_N1,CondID_N2,SpacingID,Length,ConnectionStatus\n"
+                )
+                for overhead_byphase_string in overhead_byphase_string_list:
+                    f.write(overhead_byphase_string + "\n")
 
-                                elif wire.gmr is None and (
-                                    len(i.impedance_matrix) == 1
-                                    or len(i.impedance_matrix) == 2
-                                ):
+            # Underground lines
+            #
+            if len(underground_string_list) > 0:
+                f.write("\n[UNDERGROUNDLINE SETTING]\n")
+                f.write(
+                    "FORMAT_UNDERGROUNDLINESETTING=SectionID,LineCableID,Length,ConnectionStatus,DistanceBetweenConductors,CableConfiguration\n"
+                )
+                for underground_string in underground_string_list:
+                    f.write(underground_string + "\n")
 
-                                    if isinstance(i.impedance_matrix, list):
-                                        x_in_miles = i.impedance_matrix[0][0].imag
-                                    else:
-                                        x_in_miles = i.impedance_matrix[0].imag
-                                    x_in_miles = (
-                                        x_in_miles * 1609.34
-                                    )  # internally impedance per meter
-                                    coeff1 = 0.12134
-                                    coeff2 = 7.93402
-                                    gmr_in_feet = 1 / (
-                                        math.exp((x_in_miles / coeff1) - coeff2)
-                                    )  # Solving Kerstin 4.41 for GMR
-                                    gmr_in_cm = 30.48 * gmr_in_feet
-                                    new_code += ",{}".format(gmr_in_cm)
-                                else:
-                                    new_code += ","
-
-                                if (
-                                    hasattr(wire, "resistance")
-                                    and wire.resistance is not None
-                                ):
-                                    new_code += ",{}".format(wire.resistance)
-                                elif wire.resistance is None and (
-                                    len(i.impedance_matrix) == 1
-                                    or len(i.impedance_matrix) == 2
-                                ):  # Calculate the resistance from the impedance matrix
-                                    if isinstance(i.impedance_matrix, list):
-                                        r_in_miles = i.impedance_matrix[0][0].real
-                                    else:
-                                        r_in_miles = i.impedance_matrix[0].real
-                                    r_in_miles = (
-                                        r_in_miles * 1609.34
-                                    )  # internally impedance per meter
-                                    resistance = r_in_miles - 0.09530  # From Kersting
-                                    resistance = (
-                                        resistance / 1.60934
-                                    )  # output in ohms per km
-                                    new_code += ",{}".format(resistance)
-
-                                else:
-                                    new_code += ","
-
-                                if (
-                                    hasattr(wire, "ampacity")
-                                    and wire.ampacity is not None
-                                ):
-                                    new_code += ",{}".format(wire.ampacity)
-                                else:
-                                    new_code += ","
+            # Switches
+            #
+            if len(switch_string_list) > 0:
+                f.write("\n[SWITCH SETTING]\n")
+                f.write(
+                    "FORMAT_SWITCHSETTING=SectionID,EqID,Location,ClosedPhase,Locked,ConnectionStatus,DeviceNumber\n"
+                )
+                for switch_string in switch_string_list:
+                    f.write(switch_string + "\n")
 
-                                if (
-                                    hasattr(wire, "emergency_ampacity")
-                                    and wire.emergency_ampacity is not None
-                                ):
-                                    new_code += ",{}".format(wire.emergency_ampacity)
-                                else:
-                                    new_code += ",".format(wire.emergency_ampacity)
+            # Fuses
+            #
+            if len(fuse_string_list) > 0:
+                f.write("\n[FUSE SETTING]\n")
+                f.write(
+                    "FORMAT_FUSESETTING=SectionID,EqID,Location,ClosedPhase,Locked,ConnectionStatus,DeviceNumber\n"
+                )
+                for fuse_string in fuse_string_list:
+                    f.write(fuse_string + "\n")
 
-                                # if line_type=='underground':
-                                # If we have a name for the wire, we use it as the equipment id
-                                if (
-                                    hasattr(wire, "nameclass")
-                                    and wire.nameclass is not None
-                                    and wire.nameclass != ""
-                                ):
-                                    wire_name = wire.nameclass
-                                    # If not already in the conductors dictionary, add it
-                                    if wire_name not in self.conductors:
-                                        self.conductors[wire_name] = new_code
-                                    cond_id[wire.phase] = wire_name
-                                # If we do not have a name for the wire, we create one:
-                                # The IDs will be wire_1, wire_2,...
-                                else:
-                                    found = False
-                                    # Try to find if we already have the conductor stored
-                                    for key, value in self.conductors.items():
-                                        if value == new_code:
-                                            cond_id[wire.phase] = key
-                                            found = True
-                                    # If not, create it
-                                    if not found:
-                                        ID_cond += 1
-                                        self.conductors[
-                                            "conductor_{}".format(ID_cond)
-                                        ] = new_code
-                                        cond_id[wire.phase] = ID_cond
-
-                        # Impedance matrix
-                        #
-                        # Here, we group lines that have the same characteristics:
-                        # R0,R1,X0,X1,ampacity
-                        # We create am ID for these lines (Here a simple integer)
-                        #
-                        # If we have a switch, we just use default because there is no way (to my knowledge)
-                        # to provide the impedance matrix for a switch in CYME
-                        frequency = 60  # Need to make this changable
-                        if line_type == "switch":
-                            if (
-                                i.nameclass is not None
-                                and i.nameclass != ""
-                                and i.wires[0].ampacity is not None
-                                and i.nominal_voltage is not None
-                            ):
-                                new_code2 = "{amps},{amps},{amps},{amps},{amps},{kvll},0,,,,,,,,0,0,0,0,0,".format(
-                                    amps=i.wires[0].ampacity,
-                                    kvll=i.nominal_voltage * 10 ** -3,
-                                )
+            # Reclosers
+            #
+            if len(recloser_string_list) > 0:
+                f.write("\n[RECLOSER SETTING]\n")
+                f.write(
+                    "FORMAT_RECLOSERSETTING=SectionID,EqID,Location,ClosedPhase,Locked,ConnectionStatus,DeviceNumber\n"
+                )
+                for recloser_string in recloser_string_list:
+                    f.write(recloser_string + "\n")
 
-                                if (
-                                    i.nameclass
-                                    + "_"
-                                    + str(int(i.nominal_voltage))
-                                    + "_"
-                                    + str(int(i.wires[0].ampacity))
-                                    not in self.switchcodes
-                                ):
-                                    self.switchcodes[
-                                        i.nameclass
-                                        + "_"
-                                        + str(int(i.nominal_voltage))
-                                        + "_"
-                                        + str(int(i.wires[0].ampacity))
-                                    ] = new_code2
-                                    new_line_string += (
-                                        ","
-                                        + i.nameclass
-                                        + "_"
-                                        + str(int(i.nominal_voltage))
-                                        + "_"
-                                        + str(int(i.wires[0].ampacity))
-                                    )
+            # Breakers
+            #
+            if len(breaker_string_list) > 0:
+                f.write("\n[BREAKER SETTING]\n")
+                f.write(
+                    "FORMAT_BREAKERSETTING=SectionID,EqID,Location,ClosedPhase,Locked,ConnectionStatus,DeviceNumber\n"
+                )
+                for breaker_string in breaker_string_list:
+                    f.write(breaker_string + "\n")
 
-                                elif (
-                                    self.switchcodes[
-                                        i.nameclass
-                                        + "_"
-                                        + str(int(i.nominal_voltage))
-                                        + "_"
-                                        + str(int(i.wires[0].ampacity))
-                                    ]
-                                    != new_code2
-                                ):
-                                    found = False
-                                    for k, v in self.switchcodes.items():
-                                        if new_code2 == v:
-                                            new_line_string += "," + str(k)
-                                            found = True
-                                    if not found:
-                                        self.switchcodes[
-                                            i.nameclass
-                                            + "_"
-                                            + str(int(i.nominal_voltage))
-                                            + "_"
-                                            + str(int(i.wires[0].ampacity))
-                                        ] = new_code2
-                                        new_line_string += (
-                                            ","
-                                            + i.nameclass
-                                            + "_"
-                                            + str(int(i.nominal_voltage))
-                                            + "_"
-                                            + str(int(i.wires[0].ampacity))
-                                        )
-                                else:
-                                    new_line_string += (
-                                        ","
-                                        + i.nameclass
-                                        + "_"
-                                        + str(int(i.nominal_voltage))
-                                        + "_"
-                                        + str(int(i.wires[0].ampacity))
-                                    )
+            # Capacitors
+            #
+            if len(capacitor_string_list) > 0:
+                f.write("\n[SHUNT CAPACITOR SETTING]\n")
+                f.write(
+                    "FORMAT_SHUNTCAPACITORSETTING=SectionID,Connection,SwitchedKVARA,SwitchedKVARB,SwitchedKVARC,KV,Control,OnValueA,OnValueB,OnValueC,OffValueA,OffValueB,OffValueC,DeviceNumber,ShuntCapacitorID,Location,ConnectionStatus\n"
+                )
+                for capacitor_string in capacitor_string_list:
+                    f.write(capacitor_string + "\n")
 
-                            else:
-                                new_line_string += ",DEFAULT"
+            # Transformers
+            #
+            # 2 WINDINGS
+            #
+            if len(two_windings_transformer_string_list) > 0:
+                f.write("\n[TRANSFORMER SETTING]\n")
+                f.write(
+                    "FORMAT_TRANSFORMERSETTING=SectionID,CoordX,CoordY,Conn,PhaseON,EqID,DeviceNumber,PhaseShiftType,Location,PrimTap,SecondaryTap,ODPrimPh,ConnectionStatus,Tap,SetPoint,ControlType,LowerBandwidth,UpperBandwidth,Maxbuck,Maxboost\n"
+                )
+                for transformer_string in two_windings_transformer_string_list:
+                    f.write(transformer_string + "\n")
 
-                        elif line_type == "fuse":
-                            if (
-                                i.nameclass is not None
-                                and i.nameclass != ""
-                                and i.wires[0].ampacity is not None
-                                and i.nominal_voltage is not None
-                            ):
-                                new_code2 = "{amps},{amps},{amps},{amps},{amps},{kvll},0,600.000000,0.000000,0.000000,0.000000,0.000000,0.000000,0.000000,0.000000,0,0,0,,,,".format(
-                                    amps=i.wires[0].ampacity,
-                                    kvll=i.nominal_voltage * 10 ** -3,
-                                )
+            # 3 WINDINGS
+            #
+            if len(three_windings_transformer_string_list) > 0:
+                f.write("\n[THREE WINDING TRANSFORMER SETTING]\n")
+                f.write(
+                    "FORMAT_THREEWINDINGTRANSFORMERSETTING=SectionID,CoordX,CoordY,PrimaryBaseVoltage,SecondaryBaseVoltage,TertiaryBaseVoltage,EqID,DeviceNumber,Location,TertiaryNodeID,PrimaryFixedTapSetting,SecondaryFixedTapSetting,ConnectionStatus,Tap\n"
+                )
+                for transformer_string in three_windings_transformer_string_list:
+                    f.write(transformer_string + "\n")
 
-                                if (
-                                    i.nameclass
-                                    + "_"
-                                    + str(int(i.nominal_voltage))
-                                    + "_"
-                                    + str(int(i.wires[0].ampacity))
-                                    not in self.fusecodes
-                                ):
-                                    self.fusecodes[
-                                        i.nameclass
-                                        + "_"
-                                        + str(int(i.nominal_voltage))
-                                        + "_"
-                                        + str(int(i.wires[0].ampacity))
-                                    ] = new_code2
-                                    new_line_string += (
-                                        ","
-                                        + i.nameclass
-                                        + "_"
-                                        + str(int(i.nominal_voltage))
-                                        + "_"
-                                        + str(int(i.wires[0].ampacity))
-                                    )
+            # Regulators
+            if len(regulator_string_list) > 0:
+                # Merge the Regulators
+                regulator_string_list_merged = self.merge_regulators(
+                    regulator_string_list
+                )
+                f.write("\n[REGULATOR SETTING]\n")
+                f.write(
+                    "FORMAT_REGULATORSETTING=SectionID,CoordX,CoordY,PhaseON,BandWidth,CT,PT,VsetA,VsetB,VsetC,EqID,DeviceNumber,Location,MaxBuck,MaxBoost,SettingOption,RsetA,RsetB,RsetC,XsetA,XsetB,XsetC,TapA,TapB,TapC,ConnectionStatus\n"
+                )
+                for regulator_string in regulator_string_list_merged:
+                    f.write(regulator_string + "\n")
 
-                                elif (
-                                    self.fusecodes[
-                                        i.nameclass
-                                        + "_"
-                                        + str(int(i.nominal_voltage))
-                                        + "_"
-                                        + str(int(i.wires[0].ampacity))
-                                    ]
-                                    != new_code2
-                                ):
-                                    found = False
-                                    for k, v in self.fusecodes.items():
-                                        if new_code2 == v:
-                                            new_line_string += "," + str(k)
-                                            found = True
-                                    if not found:
-                                        self.fusecodes[
-                                            i.nameclass
-                                            + "_"
-                                            + str(int(i.nominal_voltage))
-                                            + "_"
-                                            + str(int(i.wires[0].ampacity))
-                                        ] = new_code2
-                                        new_line_string += (
-                                            ","
-                                            + i.nameclass
-                                            + "_"
-                                            + str(int(i.nominal_voltage))
-                                            + "_"
-                                            + str(int(i.wires[0].ampacity))
-                                        )
-                                else:
-                                    new_line_string += (
-                                        ","
-                                        + i.nameclass
-                                        + "_"
-                                        + str(int(i.nominal_voltage))
-                                        + "_"
-                                        + str(int(i.wires[0].ampacity))
-                                    )
+            if len(converter_string_list) > 0:
+                f.write("\n[CONVERTER]\n")
+                f.write(
+                    "FORMAT_CONVERTER=DeviceNumber,DeviceType,ConverterRating,ActivePowerRating,ReactivePowerRating,MinimumPowerFactor,PowerFallLimit,PowerRiseLimit,RiseFallUnit\n"
+                )
+                for i in converter_string_list:
+                    f.write(i)
+                    f.write("\n")
 
-                            else:
-                                new_line_string += ",DEFAULT"
+            if len(converter_control_string_list) > 0:
+                f.write("\n[CONVERTER CONTROL SETTING]\n")
+                f.write(
+                    "FORMAT_CONVERTERCONTROLSETTING=DeviceNumber,DeviceType,ControlIndex,TimeTriggerIndex,ControlType,FixedVarInjection,InjectionReference,ConverterControlID,PowerReference,PowerFactor\n"
+                )
+                for i in converter_control_string_list:
+                    f.write(i)
+                    f.write("\n")
 
-                        elif line_type == "recloser":
-                            if (
-                                i.nameclass is not None
-                                and i.nameclass != ""
-                                and i.wires[0].ampacity is not None
-                                and i.nominal_voltage is not None
-                            ):
-                                new_code2 = "{amps},{amps},{amps},{amps},{amps},{kvll},0,600.000000,0.000000,0.000000,0.000000,0.000000,0.000000,0.000000,0.000000,0,0,0,0,0,0,,1,,".format(
-                                    amps=i.wires[0].ampacity,
-                                    kvll=i.nominal_voltage * 10 ** -3,
-                                )
+            if len(pv_settings_string_list) > 0:
+                f.write("\n[PHOTOVOLTAIC SETTINGS]\n")
+                f.write(
+                    "FORMAT_PHOTOVOLTAICSETTING=SectionID,Location,DeviceNumber,EquipmentID,NS,NP,AmbientTemperature,Phase,ConstantInsolation,InsolationModelID\n"
+                )
+                for i in pv_settings_string_list:
+                    f.write(i)
+                    f.write("\n")
 
-                                if (
-                                    i.nameclass
-                                    + "_"
-                                    + str(int(i.nominal_voltage))
-                                    + "_"
-                                    + str(int(i.wires[0].ampacity))
-                                    not in self.reclosercodes
-                                ):
-                                    self.reclosercodes[
-                                        i.nameclass
-                                        + "_"
-                                        + str(int(i.nominal_voltage))
-                                        + "_"
-                                        + str(int(i.wires[0].ampacity))
-                                    ] = new_code2
-                                    new_line_string += (
-                                        ","
-                                        + i.nameclass
-                                        + "_"
-                                        + str(int(i.nominal_voltage))
-                                        + "_"
-                                        + str(int(i.wires[0].ampacity))
-                                    )
+            if len(dg_generation_string_list) > 0:
+                f.write("\n[DGGENERATIONMODEL]\n")
+                f.write(
+                    "FORMAT_DGGENERATIONMODEL=DeviceNumber,DeviceType,LoadModelName,ActiveGeneration,PowerFactor\n"
+                )
+                for i in dg_generation_string_list:
+                    f.write(i)
+                    f.write("\n")
 
-                                elif (
-                                    self.reclosercodes[
-                                        i.nameclass
-                                        + "_"
-                                        + str(int(i.nominal_voltage))
-                                        + "_"
-                                        + str(int(i.wires[0].ampacity))
-                                    ]
-                                    != new_code2
-                                ):
-                                    found = False
-                                    for k, v in self.reclosercodes.items():
-                                        if new_code2 == v:
-                                            new_line_string += "," + str(k)
-                                            found = True
-                                    if not found:
-                                        self.reclosercodes[
-                                            i.nameclass
-                                            + "_"
-                                            + str(int(i.nominal_voltage))
-                                            + "_"
-                                            + str(int(i.wires[0].ampacity))
-                                        ] = new_code2
-                                        new_line_string += (
-                                            ","
-                                            + i.nameclass
-                                            + "_"
-                                            + str(int(i.nominal_voltage))
-                                            + "_"
-                                            + str(int(i.wires[0].ampacity))
-                                        )
-                                else:
-                                    new_line_string += (
-                                        ","
-                                        + i.nameclass
-                                        + "_"
-                                        + str(int(i.nominal_voltage))
-                                        + "_"
-                                        + str(int(i.wires[0].ampacity))
-                                    )
+            if len(self.node_connector_string_list) > 0:
+                f.write("\n[NODE CONNECTOR]\n")
+                f.write("FORMAT_NODECONNECTOR=NodeID,CoordX,CoordY,SectionID\n")
+                for i in self.node_connector_string_list:
+                    f.write(i)
+                    f.write("\n")
 
-                            else:
-                                new_line_string += ",DEFAULT"
+            if len(bess_settings_string_list) > 0:
+                f.write("\n[BESS SETTINGS]\n")
+                f.write(
+                    "FORMAT_BESSSETTING=SectionID,Location,DeviceNumber,EquipmentID,Phase,InitialSOC\n"
+                )
+                for i in bess_settings_string_list:
+                    f.write(i)
+                    f.write("\n")
 
-                        elif line_type == "breaker":
-                            if (
-                                i.nameclass is not None
-                                and i.nameclass != ""
-                                and i.wires[0].ampacity is not None
-                                and i.nominal_voltage is not None
-                            ):
-                                new_code2 = "{amps},{amps},{amps},{amps},{amps},{kvll},0,600.000000,0.000000,0.000000,0.000000,0.000000,0.000000,0.000000,0.000000,0,0,0,0,0,0,".format(
-                                    amps=i.wires[0].ampacity,
-                                    kvll=i.nominal_voltage * 10 ** -3,
-                                )
+    def render_network_objects(self, model):
+        """Render the DiTTo objects of the network file.
 
-                                if (
-                                    i.nameclass
-                                    + "_"
-                                    + str(int(i.nominal_voltage))
-                                    + "_"
-                                    + str(int(i.wires[0].ampacity))
-                                    not in self.breakercodes
-                                ):
-                                    self.breakercodes[
-                                        i.nameclass
-                                        + "_"
-                                        + str(int(i.nominal_voltage))
-                                        + "_"
-                                        + str(int(i.wires[0].ampacity))
-                                    ] = new_code2
-                                    new_line_string += (
-                                        ","
-                                        + i.nameclass
-                                        + "_"
-                                        + str(int(i.nominal_voltage))
-                                        + "_"
-                                        + str(int(i.wires[0].ampacity))
-                                    )
+        When parallel is set, the objects are rendered feeder by feeder in a pool of
+        processes, and the calls to the shared methods recorded by each feeder are
+        replayed in the order of the model.
+        """
+        if not self.parallel:
+            for i in model.models:
+                self.render_network_object(i, model)
+            return
+
+        # Group the objects by feeder, in model order
+        feeder_objects = {}
+        for index, obj in enumerate(model.models):
+            feeder_name = getattr(obj, "feeder_name", None)
+            feeder_objects.setdefault(feeder_name, []).append(index)
+
+        # The workers only need the state read by the render methods
+        writer = type(self)(output_path=self.output_path)
+        writer.node_connector_string_mapping = self.node_connector_string_mapping
+        writer.transformers_to_ignore = self.transformers_to_ignore
+
+        paths = []
+        pool = multiprocessing.Pool(
+            self.processes, initializer=_init_worker, initargs=(writer, model)
+        )
+        try:
+            for path in pool.imap(_render_feeder, list(feeder_objects.values())):
+                paths.append(path)
+        except Exception:
+            for path in paths:
+                os.remove(path)
+            raise
+        finally:
+            pool.close()
+            pool.join()
+
+        for index, calls in heapq.merge(*[read_calls(path) for path in paths]):
+            self.replay(calls)
+
+    def render_network_object(self, i, model):
+        """Render a DiTTo object in the sections of the network file."""
+        if hasattr(i, "drop") and i.drop == 1:
+            return
+
+        if isinstance(i, PowerSource):
+            self.render_source(i, model)
+
+        if isinstance(i, Node):
+            self.render_node(i, model)
+
+        if isinstance(i, Line):
+            self.render_line(i, model)
+
+        if isinstance(i, Storage):
+            self.render_storage(i, model)
+
+        if isinstance(i, Photovoltaic):
+            self.render_photovoltaic(i, model)
+
+        if isinstance(i, Capacitor):
+            self.render_capacitor(i, model)
+
+        if isinstance(i, Regulator) and not (
+            hasattr(i, "ltc") and i.ltc is not None and i.ltc
+        ):
+            self.render_regulator(i, model)
+
+        if (
+            isinstance(i, PowerTransformer)
+            and (i.name not in self.transformers_to_ignore)
+        ) or (
+            isinstance(i, Regulator)
+            and (hasattr(i, "ltc") and i.ltc is not None and i.ltc == 1)
+        ):
+            self.render_transformer(i, model)
+
+    def render_source(self, i, model):
+        """Render a PowerSource object."""
+        # Check that the PowerSouce object is an external power source
+        if hasattr(i, "is_sourcebus") and i.is_sourcebus == 1:
+            # Empty new source string
+            new_source_string = ""
+            substation = {}
+            voltage = None
+
+            if hasattr(i, "connecting_element") and i.connecting_element is not None:
+                new_source_string += i.connecting_element
+                substation["connecting_element"] = i.connecting_element
+            else:
+                self.add_substation(substation)
+                return
+
+            if hasattr(i, "nominal_voltage") and i.nominal_voltage is not None:
+                new_source_string += "," + str(i.nominal_voltage * 10 ** -3)
+                voltage = str(i.nominal_voltage * 10 ** -3)
+                substation["KVLL"] = str(i.nominal_voltage * 10 ** -3)
+            elif (
+                hasattr(i, "connecting_element")
+                and i.connecting_element is not None
+                and i.connecting_element in model.model_names
+                and hasattr(model[i.connecting_element], "nominal_voltage")
+                and model[i.connecting_element].nominal_voltage is not None
+            ):
+                voltage = model[i.connecting_element].nominal_voltage
+                new_source_string += "," + str(voltage * 10 ** -3)
+                substation["KVLL"] = str(voltage * 10 ** -3)
+                voltage = str(voltage * 10 ** -3)
+            else:
+                new_source_string += ","
 
-                                elif (
-                                    self.breakercodes[
-                                        i.nameclass
-                                        + "_"
-                                        + str(int(i.nominal_voltage))
-                                        + "_"
-                                        + str(int(i.wires[0].ampacity))
-                                    ]
-                                    != new_code2
-                                ):
-                                    found = False
-                                    for k, v in self.breakercodes.items():
-                                        if new_code2 == v:
-                                            new_line_string += "," + str(k)
-                                            found = True
-                                    if not found:
-                                        self.breakercodes[
-                                            i.nameclass
-                                            + "_"
-                                            + str(int(i.nominal_voltage))
-                                            + "_"
-                                            + str(int(i.wires[0].ampacity))
-                                        ] = new_code2
-                                        new_line_string += (
-                                            ","
-                                            + i.nameclass
-                                            + "_"
-                                            + str(int(i.nominal_voltage))
-                                            + "_"
-                                            + str(int(i.wires[0].ampacity))
-                                        )
-                                else:
-                                    new_line_string += (
-                                        ","
-                                        + i.nameclass
-                                        + "_"
-                                        + str(int(i.nominal_voltage))
-                                        + "_"
-                                        + str(int(i.wires[0].ampacity))
-                                    )
+            if hasattr(i, "phase_angle") and i.phase_angle is not None:
+                new_source_string += "," + str(i.phase_angle)
+                new_source_string += "," + str(i.phase_angle - 120)
+                new_source_string += "," + str(i.phase_angle + 120)
+                substation["phase_angle"] = str(i.phase_angle)
+            else:
+                new_source_string += ",,,"
+
+            if (
+                hasattr(i, "positive_sequence_impedance")
+                and i.positive_sequence_impedance is not None
+            ):
+                new_source_string += (
+                    ","
+                    + str(i.positive_sequence_impedance.real)
+                    + ","
+                    + str(i.positive_sequence_impedance.imag)
+                )
+                substation["R1"] = str(i.positive_sequence_impedance.real)
+                substation["X1"] = str(i.positive_sequence_impedance.imag)
+            else:
+                new_source_string += ",,"
+
+            if (
+                hasattr(i, "zero_sequence_impedance")
+                and i.zero_sequence_impedance is not None
+            ):
+                new_source_string += (
+                    ","
+                    + str(i.zero_sequence_impedance.real)
+                    + ","
+                    + str(i.zero_sequence_impedance.imag)
+                )
+                substation["R0"] = str(i.zero_sequence_impedance.real)
+                substation["X0"] = str(i.zero_sequence_impedance.imag)
+            else:
+                new_source_string += ",,"
+
+            if (
+                hasattr(i, "negative_sequence_impedance")
+                and i.negative_sequence_impedance is not None
+            ):
+                new_source_string += (
+                    ","
+                    + str(i.negative_sequence_impedance.real)
+                    + ","
+                    + str(i.negative_sequence_impedance.imag)
+                )
+            elif (
+                hasattr(i, "zero_sequence_impedance")
+                and i.zero_sequence_impedance is not None
+            ):
+                new_source_string += (
+                    ","
+                    + str(i.zero_sequence_impedance.real)
+                    + ","
+                    + str(i.zero_sequence_impedance.imag)
+                )
+            else:
+                new_source_string += ",,"
 
-                            else:
-                                new_line_string += ",DEFAULT"
+            # OperatingVoltages
+            try:
+                new_source_string += ",{v},{v},{v},0".format(
+                    v=i.nominal_voltage * 10 ** -3
+                )
+            except:
+                new_source_string += ",,,,0"
+                pass
 
-                        elif line_type == "underground":
-                            tt = {}
-                            if (
-                                hasattr(i, "nominal_voltage")
-                                and i.nominal_voltage is not None
-                            ):
-                                if (
-                                    i.nominal_voltage is not None
-                                    and i.nominal_voltage < 600
-                                    and len(i.wires) <= 2
-                                ):  # LV lines are assigned as triplex unless they're three phase
-                                    tt["cabletype"] = 2
-                                else:
-                                    tt["cabletype"] = 0
+            if hasattr(i, "rated_power") and i.rated_power is not None:
+                substation["MVA"] = str(i.rated_power * 10 ** -6)
 
-                            else:
-                                tt["cabletype"] = 0
+            self.add_source(i.connecting_element, voltage)
+            self.add_substation(substation)
 
-                            if (
-                                hasattr(i, "impedance_matrix")
-                                and i.impedance_matrix is not None
-                            ):
-                                z_diag = 0
-                                z_offdiag = 0
-                                try:
-                                    for kk in range(len(i.impedance_matrix)):
-                                        if i.impedance_matrix[kk][kk] != 0:
-                                            z_diag = i.impedance_matrix[kk][kk]
-                                            for jj in range(len(i.impedance_matrix)):
-                                                if jj == kk:
-                                                    continue
-                                                if i.impedance_matrix[kk][jj] != 0:
-                                                    z_offdiag = i.impedance_matrix[kk][
-                                                        jj
-                                                    ]
+            if new_source_string != "":
+                self.append_line("source", new_source_string)
 
-                                except:
-                                    try:
-                                        z_diag = i.impedance_matrix[0]
-                                        z_offdiag = i.impedance_matrix[0]
-                                    except:
-                                        raise ValueError(
-                                            "Cannot get a value from impedance matrix for line {}".format(
-                                                i.name
-                                            )
-                                        )
-                                coeff = 10 ** 3
-                                z0 = z_diag + 2 * z_offdiag
-                                z1 = z_diag - z_offdiag
+    def render_node(self, i, model):
+        """Render a Node object."""
 
-                                tt["R0"] = z0.real * coeff
-                                tt["X0"] = z0.imag * coeff
-                                try:
-                                    pos_seq_imp = i.impedance_matrix[1][1]
-                                    tt["R1"] = z1.real * coeff
-                                    tt["X1"] = z1.imag * coeff
-                                except:
-                                    tt["R1"] = tt["R0"]
-                                    tt["X1"] = tt["X0"]
-                                    pass
-                                try:
-                                    neg_seq_imp = i.impedance_matrix[2][2]
-                                    tt["R2"] = z1.real * coeff
-                                    tt["X2"] = z1.imag * coeff
-                                except:
-                                    tt["R2"] = tt["R1"]
-                                    tt["X2"] = tt["X1"]
-                                    pass
+        # Empty new node string
+        new_node_string = ""
 
-                                if (
-                                    hasattr(i, "capacitance_matrix")
-                                    and i.capacitance_matrix is not None
-                                ):
-                                    c_diag = 0
-                                    c_offdiag = 0
-                                    try:
-                                        for kk in range(len(i.impedance_matrix)):
-                                            if i.capacitance_matrix[kk][kk] != 0:
-                                                c_diag = i.capacitance_matrix[kk][kk]
-                                                for jj in range(
-                                                    len(i.capacitance_matrix)
-                                                ):
-                                                    if jj == kk:
-                                                        continue
-                                                    if (
-                                                        i.capacitance_matrix[kk][jj]
-                                                        != 0
-                                                    ):
-                                                        c_offdiag = i.capacitance_matrix[
-                                                            kk
-                                                        ][
-                                                            jj
-                                                        ]
+        # Empty new bus string (for bus representations of nodes with two coords)
+        new_bus_string = ""
 
-                                    except:
-                                        try:
-                                            c_diag = i.capacitance_matrix[0]
-                                            c_offdiag = i.capacitance_matrix[0]
-                                        except:
-                                            import pdb
-
-                                            pdb.set_trace()
-                                            raise ValueError(
-                                                "Cannot get a value from impedance matrix for line {}".format(
-                                                    i.name
-                                                )
-                                            )
-                                    coeff = 10 ** 3
-                                    c0 = c_diag + 2 * c_offdiag
-                                    c1 = c_diag - c_offdiag
+        # Name
+        if hasattr(i, "name") and i.name is not None:
+            self.add_node_ID(i.name)
+        else:
+            return
+
+        # CoordX and CoordY
+        if (
+            hasattr(i, "positions")
+            and i.positions is not None
+            and len(i.positions) == 1
+        ):
+            new_node_string += i.name
+            try:
+                new_node_string += "," + str(i.positions[0].long)
+            except:
+                new_node_string += ",0"
+                pass
+
+            try:
+                new_node_string += "," + str(i.positions[0].lat)
+            except:
+                new_node_string += ",0"
+                pass
+        elif (
+            hasattr(i, "positions")
+            and i.positions is not None
+            and len(i.positions) >= 2
+        ):
+            new_bus_string += i.name
+            try:
+                new_bus_string += "," + str(i.positions[0].long)
+            except:
+                new_bus_string += ",0"
+                pass
+
+            try:
+                new_bus_string += "," + str(i.positions[0].lat)
+            except:
+                new_bus_string += ",0"
+                pass
+
+            try:
+                new_bus_string += "," + str(i.positions[-1].long)
+            except:
+                new_bus_string += ",0"
+                pass
+
+            try:
+                new_bus_string += "," + str(i.positions[-1].lat)
+            except:
+                new_bus_string += ",0"
+                pass
+            new_bus_string += ",2"  # Set width of 2
+            for j in range(1, len(i.positions) - 1):
+                sectionid = ""
+                if (i.name, j - 1) in self.node_connector_string_mapping:
+                    sectionid = self.node_connector_string_mapping[(i.name, j - 1)]
+                new_node_connector_string = "{n},{x},{y},{s}".format(
+                    n=i.name, x=i.positions[j].long, y=i.positions[j].lat, s=sectionid,
+                )
+                self.append_line("node_connector", new_node_connector_string)
 
-                                    tt["B0"] = (
-                                        c0.real * 2 * math.pi * frequency
-                                    )  # Don't multiply by km conversion since cyme output in micro siemens
-                                    tt["B1"] = c1.real * 2 * math.pi * frequency  #
+        else:
+            new_node_string += i.name
+            new_node_string += ",0,0"
+
+        # Add the node string to the list
+        if new_node_string != "":
+            self.append_line("node", new_node_string)
+
+        if new_bus_string != "":
+            self.append_line("bus", new_bus_string)
+
+    def render_line(self, i, model):
+        """Render a Line object."""
+
+        matching_list = {
+            "overhead": "overhead",
+            "by_phase": "overhead_byphase",
+            "underground": "underground",
+            "switch": "switch",
+            "fuse": "fuse",
+            "recloser": "recloser",
+            "breaker": "breaker",
+        }
 
-                                else:
-                                    tt["B1"] = 0
-                                    tt["B0"] = 0
-                                try:
-                                    tt["amps"] = i.wires[0].ampacity
-                                except:
-                                    tt["amps"] = 0
-                                    pass
+        # Empty new strings for sections and overhead lines
+        new_section_line = ""
+        new_line_string = ""
+        line_type = "overhead"  # Line type is set to overhead by default
 
-                                if (
-                                    hasattr(i.wires[0], "nameclass")
-                                    and i.wires[0].nameclass is not None
-                                    and i.wires[0].nameclass != ""
-                                ):
-                                    cable_name = i.wires[0].nameclass
-                                    self.cablecodes[cable_name] = tt
-                                    new_line_string += "," + cable_name
-                                else:
-                                    if len(self.cablecodes) == 0:
-                                        ID_cable += 1
-                                        self.cablecodes["cable" + str(ID_cable)] = tt
-                                        new_line_string += ",cable_" + str(ID_cable)
-                                    else:
-                                        found = False
-                                        for k, v in self.cablecodes.items():
-                                            if v == tt:
-                                                new_line_string += ",cable_" + str(k)
-                                                found = True
-                                        if not found:
-                                            ID_cable += 1
-                                            self.cablecodes[
-                                                "cable" + str(ID_cable)
-                                            ] = tt
-                                            new_line_string += ",cable_" + str(ID_cable)
-
-                        else:  # We use impedance_matrix if it exists and we have 3 phases. otherwise we use by_phase. TODO: change to by_phase whenever we have the wire information for it.
-                            # try:
-                            tt = {}
-                            if "A" in cond_id:
-                                tt["CondID_A"] = cond_id["A"]
-                            else:
-                                tt["CondID_A"] = "NONE"
-                            if "B" in cond_id:
-                                tt["CondID_B"] = cond_id["B"]
-                            else:
-                                tt["CondID_B"] = "NONE"
-                            if "C" in cond_id:
-                                tt["CondID_C"] = cond_id["C"]
-                            else:
-                                tt["CondID_C"] = "NONE"
-                            if "N" in cond_id:
-                                tt["CondID_N"] = cond_id["N"]
-                            else:
-                                tt["CondID_N"] = "NONE"
-                            if "N1" in cond_id:
-                                tt["CondID_N1"] = cond_id["N1"]
-                            else:
-                                tt["CondID_N1"] = "NONE"
-                            if "N2" in cond_id:
-                                tt["CondID_N2"] = cond_id["N2"]
-                            else:
-                                tt["CondID_N2"] = "NONE"
-
-                            if hasattr(i, "wires") and i.wires is not None:
-                                for wire in i.wires:
-                                    if hasattr(wire, "phase") and str(wire.phase) in [
-                                        "A",
-                                        "B",
-                                        "C",
-                                    ]:
-                                        p = str(wire.phase)
-                                        if (
-                                            hasattr(wire, "ampacity")
-                                            and wire.ampacity is not None
-                                        ):
-                                            try:
-                                                tt["Amps{}".format(p)] = wire.ampacity
-                                            except:
-                                                tt["Amps{}".format(p)] = "DEFAULT"
-                                                pass
+        # Name
+        if hasattr(i, "name") and i.name is not None:
 
-                            # If we have 3 phases, use OVERHEADLINE SETTING
-                            if len(phases) == 3 and i.impedance_matrix is not None:
+            # Get the type
+            #
+            # (In DiTTo, a line object can be used to represent overhead and underground lines,
+            # as well as switches and fuses).
+            #
+            if hasattr(i, "line_type"):
 
-                                tt.update(
-                                    {"SpacingID": "DEFAULT", "UserDefinedImpedances": 1}
-                                )
+                # if i.line_type is None:
 
-                                for k, p1 in enumerate(phases):
-                                    for j, p2 in enumerate(phases):
-                                        if j == k:
-                                            tt["R{p}".format(p=p1)] = (
-                                                i.impedance_matrix[k][j].real * 10 ** 3
-                                            )
-                                            tt["X{p}".format(p=p1)] = (
-                                                i.impedance_matrix[k][j].imag * 10 ** 3
-                                            )
-                                            if i.capacitance_matrix is not None and len(
-                                                i.capacitance_matrix
-                                            ) == len(i.impedance_matrix):
-                                                tt["B{p}".format(p=p1)] = (
-                                                    i.capacitance_matrix[k][j].real
-                                                    * 2
-                                                    * math.pi
-                                                    * frequency
-                                                    * 10 ** 3
-                                                )
-                                            else:
-                                                tt["Ba"] = 0
-                                                tt["Bb"] = 0
-                                                tt["Bc"] = 0
-                                        elif j > k:
-                                            if p1 == "A" and p2 == "C":
-                                                tt["MutualResistanceCA"] = (
-                                                    i.impedance_matrix[k][j].real
-                                                    * 10 ** 3
-                                                )
-                                                tt["MutualReactanceCA"] = (
-                                                    i.impedance_matrix[k][j].imag
-                                                    * 10 ** 3
-                                                )
-                                                if i.capacitance_matrix is not None and len(
-                                                    i.capacitance_matrix
-                                                ) == len(
-                                                    i.impedance_matrix
-                                                ):
-                                                    tt["MutualShuntSusceptanceCA"] = (
-                                                        i.capacitance_matrix[k][j].real
-                                                        * 2
-                                                        * math.pi
-                                                        * frequency
-                                                        * 10 ** 3
-                                                    )
-                                                else:
-                                                    tt["MutualShuntSusceptanceCA"] = 0
-                                            else:
-                                                tt[
-                                                    "MutualResistance{p1}{p2}".format(
-                                                        p1=p1, p2=p2
-                                                    )
-                                                ] = (
-                                                    i.impedance_matrix[k][j].real
-                                                    * 10 ** 3
-                                                )
-                                                tt[
-                                                    "MutualReactance{p1}{p2}".format(
-                                                        p1=p1, p2=p2
-                                                    )
-                                                ] = (
-                                                    i.impedance_matrix[k][j].imag
-                                                    * 10 ** 3
-                                                )
-                                                if i.capacitance_matrix is not None and len(
-                                                    i.capacitance_matrix
-                                                ) == len(
-                                                    i.impedance_matrix
-                                                ):
-                                                    tt[
-                                                        "MutualShuntSusceptance{p1}{p2}".format(
-                                                            p1=p1, p2=p2
-                                                        )
-                                                    ] = (
-                                                        i.capacitance_matrix[k][j].real
-                                                        * 2
-                                                        * math.pi
-                                                        * frequency
-                                                        * 10 ** 3
-                                                    )
-                                                else:
-                                                    tt["MutualShuntSusceptanceAB"] = 0
-                                                    tt["MutualShuntSusceptanceBC"] = 0
+                # Fuses and reclosers are modelled in OpenDSS as an object monitoring a line.
+                # In RNM, this dummy line is actually a switch, meaning that we have in DiTTo
+                # line objects where is_switch==1 AND is_fuse==1 (or is_recloser==1)
+                # We want to output these as fuses or reclosers, not as switches
+                # Hence the following:
+                # if hasattr(i, 'is_fuse') and i.is_fuse==1:
+                #    line_type='fuse'
 
-                                if (
-                                    hasattr(i, "nameclass")
-                                    and i.nameclass is not None
-                                    and i.nameclass != ""
-                                ):
-                                    line_nameclass = i.nameclass
-                                    self.linecodes_overhead[line_nameclass] = tt
-                                    new_line_string += "," + line_nameclass
-                                else:
-                                    # If the linecode dictionary is empty, just add the new element
-                                    if len(self.linecodes_overhead) == 0:
-                                        ID += 1
-                                        self.linecodes_overhead[ID] = tt
-                                        new_line_string += ",line_" + str(ID)
+                # elif hasattr(i, 'is_recloser') and i.is_recloser==1:
+                #    line_type='recloser'
+                # ONLY if line is not a fuse nor a recloser, but is a switch do we output a switch...
+                # elif hasattr(i, 'is_switch') and i.is_switch==1:
+                #    line_type='switch'
 
-                                    # Otherwise, loop over the dict to find a matching linecode
-                                    else:
-                                        found = False
-                                        for k, v in self.linecodes_overhead.items():
-                                            if v == tt:
-                                                new_line_string += "," + str(k)
-                                                found = True
-                                        if not found:
-                                            ID += 1
-                                            self.linecodes_overhead[
-                                                "line_" + str(ID)
-                                            ] = tt
-                                            new_line_string += ",line_" + str(ID)
-
-                            # If we have less than 3 phases, then use a BY_PHASE configuration
-                            else:
-                                line_type = "by_phase"  # Change the line_type to write the line under the proper header
-
-                                # Add device number and phase conductor IDs
-                                new_line_string += ",{device},{condIDA},{condIDB},{condIDC}".format(
-                                    device=new_section_ID,
-                                    condIDA=tt["CondID_A"],
-                                    condIDB=tt["CondID_B"],
-                                    condIDC=tt["CondID_C"],
-                                )
+                if i.line_type is not None:
+                    if i.line_type.lower() == "underground":
+                        line_type = "underground"
 
-                                # Add neutral conductor IDs
-                                #
-                                # If we have valid IDs for BOTH N1 and N2, then use that
-                                if (
-                                    tt["CondID_N1"] != "NONE"
-                                    and tt["CondID_N2"] != "NONE"
-                                ):
-                                    new_line_string += ",{condIDN1},{condIDN2}".format(
-                                        condIDN1=tt["CondID_N1"],
-                                        condIDN2=tt["CondID_N2"],
-                                    )
-                                # Otherwise, if we have a valid ID for N, then use that as condIDN1 and use whatever we have for N2
-                                elif tt["CondID_N"] != "NONE":
-                                    new_line_string += ",{condIDN1},{condIDN2}".format(
-                                        condIDN1=tt["CondID_N"],
-                                        condIDN2=tt["CondID_N2"],
-                                    )
-                                # Otherwise, do as for case 1
-                                else:
-                                    new_line_string += ",{condIDN1},{condIDN2}".format(
-                                        condIDN1=tt["CondID_N1"],
-                                        condIDN2=tt["CondID_N2"],
-                                    )
+                if (
+                    hasattr(i, "nominal_voltage")
+                    and i.nominal_voltage is not None
+                    and i.nominal_voltage < 600
+                ):
+                    line_type = "underground"  # for triplex lines
+
+            if hasattr(i, "is_fuse") and i.is_fuse == 1:
+                line_type = "fuse"
+
+            elif hasattr(i, "is_recloser") and i.is_recloser == 1:
+                line_type = "recloser"
+
+            elif hasattr(i, "is_breaker") and i.is_breaker == 1:
+                line_type = "breaker"
+
+            # ONLY if line is not a fuse nor a recloser, but is a switch do we output a switch...
+            elif hasattr(i, "is_switch") and i.is_switch == 1:
+                line_type = "switch"
+
+            # From element for sections
+            if (
+                hasattr(i, "from_element")
+                and i.from_element is not None
+                and hasattr(i, "to_element")
+                and i.to_element is not None
+            ):
+                new_section_ID = self.add_line_section_ID(
+                    "{f}_{t}".format(f=i.from_element, t=i.to_element),
+                    getattr(i, "feeder_name", None),
+                    getattr(i, "substation_name", None),
+                )
+                new_line_string += new_section_ID
+                from_index = 0
+                to_index = 0
+                if (
+                    hasattr(i, "from_element_connection_index")
+                    and i.from_element_connection_index is not None
+                ):
+                    from_index = i.from_element_connection_index
+                if (
+                    hasattr(i, "to_element_connection_index")
+                    and i.to_element_connection_index is not None
+                ):
+                    to_index = i.to_element_connection_index
+                new_section_line = "{id},{f},{fi},{t},{ti}".format(
+                    id=new_section_ID,
+                    f=i.from_element,
+                    fi=from_index,
+                    t=i.to_element,
+                    ti=to_index,
+                )
+            else:
+                raise ValueError(
+                    "Line {name} does not have from and to.".format(name=i.name)
+                )
 
-                                # Use Default spacing
-                                #
-                                # TODO: User-defined spacing support
-                                #
-                                if len(phases) == 1:
-                                    new_line_string += ",N_ABOVE_1PH"
-                                if len(phases) == 2:
-                                    new_line_string += ",N_ABOVE_2PH"
-                                if len(phases) == 3:
-                                    new_line_string += ",N_ABOVE_3PH"
-
-                        # Length
-                        if hasattr(i, "length") and i.length is not None:
-                            if (
-                                line_type != "switch"
-                                and line_type != "fuse"
-                                and line_type != "recloser"
-                                and line_type != "breaker"
-                            ):
-                                try:
-                                    new_line_string += "," + str(i.length)
-                                except:
-                                    new_line_string += ","
-                                    pass
-                        else:
-                            if (
-                                line_type != "switch"
-                                and line_type != "fuse"
-                                and line_type != "recloser"
-                                and line_type != "breaker"
-                            ):
-                                new_line_string += ","
-
-                        if line_type == "switch" or line_type == "breaker":
-                            closed_phase = np.sort(
-                                [
-                                    wire.phase
-                                    for wire in i.wires
-                                    if wire.is_open == 0
-                                    and wire.phase not in ["N", "N1", "N2"]
-                                ]
-                            )
-                            if len(closed_phase) == 0:
-                                new_line_string += ",M,None,0"
-                            else:
-                                new_line_string += ",M,{},0".format(
-                                    reduce(lambda x, y: x + y, closed_phase)
-                                )
+            if (
+                hasattr(i, "positions")
+                and i.positions is not None
+                and len(i.positions) > 0
+            ):
+                for seg_number, position in enumerate(i.positions):
+                    self.append_line(
+                        "intermediate_node",
+                        "{},{},{},{}".format(
+                            new_section_ID, seg_number, position.long, position.lat
+                        ),
+                    )
 
-                        if line_type == "fuse" or line_type == "recloser":
-                            closed_phase = np.sort(
-                                [
-                                    wire.phase
-                                    for wire in i.wires
-                                    if wire.phase not in ["N", "N1", "N2"]
-                                ]
-                            )
-                            new_line_string += ",M,{},0".format(
-                                reduce(lambda x, y: x + y, closed_phase)
-                            )
+            # Phases of the section
+            #
+            new_section_line += ","
+            phases = []
+            cond_id = {}
+            if hasattr(i, "wires") and i.wires is not None:
+                i.wires = [w for w in i.wires if w.drop != 1]
+                for wire in i.wires:
+
+                    if hasattr(wire, "phase") and wire.phase is not None:
+                        # Do not count the neutral(s)...
+                        if wire.phase in ["A", "B", "C"]:
+                            new_section_line += wire.phase
+                            phases.append(wire.phase)
+
+                    new_code = ""
+                    if hasattr(wire, "diameter") and wire.diameter is not None:
+                        new_code += ",{}".format(wire.diameter)
+                    else:
+                        new_code += ","
 
-                        # ConnectionStatus
-                        new_line_string += ",0"  # Assumes the line is connected because there is no connected field in DiTTo
+                    if hasattr(wire, "gmr") and wire.gmr is not None:
+                        new_code += ",{}".format(wire.gmr)
 
-                        # DeviceNumber
-                        if (
-                            line_type == "switch"
-                            or line_type == "fuse"
-                            or line_type == "recloser"
-                            or line_type == "breaker"
-                        ):
-                            new_line_string += "," + new_section_ID
+                    # These calculations require no neutral wire as output (since these equations assume no kron reduction)
+                    # They serve the purpose of getting the impedance matrix output in CYME to match the impedance matrix from DiTTo
+                    # NOTE: a 2x2 impedance matrix is probably derived from R1, R0, X1, X0 and isn't actually a 2-wire or even a kron reduced matrix.
+                    # To get the cross-terms to match would require a kron reduction, often of imaginary wire resistances to get the cross-terms to match
+                    # For that reason, we let CYME apply the cross terms with their default spacing. This may cause some differences in the powerflow
+                    # i.e. WARNING - 2x2 matrix cross terms won't match
 
-                        if line_type == "underground":
-                            new_line_string += (
-                                ",10,2"  # DistanceBetweenConductors, CableConfiguration
-                            )
+                    elif wire.gmr is None and (
+                        len(i.impedance_matrix) == 1 or len(i.impedance_matrix) == 2
+                    ):
 
-                        # Add the strings to the lists
-                        #
-                        if new_section_line != "":
-                            self.section_line_list.append(new_section_line)
-                            # If the object is inside of a substation...
-                            if hasattr(i, "is_substation") and i.is_substation == 1:
-                                # ...it should have the name of the substation specified in the 'substation_name' attribute
-                                if (
-                                    hasattr(i, "substation_name")
-                                    and i.substation_name is not None
-                                    and i.substation_name != ""
-                                ):
-                                    # Add 'substation_' prefix to easily distinguish substation from feeders or transmission lines
-                                    ff_name = "substation_{}".format(i.substation_name)
-                                    self.network_have_substations = True
-                            # If the object is not inside of a substation, then use the feeder_name attribute if it exists
-                            elif (
-                                hasattr(i, "feeder_name")
-                                and i.feeder_name is not None
-                                and i.feeder_name != ""
-                            ):
-                                ff_name = i.feeder_name
+                        if isinstance(i.impedance_matrix, list):
+                            x_in_miles = i.impedance_matrix[0][0].imag
+                        else:
+                            x_in_miles = i.impedance_matrix[0].imag
+                        x_in_miles = (
+                            x_in_miles * 1609.34
+                        )  # internally impedance per meter
+                        coeff1 = 0.12134
+                        coeff2 = 7.93402
+                        gmr_in_feet = 1 / (
+                            math.exp((x_in_miles / coeff1) - coeff2)
+                        )  # Solving Kerstin 4.41 for GMR
+                        gmr_in_cm = 30.48 * gmr_in_feet
+                        new_code += ",{}".format(gmr_in_cm)
+                    else:
+                        new_code += ","
+
+                    if hasattr(wire, "resistance") and wire.resistance is not None:
+                        new_code += ",{}".format(wire.resistance)
+                    elif wire.resistance is None and (
+                        len(i.impedance_matrix) == 1 or len(i.impedance_matrix) == 2
+                    ):  # Calculate the resistance from the impedance matrix
+                        if isinstance(i.impedance_matrix, list):
+                            r_in_miles = i.impedance_matrix[0][0].real
+                        else:
+                            r_in_miles = i.impedance_matrix[0].real
+                        r_in_miles = (
+                            r_in_miles * 1609.34
+                        )  # internally impedance per meter
+                        resistance = r_in_miles - 0.09530  # From Kersting
+                        resistance = resistance / 1.60934  # output in ohms per km
+                        new_code += ",{}".format(resistance)
 
-                            if ff_name in self.section_line_feeder_mapping:
-                                self.section_line_feeder_mapping[ff_name].append(
-                                    new_section_line
-                                )
-                            else:
-                                self.section_line_feeder_mapping[ff_name] = [
-                                    new_section_line
-                                ]
+                    else:
+                        new_code += ","
 
-                        if new_line_string != "":
-                            try:
-                                matching_list[line_type].append(new_line_string)
-                            except:
-                                pass
+                    if hasattr(wire, "ampacity") and wire.ampacity is not None:
+                        new_code += ",{}".format(wire.ampacity)
+                    else:
+                        new_code += ","
 
-                if isinstance(i, Storage):
-                    bess_string = ""
-                    new_bess_setting_string = ""
-                    new_converter_string = ""
-                    new_converter_control_setting_string = ""
+                    if (
+                        hasattr(wire, "emergency_ampacity")
+                        and wire.emergency_ampacity is not None
+                    ):
+                        new_code += ",{}".format(wire.emergency_ampacity)
+                    else:
+                        new_code += ",".format(wire.emergency_ampacity)
 
+                    # if line_type=='underground':
+                    # If we have a name for the wire, we use it as the equipment id
                     if (
-                        hasattr(i, "name")
-                        and i.name is not None
-                        and hasattr(i, "connecting_element")
-                        and i.connecting_element is not None
-                        and (
-                            i.connecting_element in model.model_names
-                            or "load_" + i.connecting_element in model.model_names
-                        )
+                        hasattr(wire, "nameclass")
+                        and wire.nameclass is not None
+                        and wire.nameclass != ""
                     ):
-                        new_section_ID = "{f}_{t}".format(
-                            f=i.connecting_element, t=i.name
-                        )
-                        if len(new_section_ID) > 64:
-                            hasher = hashlib.sha1()
-                            hasher.update(new_section_ID.encode("utf-8"))
-                            new_section_ID = hasher.hexdigest()
+                        wire_name = wire.nameclass
+                        # If not already in the conductors dictionary, add it
+                        self.add_conductor(wire_name, new_code)
+                        cond_id[wire.phase] = wire_name
+                    # If we do not have a name for the wire, we create one:
+                    # The IDs will be wire_1, wire_2,...
+                    else:
+                        cond_id[wire.phase] = self.conductor_ID(new_code)
 
-                        new_section = (
-                            new_section_ID
-                            + ",{f},0,{t},0,".format(  # Assume only one index for the load connection point
-                                f=i.connecting_element, t=i.name
-                            )
-                        )
+            # Impedance matrix
+            #
+            # Here, we group lines that have the same characteristics:
+            # R0,R1,X0,X1,ampacity
+            # We create am ID for these lines (Here a simple integer)
+            #
+            # If we have a switch, we just use default because there is no way (to my knowledge)
+            # to provide the impedance matrix for a switch in CYME
+            frequency = 60  # Need to make this changable
+            if line_type == "switch":
+                if (
+                    i.nameclass is not None
+                    and i.nameclass != ""
+                    and i.wires[0].ampacity is not None
+                    and i.nominal_voltage is not None
+                ):
+                    new_code2 = "{amps},{amps},{amps},{amps},{amps},{kvll},0,,,,,,,,0,0,0,0,0,".format(
+                        amps=i.wires[0].ampacity, kvll=i.nominal_voltage * 10 ** -3,
+                    )
 
-                        new_node_string = "{n}".format(n=i.name)
-                        if hasattr(i, "positions") and i.positions is not None:
-                            try:
-                                new_node_string += "," + str(i.positions[0].long)
-                            except:
-                                new_node_string += ",0"
-                                pass
+                    new_line_string += "," + self.protective_device_IDs(
+                        "switchcodes",
+                        i.nameclass
+                        + "_"
+                        + str(int(i.nominal_voltage))
+                        + "_"
+                        + str(int(i.wires[0].ampacity)),
+                        new_code2,
+                    )
 
-                            try:
-                                new_node_string += "," + str(i.positions[0].lat)
-                            except:
-                                new_node_string += ",0"
-                                pass
-                        else:
-                            new_node_string += ",0,0"
-                        self.node_string_list.append(new_node_string)
-
-                        phases = ""
-                        if i.phase_storages is not None:
-                            for ps in i.phase_storages:
-                                if ps.phase in ["A", "B", "C"]:
-                                    new_section += ps.phase
-                                    phases += ps.phase
-
-                        # If the object is inside of a substation...
-                        if hasattr(i, "is_substation") and i.is_substation == 1:
-                            # ...it should have the name of the substation specified in the 'substation_name' attribute
-                            if (
-                                hasattr(i, "substation_name")
-                                and i.substation_name is not None
-                                and i.substation_name != ""
-                            ):
-                                # Add 'substation_' prefix to easily distinguish substation from feeders or transmission lines
-                                ff_name = "substation_{}".format(i.substation_name)
-                                self.network_have_substations = True
-
-                        # If the object is not inside of a substation, then use the feeder_name attribute if it exists
-                        elif (
-                            hasattr(i, "feeder_name")
-                            and i.feeder_name is not None
-                            and i.feeder_name != ""
-                        ):
-                            ff_name = i.feeder_name
+                else:
+                    new_line_string += ",DEFAULT"
 
-                        self.section_line_list.append(new_section)
-                        if ff_name in self.section_line_feeder_mapping:
-                            self.section_line_feeder_mapping[ff_name].append(
-                                new_section
-                            )
-                        else:
-                            self.section_line_feeder_mapping[ff_name] = [new_section]
+            elif line_type == "fuse":
+                if (
+                    i.nameclass is not None
+                    and i.nameclass != ""
+                    and i.wires[0].ampacity is not None
+                    and i.nominal_voltage is not None
+                ):
+                    new_code2 = "{amps},{amps},{amps},{amps},{amps},{kvll},0,600.000000,0.000000,0.000000,0.000000,0.000000,0.000000,0.000000,0.000000,0,0,0,,,,".format(
+                        amps=i.wires[0].ampacity, kvll=i.nominal_voltage * 10 ** -3,
+                    )
 
-                        new_converter_string += (
-                            new_section_ID + ",80,"
-                        )  # 45 is the CYME code for PV devices
-                        new_converter_control_setting_string += (
-                            new_section_ID + ",80,0,0,"
-                        )  # The controlindex and timetrigger indices are both zero
+                    new_line_string += "," + self.protective_device_IDs(
+                        "fusecodes",
+                        i.nameclass
+                        + "_"
+                        + str(int(i.nominal_voltage))
+                        + "_"
+                        + str(int(i.wires[0].ampacity)),
+                        new_code2,
+                    )
 
-                        if hasattr(i, "rated_kWh") and i.rated_kWh is not None:
-                            bess_string += str(i.rated_kWh * 10 ** -3)
-                        bess_string += ","
+                else:
+                    new_line_string += ",DEFAULT"
 
-                        if hasattr(i, "rated_power") and i.rated_power is not None:
-                            bess_string += str(i.rated_power * 10 ** -3)
-                        bess_string += ","
+            elif line_type == "recloser":
+                if (
+                    i.nameclass is not None
+                    and i.nameclass != ""
+                    and i.wires[0].ampacity is not None
+                    and i.nominal_voltage is not None
+                ):
+                    new_code2 = "{amps},{amps},{amps},{amps},{amps},{kvll},0,600.000000,0.000000,0.000000,0.000000,0.000000,0.000000,0.000000,0.000000,0,0,0,0,0,0,,1,,".format(
+                        amps=i.wires[0].ampacity, kvll=i.nominal_voltage * 10 ** -3,
+                    )
 
-                        # Use for both charging and discharging power
-                        if hasattr(i, "rated_power") and i.rated_power is not None:
-                            bess_string += str(i.rated_power * 10 ** -3)
-                        bess_string += ","
+                    new_line_string += "," + self.protective_device_IDs(
+                        "reclosercodes",
+                        i.nameclass
+                        + "_"
+                        + str(int(i.nominal_voltage))
+                        + "_"
+                        + str(int(i.wires[0].ampacity)),
+                        new_code2,
+                    )
 
-                        if (
-                            hasattr(i, "charging_efficiency")
-                            and i.charging_efficiency is not None
-                        ):
-                            bess_string += str(i.charging_efficiency)
-                        bess_string += ","
+                else:
+                    new_line_string += ",DEFAULT"
 
-                        if (
-                            hasattr(i, "discharging_efficiency")
-                            and i.discharging_efficiency is not None
-                        ):
-                            bess_string += str(i.discharging_efficiency)
+            elif line_type == "breaker":
+                if (
+                    i.nameclass is not None
+                    and i.nameclass != ""
+                    and i.wires[0].ampacity is not None
+                    and i.nominal_voltage is not None
+                ):
+                    new_code2 = "{amps},{amps},{amps},{amps},{amps},{kvll},0,600.000000,0.000000,0.000000,0.000000,0.000000,0.000000,0.000000,0.000000,0,0,0,0,0,0,".format(
+                        amps=i.wires[0].ampacity, kvll=i.nominal_voltage * 10 ** -3,
+                    )
 
-                        bess_type = ""
-                        if bess_string in self.bess_codes:
-                            bess_type = self.bess_codes[bess_string]
-                        else:
-                            ID_bess += 1
-                            bess_type = "BESS_" + str(ID_bess)
-                            self.bess_codes[bess_string] = bess_type
+                    new_line_string += "," + self.protective_device_IDs(
+                        "breakercodes",
+                        i.nameclass
+                        + "_"
+                        + str(int(i.nominal_voltage))
+                        + "_"
+                        + str(int(i.wires[0].ampacity)),
+                        new_code2,
+                    )
 
-                        bess_string = bess_type + "," + bess_string
+                else:
+                    new_line_string += ",DEFAULT"
 
-                        new_bess_setting_string += (
-                            new_section_ID
-                            + ",M,"
-                            + new_section_ID
-                            + ","
-                            + bess_type
-                            + ","
-                            + phases
-                            + ","
-                        )
+            elif line_type == "underground":
+                tt = {}
+                if hasattr(i, "nominal_voltage") and i.nominal_voltage is not None:
+                    if (
+                        i.nominal_voltage is not None
+                        and i.nominal_voltage < 600
+                        and len(i.wires) <= 2
+                    ):  # LV lines are assigned as triplex unless they're three phase
+                        tt["cabletype"] = 2
+                    else:
+                        tt["cabletype"] = 0
 
-                        if (
-                            hasattr(i, "stored_kWh")
-                            and i.stored_kWh is not None
-                            and hasattr(i, "rated_kWh")
-                            and i.rated_kWh is not None
-                            and i.rated_kWh != 0
-                        ):
-                            new_bess_setting_string += str(
-                                int(i.stored_kWh / i.rated_kWh * 100)
-                            )
+                else:
+                    tt["cabletype"] = 0
 
-                        if hasattr(i, "active_rating") and i.active_rating is not None:
-                            if (
-                                hasattr(i, "reactive_rating")
-                                and i.reactive_rating is not None
-                            ):
-                                new_converter_string += (
-                                    str(
-                                        math.sqrt(
-                                            i.reactive_rating ** 2
-                                            + i.active_rating ** 2
-                                        )
-                                        / 1000.0
-                                    )
-                                    + ","
-                                )
-                            else:
-                                new_converter_string += (
-                                    str(i.active_rating / 1000.0) + ","
-                                )
-                            new_converter_string += str(i.active_rating / 1000.0) + ","
-                        elif hasattr(i, "rated_power") and i.rated_power is not None:
-                            if (
-                                hasattr(i, "reactive_rating")
-                                and i.reactive_rating is not None
-                            ):
-                                new_converter_string += (
-                                    str(
-                                        math.sqrt(
-                                            i.reactive_rating ** 2
-                                            + (i.rated_power * 1.1) ** 2
-                                        )
-                                        / 1000.0
-                                    )
-                                    + ","
-                                )
-                            else:
-                                new_converter_string += (
-                                    str(i.rated_power * 1.1 / 1000.0) + ","
-                                )
-                            new_converter_string += (
-                                str(i.rated_power * 1.1 / 1000.0) + ","
-                            )  # Default value sets inverter to be oversized by 10%
-                        else:
-                            new_converter_string += ",,"
+                if hasattr(i, "impedance_matrix") and i.impedance_matrix is not None:
+                    z_diag = 0
+                    z_offdiag = 0
+                    try:
+                        for kk in range(len(i.impedance_matrix)):
+                            if i.impedance_matrix[kk][kk] != 0:
+                                z_diag = i.impedance_matrix[kk][kk]
+                                for jj in range(len(i.impedance_matrix)):
+                                    if jj == kk:
+                                        continue
+                                    if i.impedance_matrix[kk][jj] != 0:
+                                        z_offdiag = i.impedance_matrix[kk][jj]
 
-                        if (
-                            hasattr(i, "reactive_rating")
-                            and i.reactive_rating is not None
-                        ):
-                            new_converter_string += (
-                                str(i.reactive_rating / 1000.0) + ","
+                    except:
+                        try:
+                            z_diag = i.impedance_matrix[0]
+                            z_offdiag = i.impedance_matrix[0]
+                        except:
+                            raise ValueError(
+                                "Cannot get a value from impedance matrix for line {}".format(
+                                    i.name
+                                )
                             )
-                        elif hasattr(i, "rated_power") and i.rated_power is not None:
-                            new_converter_string += (
-                                str(i.rated_power * 1.1 / 1000.0) + ","
-                            )  # Default value sets inverter to be oversized by 10% and active=reactive
-                        else:
-                            new_converter_string += ","
+                    coeff = 10 ** 3
+                    z0 = z_diag + 2 * z_offdiag
+                    z1 = z_diag - z_offdiag
 
-                        if hasattr(i, "rated_power") and i.rated_power is not None:
-                            new_dg_generation_string += str(i.rated_power / 1000.0)
-                        elif hasattr(i, "rated_power") and i.rated_power is not None:
-                            new_dg_generation_string += str(i.rated_power / 1000.0)
-                        new_dg_generation_string += ","
-                        if (
-                            hasattr(i, "min_powerfactor")
-                            and i.min_powerfactor is not None
-                        ):
-                            new_converter_string += str(i.powerfactor * 100)
-                            new_dg_generation_string += str(i.powerfactor * 100)
-                        new_dg_generation_string += ","
-                        new_converter_string += ","
-                        if hasattr(i, "fall_limit") and i.fall_limit is not None:
-                            new_converter_string += str(i.fall_limit)
-                        new_converter_string += ","
-                        if hasattr(i, "rise_limit") and i.rise_limit is not None:
-                            new_converter_string += str(i.rise_limit)
-                        new_converter_string += ","
-                        if (hasattr(i, "fall_limit") and i.fall_limit is not None) or (
-                            hasattr(i, "rise_limit") and i.rise_limit is not None
-                        ):
-                            new_converter_string += "0"  # Using units of % per minute
+                    tt["R0"] = z0.real * coeff
+                    tt["X0"] = z0.imag * coeff
+                    try:
+                        pos_seq_imp = i.impedance_matrix[1][1]
+                        tt["R1"] = z1.real * coeff
+                        tt["X1"] = z1.imag * coeff
+                    except:
+                        tt["R1"] = tt["R0"]
+                        tt["X1"] = tt["X0"]
+                        pass
+                    try:
+                        neg_seq_imp = i.impedance_matrix[2][2]
+                        tt["R2"] = z1.real * coeff
+                        tt["X2"] = z1.imag * coeff
+                    except:
+                        tt["R2"] = tt["R1"]
+                        tt["X2"] = tt["X1"]
+                        pass
 
-                        if hasattr(i, "control_type") and i.control_type is not None:
-                            if (
-                                i.control_type.lower() == "voltvar_vars_over_watts"
-                                or i.control_type.lower() == "voltvar"
-                            ):  # use default voltvar curve in cyme
-                                new_converter_control_setting_string += "1"
-                            if i.control_type.lower() == "voltvar_watts_over_vars":
-                                new_converter_control_setting_string += "0"
-                            if i.control_type.lower() == "voltvar_fixed_vars":
-                                new_converter_control_setting_string += "2"
-                            if i.control_type.lower() == "voltvar_novars":
-                                new_converter_control_setting_string += "3"
-                            if i.control_type.lower() == "voltwatt":
-                                new_converter_control_setting_string += "5"
-                            if i.control_type.lower() == "watt_powerfactor":
-                                new_converter_control_setting_string += "6"
-                            if i.control_type.lower() == "powerfactor":
-                                new_converter_control_setting_string += "10"
-
-                            new_converter_control_setting_string += ","
-                            if (
-                                i.control_type.lower() == "voltvar_fixed_vars"
-                                and i.var_injection is not None
-                            ):
-                                new_converter_control_setting_string += (
-                                    str(i.var_injection) + ",2,"
-                                )  # 2 is the code for the pecentage reactive power available
-                            else:
-                                new_converter_control_setting_string += ",,"
-                            if (
-                                i.control_type.lower() == "voltvar_watts_over_vars"
-                                or i.control_type.lower() == "voltvar_vars_over_watts"
-                            ) and i.voltvar_curve is not None:
-                                new_converter_control_setting_string += (
-                                    i.voltvar_curve + ",,"
-                                )
-                            elif (
-                                i.control_type.lower() == "voltwatt"
-                                and i.voltwatt_curve is not None
-                            ):
-                                new_converter_control_setting_string += (
-                                    i.voltwatt_curve + ",0,"
-                                )  # 0 is the code for using the active power rating
-                            elif (
-                                i.control_type.lower() == "watt_powerfactor"
-                                and i.watt_powerfactor_curve is not None
-                            ):
-                                new_converter_control_setting_string += (
-                                    i.watt_powerfactor_curve + ",0,"
-                                )  # 0 is the code for using the active power rating
-                            else:
-                                new_converter_control_setting_string += ",,"
-                        else:
-                            new_converter_control_setting_string += "10" + "," * 5
+                    if (
+                        hasattr(i, "capacitance_matrix")
+                        and i.capacitance_matrix is not None
+                    ):
+                        c_diag = 0
+                        c_offdiag = 0
+                        try:
+                            for kk in range(len(i.impedance_matrix)):
+                                if i.capacitance_matrix[kk][kk] != 0:
+                                    c_diag = i.capacitance_matrix[kk][kk]
+                                    for jj in range(len(i.capacitance_matrix)):
+                                        if jj == kk:
+                                            continue
+                                        if i.capacitance_matrix[kk][jj] != 0:
+                                            c_offdiag = i.capacitance_matrix[kk][jj]
 
-                    if new_converter_string != "":
-                        converter_string_list.append(new_converter_string)
-                    if new_converter_control_setting_string != "":
-                        converter_control_string_list.append(
-                            new_converter_control_setting_string
-                        )
+                        except:
+                            try:
+                                c_diag = i.capacitance_matrix[0]
+                                c_offdiag = i.capacitance_matrix[0]
+                            except:
+                                raise ValueError(
+                                    "Cannot get a value from impedance matrix for line {}".format(
+                                        i.name
+                                    )
+                                )
+                        coeff = 10 ** 3
+                        c0 = c_diag + 2 * c_offdiag
+                        c1 = c_diag - c_offdiag
 
-                    if new_bess_setting_string != "":
-                        bess_settings_string_list.append(new_bess_setting_string)
+                        tt["B0"] = (
+                            c0.real * 2 * math.pi * frequency
+                        )  # Don't multiply by km conversion since cyme output in micro siemens
+                        tt["B1"] = c1.real * 2 * math.pi * frequency  #
 
-                # If we get a Photovoltaic object
+                    else:
+                        tt["B1"] = 0
+                        tt["B0"] = 0
+                    try:
+                        tt["amps"] = i.wires[0].ampacity
+                    except:
+                        tt["amps"] = 0
+                        pass
 
-                if isinstance(i, Photovoltaic):
-                    new_converter_string = ""
-                    new_converter_control_setting_string = ""
-                    new_pv_setting_string = ""
-                    new_dg_generation_string = ""
                     if (
-                        hasattr(i, "name")
-                        and i.name is not None
-                        and hasattr(i, "connecting_element")
-                        and i.connecting_element is not None
-                        and (
-                            i.connecting_element in model.model_names
-                            or "load_" + i.connecting_element in model.model_names
-                        )
+                        hasattr(i.wires[0], "nameclass")
+                        and i.wires[0].nameclass is not None
+                        and i.wires[0].nameclass != ""
                     ):
-                        new_section_ID = "{f}_{t}".format(
-                            f=i.connecting_element, t=i.name
-                        )
-                        if len(new_section_ID) > 64:
-                            hasher = hashlib.sha1()
-                            hasher.update(new_section_ID.encode("utf-8"))
-                            new_section_ID = hasher.hexdigest()
-
-                        new_section = (
-                            new_section_ID
-                            + ",{f},0,{t},0,".format(  # Assume only one index for the load connection point
-                                f=i.connecting_element, t=i.name
-                            )
+                        new_line_string += "," + self.cable_IDs(
+                            tt, i.wires[0].nameclass
                         )
+                    else:
+                        new_line_string += "," + self.cable_IDs(tt)
 
-                        new_node_string = "{n}".format(n=i.name)
-                        if hasattr(i, "positions") and i.positions is not None:
-                            try:
-                                new_node_string += "," + str(i.positions[0].long)
-                            except:
-                                new_node_string += ",0"
-                                pass
-
-                            try:
-                                new_node_string += "," + str(i.positions[0].lat)
-                            except:
-                                new_node_string += ",0"
-                                pass
-                        else:
-                            new_node_string += ",0,0"
-                        self.node_string_list.append(new_node_string)
-
-                        phases = ""
-                        for phase in i.phases:
-                            if phase.default_value in ["A", "B", "C"]:
-                                new_section += phase.default_value
-                                phases += phase.default_value
-                        self.section_line_list.append(new_section)
-                        if hasattr(i, "feeder_name") and i.feeder_name is not None:
-                            if i.feeder_name in self.section_line_feeder_mapping:
-                                self.section_line_feeder_mapping[i.feeder_name].append(
-                                    new_section
-                                )
-                            else:
-                                self.section_line_feeder_mapping[i.feeder_name] = [
-                                    new_section
-                                ]
-
-                        if hasattr(i, "feeder_name") and i.feeder_name is not None:
-                            if i.feeder_name in self.section_feeder_mapping:
-                                self.section_feeder_mapping[i.feeder_name].append(
-                                    new_section_ID
-                                )
-                            else:
-                                self.section_feeder_mapping[i.feeder_name] = [
-                                    new_section_ID
-                                ]
-                            if (
-                                hasattr(i, "substation_name")
-                                and i.substation_name is not None
-                            ):
-                                self.section_headnode_mapping[
-                                    i.feeder_name
-                                ] = i.substation_name
-
-                        new_converter_string += (
-                            new_section_ID + ",45,"
-                        )  # 45 is the CYME code for PV devices
-                        new_converter_control_setting_string += (
-                            new_section_ID + ",45,0,0,"
-                        )  # The controlindex and timetrigger indices are both zero
-                        new_pv_setting_string += (
-                            new_section_ID + ",M," + new_section_ID + ",DEFAULT,"
-                        )  # Use the default CYME PV configuration for the moment.
-                        new_dg_generation_string += new_section_ID + "45,DEFAULT,"
-                        # DGGENERATIONMODEL is not included as this just sets the LoadModelName which is DEFAULT
-
-                        if hasattr(i, "rated_power") and i.rated_power is not None:
-                            panel_area = math.ceil(
-                                i.rated_power / 1000 / 0.08
-                            )  # Each panel produces 0.08 kw
-                            num_x, num_y = self.smallest_perimeter(panel_area)
-                            if min(num_x, num_y) == 1:
-                                num_x, num_y = self.smallest_perimeter(
-                                    panel_area + 1
-                                )  # if area is prime
-                            new_pv_setting_string += str(num_x) + "," + str(num_y) + ","
-                        elif (
-                            hasattr(i, "active_rating") and i.active_rating is not None
-                        ):
-                            panel_area = math.ceil(
-                                i.active_rating / 1.1 / 1000 / 0.08
-                            )  # Each panel produces 0.08 kw. Assume 10% inverter oversize
-                            num_x, num_y = self.smallest_perimeter(panel_area)
-                            if min(num_x, num_y) == 1:
-                                num_x, num_y = self.smallest_perimeter(
-                                    panel_area + 1
-                                )  # if area is prime
-                            new_pv_setting_string += str(num_x) + "," + str(num_y) + ","
-                        else:
-                            new_pv_setting_string += (
-                                ",,"  # This will produce garbage output power
-                            )
+            else:  # We use impedance_matrix if it exists and we have 3 phases. otherwise we use by_phase. TODO: change to by_phase whenever we have the wire information for it.
+                # try:
+                tt = {}
+                if "A" in cond_id:
+                    tt["CondID_A"] = cond_id["A"]
+                else:
+                    tt["CondID_A"] = "NONE"
+                if "B" in cond_id:
+                    tt["CondID_B"] = cond_id["B"]
+                else:
+                    tt["CondID_B"] = "NONE"
+                if "C" in cond_id:
+                    tt["CondID_C"] = cond_id["C"]
+                else:
+                    tt["CondID_C"] = "NONE"
+                if "N" in cond_id:
+                    tt["CondID_N"] = cond_id["N"]
+                else:
+                    tt["CondID_N"] = "NONE"
+                if "N1" in cond_id:
+                    tt["CondID_N1"] = cond_id["N1"]
+                else:
+                    tt["CondID_N1"] = "NONE"
+                if "N2" in cond_id:
+                    tt["CondID_N2"] = cond_id["N2"]
+                else:
+                    tt["CondID_N2"] = "NONE"
+
+                if hasattr(i, "wires") and i.wires is not None:
+                    for wire in i.wires:
+                        if hasattr(wire, "phase") and str(wire.phase) in [
+                            "A",
+                            "B",
+                            "C",
+                        ]:
+                            p = str(wire.phase)
+                            if hasattr(wire, "ampacity") and wire.ampacity is not None:
+                                try:
+                                    tt["Amps{}".format(p)] = wire.ampacity
+                                except:
+                                    tt["Amps{}".format(p)] = "DEFAULT"
+                                    pass
 
-                        if hasattr(i, "temperature") and i.temperature is not None:
-                            new_pv_setting_string += str(i.temperature)
+                # If we have 3 phases, use OVERHEADLINE SETTING
+                if len(phases) == 3 and i.impedance_matrix is not None:
 
-                        new_pv_setting_string += "," + phases
+                    tt.update({"SpacingID": "DEFAULT", "UserDefinedImpedances": 1})
 
-                        if hasattr(i, "active_rating") and i.active_rating is not None:
-                            if (
-                                hasattr(i, "reactive_rating")
-                                and i.reactive_rating is not None
-                            ):
-                                new_converter_string += (
-                                    str(
-                                        math.sqrt(
-                                            i.reactive_rating ** 2
-                                            + i.active_rating ** 2
-                                        )
-                                        / 1000.0
-                                    )
-                                    + ","
+                    for k, p1 in enumerate(phases):
+                        for j, p2 in enumerate(phases):
+                            if j == k:
+                                tt["R{p}".format(p=p1)] = (
+                                    i.impedance_matrix[k][j].real * 10 ** 3
                                 )
-                            else:
-                                new_converter_string += (
-                                    str(i.active_rating / 1000.0) + ","
+                                tt["X{p}".format(p=p1)] = (
+                                    i.impedance_matrix[k][j].imag * 10 ** 3
                                 )
-                            new_converter_string += str(i.active_rating / 1000.0) + ","
-                        elif hasattr(i, "rated_power") and i.rated_power is not None:
-                            if (
-                                hasattr(i, "reactive_rating")
-                                and i.reactive_rating is not None
-                            ):
-                                new_converter_string += (
-                                    str(
-                                        math.sqrt(
-                                            i.reactive_rating ** 2
-                                            + (i.rated_power * 1.1) ** 2
-                                        )
-                                        / 1000.0
+                                if i.capacitance_matrix is not None and len(
+                                    i.capacitance_matrix
+                                ) == len(i.impedance_matrix):
+                                    tt["B{p}".format(p=p1)] = (
+                                        i.capacitance_matrix[k][j].real
+                                        * 2
+                                        * math.pi
+                                        * frequency
+                                        * 10 ** 3
                                     )
-                                    + ","
-                                )
-                            else:
-                                new_converter_string += (
-                                    str(i.rated_power * 1.1 / 1000.0) + ","
-                                )
-                            new_converter_string += (
-                                str(i.rated_power * 1.1 / 1000.0) + ","
-                            )  # Default value sets inverter to be oversized by 10%
-                        else:
-                            new_converter_string += ",,"
+                                else:
+                                    tt["Ba"] = 0
+                                    tt["Bb"] = 0
+                                    tt["Bc"] = 0
+                            elif j > k:
+                                if p1 == "A" and p2 == "C":
+                                    tt["MutualResistanceCA"] = (
+                                        i.impedance_matrix[k][j].real * 10 ** 3
+                                    )
+                                    tt["MutualReactanceCA"] = (
+                                        i.impedance_matrix[k][j].imag * 10 ** 3
+                                    )
+                                    if i.capacitance_matrix is not None and len(
+                                        i.capacitance_matrix
+                                    ) == len(i.impedance_matrix):
+                                        tt["MutualShuntSusceptanceCA"] = (
+                                            i.capacitance_matrix[k][j].real
+                                            * 2
+                                            * math.pi
+                                            * frequency
+                                            * 10 ** 3
+                                        )
+                                    else:
+                                        tt["MutualShuntSusceptanceCA"] = 0
+                                else:
+                                    tt[
+                                        "MutualResistance{p1}{p2}".format(p1=p1, p2=p2)
+                                    ] = (i.impedance_matrix[k][j].real * 10 ** 3)
+                                    tt[
+                                        "MutualReactance{p1}{p2}".format(p1=p1, p2=p2)
+                                    ] = (i.impedance_matrix[k][j].imag * 10 ** 3)
+                                    if i.capacitance_matrix is not None and len(
+                                        i.capacitance_matrix
+                                    ) == len(i.impedance_matrix):
+                                        tt[
+                                            "MutualShuntSusceptance{p1}{p2}".format(
+                                                p1=p1, p2=p2
+                                            )
+                                        ] = (
+                                            i.capacitance_matrix[k][j].real
+                                            * 2
+                                            * math.pi
+                                            * frequency
+                                            * 10 ** 3
+                                        )
+                                    else:
+                                        tt["MutualShuntSusceptanceAB"] = 0
+                                        tt["MutualShuntSusceptanceBC"] = 0
 
-                        if (
-                            hasattr(i, "reactive_rating")
-                            and i.reactive_rating is not None
-                        ):
-                            new_converter_string += (
-                                str(i.reactive_rating / 1000.0) + ","
-                            )
-                        elif hasattr(i, "rated_power") and i.rated_power is not None:
-                            new_converter_string += (
-                                str(i.rated_power * 1.1 / 1000.0) + ","
-                            )  # Default value sets inverter to be oversized by 10% and active=reactive
-                        else:
-                            new_converter_string += ","
+                    if (
+                        hasattr(i, "nameclass")
+                        and i.nameclass is not None
+                        and i.nameclass != ""
+                    ):
+                        new_line_string += "," + self.overhead_line_IDs(tt, i.nameclass)
+                    else:
+                        # Find a matching linecode, or add the new one
+                        new_line_string += "," + self.overhead_line_IDs(tt)
 
-                        if hasattr(i, "rated_power") and i.rated_power is not None:
-                            new_dg_generation_string += str(i.rated_power / 1000.0)
-                        elif hasattr(i, "rated_power") and i.rated_power is not None:
-                            new_dg_generation_string += str(i.rated_power / 1000.0)
-                        new_dg_generation_string += ","
-                        if (
-                            hasattr(i, "min_powerfactor")
-                            and i.min_powerfactor is not None
-                        ):
-                            new_converter_string += str(i.powerfactor * 100)
-                            new_dg_generation_string += str(i.powerfactor * 100)
-                        new_dg_generation_string += ","
-                        new_converter_string += ","
-                        if hasattr(i, "fall_limit") and i.fall_limit is not None:
-                            new_converter_string += str(i.fall_limit)
-                        new_converter_string += ","
-                        if hasattr(i, "rise_limit") and i.rise_limit is not None:
-                            new_converter_string += str(i.rise_limit)
-                        new_converter_string += ","
-                        if (hasattr(i, "fall_limit") and i.fall_limit is not None) or (
-                            hasattr(i, "rise_limit") and i.rise_limit is not None
-                        ):
-                            new_converter_string += "0"  # Using units of % per minute
+                # If we have less than 3 phases, then use a BY_PHASE configuration
+                else:
+                    line_type = "by_phase"  # Change the line_type to write the line under the proper header
+
+                    # Add device number and phase conductor IDs
+                    new_line_string += ",{device},{condIDA},{condIDB},{condIDC}".format(
+                        device=new_section_ID,
+                        condIDA=tt["CondID_A"],
+                        condIDB=tt["CondID_B"],
+                        condIDC=tt["CondID_C"],
+                    )
 
-                        if hasattr(i, "control_type") and i.control_type is not None:
-                            if (
-                                i.control_type.lower() == "voltvar_vars_over_watts"
-                                or i.control_type.lower() == "voltvar"
-                            ):  # use default voltvar curve in cyme
-                                new_converter_control_setting_string += "1"
-                            if i.control_type.lower() == "voltvar_watts_over_vars":
-                                new_converter_control_setting_string += "0"
-                            if i.control_type.lower() == "voltvar_fixed_vars":
-                                new_converter_control_setting_string += "2"
-                            if i.control_type.lower() == "voltvar_novars":
-                                new_converter_control_setting_string += "3"
-                            if i.control_type.lower() == "voltwatt":
-                                new_converter_control_setting_string += "5"
-                            if i.control_type.lower() == "watt_powerfactor":
-                                new_converter_control_setting_string += "6"
-                            if i.control_type.lower() == "powerfactor":
-                                new_converter_control_setting_string += "10"
-
-                            new_converter_control_setting_string += ","
-                            if (
-                                i.control_type.lower() == "voltvar_fixed_vars"
-                                and i.var_injection is not None
-                            ):
-                                new_converter_control_setting_string += (
-                                    str(i.var_injection) + ",2,"
-                                )  # 2 is the code for the pecentage reactive power available
-                            else:
-                                new_converter_control_setting_string += ",,"
-                            if (
-                                i.control_type.lower() == "voltvar_watts_over_vars"
-                                or i.control_type.lower() == "voltvar_vars_over_watts"
-                            ) and i.voltvar_curve is not None:
-                                new_converter_control_setting_string += (
-                                    i.voltvar_curve + ",,"
-                                )
-                            elif (
-                                i.control_type.lower() == "voltwatt"
-                                and i.voltwatt_curve is not None
-                            ):
-                                new_converter_control_setting_string += (
-                                    i.voltwatt_curve + ",0,"
-                                )  # 0 is the code for using the active power rating
-                            elif (
-                                i.control_type.lower() == "watt_powerfactor"
-                                and i.watt_powerfactor_curve is not None
-                            ):
-                                new_converter_control_setting_string += (
-                                    i.watt_powerfactor_curve + ",0,"
-                                )  # 0 is the code for using the active power rating
-                            else:
-                                new_converter_control_setting_string += ",,"
+                    # Add neutral conductor IDs
+                    #
+                    # If we have valid IDs for BOTH N1 and N2, then use that
+                    if tt["CondID_N1"] != "NONE" and tt["CondID_N2"] != "NONE":
+                        new_line_string += ",{condIDN1},{condIDN2}".format(
+                            condIDN1=tt["CondID_N1"], condIDN2=tt["CondID_N2"],
+                        )
+                    # Otherwise, if we have a valid ID for N, then use that as condIDN1 and use whatever we have for N2
+                    elif tt["CondID_N"] != "NONE":
+                        new_line_string += ",{condIDN1},{condIDN2}".format(
+                            condIDN1=tt["CondID_N"], condIDN2=tt["CondID_N2"],
+                        )
+                    # Otherwise, do as for case 1
+                    else:
+                        new_line_string += ",{condIDN1},{condIDN2}".format(
+                            condIDN1=tt["CondID_N1"], condIDN2=tt["CondID_N2"],
+                        )
 
-                            if (
-                                i.control_type.lower() == "powerfactor"
-                                and i.powerfactor is not None
-                            ):
-                                new_converter_control_setting_string += str(
-                                    i.powerfactor
-                                )
-                        else:
-                            new_converter_control_setting_string += (
-                                "10,,,,,100"  # Use Powerfactor as default
-                            )
+                    # Use Default spacing
+                    #
+                    # TODO: User-defined spacing support
+                    #
+                    if len(phases) == 1:
+                        new_line_string += ",N_ABOVE_1PH"
+                    if len(phases) == 2:
+                        new_line_string += ",N_ABOVE_2PH"
+                    if len(phases) == 3:
+                        new_line_string += ",N_ABOVE_3PH"
+
+            # Length
+            if hasattr(i, "length") and i.length is not None:
+                if (
+                    line_type != "switch"
+                    and line_type != "fuse"
+                    and line_type != "recloser"
+                    and line_type != "breaker"
+                ):
+                    try:
+                        new_line_string += "," + str(i.length)
+                    except:
+                        new_line_string += ","
+                        pass
+            else:
+                if (
+                    line_type != "switch"
+                    and line_type != "fuse"
+                    and line_type != "recloser"
+                    and line_type != "breaker"
+                ):
+                    new_line_string += ","
+
+            if line_type == "switch" or line_type == "breaker":
+                closed_phase = np.sort(
+                    [
+                        wire.phase
+                        for wire in i.wires
+                        if wire.is_open == 0 and wire.phase not in ["N", "N1", "N2"]
+                    ]
+                )
+                if len(closed_phase) == 0:
+                    new_line_string += ",M,None,0"
+                else:
+                    new_line_string += ",M,{},0".format(
+                        reduce(lambda x, y: x + y, closed_phase)
+                    )
 
-                        if (
-                            hasattr(i, "timeseries")
-                            and i.timeseries is not None
-                            and len(i.timeseries) > 0
-                            and i.timeseries[0].data_label is not None
-                            and i.timeseries[0].data_location is not None
-                        ):
-                            new_pv_setting_string += ",0,{loc}".format(
-                                loc=i.timeseries[0].data_label
-                            )
-                            self.irradiance_profiles[
-                                i.timeseries[0].data_label
-                            ] = i.timeseries[0].data_location
-                        else:
-                            new_pv_setting_string += ",1,"
+            if line_type == "fuse" or line_type == "recloser":
+                closed_phase = np.sort(
+                    [
+                        wire.phase
+                        for wire in i.wires
+                        if wire.phase not in ["N", "N1", "N2"]
+                    ]
+                )
+                new_line_string += ",M,{},0".format(
+                    reduce(lambda x, y: x + y, closed_phase)
+                )
 
-                    else:
-                        if hasattr(i, "name"):
-                            logger.warning(
-                                "PV "
-                                + i.name
-                                + " was not connected and has not been written to CYME"
-                            )
-                        else:
-                            logger.warning("PV element is unnamed")
+            # ConnectionStatus
+            new_line_string += ",0"  # Assumes the line is connected because there is no connected field in DiTTo
+
+            # DeviceNumber
+            if (
+                line_type == "switch"
+                or line_type == "fuse"
+                or line_type == "recloser"
+                or line_type == "breaker"
+            ):
+                new_line_string += "," + new_section_ID
+
+            if line_type == "underground":
+                new_line_string += (
+                    ",10,2"  # DistanceBetweenConductors, CableConfiguration
+                )
+
+            # Add the strings to the lists
+            #
+            if new_section_line != "":
+                self.add_section(new_section_line, *self.network_ID(i))
+
+            if new_line_string != "":
+                try:
+                    self.append_line(matching_list[line_type], new_line_string)
+                except:
+                    pass
+
+    def render_storage(self, i, model):
+        """Render a Storage object."""
+        bess_string = ""
+        new_bess_setting_string = ""
+        new_converter_string = ""
+        new_converter_control_setting_string = ""
+        new_dg_generation_string = ""
+
+        if (
+            hasattr(i, "name")
+            and i.name is not None
+            and hasattr(i, "connecting_element")
+            and i.connecting_element is not None
+            and (
+                i.connecting_element in model.model_names
+                or "load_" + i.connecting_element in model.model_names
+            )
+        ):
+            new_section_ID = "{f}_{t}".format(f=i.connecting_element, t=i.name)
+            if len(new_section_ID) > 64:
+                hasher = hashlib.sha1()
+                hasher.update(new_section_ID.encode("utf-8"))
+                new_section_ID = hasher.hexdigest()
+
+            new_section = (
+                new_section_ID
+                + ",{f},0,{t},0,".format(  # Assume only one index for the load connection point
+                    f=i.connecting_element, t=i.name
+                )
+            )
+
+            new_node_string = "{n}".format(n=i.name)
+            if hasattr(i, "positions") and i.positions is not None:
+                try:
+                    new_node_string += "," + str(i.positions[0].long)
+                except:
+                    new_node_string += ",0"
+                    pass
+
+                try:
+                    new_node_string += "," + str(i.positions[0].lat)
+                except:
+                    new_node_string += ",0"
+                    pass
+            else:
+                new_node_string += ",0,0"
+            self.append_line("node", new_node_string)
+
+            phases = ""
+            if i.phase_storages is not None:
+                for ps in i.phase_storages:
+                    if ps.phase in ["A", "B", "C"]:
+                        new_section += ps.phase
+                        phases += ps.phase
+
+            self.add_section(new_section, *self.network_ID(i))
+
+            new_converter_string += (
+                new_section_ID + ",80,"
+            )  # 45 is the CYME code for PV devices
+            new_converter_control_setting_string += (
+                new_section_ID + ",80,0,0,"
+            )  # The controlindex and timetrigger indices are both zero
+
+            if hasattr(i, "rated_kWh") and i.rated_kWh is not None:
+                bess_string += str(i.rated_kWh * 10 ** -3)
+            bess_string += ","
+
+            if hasattr(i, "rated_power") and i.rated_power is not None:
+                bess_string += str(i.rated_power * 10 ** -3)
+            bess_string += ","
+
+            # Use for both charging and discharging power
+            if hasattr(i, "rated_power") and i.rated_power is not None:
+                bess_string += str(i.rated_power * 10 ** -3)
+            bess_string += ","
+
+            if hasattr(i, "charging_efficiency") and i.charging_efficiency is not None:
+                bess_string += str(i.charging_efficiency)
+            bess_string += ","
+
+            if (
+                hasattr(i, "discharging_efficiency")
+                and i.discharging_efficiency is not None
+            ):
+                bess_string += str(i.discharging_efficiency)
+
+            bess_type = self.bess_ID(bess_string)
+
+            bess_string = bess_type + "," + bess_string
+
+            new_bess_setting_string += (
+                new_section_ID
+                + ",M,"
+                + new_section_ID
+                + ","
+                + bess_type
+                + ","
+                + phases
+                + ","
+            )
 
-                    if new_converter_string != "":
-                        converter_string_list.append(new_converter_string)
-                    if new_converter_control_setting_string != "":
-                        converter_control_string_list.append(
-                            new_converter_control_setting_string
+            if (
+                hasattr(i, "stored_kWh")
+                and i.stored_kWh is not None
+                and hasattr(i, "rated_kWh")
+                and i.rated_kWh is not None
+                and i.rated_kWh != 0
+            ):
+                new_bess_setting_string += str(int(i.stored_kWh / i.rated_kWh * 100))
+
+            if hasattr(i, "active_rating") and i.active_rating is not None:
+                if hasattr(i, "reactive_rating") and i.reactive_rating is not None:
+                    new_converter_string += (
+                        str(
+                            math.sqrt(i.reactive_rating ** 2 + i.active_rating ** 2)
+                            / 1000.0
                         )
-                    if new_pv_setting_string != "":
-                        pv_settings_string_list.append(new_pv_setting_string)
-                    if new_dg_generation_string != "":
-                        dg_generation_string_list.append(new_dg_generation_string)
+                        + ","
+                    )
+                else:
+                    new_converter_string += str(i.active_rating / 1000.0) + ","
+                new_converter_string += str(i.active_rating / 1000.0) + ","
+            elif hasattr(i, "rated_power") and i.rated_power is not None:
+                if hasattr(i, "reactive_rating") and i.reactive_rating is not None:
+                    new_converter_string += (
+                        str(
+                            math.sqrt(
+                                i.reactive_rating ** 2 + (i.rated_power * 1.1) ** 2
+                            )
+                            / 1000.0
+                        )
+                        + ","
+                    )
+                else:
+                    new_converter_string += str(i.rated_power * 1.1 / 1000.0) + ","
+                new_converter_string += (
+                    str(i.rated_power * 1.1 / 1000.0) + ","
+                )  # Default value sets inverter to be oversized by 10%
+            else:
+                new_converter_string += ",,"
+
+            if hasattr(i, "reactive_rating") and i.reactive_rating is not None:
+                new_converter_string += str(i.reactive_rating / 1000.0) + ","
+            elif hasattr(i, "rated_power") and i.rated_power is not None:
+                new_converter_string += (
+                    str(i.rated_power * 1.1 / 1000.0) + ","
+                )  # Default value sets inverter to be oversized by 10% and active=reactive
+            else:
+                new_converter_string += ","
+
+            if hasattr(i, "rated_power") and i.rated_power is not None:
+                new_dg_generation_string += str(i.rated_power / 1000.0)
+            elif hasattr(i, "rated_power") and i.rated_power is not None:
+                new_dg_generation_string += str(i.rated_power / 1000.0)
+            new_dg_generation_string += ","
+            if hasattr(i, "min_powerfactor") and i.min_powerfactor is not None:
+                new_converter_string += str(i.powerfactor * 100)
+                new_dg_generation_string += str(i.powerfactor * 100)
+            new_dg_generation_string += ","
+            new_converter_string += ","
+            if hasattr(i, "fall_limit") and i.fall_limit is not None:
+                new_converter_string += str(i.fall_limit)
+            new_converter_string += ","
+            if hasattr(i, "rise_limit") and i.rise_limit is not None:
+                new_converter_string += str(i.rise_limit)
+            new_converter_string += ","
+            if (hasattr(i, "fall_limit") and i.fall_limit is not None) or (
+                hasattr(i, "rise_limit") and i.rise_limit is not None
+            ):
+                new_converter_string += "0"  # Using units of % per minute
+
+            if hasattr(i, "control_type") and i.control_type is not None:
+                if (
+                    i.control_type.lower() == "voltvar_vars_over_watts"
+                    or i.control_type.lower() == "voltvar"
+                ):  # use default voltvar curve in cyme
+                    new_converter_control_setting_string += "1"
+                if i.control_type.lower() == "voltvar_watts_over_vars":
+                    new_converter_control_setting_string += "0"
+                if i.control_type.lower() == "voltvar_fixed_vars":
+                    new_converter_control_setting_string += "2"
+                if i.control_type.lower() == "voltvar_novars":
+                    new_converter_control_setting_string += "3"
+                if i.control_type.lower() == "voltwatt":
+                    new_converter_control_setting_string += "5"
+                if i.control_type.lower() == "watt_powerfactor":
+                    new_converter_control_setting_string += "6"
+                if i.control_type.lower() == "powerfactor":
+                    new_converter_control_setting_string += "10"
+
+                new_converter_control_setting_string += ","
+                if (
+                    i.control_type.lower() == "voltvar_fixed_vars"
+                    and i.var_injection is not None
+                ):
+                    new_converter_control_setting_string += (
+                        str(i.var_injection) + ",2,"
+                    )  # 2 is the code for the pecentage reactive power available
+                else:
+                    new_converter_control_setting_string += ",,"
+                if (
+                    i.control_type.lower() == "voltvar_watts_over_vars"
+                    or i.control_type.lower() == "voltvar_vars_over_watts"
+                ) and i.voltvar_curve is not None:
+                    new_converter_control_setting_string += i.voltvar_curve + ",,"
+                elif (
+                    i.control_type.lower() == "voltwatt"
+                    and i.voltwatt_curve is not None
+                ):
+                    new_converter_control_setting_string += (
+                        i.voltwatt_curve + ",0,"
+                    )  # 0 is the code for using the active power rating
+                elif (
+                    i.control_type.lower() == "watt_powerfactor"
+                    and i.watt_powerfactor_curve is not None
+                ):
+                    new_converter_control_setting_string += (
+                        i.watt_powerfactor_curve + ",0,"
+                    )  # 0 is the code for using the active power rating
+                else:
+                    new_converter_control_setting_string += ",,"
+            else:
+                new_converter_control_setting_string += "10" + "," * 5
+
+        if new_converter_string != "":
+            self.append_line("converter", new_converter_string)
+        if new_converter_control_setting_string != "":
+            self.append_line("converter_control", new_converter_control_setting_string)
+
+        if new_bess_setting_string != "":
+            self.append_line("bess_settings", new_bess_setting_string)
+
+    def render_photovoltaic(self, i, model):
+        """Render a Photovoltaic object."""
+        new_converter_string = ""
+        new_converter_control_setting_string = ""
+        new_pv_setting_string = ""
+        new_dg_generation_string = ""
+        if (
+            hasattr(i, "name")
+            and i.name is not None
+            and hasattr(i, "connecting_element")
+            and i.connecting_element is not None
+            and (
+                i.connecting_element in model.model_names
+                or "load_" + i.connecting_element in model.model_names
+            )
+        ):
+            new_section_ID = "{f}_{t}".format(f=i.connecting_element, t=i.name)
+            if len(new_section_ID) > 64:
+                hasher = hashlib.sha1()
+                hasher.update(new_section_ID.encode("utf-8"))
+                new_section_ID = hasher.hexdigest()
+
+            new_section = (
+                new_section_ID
+                + ",{f},0,{t},0,".format(  # Assume only one index for the load connection point
+                    f=i.connecting_element, t=i.name
+                )
+            )
 
-                # If we get a Capacitor object
-                #
-                if isinstance(i, Capacitor):
+            new_node_string = "{n}".format(n=i.name)
+            if hasattr(i, "positions") and i.positions is not None:
+                try:
+                    new_node_string += "," + str(i.positions[0].long)
+                except:
+                    new_node_string += ",0"
+                    pass
+
+                try:
+                    new_node_string += "," + str(i.positions[0].lat)
+                except:
+                    new_node_string += ",0"
+                    pass
+            else:
+                new_node_string += ",0,0"
+            self.append_line("node", new_node_string)
+
+            phases = ""
+            for phase in i.phases:
+                if phase.default_value in ["A", "B", "C"]:
+                    new_section += phase.default_value
+                    phases += phase.default_value
+            self.add_section(new_section, getattr(i, "feeder_name", None), carry=False)
+            self.add_feeder_section_ID(
+                new_section_ID,
+                getattr(i, "feeder_name", None),
+                getattr(i, "substation_name", None),
+            )
 
-                    # Empty new capacitor string
-                    new_capacitor_line = ""
-                    new_capacitor_object_line = ""
+            new_converter_string += (
+                new_section_ID + ",45,"
+            )  # 45 is the CYME code for PV devices
+            new_converter_control_setting_string += (
+                new_section_ID + ",45,0,0,"
+            )  # The controlindex and timetrigger indices are both zero
+            new_pv_setting_string += (
+                new_section_ID + ",M," + new_section_ID + ",DEFAULT,"
+            )  # Use the default CYME PV configuration for the moment.
+            new_dg_generation_string += new_section_ID + "45,DEFAULT,"
+            # DGGENERATIONMODEL is not included as this just sets the LoadModelName which is DEFAULT
+
+            if hasattr(i, "rated_power") and i.rated_power is not None:
+                panel_area = math.ceil(
+                    i.rated_power / 1000 / 0.08
+                )  # Each panel produces 0.08 kw
+                num_x, num_y = self.smallest_perimeter(panel_area)
+                if min(num_x, num_y) == 1:
+                    num_x, num_y = self.smallest_perimeter(
+                        panel_area + 1
+                    )  # if area is prime
+                new_pv_setting_string += str(num_x) + "," + str(num_y) + ","
+            elif hasattr(i, "active_rating") and i.active_rating is not None:
+                panel_area = math.ceil(
+                    i.active_rating / 1.1 / 1000 / 0.08
+                )  # Each panel produces 0.08 kw. Assume 10% inverter oversize
+                num_x, num_y = self.smallest_perimeter(panel_area)
+                if min(num_x, num_y) == 1:
+                    num_x, num_y = self.smallest_perimeter(
+                        panel_area + 1
+                    )  # if area is prime
+                new_pv_setting_string += str(num_x) + "," + str(num_y) + ","
+            else:
+                new_pv_setting_string += ",,"  # This will produce garbage output power
 
-                    # Connecting element
-                    # We need to create a new section since there is no physical line connecting
-                    # capacitors to the rest of the feeder in DiTTo, but CYME needs a section for this
-                    new_section = None
-                    if (
-                        hasattr(i, "name")
-                        and i.name is not None
-                        and hasattr(i, "connecting_element")
-                        and i.connecting_element is not None
-                    ):
-                        try:
-                            new_section_ID = "{f}_{t}".format(
-                                f=i.connecting_element, t=i.name
-                            )
-                            if len(new_section_ID) > 64:
-                                hasher = hashlib.sha1()
-                                hasher.update(new_section_ID.encode("utf-8"))
-                                new_section_ID = hasher.hexdigest()
-                            new_section = (
-                                new_section_ID
-                                + ",{f},0,{t},0,".format(  # assume only one connection point for capacitors
-                                    f=i.connecting_element, t=i.name
-                                )
+            if hasattr(i, "temperature") and i.temperature is not None:
+                new_pv_setting_string += str(i.temperature)
+
+            new_pv_setting_string += "," + phases
+
+            if hasattr(i, "active_rating") and i.active_rating is not None:
+                if hasattr(i, "reactive_rating") and i.reactive_rating is not None:
+                    new_converter_string += (
+                        str(
+                            math.sqrt(i.reactive_rating ** 2 + i.active_rating ** 2)
+                            / 1000.0
+                        )
+                        + ","
+                    )
+                else:
+                    new_converter_string += str(i.active_rating / 1000.0) + ","
+                new_converter_string += str(i.active_rating / 1000.0) + ","
+            elif hasattr(i, "rated_power") and i.rated_power is not None:
+                if hasattr(i, "reactive_rating") and i.reactive_rating is not None:
+                    new_converter_string += (
+                        str(
+                            math.sqrt(
+                                i.reactive_rating ** 2 + (i.rated_power * 1.1) ** 2
                             )
-                            new_capacitor_line += new_section_ID
-                            if i.connecting_element not in self.nodeID_list:
-                                self.nodeID_list.append(i.connecting_element)
-                                self.node_string_list.append(
-                                    "{},0,0".format(i.connecting_element)
-                                )
-                            if i.name not in self.nodeID_list:
-                                if hasattr(i, "positions") and i.positions is not None:
-                                    try:
-                                        X = i.positions[0].long
-                                        Y = i.positions[0].lat
-                                    except:
-                                        X = 0
-                                        Y = 0
-                                        pass
-                                else:
-                                    X = 0
-                                    Y = 0
-                                self.nodeID_list.append(i.name)
-                                self.node_string_list.append(
-                                    "{name},{X},{Y}".format(name=i.name, X=X, Y=Y)
-                                )
-                            if hasattr(i, "feeder_name") and i.feeder_name is not None:
-                                if i.feeder_name in self.section_feeder_mapping:
-                                    self.section_feeder_mapping[i.feeder_name].append(
-                                        new_section_ID
-                                    )
-                                else:
-                                    self.section_feeder_mapping[i.feeder_name] = [
-                                        new_section_ID
-                                    ]
-                                if (
-                                    hasattr(i, "substation_name")
-                                    and i.substation_name is not None
-                                ):
-                                    self.section_headnode_mapping[
-                                        i.feeder_name
-                                    ] = i.substation_name
-                        except:
-                            continue
+                            / 1000.0
+                        )
+                        + ","
+                    )
+                else:
+                    new_converter_string += str(i.rated_power * 1.1 / 1000.0) + ","
+                new_converter_string += (
+                    str(i.rated_power * 1.1 / 1000.0) + ","
+                )  # Default value sets inverter to be oversized by 10%
+            else:
+                new_converter_string += ",,"
+
+            if hasattr(i, "reactive_rating") and i.reactive_rating is not None:
+                new_converter_string += str(i.reactive_rating / 1000.0) + ","
+            elif hasattr(i, "rated_power") and i.rated_power is not None:
+                new_converter_string += (
+                    str(i.rated_power * 1.1 / 1000.0) + ","
+                )  # Default value sets inverter to be oversized by 10% and active=reactive
+            else:
+                new_converter_string += ","
+
+            if hasattr(i, "rated_power") and i.rated_power is not None:
+                new_dg_generation_string += str(i.rated_power / 1000.0)
+            elif hasattr(i, "rated_power") and i.rated_power is not None:
+                new_dg_generation_string += str(i.rated_power / 1000.0)
+            new_dg_generation_string += ","
+            if hasattr(i, "min_powerfactor") and i.min_powerfactor is not None:
+                new_converter_string += str(i.powerfactor * 100)
+                new_dg_generation_string += str(i.powerfactor * 100)
+            new_dg_generation_string += ","
+            new_converter_string += ","
+            if hasattr(i, "fall_limit") and i.fall_limit is not None:
+                new_converter_string += str(i.fall_limit)
+            new_converter_string += ","
+            if hasattr(i, "rise_limit") and i.rise_limit is not None:
+                new_converter_string += str(i.rise_limit)
+            new_converter_string += ","
+            if (hasattr(i, "fall_limit") and i.fall_limit is not None) or (
+                hasattr(i, "rise_limit") and i.rise_limit is not None
+            ):
+                new_converter_string += "0"  # Using units of % per minute
+
+            if hasattr(i, "control_type") and i.control_type is not None:
+                if (
+                    i.control_type.lower() == "voltvar_vars_over_watts"
+                    or i.control_type.lower() == "voltvar"
+                ):  # use default voltvar curve in cyme
+                    new_converter_control_setting_string += "1"
+                if i.control_type.lower() == "voltvar_watts_over_vars":
+                    new_converter_control_setting_string += "0"
+                if i.control_type.lower() == "voltvar_fixed_vars":
+                    new_converter_control_setting_string += "2"
+                if i.control_type.lower() == "voltvar_novars":
+                    new_converter_control_setting_string += "3"
+                if i.control_type.lower() == "voltwatt":
+                    new_converter_control_setting_string += "5"
+                if i.control_type.lower() == "watt_powerfactor":
+                    new_converter_control_setting_string += "6"
+                if i.control_type.lower() == "powerfactor":
+                    new_converter_control_setting_string += "10"
+
+                new_converter_control_setting_string += ","
+                if (
+                    i.control_type.lower() == "voltvar_fixed_vars"
+                    and i.var_injection is not None
+                ):
+                    new_converter_control_setting_string += (
+                        str(i.var_injection) + ",2,"
+                    )  # 2 is the code for the pecentage reactive power available
+                else:
+                    new_converter_control_setting_string += ",,"
+                if (
+                    i.control_type.lower() == "voltvar_watts_over_vars"
+                    or i.control_type.lower() == "voltvar_vars_over_watts"
+                ) and i.voltvar_curve is not None:
+                    new_converter_control_setting_string += i.voltvar_curve + ",,"
+                elif (
+                    i.control_type.lower() == "voltwatt"
+                    and i.voltwatt_curve is not None
+                ):
+                    new_converter_control_setting_string += (
+                        i.voltwatt_curve + ",0,"
+                    )  # 0 is the code for using the active power rating
+                elif (
+                    i.control_type.lower() == "watt_powerfactor"
+                    and i.watt_powerfactor_curve is not None
+                ):
+                    new_converter_control_setting_string += (
+                        i.watt_powerfactor_curve + ",0,"
+                    )  # 0 is the code for using the active power rating
+                else:
+                    new_converter_control_setting_string += ",,"
 
-                    # Connection type
-                    if hasattr(i, "connection_type") and i.connection_type is not None:
-                        try:
-                            new_capacitor_line += "," + i.connection_type
-                        except:
-                            new_capacitor_line += ","
-                            pass
-                    else:
-                        new_capacitor_line += ","
+                if (
+                    i.control_type.lower() == "powerfactor"
+                    and i.powerfactor is not None
+                ):
+                    new_converter_control_setting_string += str(i.powerfactor)
+            else:
+                new_converter_control_setting_string += (
+                    "10,,,,,100"  # Use Powerfactor as default
+                )
+
+            if (
+                hasattr(i, "timeseries")
+                and i.timeseries is not None
+                and len(i.timeseries) > 0
+                and i.timeseries[0].data_label is not None
+                and i.timeseries[0].data_location is not None
+            ):
+                new_pv_setting_string += ",0,{loc}".format(
+                    loc=i.timeseries[0].data_label
+                )
+                self.add_irradiance_profile(
+                    i.timeseries[0].data_label, i.timeseries[0].data_location
+                )
+            else:
+                new_pv_setting_string += ",1,"
+
+        else:
+            if hasattr(i, "name"):
+                logger.warning(
+                    "PV "
+                    + i.name
+                    + " was not connected and has not been written to CYME"
+                )
+            else:
+                logger.warning("PV element is unnamed")
+
+        if new_converter_string != "":
+            self.append_line("converter", new_converter_string)
+        if new_converter_control_setting_string != "":
+            self.append_line("converter_control", new_converter_control_setting_string)
+        if new_pv_setting_string != "":
+            self.append_line("pv_settings", new_pv_setting_string)
+        if new_dg_generation_string != "":
+            self.append_line("dg_generation", new_dg_generation_string)
+
+    def render_capacitor(self, i, model):
+        """Render a Capacitor object."""
+
+        # Empty new capacitor string
+        new_capacitor_line = ""
+        new_capacitor_object_line = ""
+
+        # Connecting element
+        # We need to create a new section since there is no physical line connecting
+        # capacitors to the rest of the feeder in DiTTo, but CYME needs a section for this
+        new_section = None
+        new_section_ID = ""
+        if (
+            hasattr(i, "name")
+            and i.name is not None
+            and hasattr(i, "connecting_element")
+            and i.connecting_element is not None
+        ):
+            try:
+                new_section_ID = "{f}_{t}".format(f=i.connecting_element, t=i.name)
+                if len(new_section_ID) > 64:
+                    hasher = hashlib.sha1()
+                    hasher.update(new_section_ID.encode("utf-8"))
+                    new_section_ID = hasher.hexdigest()
+                new_section = (
+                    new_section_ID
+                    + ",{f},0,{t},0,".format(  # assume only one connection point for capacitors
+                        f=i.connecting_element, t=i.name
+                    )
+                )
+                new_capacitor_line += new_section_ID
+                self.add_missing_node(
+                    i.connecting_element, "{},0,0".format(i.connecting_element)
+                )
+                if hasattr(i, "positions") and i.positions is not None:
+                    try:
+                        X = i.positions[0].long
+                        Y = i.positions[0].lat
+                    except:
+                        X = 0
+                        Y = 0
+                        pass
+                else:
+                    X = 0
+                    Y = 0
+                self.add_missing_node(
+                    i.name, "{name},{X},{Y}".format(name=i.name, X=X, Y=Y)
+                )
+                self.add_feeder_section_ID(
+                    new_section_ID,
+                    getattr(i, "feeder_name", None),
+                    getattr(i, "substation_name", None),
+                )
+            except:
+                return
+
+        # Connection type
+        if hasattr(i, "connection_type") and i.connection_type is not None:
+            try:
+                new_capacitor_line += "," + i.connection_type
+            except:
+                new_capacitor_line += ","
+                pass
+        else:
+            new_capacitor_line += ","
+
+        # KVAR and Phase
+        phases = []
+        if hasattr(i, "phase_capacitors") and i.phase_capacitors is not None:
+            total_var = 0
+            one_var = 0
+            switched_vars = {}
+            # new_capacitor_line+=','
+            for phase_capacitor in i.phase_capacitors:
+                if (
+                    hasattr(phase_capacitor, "phase")
+                    and phase_capacitor.phase is not None
+                ):
+                    phases.append(phase_capacitor.phase)
+                    if new_section is not None:
+                        new_section += str(phase_capacitor.phase)
+
+                if hasattr(phase_capacitor, "var") and phase_capacitor.var is not None:
+                    total_var += phase_capacitor.var
+                if (
+                    phase_capacitor.var is not None
+                    and phase_capacitor.phase is not None
+                ):
+                    switched_vars[phase_capacitor.phase.upper()] = phase_capacitor.var
+            if "A" in switched_vars:
+                new_capacitor_line += "," + str(switched_vars["A"] * 10 ** -3)
+                one_var = switched_vars["A"]
+            else:
+                new_capacitor_line += ","
+            if "B" in switched_vars:
+                new_capacitor_line += "," + str(switched_vars["B"] * 10 ** -3)
+                one_var = switched_vars["B"]
+            else:
+                new_capacitor_line += ","
+            if "C" in switched_vars:
+                new_capacitor_line += "," + str(switched_vars["C"] * 10 ** -3)
+                one_var = switched_vars["C"]
+            else:
+                new_capacitor_line += ","
+            if total_var > 0:
+                new_capacitor_object_line += str(one_var * 10 ** -3) + ","
+            else:
+                new_capacitor_object_line += ","
+                pass
+
+        # KV
+        if hasattr(i, "nominal_voltage") and i.nominal_voltage is not None:
+            try:
+                if len(phases) == 1:
+                    new_capacitor_line += "," + str(i.nominal_voltage * 10 ** -3)
+                    new_capacitor_object_line += str(i.nominal_voltage * 10 ** -3) + ","
+                else:
+                    new_capacitor_line += "," + str(
+                        i.nominal_voltage * 10 ** -3 / math.sqrt(3)
+                    )
+                    new_capacitor_object_line += (
+                        str(i.nominal_voltage * 10 ** -3 / math.sqrt(3)) + ","
+                    )
+            except:
+                new_capacitor_line += ","
+                new_capacitor_object_line += ","
+                pass
+
+        if hasattr(i, "mode") and i.mode is not None:
+            if i.mode.lower() == "currentFlow":
+                new_capacitor_line += ",2"
+            elif i.mode.lower() == "voltage":
+                new_capacitor_line += ",1"
+            elif i.mode.lower() == "activepower":
+                new_capacitor_line += ",4"
+            elif i.mode.lower() == "reactivepower":
+                new_capacitor_line += ",7"
+            elif i.mode.lower() == "timescheduled":
+                new_capacitor_line += ",6"
+            else:
+                new_capacitor_line += ",0"
+        else:
+            new_capacitor_line += ","
+
+        if hasattr(i, "low") and i.low is not None:
+            new_capacitor_line += "," + str(i.low) + "," + str(i.low) + "," + str(i.low)
+        else:
+            new_capacitor_line += ",,,"
+
+        if hasattr(i, "high") and i.high is not None:
+            new_capacitor_line += (
+                "," + str(i.high) + "," + str(i.high) + "," + str(i.high)
+            )
+        else:
+            new_capacitor_line += ",,,"
+
+        new_capacitor_line += (
+            ","
+            + new_section_ID
+            + ",capacitor_"
+            + str(self.equipment_ID("capcodes", new_capacitor_object_line))
+        )
+
+        new_capacitor_line += ",S,0"  # Location and ConnectionStatus
+
+        if new_capacitor_line != "":
+            self.append_line("capacitor", new_capacitor_line)
+
+        if new_section is not None:
+            self.add_section(new_section, *self.network_ID(i))
+
+    def render_regulator(self, i, model):
+        """Render a Regulator object."""
+
+        new_regulator_string = ""
+        new_regulator_object_line = ""
+
+        # We need to get bus1 and bus2 to create the section bus1_bus2
+        new_section = None
+        new_section_ID = None
+        if (
+            hasattr(i, "from_element")
+            and i.from_element is not None
+            and hasattr(i, "to_element")
+            and i.to_element is not None
+        ):
+            # try:
+            from_index = 0
+            to_index = 0
+            if (
+                hasattr(i, "from_element_connection_index")
+                and i.from_element_connection_index is not None
+            ):
+                from_index = i.from_element_connection_index
+            if (
+                hasattr(i, "to_element_connection_index")
+                and i.to_element_connection_index is not None
+            ):
+                to_index = i.to_element_connection_index
+            new_section_ID = "{f}_{t}".format(f=i.from_element, t=i.to_element)
+            if len(new_section_ID) > 64:
+                hasher = hashlib.sha1()
+                hasher.update(new_section_ID.encode("utf-8"))
+                new_section_ID = hasher.hexdigest()
+            new_section = new_section_ID + ",{f},{fi},{t},{ti},".format(
+                f=i.from_element, fi=from_index, t=i.to_element, ti=to_index
+            )
+            self.add_feeder_section_ID(
+                new_section_ID,
+                getattr(i, "feeder_name", None),
+                getattr(i, "substation_name", None),
+            )
+            # except:
+            #    pass
+
+        # If we have a regulator with two windings that have different
+        # voltages, we create a new section and a new transformer connected to it
+        # in order to have the voltage change
+        winding1 = None
+        winding2 = None
+        from_element = None
+        to_element = None
+        from_index = 0
+        to_index = 0
+        windings_local = []
+        if hasattr(i, "windings") and i.windings is not None:
+            if (
+                len(i.windings) >= 2
+                and hasattr(i.windings[0], "nominal_voltage")
+                and hasattr(i.windings[1], "nominal_voltage")
+                and i.windings[0].nominal_voltage is not None
+                and i.windings[1].nominal_voltage is not None
+            ):
+                winding1 = i.windings[0]
+                winding2 = i.windings[1]
+                if (
+                    hasattr(i, "from_element")
+                    and i.from_element is not None
+                    and hasattr(i, "to_element")
+                    and i.to_element is not None
+                ):
+                    from_element = i.from_element
+                    to_element = i.to_element
 
-                    # KVAR and Phase
-                    phases = []
                     if (
-                        hasattr(i, "phase_capacitors")
-                        and i.phase_capacitors is not None
+                        hasattr(i, "from_element_connection_index")
+                        and i.from_element_connection_index is not None
                     ):
-                        total_var = 0
-                        one_var = 0
-                        switched_vars = {}
-                        # new_capacitor_line+=','
-                        for phase_capacitor in i.phase_capacitors:
+                        from_index = i.from_element_connection_index
+                    if (
+                        hasattr(i, "to_element_connection_index")
+                        and i.to_element_connection_index is not None
+                    ):
+                        to_index = i.to_element_connection_index
+        if winding1 is not None and winding2 is not None:
+            windings_local = [winding1, winding2]
+            if winding1.nominal_voltage != winding2.nominal_voltage:
+                new_trans_sectionID = "{f}_{t}".format(
+                    f=from_element, t=to_element + "_reg"
+                )
+                if len(new_trans_sectionID) > 64:
+                    hasher = hashlib.sha1()
+                    hasher.update(new_trans_sectionID.encode("utf-8"))
+                    new_trans_sectionID = hasher.hexdigest()
+                new_trans_section = new_trans_sectionID + ",{f},{fi},{t},{ti},".format(
+                    f=from_element, fi=from_index, t=to_element + "_reg", ti=to_index,
+                )
+                new_section_ID = "{f}_{t}".format(f=to_element + "_reg", t=to_element)
+                if len(new_section_ID) > 64:
+                    hasher = hashlib.sha1()
+                    hasher.update(new_section_ID.encode("utf-8"))
+                    new_section_ID = hasher.hexdigest()
+                new_section = new_section_ID + ",{f},{fi},{t},{ti},".format(
+                    f=to_element + "_reg", fi=from_index, t=to_element, ti=to_index,
+                )
+                self.add_feeder_section_ID(
+                    new_section_ID,
+                    getattr(i, "feeder_name", None),
+                    getattr(i, "substation_name", None),
+                )
+                self.add_node_ID(to_element + "_reg")
+                self.append_line("node", "{},0,0".format(to_element + "_reg"))
+                new_transformer_line = ""
+                new_transformer_object_line = ""
+                phase_on = ""
+                if (
+                    hasattr(winding1, "phase_windings")
+                    and winding1.phase_windings is not None
+                ):
+                    for phase_winding in winding1.phase_windings:
+                        if new_trans_section is not None:
                             if (
-                                hasattr(phase_capacitor, "phase")
-                                and phase_capacitor.phase is not None
+                                hasattr(phase_winding, "phase")
+                                and phase_winding.phase is not None
                             ):
-                                phases.append(phase_capacitor.phase)
-                                if new_section is not None:
-                                    new_section += str(phase_capacitor.phase)
+                                new_trans_section += str(phase_winding.phase)
+                                phase_on += str(phase_winding.phase)
+
+                if new_trans_section is not None:
+                    # The network gets the regulator section, not the transformer one
+                    self.add_section(
+                        new_trans_section,
+                        *self.network_ID(i),
+                        unique=True,
+                        network_section=new_section
+                    )
 
-                            if (
-                                hasattr(phase_capacitor, "var")
-                                and phase_capacitor.var is not None
-                            ):
-                                total_var += phase_capacitor.var
-                            if (
-                                phase_capacitor.var is not None
-                                and phase_capacitor.phase is not None
-                            ):
-                                switched_vars[
-                                    phase_capacitor.phase.upper()
-                                ] = phase_capacitor.var
-                        if "A" in switched_vars:
-                            new_capacitor_line += "," + str(
-                                switched_vars["A"] * 10 ** -3
-                            )
-                            one_var = switched_vars["A"]
-                        else:
-                            new_capacitor_line += ","
-                        if "B" in switched_vars:
-                            new_capacitor_line += "," + str(
-                                switched_vars["B"] * 10 ** -3
-                            )
-                            one_var = switched_vars["B"]
-                        else:
-                            new_capacitor_line += ","
-                        if "C" in switched_vars:
-                            new_capacitor_line += "," + str(
-                                switched_vars["C"] * 10 ** -3
-                            )
-                            one_var = switched_vars["C"]
-                        else:
-                            new_capacitor_line += ","
-                        if total_var > 0:
-                            new_capacitor_object_line += str(one_var * 10 ** -3) + ","
+                if (
+                    hasattr(winding1, "phase_windings")
+                    and winding1.phase_windings is not None
+                ):
+                    try:
+                        if len(winding1.phase_windings) == 1:
+                            TYPE = 1
+                        elif len(winding1.phase_windings) == 3:
+                            TYPE = 2
                         else:
-                            new_capacitor_object_line += ","
-                            pass
+                            TYPE = 3
+                    except:
+                        TYPE = 3
+                        pass
+                else:
+                    TYPE = 3
 
-                    # KV
-                    if hasattr(i, "nominal_voltage") and i.nominal_voltage is not None:
-                        try:
-                            if len(phases) == 1:
-                                new_capacitor_line += "," + str(
-                                    i.nominal_voltage * 10 ** -3
-                                )
-                                new_capacitor_object_line += (
-                                    str(i.nominal_voltage * 10 ** -3) + ","
-                                )
-                            else:
-                                new_capacitor_line += "," + str(
-                                    i.nominal_voltage * 10 ** -3 / math.sqrt(3)
-                                )
-                                new_capacitor_object_line += (
-                                    str(i.nominal_voltage * 10 ** -3 / math.sqrt(3))
-                                    + ","
-                                )
-                        except:
-                            new_capacitor_line += ","
-                            new_capacitor_object_line += ","
-                            pass
+                try:
+                    new_transformer_line += new_trans_sectionID
+                except:
+                    pass
 
-                    if hasattr(i, "mode") and i.mode is not None:
-                        if i.mode.lower() == "currentFlow":
-                            new_capacitor_line += ",2"
-                        elif i.mode.lower() == "voltage":
-                            new_capacitor_line += ",1"
-                        elif i.mode.lower() == "activepower":
-                            new_capacitor_line += ",4"
-                        elif i.mode.lower() == "reactivepower":
-                            new_capacitor_line += ",7"
-                        elif i.mode.lower() == "timescheduled":
-                            new_capacitor_line += ",6"
-                        else:
-                            new_capacitor_line += ",0"
-                    else:
-                        new_capacitor_line += ","
+                # CoordX and CoordY
+                if hasattr(i, "positions") and i.positions is not None:
+                    try:
+                        new_transformer_line += "," + str(i.positions[0].long)
+                        new_transformer_line += "," + str(i.positions[0].lat)
+                    except:
+                        new_transformer_line += ",,"
+                        pass
 
-                    if hasattr(i, "low") and i.low is not None:
-                        new_capacitor_line += (
-                            "," + str(i.low) + "," + str(i.low) + "," + str(i.low)
+                CONN = ""
+                try:
+                    new_transformer_line += (
+                        ","
+                        + self.transformer_connection_configuration_mapping(
+                            winding1.connection_type,
+                            winding2.connection_type,
+                            "transformer_settings",
                         )
-                    else:
-                        new_capacitor_line += ",,,"
-
-                    if hasattr(i, "high") and i.high is not None:
-                        new_capacitor_line += (
-                            "," + str(i.high) + "," + str(i.high) + "," + str(i.high)
+                    )
+                    CONN = self.transformer_connection_configuration_mapping(
+                        winding1.connection_type, winding2.connection_type
+                    )
+                except:
+                    new_transformer_line += ","
+                    pass
+
+                phase_shift = 0
+                if CONN == "0" or CONN == "4":
+                    phase_shift = 0
+                if CONN == "1" or CONN == "2":
+                    phase_shift = 1
+
+                try:
+                    new_transformer_line += "," + phase_on
+                except:
+                    new_transformer_line += ","
+                    pass
+
+                # XHL is in percentage of the KVA of the FIRST winding
+                XHL = RH = RL = None
+                if (
+                    hasattr(i, "reactances")
+                    and i.reactances is not None
+                    and len(i.reactances) == 1
+                ):
+                    try:
+                        XHL = (
+                            i.reactances[0] * 10 ** -2 * winding1.rated_power * 10 ** -3
                         )
-                    else:
-                        new_capacitor_line += ",,,"
+                    except:
+                        XHL = 0
+                        pass
 
-                    found = False
-                    for k, d in self.capcodes.items():
-                        if d == new_capacitor_object_line:
-                            new_capacitor_line += (
-                                "," + new_section_ID + ",capacitor_" + str(k)
-                            )
-                            found = True
-                    if not found:
-                        ID_cap += 1
-                        self.capcodes[ID_cap] = new_capacitor_object_line
-                        new_capacitor_line += (
-                            "," + new_section_ID + ",capacitor_" + str(ID_cap)
+                if (
+                    hasattr(winding1, "resistance")
+                    and hasattr(winding2, "resistance")
+                    and winding1.resistance is not None
+                    and winding2.resistance is not None
+                ):
+                    # Resistance is given as a percentage of the KVA of the corresponding winding
+                    try:
+                        RH = (
+                            winding1.resistance
+                            * 10 ** -2
+                            * winding1.rated_power
+                            * 10 ** -3
                         )
+                        RL = (
+                            winding2.resistance
+                            * 10 ** -2
+                            * winding2.rated_power
+                            * 10 ** -3
+                        )
+                    except:
+                        RH = 0
+                        RL = 0
+                        pass
 
-                    new_capacitor_line += ",S,0"  # Location and ConnectionStatus
+                # We have ZHL=(RH+RL)+XHLj
+                #
+                # Compute the X over R ratio
+                try:
+                    XR = (XHL) / (RH + RL)
+                    XR0 = XR
+                except:
+                    XR = 0
+                    XR0 = 0
+                    pass
+                #
+                # |ZHL|=sqrt((RH+RL)^2 + XHL^2)
+                try:
+                    _ZHL_ = math.sqrt((RH + RL) ** 2 + XHL ** 2)
+                except:
+                    _ZHL_ = 0
+                    pass
 
-                    if new_capacitor_line != "":
-                        capacitor_string_list.append(new_capacitor_line)
+                #
+                # Expressed in percentage of the KVA base
+                try:
+                    Z1 = _ZHL_ * 100.0 / (winding1.rated_power * 10 ** -3)
+                except:
+                    Z1 = 0
+                    pass
+                Z0 = Z1
+
+                # Total kva
+                try:
+                    KVA = windings_local[0].rated_power
+                except:
+                    pass
+
+                KVLLprim = ""
+                KVLLsec = ""
+                VoltageUnit = 1
+                for w, winding in enumerate(windings_local):
+
+                    if hasattr(winding, "nominal_voltage"):
+                        try:
+                            if w == 0:
+                                KVLLprim = winding.nominal_voltage * 10 ** -3
+                                if getattr(i, "is_center_tap", False) == True:
+                                    KVLLprim = round(
+                                        KVLLprim / (3 ** 0.5), 2
+                                    )  # produces output in L-N format if center-tap rather than L-L
+                                VoltageUnit = 1  # Voltage declared in KV, not in KVLL
+                            elif w == 1:
+                                KVLLsec = winding.nominal_voltage * 10 ** -3
+                                VoltageUnit = 1  # Voltage declared in KV, not in KVLL
+                        except:
+                            pass
+                    # NoLoadLosses
+                    if hasattr(i, "noload_loss") and i.noload_loss is not None:
+                        # TODO: Make sure noloadlosses is in % in DiTTo, or change what is next.
+                        NoLoadLosses = i.noload_loss / 100.0 * KVA
+                    else:
+                        NoLoadLosses = ""
+
+                new_transformer_object_line += "{type},{kva},{voltageunit},{kvllprim},{kvllsec},{Z1},{Z0},{XR},{XR0},{Conn},{WindingType},{noloadloss},{phaseshift},{isltc}".format(
+                    type=TYPE,
+                    kva=KVA,
+                    voltageunit=VoltageUnit,
+                    kvllprim=KVLLprim,
+                    kvllsec=KVLLsec,
+                    Conn=CONN,
+                    Z1=Z1,
+                    Z0=Z0,
+                    XR=XR,
+                    XR0=XR0,
+                    WindingType=1,
+                    noloadloss=NoLoadLosses,
+                    phaseshift=phase_shift,
+                    isltc=0,
+                )
 
-                    if new_section is not None:
-                        self.section_line_list.append(new_section)
-                        # If the object is inside of a substation...
-                        if hasattr(i, "is_substation") and i.is_substation == 1:
-                            # ...it should have the name of the substation specified in the 'substation_name' attribute
-                            if (
-                                hasattr(i, "substation_name")
-                                and i.substation_name is not None
-                                and i.substation_name != ""
-                            ):
-                                # Add 'substation_' prefix to easily distinguish substation from feeders or transmission lines
-                                ff_name = "substation_{}".format(i.substation_name)
-                                self.network_have_substations = True
-                        # If the object is not inside of a substation, then use the feeder_name attribute if it exists
-                        elif (
-                            hasattr(i, "feeder_name")
-                            and i.feeder_name is not None
-                            and i.feeder_name != ""
-                        ):
-                            ff_name = i.feeder_name
+                k = self.equipment_ID(
+                    "two_windings_trans_codes", new_transformer_object_line
+                )
+                new_transformer_line += (
+                    ",transformer_" + str(k) + ",transformer_" + str(k)
+                )
 
-                        if ff_name in self.section_line_feeder_mapping:
-                            self.section_line_feeder_mapping[ff_name].append(
-                                new_section
-                            )
-                        else:
-                            self.section_line_feeder_mapping[ff_name] = [new_section]
+                new_transformer_line += ",{PhaseShiftType},M,100,100,None,0".format(
+                    PhaseShiftType=phase_shift
+                )  # Phase shift, Location, PrimTap,SecondaryTap, ODPrimPh, and ConnectionStatus
 
-                # If we get a Regulator
-                #
-                if isinstance(i, Regulator) and not (
-                    hasattr(i, "ltc") and i.ltc is not None and i.ltc
-                ):
+                if new_transformer_line != "":
+                    self.append_line("two_windings_transformer", new_transformer_line)
 
-                    new_regulator_string = ""
-                    new_regulator_object_line = ""
+            if hasattr(winding1, "phase_windings"):
+                for phase_winding in winding1.phase_windings:
+                    try:
+                        new_section += str(phase_winding.phase)
+                    except:
+                        pass
 
-                    # We need to get bus1 and bus2 to create the section bus1_bus2
-                    new_section = None
-                    new_section_ID = None
-                    if (
-                        hasattr(i, "from_element")
-                        and i.from_element is not None
-                        and hasattr(i, "to_element")
-                        and i.to_element is not None
-                    ):
-                        # try:
-                        from_index = 0
-                        to_index = 0
-                        if (
-                            hasattr(i, "from_element_connection_index")
-                            and i.from_element_connection_index is not None
-                        ):
-                            from_index = i.from_element_connection_index
-                        if (
-                            hasattr(i, "to_element_connection_index")
-                            and i.to_element_connection_index is not None
-                        ):
-                            to_index = i.to_element_connection_index
-                        new_section_ID = "{f}_{t}".format(
-                            f=i.from_element, t=i.to_element
-                        )
-                        if len(new_section_ID) > 64:
-                            hasher = hashlib.sha1()
-                            hasher.update(new_section_ID.encode("utf-8"))
-                            new_section_ID = hasher.hexdigest()
-                        new_section = new_section_ID + ",{f},{fi},{t},{ti},".format(
-                            f=i.from_element, fi=from_index, t=i.to_element, ti=to_index
-                        )
-                        if hasattr(i, "feeder_name") and i.feeder_name is not None:
-                            if i.feeder_name in self.section_feeder_mapping:
-                                self.section_feeder_mapping[i.feeder_name].append(
-                                    new_section_ID
-                                )
-                            else:
-                                self.section_feeder_mapping[i.feeder_name] = [
-                                    new_section_ID
-                                ]
-                            if (
-                                hasattr(i, "substation_name")
-                                and i.substation_name is not None
-                            ):
-                                self.section_headnode_mapping[
-                                    i.feeder_name
-                                ] = i.substation_name
-                        # except:
-                        #    pass
-
-                    # If we have a regulator with two windings that have different
-                    # voltages, we create a new section and a new transformer connected to it
-                    # in order to have the voltage change
-                    winding1 = None
-                    winding2 = None
-                    from_element = None
-                    to_element = None
-                    from_index = 0
-                    to_index = 0
-                    windings_local = []
-                    if hasattr(i, "windings") and i.windings is not None:
-                        if (
-                            len(i.windings) >= 2
-                            and hasattr(i.windings[0], "nominal_voltage")
-                            and hasattr(i.windings[1], "nominal_voltage")
-                            and i.windings[0].nominal_voltage is not None
-                            and i.windings[1].nominal_voltage is not None
-                        ):
-                            winding1 = i.windings[0]
-                            winding2 = i.windings[1]
-                            if (
-                                hasattr(i, "from_element")
-                                and i.from_element is not None
-                                and hasattr(i, "to_element")
-                                and i.to_element is not None
-                            ):
-                                from_element = i.from_element
-                                to_element = i.to_element
-
-                                if (
-                                    hasattr(i, "from_element_connection_index")
-                                    and i.from_element_connection_index is not None
-                                ):
-                                    from_index = i.from_element_connection_index
-                                if (
-                                    hasattr(i, "to_element_connection_index")
-                                    and i.to_element_connection_index is not None
-                                ):
-                                    to_index = i.to_element_connection_index
-                    if winding1 is not None and winding2 is not None:
-                        windings_local = [winding1, winding2]
-                        if winding1.nominal_voltage != winding2.nominal_voltage:
-                            new_trans_sectionID = "{f}_{t}".format(
-                                f=from_element, t=to_element + "_reg"
-                            )
-                            if len(new_trans_sectionID) > 64:
-                                hasher = hashlib.sha1()
-                                hasher.update(new_trans_sectionID.encode("utf-8"))
-                                new_trans_sectionID = hasher.hexdigest()
-                            new_trans_section = (
-                                new_trans_sectionID
-                                + ",{f},{fi},{t},{ti},".format(
-                                    f=from_element,
-                                    fi=from_index,
-                                    t=to_element + "_reg",
-                                    ti=to_index,
-                                )
-                            )
-                            new_section_ID = "{f}_{t}".format(
-                                f=to_element + "_reg", t=to_element
-                            )
-                            if len(new_section_ID) > 64:
-                                hasher = hashlib.sha1()
-                                hasher.update(new_section_ID.encode("utf-8"))
-                                new_section_ID = hasher.hexdigest()
-                            new_section = new_section_ID + ",{f},{fi},{t},{ti},".format(
-                                f=to_element + "_reg",
-                                fi=from_index,
-                                t=to_element,
-                                ti=to_index,
-                            )
-                            if hasattr(i, "feeder_name") and i.feeder_name is not None:
-                                if i.feeder_name in self.section_feeder_mapping:
-                                    self.section_feeder_mapping[i.feeder_name].append(
-                                        new_section_ID
-                                    )
-                                else:
-                                    self.section_feeder_mapping[i.feeder_name] = [
-                                        new_section_ID
-                                    ]
-                                if (
-                                    hasattr(i, "substation_name")
-                                    and i.substation_name is not None
-                                ):
-                                    self.section_headnode_mapping[
-                                        i.feeder_name
-                                    ] = i.substation_name
-                            self.nodeID_list.append(to_element + "_reg")
-                            self.node_string_list.append(
-                                "{},0,0".format(to_element + "_reg")
-                            )
-                            new_transformer_line = ""
-                            new_transformer_object_line = ""
-                            phase_on = ""
-                            if (
-                                hasattr(winding1, "phase_windings")
-                                and winding1.phase_windings is not None
-                            ):
-                                for phase_winding in winding1.phase_windings:
-                                    if new_trans_section is not None:
-                                        if (
-                                            hasattr(phase_winding, "phase")
-                                            and phase_winding.phase is not None
-                                        ):
-                                            new_trans_section += str(
-                                                phase_winding.phase
-                                            )
-                                            phase_on += str(phase_winding.phase)
-
-                            if (
-                                new_trans_section is not None
-                                and new_trans_section not in self.section_line_list
-                            ):
-                                self.section_line_list.append(new_trans_section)
-                                # If the object is inside of a substation...
-                                if hasattr(i, "is_substation") and i.is_substation == 1:
-                                    # ...it should have the name of the substation specified in the 'substation_name' attribute
-                                    if (
-                                        hasattr(i, "substation_name")
-                                        and i.substation_name is not None
-                                        and i.substation_name != ""
-                                    ):
-                                        # Add 'substation_' prefix to easily distinguish substation from feeders or transmission lines
-                                        ff_name = "substation_{}".format(
-                                            i.substation_name
-                                        )
-                                        self.network_have_substations = True
-                                # If the object is not inside of a substation, then use the feeder_name attribute if it exists
-                                elif (
-                                    hasattr(i, "feeder_name")
-                                    and i.feeder_name is not None
-                                    and i.feeder_name != ""
-                                ):
-                                    ff_name = i.feeder_name
-
-                                if ff_name in self.section_line_feeder_mapping:
-                                    self.section_line_feeder_mapping[ff_name].append(
-                                        new_section
-                                    )
-                                else:
-                                    self.section_line_feeder_mapping[ff_name] = [
-                                        new_section
-                                    ]
-
-                            if (
-                                hasattr(winding1, "phase_windings")
-                                and winding1.phase_windings is not None
-                            ):
-                                try:
-                                    if len(winding1.phase_windings) == 1:
-                                        TYPE = 1
-                                    elif len(winding1.phase_windings) == 3:
-                                        TYPE = 2
-                                    else:
-                                        TYPE = 3
-                                except:
-                                    TYPE = 3
-                                    pass
-                            else:
-                                TYPE = 3
-
-                            try:
-                                new_transformer_line += new_trans_sectionID
-                            except:
-                                pass
-
-                            # CoordX and CoordY
-                            if hasattr(i, "positions") and i.positions is not None:
-                                try:
-                                    new_transformer_line += "," + str(
-                                        i.positions[0].long
-                                    )
-                                    new_transformer_line += "," + str(
-                                        i.positions[0].lat
-                                    )
-                                except:
-                                    new_transformer_line += ",,"
-                                    pass
-
-                            CONN = ""
-                            try:
-                                new_transformer_line += (
-                                    ","
-                                    + self.transformer_connection_configuration_mapping(
-                                        winding1.connection_type,
-                                        winding2.connection_type,
-                                        "transformer_settings",
-                                    )
-                                )
-                                CONN = self.transformer_connection_configuration_mapping(
-                                    winding1.connection_type, winding2.connection_type
-                                )
-                            except:
-                                new_transformer_line += ","
-                                pass
-
-                            phase_shift = 0
-                            if CONN == "0" or CONN == "4":
-                                phase_shift = 0
-                            if CONN == "1" or CONN == "2":
-                                phase_shift = 1
-
-                            try:
-                                new_transformer_line += "," + phase_on
-                            except:
-                                new_transformer_line += ","
-                                pass
-
-                            if (
-                                hasattr(winding1, "resistance")
-                                and hasattr(winding2, "resistance")
-                                and winding1.resistance is not None
-                                and winding2.resistance is not None
-                            ):
-                                # Resistance is given as a percentage of the KVA of the corresponding winding
-                                try:
-                                    RH = (
-                                        winding1.resistance
-                                        * 10 ** -2
-                                        * winding1.rated_power
-                                        * 10 ** -3
-                                    )
-                                    RL = (
-                                        winding2.resistance
-                                        * 10 ** -2
-                                        * winding2.rated_power
-                                        * 10 ** -3
-                                    )
-                                except:
-                                    RH = 0
-                                    RL = 0
-                                    pass
-
-                            # We have ZHL=(RH+RL)+XHLj
-                            #
-                            # Compute the X over R ratio
-                            try:
-                                XR = (XHL) / (RH + RL)
-                                XR0 = XR
-                            except:
-                                XR = 0
-                                XR0 = 0
-                                pass
-                            #
-                            # |ZHL|=sqrt((RH+RL)^2 + XHL^2)
-                            try:
-                                _ZHL_ = math.sqrt((RH + RL) ** 2 + XHL ** 2)
-                            except:
-                                _ZHL_ = 0
-                                pass
-
-                            #
-                            # Expressed in percentage of the KVA base
-                            try:
-                                Z1 = _ZHL_ * 100.0 / (winding1.rated_power * 10 ** -3)
-                            except:
-                                Z1 = 0
-                                pass
-                            Z0 = Z1
-
-                            # Total kva
-                            try:
-                                KVA = windings_local[0].rated_power
-                            except:
-                                pass
-
-                            for w, winding in enumerate(windings_local):
+        if new_section is not None:
+            self.add_section(new_section, *self.network_ID(i), unique=True)
+
+        try:
+            new_regulator_string += new_section_ID
+        except:
+            pass
+
+        # CoordX and CoordY
+        if hasattr(i, "positions") and i.positions is not None:
+            try:
+                new_regulator_string += "," + str(i.positions[0].long)
+                new_regulator_string += "," + str(i.positions[0].lat)
+            except:
+                new_regulator_string += ",,"
+                pass
+        else:
+            new_regulator_string += ",,"
+
+        # if hasattr(i, "pt_phase") and i.pt_phase is not None:
+        #     try:
+        #         new_regulator_string += "," + str(i.pt_phase)
+        #     except:
+        #         new_regulator_string += ","
+        #         pass
+        # else:
+        #     new_regulator_string += ","
+
+        _KVA = 0
+        _KVLN = 0
+        _Rset = {"A": 0, "B": 0, "C": 0}
+        _Xset = {"A": 0, "B": 0, "C": 0}
+        _regphases = []
+        if len(windings_local) >= 2:
+            try:
+                _KVA = windings_local[0].rated_power * 10 ** -3
+            except:
+                pass
+            _KVLN = windings_local[-1].nominal_voltage / math.sqrt(3) * 10 ** -3
+
+            if (
+                hasattr(winding1, "phase_windings")
+                and winding1.phase_windings is not None
+            ):
+                for phase_winding in winding1.phase_windings:
+                    try:
+                        _regphases.append(phase_winding.phase)
+                        _Rset[phase_winding.phase] = phase_winding.compensator_r
+                        _Xset[phase_winding.phase] = phase_winding.compensator_x
+                    except:
+                        pass
 
-                                if hasattr(winding, "nominal_voltage"):
-                                    try:
-                                        if w == 0:
-                                            KVLLprim = (
-                                                winding.nominal_voltage * 10 ** -3
-                                            )
-                                            if transformer_object.is_center_tap == True:
-                                                KVLLprim = round(
-                                                    KVLLprim / (3 ** 0.5), 2
-                                                )  # produces output in L-N format if center-tap rather than L-L
-                                            VoltageUnit = (
-                                                1  # Voltage declared in KV, not in KVLL
-                                            )
-                                        elif w == 1:
-                                            KVLLsec = winding.nominal_voltage * 10 ** -3
-                                            VoltageUnit = (
-                                                1  # Voltage declared in KV, not in KVLL
-                                            )
-                                    except:
-                                        pass
-                                # NoLoadLosses
-                                if (
-                                    hasattr(i, "noload_loss")
-                                    and i.noload_loss is not None
-                                ):
-                                    # TODO: Make sure noloadlosses is in % in DiTTo, or change what is next.
-                                    NoLoadLosses = i.noload_loss / 100.0 * KVA
-                                else:
-                                    NoLoadLosses = ""
-
-                            new_transformer_object_line += "{type},{kva},{voltageunit},{kvllprim},{kvllsec},{Z1},{Z0},{XR},{XR0},{Conn},{WindingType},{noloadloss},{phaseshift},{isltc}".format(
-                                type=TYPE,
-                                kva=KVA,
-                                voltageunit=VoltageUnit,
-                                kvllprim=KVLLprim,
-                                kvllsec=KVLLsec,
-                                Conn=CONN,
-                                Z1=Z1,
-                                Z0=Z0,
-                                XR=XR,
-                                XR0=XR0,
-                                WindingType=1,
-                                noloadloss=NoLoadLosses,
-                                phaseshift=phase_shift,
-                                isltc=0,
-                            )
+        new_regulator_string += ","
+        for phase in _regphases:
+            new_regulator_string += phase
+
+        _band = None
+        if hasattr(i, "bandwidth") and i.bandwidth is not None:
+            try:
+                new_regulator_string += "," + str(i.bandwidth)
+                _band = str(i.bandwidth)
+            except:
+                new_regulator_string += ","
+                pass
+        else:
+            new_regulator_string += ","
+
+        _CT = None
+        if hasattr(i, "ct_ratio") and i.ct_ratio is not None:
+            try:
+                new_regulator_string += "," + str(i.ct_ratio)
+                _CT = str(i.ct_ratio)
+            except:
+                new_regulator_string += ","
+        else:
+            new_regulator_string += ","
+
+        _PT = None
+        if hasattr(i, "pt_ratio") and i.pt_ratio is not None:
+            try:
+                new_regulator_string += "," + str(i.pt_ratio)
+                _PT = str(i.pt_ratio)
+            except:
+                new_regulator_string += ","
+        else:
+            new_regulator_string += ","
+
+        if hasattr(i, "setpoint") and i.setpoint is not None:
+            scaled_setpoint = i.setpoint * 120 / 100.0
+            try:
+                new_regulator_string += (
+                    ","
+                    + str(scaled_setpoint)
+                    + ","
+                    + str(scaled_setpoint)
+                    + ","
+                    + str(scaled_setpoint)
+                )  # Assume same setpoint on all phases
+            except:
+                new_regulator_string += ",,,"
+        else:
+            new_regulator_string += ",,,"
+
+        new_regulator_object_line = "{kva},{band},{ct},{pt},{Type},{KVLN},{MaxBuck},{MaxBoost},{Taps},{Reversible}".format(
+            kva=_KVA,
+            band=_band,
+            ct=_CT,
+            pt=_PT,
+            Type=0,
+            KVLN=_KVLN,
+            MaxBuck=10,
+            MaxBoost=10,
+            Taps=32,
+            Reversible=0,
+        )
+
+        new_regulator_string += ",regulator_{id},{secid}".format(
+            id=self.equipment_ID("reg_codes", new_regulator_object_line),
+            secid=new_section_ID,
+        )
+
+        # Location, MaxBuck, MaxBoost, SettingOption, RsetA, RsetB, RsetC, XsetA,
+        # XsetB, XsetC, TapA, TapB, TapC, and ConnectionStatus
+        new_regulator_string += ",M,10,10,T,{RsetA},{RsetB},{RsetC},{XsetA},{XsetB},{XsetC},0,0,0,0".format(
+            RsetA=_Rset["A"],
+            RsetB=_Rset["B"],
+            RsetC=_Rset["C"],
+            XsetA=_Xset["A"],
+            XsetB=_Xset["B"],
+            XsetC=_Xset["C"],
+        )
+
+        if new_regulator_string != "":
+            self.append_line("regulator", new_regulator_string)
+
+    def render_transformer(self, i, model):
+        """Render a PowerTransformer object."""
+
+        transformer_object = i
+
+        # These are only set if it's an LTC
+        Setpoint = ""
+        ControlType = ""
+        LowerBandwidth = ""
+        UpperBandwidth = ""
+        MaxBoost = ""
+        MaxBuck = ""
+        is_ltc = 0
+        if isinstance(i, Regulator):
+            is_ltc = 1
+            Setpoint = i.setpoint
+            if hasattr(i, "connected_transformer"):
+                transformer_object = model[i.connected_transformer]
+                ControlType = "0"
+            else:
+                raise ValueError("An LTC regulator needs a connecting transformer")
+
+        # We need to get bus1 and bus2 to create the section bus1_bus2
+        new_section = None
+        new_section_ID = None
+        if (
+            hasattr(transformer_object, "from_element")
+            and transformer_object.from_element is not None
+            and hasattr(transformer_object, "to_element")
+            and transformer_object.to_element is not None
+        ):
+            from_index = 0
+            to_index = 0
+            if (
+                hasattr(transformer_object, "from_element_connection_index")
+                and transformer_object.from_element_connection_index is not None
+            ):
+                from_index = transformer_object.from_element_connection_index
+            if (
+                hasattr(transformer_object, "to_element_connection_index")
+                and transformer_object.to_element_connection_index is not None
+            ):
+                to_index = transformer_object.to_element_connection_index
+
+            new_section_ID = "{f}_{t}".format(
+                f=transformer_object.from_element, t=transformer_object.to_element,
+            )
 
-                            found = False
-                            for k, d in self.two_windings_trans_codes.items():
-                                if d == new_transformer_object_line:
-                                    new_transformer_line += (
-                                        ",transformer_"
-                                        + str(k)
-                                        + ",transformer_"
-                                        + str(k)
-                                    )
-                                    found = True
-                            if not found:
-                                ID_trans += 1
-                                self.two_windings_trans_codes[
-                                    ID_trans
-                                ] = new_transformer_object_line
-                                new_transformer_line += (
-                                    ",transformer_"
-                                    + str(ID_trans)
-                                    + ",transformer_"
-                                    + str(ID_trans)
-                                )
+            if len(new_section_ID) > 64:
+                hasher = hashlib.sha1()
+                hasher.update(new_section_ID.encode("utf-8"))
+                new_section_ID = hasher.hexdigest()
+            new_section = new_section_ID + ",{f},{fi},{t},{ti},".format(
+                f=transformer_object.from_element,
+                fi=from_index,
+                t=transformer_object.to_element,
+                ti=to_index,
+            )
+            # If it's a regulator, use the regulator object to find the feeder and substation if they're set
+            self.add_feeder_section_ID(
+                new_section_ID,
+                getattr(i, "feeder_name", None),
+                getattr(i, "substation_name", None),
+            )
 
-                            new_transformer_line += ",{PhaseShiftType},M,100,100,None,0".format(
-                                PhaseShiftType=phase_shift
-                            )  # Phase shift, Location, PrimTap,SecondaryTap, ODPrimPh, and ConnectionStatus
+        # Set Regulator attributes if its an LTC
+
+        if hasattr(i, "bandwidth") and i.bandwidth is not None:
+            bandcenter = 0
+            if hasattr(i, "bandcenter") and i.bandcenter is not None:
+                bandcenter = i.bandcenter
+            LowerBandwidth = str(abs(bandcenter - i.bandwidth))
+            UpperBandwidth = str(abs(bandcenter + i.bandwidth))
+
+        if hasattr(i, "highstep") and i.highstep is not None:
+            MaxBoost = str(i.highstep)
+
+        if hasattr(i, "highstep") and i.highstep is not None:
+            MaxBuck = str(i.lowstep)
+
+        # Find out if we have a two or three windings transformer
+        if (
+            hasattr(transformer_object, "windings")
+            and transformer_object.windings is not None
+        ):
+
+            phase_on = ""
+            if (
+                hasattr(transformer_object.windings[0], "phase_windings")
+                and transformer_object.windings[0].phase_windings is not None
+            ):
+                for phase_winding in transformer_object.windings[0].phase_windings:
+                    if new_section is not None:
+                        if (
+                            hasattr(phase_winding, "phase")
+                            and phase_winding.phase is not None
+                        ):
+                            new_section += str(phase_winding.phase)
+                            phase_on += str(phase_winding.phase)
 
-                            if new_transformer_line != "":
-                                two_windings_transformer_string_list.append(
-                                    new_transformer_line
-                                )
+            if new_section is not None:
+                self.add_section(
+                    new_section, *self.network_ID(transformer_object), unique=True
+                )
 
-                        if hasattr(winding1, "phase_windings"):
-                            for phase_winding in winding1.phase_windings:
-                                try:
-                                    new_section += str(phase_winding.phase)
-                                except:
-                                    pass
+            # Case 1: Two Windings
+            #
+            if (
+                len(transformer_object.windings) == 2
+                or transformer_object.is_center_tap == True
+            ):
+                # Empty new transformer string
+                new_transformer_line = ""
+                new_transformer_object_line = ""
+
+                # Impedances and voltages that the transformer might not define
+                XHL = RH = RL = None
+                XR = XR0 = Z1 = Z0 = 0
+                KVLLprim = KVLLsec = ""
+                voltageUnit = 1
 
-                    if (
-                        new_section is not None
-                        and new_section not in self.section_line_list
-                    ):
-                        self.section_line_list.append(new_section)
-                        # If the object is inside of a substation...
-                        if hasattr(i, "is_substation") and i.is_substation == 1:
-                            # ...it should have the name of the substation specified in the 'substation_name' attribute
-                            if (
-                                hasattr(i, "substation_name")
-                                and i.substation_name is not None
-                                and i.substation_name != ""
-                            ):
-                                # Add 'substation_' prefix to easily distinguish substation from feeders or transmission lines
-                                ff_name = "substation_{}".format(i.substation_name)
-                                self.network_have_substations = True
-                        # If the object is not inside of a substation, then use the feeder_name attribute if it exists
-                        elif (
-                            hasattr(i, "feeder_name")
-                            and i.feeder_name is not None
-                            and i.feeder_name != ""
+                if (
+                    hasattr(transformer_object.windings[0], "phase_windings")
+                    and transformer_object.windings[0].phase_windings is not None
+                ):
+                    try:
+                        if (
+                            transformer_object.is_center_tap == True
+                            and len(transformer_object.windings[0].phase_windings) == 1
                         ):
-                            ff_name = i.feeder_name
-
-                        if ff_name in self.section_line_feeder_mapping:
-                            self.section_line_feeder_mapping[ff_name].append(
-                                new_section
-                            )
+                            TYPE = 4
+                        elif len(transformer_object.windings[0].phase_windings) == 1:
+                            TYPE = 1
+                        elif len(transformer_object.windings[0].phase_windings) == 3:
+                            TYPE = 2
                         else:
-                            self.section_line_feeder_mapping[ff_name] = [new_section]
+                            TYPE = 3
+                    except:
+                        TYPE = 3
+                        pass
+                else:
+                    TYPE = 3
+
+                try:
+                    new_transformer_line += new_section_ID
+                except:
+                    pass
 
+                # CoordX and CoordY
+                if (
+                    hasattr(transformer_object, "positions")
+                    and transformer_object.positions is not None
+                ):
                     try:
-                        new_regulator_string += new_section_ID
+                        new_transformer_line += "," + str(
+                            transformer_object.positions[0].long
+                        )
+                        new_transformer_line += "," + str(
+                            transformer_object.positions[0].lat
+                        )
                     except:
+                        new_transformer_line += ",,"
                         pass
 
-                    # CoordX and CoordY
-                    if hasattr(i, "positions") and i.positions is not None:
-                        try:
-                            new_regulator_string += "," + str(i.positions[0].long)
-                            new_regulator_string += "," + str(i.positions[0].lat)
-                        except:
-                            new_regulator_string += ",,"
-                            pass
+                CONN = ""
+                try:
+                    if TYPE == 4:
+                        CONN = "0"  # Center Tap not a configuration for transformer object. Leave as Y-Y
+                        new_transformer_line += ",15"
                     else:
-                        new_regulator_string += ",,"
-
-                    # if hasattr(i, "pt_phase") and i.pt_phase is not None:
-                    #     try:
-                    #         new_regulator_string += "," + str(i.pt_phase)
-                    #     except:
-                    #         new_regulator_string += ","
-                    #         pass
-                    # else:
-                    #     new_regulator_string += ","
-
-                    _KVA = 0
-                    _KVLN = 0
-                    _Rset = {"A": 0, "B": 0, "C": 0}
-                    _Xset = {"A": 0, "B": 0, "C": 0}
-                    _regphases = []
-                    if len(windings_local) >= 2:
-                        try:
-                            _KVA = windings_local[0].rated_power * 10 ** -3
-                        except:
-                            pass
-                        _KVLN = (
-                            windings_local[-1].nominal_voltage / math.sqrt(3) * 10 ** -3
+                        new_transformer_line += (
+                            ","
+                            + self.transformer_connection_configuration_mapping(
+                                transformer_object.windings[0].connection_type,
+                                transformer_object.windings[1].connection_type,
+                                "transformer_settings",
+                            )
                         )
-
+                        CONN = self.transformer_connection_configuration_mapping(
+                            transformer_object.windings[0].connection_type,
+                            transformer_object.windings[1].connection_type,
+                        )
+                except:
+                    new_transformer_line += ","
+                    pass
+
+                phase_shift = 0
+                if CONN == "0" or CONN == "4":
+                    phase_shift = 0
+                if CONN == "1" or CONN == "2":
+                    phase_shift = 1
+
+                try:
+                    new_transformer_line += "," + phase_on
+                except:
+                    new_transformer_line += ","
+                    pass
+
+                # Compute the impedances of center tap transformers. These should be three windings, one phase transformers in DiTTo
+                # with the is_center_tap flag set to 1
+                if TYPE == 4:
+                    if (
+                        hasattr(transformer_object, "reactances")
+                        and transformer_object.reactances is not None
+                        and len(i.reactances) == 3
+                    ):
+                        XHL, XHT, XLT = transformer_object.reactances
                         if (
-                            hasattr(winding1, "phase_windings")
-                            and winding1.phase_windings is not None
+                            hasattr(transformer_object.windings[0], "resistance")
+                            and hasattr(transformer_object.windings[1], "resistance")
+                            and hasattr(transformer_object.windings[2], "resistance")
+                            and transformer_object.windings[0].resistance is not None
+                            and transformer_object.windings[1].resistance is not None
+                            and transformer_object.windings[2].resistance is not None
                         ):
-                            for phase_winding in winding1.phase_windings:
-                                try:
-                                    _regphases.append(phase_winding.phase)
-                                    _Rset[
-                                        phase_winding.phase
-                                    ] = phase_winding.compensator_r
-                                    _Xset[
-                                        phase_winding.phase
-                                    ] = phase_winding.compensator_x
-                                except:
-                                    pass
-
-                    new_regulator_string += ","
-                    for phase in _regphases:
-                        new_regulator_string += phase
-
-                    _band = None
-                    if hasattr(i, "bandwidth") and i.bandwidth is not None:
-                        try:
-                            new_regulator_string += "," + str(i.bandwidth)
-                            _band = str(i.bandwidth)
-                        except:
-                            new_regulator_string += ","
-                            pass
-                    else:
-                        new_regulator_string += ","
-
-                    _CT = None
-                    if hasattr(i, "ct_ratio") and i.ct_ratio is not None:
-                        try:
-                            new_regulator_string += "," + str(i.ct_ratio)
-                            _CT = str(i.ct_ratio)
-                        except:
-                            new_regulator_string += ","
-                    else:
-                        new_regulator_string += ","
-
-                    _PT = None
-                    if hasattr(i, "pt_ratio") and i.pt_ratio is not None:
-                        try:
-                            new_regulator_string += "," + str(i.pt_ratio)
-                            _PT = str(i.pt_ratio)
-                        except:
-                            new_regulator_string += ","
-                    else:
-                        new_regulator_string += ","
-
-                    if hasattr(i, "setpoint") and i.setpoint is not None:
-                        scaled_setpoint = i.setpoint * 120 / 100.0
-                        try:
-                            new_regulator_string += (
-                                ","
-                                + str(scaled_setpoint)
-                                + ","
-                                + str(scaled_setpoint)
-                                + ","
-                                + str(scaled_setpoint)
-                            )  # Assume same setpoint on all phases
-                        except:
-                            new_regulator_string += ",,,"
-                    else:
-                        new_regulator_string += ",,,"
-
-                    new_regulator_object_line = "{kva},{band},{ct},{pt},{Type},{KVLN},{MaxBuck},{MaxBoost},{Taps},{Reversible}".format(
-                        kva=_KVA,
-                        band=_band,
-                        ct=_CT,
-                        pt=_PT,
-                        Type=0,
-                        KVLN=_KVLN,
-                        MaxBuck=10,
-                        MaxBoost=10,
-                        Taps=32,
-                        Reversible=0,
-                    )
-
-                    found = False
-                    for k, d in self.reg_codes.items():
-                        if d == new_regulator_object_line:
-                            new_regulator_string += ",regulator_{id},{secid}".format(
-                                id=k, secid=new_section_ID
+                            R0, R1, R2 = [
+                                w.resistance for w in transformer_object.windings
+                            ]
+                            KVA_BASE = (
+                                transformer_object.windings[0].rated_power * 10 ** -3
                             )
-                            found = True
-                    if not found:
-                        ID_reg += 1
-                        self.reg_codes[ID_reg] = new_regulator_object_line
-                        new_regulator_string += ",regulator_{id},{secid}".format(
-                            id=ID_reg, secid=new_section_ID
-                        )
-
-                    # Location, MaxBuck, MaxBoost, SettingOption, RsetA, RsetB, RsetC, XsetA,
-                    # XsetB, XsetC, TapA, TapB, TapC, and ConnectionStatus
-                    new_regulator_string += ",M,10,10,T,{RsetA},{RsetB},{RsetC},{XsetA},{XsetB},{XsetC},0,0,0,0".format(
-                        RsetA=_Rset["A"],
-                        RsetB=_Rset["B"],
-                        RsetC=_Rset["C"],
-                        XsetA=_Xset["A"],
-                        XsetB=_Xset["B"],
-                        XsetC=_Xset["C"],
-                    )
-
-                    if new_regulator_string != "":
-                        regulator_string_list.append(new_regulator_string)
-
-                # If we get a Transformer object
-                #
-                if (
-                    isinstance(i, PowerTransformer)
-                    and (i.name not in self.transformers_to_ignore)
-                ) or (
-                    isinstance(i, Regulator)
-                    and (hasattr(i, "ltc") and i.ltc is not None and i.ltc == 1)
-                ):
-
-                    transformer_object = i
-
-                    # These are only set if it's an LTC
-                    Setpoint = ""
-                    ControlType = ""
-                    LowerBandwidth = ""
-                    UpperBandwidth = ""
-                    MaxBoost = ""
-                    MaxBuck = ""
-                    is_ltc = 0
-                    if isinstance(i, Regulator):
-                        is_ltc = 1
-                        Setpoint = i.setpoint
-                        if hasattr(i, "connected_transformer"):
-                            transformer_object = model[i.connected_transformer]
-                            ControlType = "0"
-                        else:
-                            raise ValueError(
-                                "An LTC regulator needs a connecting transformer"
+                            XR, Z1 = self.get_center_tap_impedances(
+                                R0, R1, R2, XHL, XHT, XLT, KVA_BASE
                             )
+                            XR0 = XR
+                            Z0 = Z1
 
-                    # We need to get bus1 and bus2 to create the section bus1_bus2
-                    new_section = None
-                    new_section_ID = None
+                else:
                     if (
-                        hasattr(transformer_object, "from_element")
-                        and transformer_object.from_element is not None
-                        and hasattr(transformer_object, "to_element")
-                        and transformer_object.to_element is not None
+                        hasattr(transformer_object, "reactances")
+                        and transformer_object.reactances is not None
+                        and len(transformer_object.reactances) == 1
                     ):
-                        from_index = 0
-                        to_index = 0
-                        if (
-                            hasattr(transformer_object, "from_element_connection_index")
-                            and transformer_object.from_element_connection_index
-                            is not None
-                        ):
-                            from_index = (
-                                transformer_object.from_element_connection_index
+                        XHL_perct = transformer_object.reactances[0]
+                        # XHL is in percentage of the KVA of the FIRST winding
+                        try:
+                            XHL = (
+                                XHL_perct
+                                * 10 ** -2
+                                * transformer_object.windings[0].rated_power
+                                * 10 ** -3
                             )
-                        if (
-                            hasattr(transformer_object, "to_element_connection_index")
-                            and transformer_object.to_element_connection_index
-                            is not None
-                        ):
-                            to_index = transformer_object.to_element_connection_index
-
-                        new_section_ID = "{f}_{t}".format(
-                            f=transformer_object.from_element,
-                            t=transformer_object.to_element,
-                        )
-
-                        if len(new_section_ID) > 64:
-                            hasher = hashlib.sha1()
-                            hasher.update(new_section_ID.encode("utf-8"))
-                            new_section_ID = hasher.hexdigest()
-                        new_section = new_section_ID + ",{f},{fi},{t},{ti},".format(
-                            f=transformer_object.from_element,
-                            fi=from_index,
-                            t=transformer_object.to_element,
-                            ti=to_index,
-                        )
-                        # If it's a regulator, use the regulator object to find the feeder and substation if they're set
-                        if hasattr(i, "feeder_name") and i.feeder_name is not None:
-                            if i.feeder_name in self.section_feeder_mapping:
-                                self.section_feeder_mapping[i.feeder_name].append(
-                                    new_section_ID
-                                )
-                            else:
-                                self.section_feeder_mapping[i.feeder_name] = [
-                                    new_section_ID
-                                ]
-                            if (
-                                hasattr(i, "substation_name")
-                                and i.substation_name is not None
-                            ):
-                                self.section_headnode_mapping[
-                                    i.feeder_name
-                                ] = i.substation_name
-
-                    # Set Regulator attributes if its an LTC
-
-                    if hasattr(i, "bandwidth") and i.bandwidth is not None:
-                        bandcenter = 0
-                        if hasattr(i, "bandcenter") and i.bandcenter is not None:
-                            bandcenter = i.bandcenter
-                        LowerBandwidth = str(abs(bandcenter - i.bandwidth))
-                        UpperBandwidth = str(abs(bandcenter + i.bandwidth))
-
-                    if hasattr(i, "highstep") and i.highstep is not None:
-                        MaxBoost = str(i.highstep)
-
-                    if hasattr(i, "highstep") and i.highstep is not None:
-                        MaxBuck = str(i.lowstep)
+                        except:
+                            XHL = 0
+                            pass
 
-                    # Find out if we have a two or three windings transformer
                     if (
-                        hasattr(transformer_object, "windings")
-                        and transformer_object.windings is not None
+                        hasattr(transformer_object.windings[0], "resistance")
+                        and hasattr(transformer_object.windings[1], "resistance")
+                        and transformer_object.windings[0].resistance is not None
+                        and transformer_object.windings[1].resistance is not None
                     ):
+                        # Resistance is given as a percentage of the KVA of the corresponding winding
+                        try:
+                            RH = (
+                                transformer_object.windings[0].resistance
+                                * 10 ** -2
+                                * transformer_object.windings[0].rated_power
+                                * 10 ** -3
+                            )
+                            RL = (
+                                transformer_object.windings[1].resistance
+                                * 10 ** -2
+                                * transformer_object.windings[1].rated_power
+                                * 10 ** -3
+                            )
+                        except:
+                            RH = 0
+                            RL = 0
+                            pass
 
-                        phase_on = ""
-                        if (
-                            hasattr(transformer_object.windings[0], "phase_windings")
-                            and transformer_object.windings[0].phase_windings
-                            is not None
-                        ):
-                            for phase_winding in transformer_object.windings[
-                                0
-                            ].phase_windings:
-                                if new_section is not None:
-                                    if (
-                                        hasattr(phase_winding, "phase")
-                                        and phase_winding.phase is not None
-                                    ):
-                                        new_section += str(phase_winding.phase)
-                                        phase_on += str(phase_winding.phase)
-
-                        if (
-                            new_section is not None
-                            and new_section not in self.section_line_list
-                        ):
-                            self.section_line_list.append(new_section)
-                            # If the object is inside of a substation...
-                            if (
-                                hasattr(transformer_object, "is_substation")
-                                and transformer_object.is_substation == 1
-                            ):
-                                # ...it should have the name of the substation specified in the 'substation_name' attribute
-                                if (
-                                    hasattr(transformer_object, "substation_name")
-                                    and transformer_object.substation_name is not None
-                                    and transformer_object.substation_name != ""
-                                ):
-                                    # Add 'substation_' prefix to easily distinguish substation from feeders or transmission lines
-                                    ff_name = "substation_{}".format(
-                                        transformer_object.substation_name
-                                    )
-                                    self.network_have_substations = True
-                            # If the object is not inside of a substation, then use the feeder_name attribute if it exists
-                            elif (
-                                hasattr(transformer_object, "feeder_name")
-                                and transformer_object.feeder_name is not None
-                                and transformer_object.feeder_name != ""
-                            ):
-                                ff_name = transformer_object.feeder_name
-
-                            if ff_name in self.section_line_feeder_mapping:
-                                self.section_line_feeder_mapping[ff_name].append(
-                                    new_section
-                                )
-                            else:
-                                self.section_line_feeder_mapping[ff_name] = [
-                                    new_section
-                                ]
-
-                        # Case 1: Two Windings
-                        #
-                        if (
-                            len(transformer_object.windings) == 2
-                            or transformer_object.is_center_tap == True
-                        ):
-                            # Empty new transformer string
-                            new_transformer_line = ""
-                            new_transformer_object_line = ""
-
-                            if (
-                                hasattr(
-                                    transformer_object.windings[0], "phase_windings"
-                                )
-                                and transformer_object.windings[0].phase_windings
-                                is not None
-                            ):
-                                try:
-                                    if (
-                                        transformer_object.is_center_tap == True
-                                        and len(
-                                            transformer_object.windings[
-                                                0
-                                            ].phase_windings
-                                        )
-                                        == 1
-                                    ):
-                                        TYPE = 4
-                                    elif (
-                                        len(
-                                            transformer_object.windings[
-                                                0
-                                            ].phase_windings
-                                        )
-                                        == 1
-                                    ):
-                                        TYPE = 1
-                                    elif (
-                                        len(
-                                            transformer_object.windings[
-                                                0
-                                            ].phase_windings
-                                        )
-                                        == 3
-                                    ):
-                                        TYPE = 2
-                                    else:
-                                        TYPE = 3
-                                except:
-                                    TYPE = 3
-                                    pass
-                            else:
-                                TYPE = 3
-
-                            try:
-                                new_transformer_line += new_section_ID
-                            except:
-                                pass
-
-                            # CoordX and CoordY
-                            if (
-                                hasattr(transformer_object, "positions")
-                                and transformer_object.positions is not None
-                            ):
-                                try:
-                                    new_transformer_line += "," + str(
-                                        transformer_object.positions[0].long
-                                    )
-                                    new_transformer_line += "," + str(
-                                        transformer_object.positions[0].lat
-                                    )
-                                except:
-                                    new_transformer_line += ",,"
-                                    pass
-
-                            CONN = ""
-                            try:
-                                if TYPE == 4:
-                                    CONN = "0"  # Center Tap not a configuration for transformer object. Leave as Y-Y
-                                    new_transformer_line += ",15"
-                                else:
-                                    new_transformer_line += (
-                                        ","
-                                        + self.transformer_connection_configuration_mapping(
-                                            transformer_object.windings[
-                                                0
-                                            ].connection_type,
-                                            transformer_object.windings[
-                                                1
-                                            ].connection_type,
-                                            "transformer_settings",
-                                        )
-                                    )
-                                    CONN = self.transformer_connection_configuration_mapping(
-                                        transformer_object.windings[0].connection_type,
-                                        transformer_object.windings[1].connection_type,
-                                    )
-                            except:
-                                new_transformer_line += ","
-                                pass
-
-                            phase_shift = 0
-                            if CONN == "0" or CONN == "4":
-                                phase_shift = 0
-                            if CONN == "1" or CONN == "2":
-                                phase_shift = 1
-
-                            try:
-                                new_transformer_line += "," + phase_on
-                            except:
-                                new_transformer_line += ","
-                                pass
-
-                            # Compute the impedances of center tap transformers. These should be three windings, one phase transformers in DiTTo
-                            # with the is_center_tap flag set to 1
-                            if TYPE == 4:
-                                if (
-                                    hasattr(transformer_object, "reactances")
-                                    and transformer_object.reactances is not None
-                                    and len(i.reactances) == 3
-                                ):
-                                    XHL, XHT, XLT = transformer_object.reactances
-                                    if (
-                                        hasattr(
-                                            transformer_object.windings[0], "resistance"
-                                        )
-                                        and hasattr(
-                                            transformer_object.windings[1], "resistance"
-                                        )
-                                        and hasattr(
-                                            transformer_object.windings[2], "resistance"
-                                        )
-                                        and transformer_object.windings[0].resistance
-                                        is not None
-                                        and transformer_object.windings[1].resistance
-                                        is not None
-                                        and transformer_object.windings[2].resistance
-                                        is not None
-                                    ):
-                                        R0, R1, R2 = [
-                                            w.resistance
-                                            for w in transformer_object.windings
-                                        ]
-                                        KVA_BASE = (
-                                            transformer_object.windings[0].rated_power
-                                            * 10 ** -3
-                                        )
-                                        XR, Z1 = self.get_center_tap_impedances(
-                                            R0, R1, R2, XHL, XHT, XLT, KVA_BASE
-                                        )
-                                        XR0 = XR
-                                        Z0 = Z1
-
-                            else:
-                                if (
-                                    hasattr(transformer_object, "reactances")
-                                    and transformer_object.reactances is not None
-                                    and len(transformer_object.reactances) == 1
-                                ):
-                                    XHL_perct = transformer_object.reactances[0]
-                                    # XHL is in percentage of the KVA of the FIRST winding
-                                    try:
-                                        XHL = (
-                                            XHL_perct
-                                            * 10 ** -2
-                                            * transformer_object.windings[0].rated_power
-                                            * 10 ** -3
-                                        )
-                                    except:
-                                        XHL = 0
-                                        pass
-
-                                if (
-                                    hasattr(
-                                        transformer_object.windings[0], "resistance"
-                                    )
-                                    and hasattr(
-                                        transformer_object.windings[1], "resistance"
-                                    )
-                                    and transformer_object.windings[0].resistance
-                                    is not None
-                                    and transformer_object.windings[1].resistance
-                                    is not None
-                                ):
-                                    # Resistance is given as a percentage of the KVA of the corresponding winding
-                                    try:
-                                        RH = (
-                                            transformer_object.windings[0].resistance
-                                            * 10 ** -2
-                                            * transformer_object.windings[0].rated_power
-                                            * 10 ** -3
-                                        )
-                                        RL = (
-                                            transformer_object.windings[1].resistance
-                                            * 10 ** -2
-                                            * transformer_object.windings[1].rated_power
-                                            * 10 ** -3
-                                        )
-                                    except:
-                                        RH = 0
-                                        RL = 0
-                                        pass
-
-                                # We have ZHL=(RH+RL)+XHLj
-                                #
-                                # Compute the X over R ratio
-                                try:
-                                    XR = (XHL) / (RH + RL)
-                                    XR0 = XR
-                                except:
-                                    XR = 0
-                                    XR0 = 0
-                                    pass
-                                #
-                                # |ZHL|=sqrt((RH+RL)^2 + XHL^2)
-                                try:
-                                    _ZHL_ = math.sqrt((RH + RL) ** 2 + XHL ** 2)
-                                except:
-                                    _ZHL_ = 0
-                                    pass
-
-                                #
-                                # Expressed in percentage of the KVA base
-                                try:
-                                    Z1 = (
-                                        _ZHL_
-                                        * 100.0
-                                        / (
-                                            transformer_object.windings[0].rated_power
-                                            * 10 ** -3
-                                        )
-                                    )
-                                except:
-                                    Z1 = 0
-                                    pass
-                                Z0 = Z1
-
-                            # Total kva
-                            try:
-                                KVA = (
-                                    transformer_object.windings[0].rated_power
-                                    * 10 ** -3
-                                )
-                            except:
-                                KVA = "DEFAULT"
-                                pass
-
-                            for w, winding in enumerate(transformer_object.windings):
-                                # try:
-                                #    KVA+=winding.rated_power*10**-3
-                                # except:
-                                #    pass
-
-                                if hasattr(winding, "nominal_voltage"):
-                                    # If we have a one phase transformer or a delta transformer, we specify voltage in KV, not in KVLL
-                                    # This is done by setting the voltageUnit keyword to 1
-                                    if (
-                                        len(
-                                            transformer_object.windings[
-                                                0
-                                            ].phase_windings
-                                        )
-                                        <= 1
-                                        or len(
-                                            transformer_object.windings[
-                                                0
-                                            ].phase_windings
-                                        )
-                                        == 2
-                                    ):
-                                        if w == 0:
-                                            KVLLprim = (
-                                                winding.nominal_voltage * 10 ** -3
-                                            )
-                                            # if transformer_object.is_center_tap == True:
-                                            #     KVLLprim = round(
-                                            #         KVLLprim / (3 ** 0.5), 2
-                                            #     )  # produces output in L-N format if center-tap rather than L-L
-                                            voltageUnit = (
-                                                1  # Voltage declared in KV, not in KVLL
-                                            )
-                                        elif w == 1:
-                                            # In addition, if we have a center tap, we need to add the secondary and tertiary voltages here
-                                            if TYPE == 4:
-                                                try:
-                                                    KVLLsec = (
-                                                        winding.nominal_voltage
-                                                        * 10 ** -3
-                                                        + transformer_object.windings[
-                                                            2
-                                                        ].nominal_voltage
-                                                        * 10 ** -3
-                                                    )
-                                                    voltageUnit = 1  # Voltage declared in KV, not in KVLL
-                                                except:
-                                                    KVLLsec = "DEFAULT"
-                                                    pass
-                                            else:
-                                                KVLLsec = (
-                                                    winding.nominal_voltage * 10 ** -3
-                                                )
-                                                voltageUnit = 1  # Voltage declared in KV, not in KVLL
-                                    # If we have a three phase transformer, we need to specify the voltage in KVLL.
-                                    # This is done by setting the voltageUnit to 0, and multiplying the voltage by sqrt(3)
-                                    # Note: If we have three phases, the transformer shouln't be a center tap
-                                    elif (
-                                        len(
-                                            transformer_object.windings[
-                                                0
-                                            ].phase_windings
-                                        )
-                                        == 3
-                                    ):
-                                        if w == 0:
-                                            KVLLprim = (
-                                                winding.nominal_voltage * 10 ** -3
-                                            )  # *math.sqrt(3)
-                                            if transformer_object.is_center_tap == True:
-                                                KVLLprim = round(
-                                                    KVLLprim / (3 ** 0.5), 2
-                                                )  # produces output in L-N format if center-tap rather than L-L
-                                            voltageUnit = 0
-                                        if w == 1:
-                                            KVLLsec = (
-                                                winding.nominal_voltage * 10 ** -3
-                                            )  # *math.sqrt(3)
-                                            voltageUnit = 0
-
-                            # NoLoadLosses
-                            if (
-                                hasattr(transformer_object, "noload_loss")
-                                and transformer_object.noload_loss is not None
-                            ):
-                                # TODO: Make sure noloadlosses is in % in DiTTo, or change what is next.
-                                NOLOADLOSS = (
-                                    transformer_object.noload_loss / 100.0 * KVA
-                                )
-                            else:
-                                NOLOADLOSS = ""
-
-                            new_transformer_object_line += "{type},{kva},{voltageUnit},{kvllprim},{kvllsec},{Z1},{Z0},{XR},{XR0},{Conn},{WindingType},{noloadloss},{phaseshift},{isltc}".format(
-                                phaseshift=phase_shift,
-                                type=TYPE,
-                                kva=KVA,
-                                voltageUnit=voltageUnit,
-                                kvllprim=KVLLprim,
-                                kvllsec=KVLLsec,
-                                Conn=CONN,
-                                Z1=Z1,
-                                Z0=Z0,
-                                XR=XR,
-                                XR0=XR0,
-                                WindingType=1,
-                                noloadloss=NOLOADLOSS,
-                                isltc=is_ltc,
-                            )
-
-                            found = False
-                            for k, d in self.two_windings_trans_codes.items():
-                                if d == new_transformer_object_line:
-                                    new_transformer_line += (
-                                        ",transformer_" + str(k) + "," + new_section_ID
-                                    )
-                                    found = True
-                            if not found:
-                                ID_trans += 1
-                                self.two_windings_trans_codes[
-                                    ID_trans
-                                ] = new_transformer_object_line
-                                new_transformer_line += (
-                                    ",transformer_"
-                                    + str(ID_trans)
-                                    + ","
-                                    + new_section_ID
-                                )
-
-                            new_transformer_line += ",{PhaseShiftType},M,100,100,None,0".format(
-                                PhaseShiftType=phase_shift
-                            )  # Phase shift, Location, PrimTap,SecondaryTap, ODPrimPh, and ConnectionStatus
-
-                            try:
-                                TAP = 1.0 / float(
-                                    transformer_object.windings[1]
-                                    .phase_windings[0]
-                                    .tap_position
-                                )
-                                new_transformer_line += ",{}".format(TAP)
-                            except:
-                                new_transformer_line += ","
-                                pass
-
-                            # Apply the LTC settings. These are empty if it's just a transformer
-                            new_transformer_line += ",{setpoint},{controltype},{lowerbandwidth},{upperbandwidth},{maxbuck},{maxboost}".format(
-                                setpoint=Setpoint,
-                                controltype=ControlType,
-                                lowerbandwidth=LowerBandwidth,
-                                upperbandwidth=UpperBandwidth,
-                                maxbuck=MaxBuck,
-                                maxboost=MaxBoost,
-                            )
-
-                            if new_transformer_line != "":
-                                two_windings_transformer_string_list.append(
-                                    new_transformer_line
-                                )
-
-                        # Case 2: Three Windings
-                        #
-                        elif len(transformer_object.windings) == 3:
-                            # Empty new transformer string
-                            new_transformer_line = ""
-                            new_transformer_object_line = ""
-
-                            # Name
-                            if (
-                                hasattr(transformer_object, "name")
-                                and transformer_object.name is not None
-                            ):
-                                try:
-                                    new_transformer_line += new_section_ID
-                                except:
-                                    pass
-
-                            # CoordX and CoordY
-                            if (
-                                hasattr(transformer_object, "positions")
-                                and transformer_object.positions is not None
-                            ):
-                                try:
-                                    new_transformer_line += "," + str(
-                                        transformer_object.positions[0].long
-                                    )
-                                    new_transformer_line += "," + str(
-                                        transformer_object.positions[0].lat
-                                    )
-                                except:
-                                    new_transformer_line += ",,"
-                                    pass
-
-                            _primary_rated_capacity = None
-                            _secondary_rated_capacity = None
-                            _tertiary_rated_capacity = None
-                            _primary_voltage = None
-                            _secondary_voltage = None
-                            _tertiary_voltage = None
-                            _primary_connection = None
-                            _secondary_connection = None
-                            _tertiary_connection = None
-                            R = {}
-                            XHL_perct, XLT_perct, XHT_perct = None, None, None
-                            for w, winding in enumerate(transformer_object.windings):
-                                if (
-                                    hasattr(winding, "rated_power")
-                                    and winding.rated_power is not None
-                                ):
-                                    if w == 0:
-                                        _primary_rated_capacity = str(
-                                            winding.rated_power * 10 ** -3
-                                        )
-                                    if w == 1:
-                                        _secondary_rated_capacity = str(
-                                            winding.rated_power * 10 ** -3
-                                        )
-                                    if w == 2:
-                                        _tertiary_rated_capacity = str(
-                                            winding.rated_power * 10 ** -3
-                                        )
-
-                                if (
-                                    hasattr(winding, "connection_type")
-                                    and winding.connection_type is not None
-                                ):
-                                    if w == 0:
-                                        _primary_connection = winding.connection_type
-                                    if w == 1:
-                                        _secondary_connection = winding.connection_type
-                                    if w == 2:
-                                        _tertiary_connection = winding.connection_type
-
-                                if (
-                                    hasattr(winding, "nominal_voltage")
-                                    and winding.nominal_voltage is not None
-                                ):
-                                    try:
-                                        new_transformer_line += "," + str(
-                                            winding.nominal_voltage * 10 ** -3
-                                        )
-                                    except:
-                                        new_transformer_line += ","
-                                        pass
-                                    if w == 0:
-                                        _primary_voltage = str(
-                                            winding.nominal_voltage * 10 ** -3
-                                        )
-                                    if w == 1:
-                                        _secondary_voltage = str(
-                                            winding.nominal_voltage * 10 ** -3
-                                        )
-                                    if w == 2:
-                                        _tertiary_voltage = str(
-                                            winding.nominal_voltage * 10 ** -3
-                                        )
-
-                                else:
-                                    new_transformer_line += ","
-
-                                if (
-                                    hasattr(winding, "resistance")
-                                    and winding.resistance is not None
-                                ):
-                                    try:
-                                        R[w] = (
-                                            winding.resistance
-                                            * winding.rated_power
-                                            * 10 ** -3
-                                        )
-                                    except:
-                                        R[w] = None
-                                        pass
-
-                            if (
-                                hasattr(transformer_object, "reactances")
-                                and i.reactances is not None
-                            ):
-                                try:
-                                    XHL_perct, XLT_perct, XHT_perct = i.reactances
-                                except:
-                                    pass
-
-                            if XHL_perct is not None:
-                                try:
-                                    XHL = (
-                                        XHL_perct
-                                        * 10 ** -2
-                                        * transformer_object.windings[0].rated_power
-                                        * 10 ** -3
-                                    )
-                                except:
-                                    XHL = None
-                                    pass
-                            if XLT_perct is not None:
-                                try:
-                                    XLT = (
-                                        XLT_perct
-                                        * 10 ** -2
-                                        * transformer_object.windings[0].rated_power
-                                        * 10 ** -3
-                                    )
-                                except:
-                                    XLT = None
-                                    pass
-                            if XHT_perct is not None:
-                                try:
-                                    XHT = (
-                                        XHT_perct
-                                        * 10 ** -2
-                                        * transformer_object.windings[0].rated_power
-                                        * 10 ** -3
-                                    )
-                                except:
-                                    XHT = None
-                                    pass
-
-                            if (
-                                sum([x is None for x in R]) == 0
-                                and XHL is not None
-                                and XLT is not None
-                                and XHT is not None
-                            ):
-                                ZHL = complex(R[0] + R[1], XHL)
-                                ZLT = complex(R[1] + R[2], XLT)
-                                ZHT = complex(R[0] + R[2], XHT)
-
-                                _PrimaryToSecondaryXR1 = ZHL.imag / ZHL.real
-                                _PrimaryToSecondaryXR0 = _PrimaryToSecondaryXR1
-
-                                _PrimaryToTertiaryXR1 = ZHT.imag / ZHT.real
-                                _PrimaryToTertiaryXR0 = _PrimaryToTertiaryXR1
-
-                                _SecondaryToTertiaryXR1 = ZLT.imag / ZLT.real
-                                _SecondaryToTertiaryXR0 = _SecondaryToTertiaryXR1
-
-                                _PrimaryToSecondaryZ1 = (
-                                    math.sqrt(ZHL.real ** 2 + ZHL.imag ** 2)
-                                    * 100.0
-                                    / (
-                                        transformer_object.windings[0].rated_power
-                                        * 10 ** -3
-                                    )
-                                )
-                                _PrimaryToSecondaryZ0 = _PrimaryToSecondaryZ1
-
-                                _PrimaryToTertiaryZ1 = (
-                                    math.sqrt(ZHT.real ** 2 + ZHT.imag ** 2)
-                                    * 100.0
-                                    / (
-                                        transformer_object.windings[0].rated_power
-                                        * 10 ** -3
-                                    )
-                                )
-                                _PrimaryToTertiaryZ0 = _PrimaryToTertiaryZ1
-
-                                _SecondaryToTertiaryZ1 = (
-                                    math.sqrt(ZLT.real ** 2 + ZLT.imag ** 2)
-                                    * 100.0
-                                    / (
-                                        transformer_object.windings[0].rated_power
-                                        * 10 ** -3
-                                    )
-                                )
-                                _SecondaryToTertiaryZ0 = _SecondaryToTertiaryZ1
-
-                            # NoLoadLosses
-                            if (
-                                hasattr(transformer_object, "noload_loss")
-                                and transformer_object.noload_loss is not None
-                            ):
-                                # TODO: Make sure noloadlosses is in % in DiTTo, or change what is next.
-                                NOLOADLOSS = (
-                                    transformer_object.noload_loss / 100.0 * KVA
-                                )
-                            else:
-                                NOLOADLOSS = ""
-
-                            new_transformer_object_line = "{kva1},{kv1},{conn1},,,,,,,{kva2},{kv2},{conn2},{kva3},{kv3},{conn3},".format(
-                                kva1=_primary_rated_capacity,
-                                kv1=_primary_voltage,
-                                conn1=_primary_connection,
-                                kva2=_secondary_rated_capacity,
-                                kv2=_secondary_voltage,
-                                conn2=_secondary_connection,
-                                kva3=_tertiary_rated_capacity,
-                                kv3=_tertiary_voltage,
-                                conn3=_tertiary_connection,
-                            )
-                            new_transformer_object_line += "{PrimaryToSecondaryZ1},{PrimaryToSecondaryZ0},{PrimaryToSecondaryXR1},{PrimaryToSecondaryXR0},{PrimaryToTertiaryZ1},{PrimaryToTertiaryZ0},{PrimaryToTertiaryXR1},{PrimaryToTertiaryXR0},{SecondaryToTertiaryZ1},{SecondaryToTertiaryZ0}".format(
-                                PrimaryToSecondaryZ1=_PrimaryToSecondaryZ1,
-                                PrimaryToSecondaryZ0=_PrimaryToSecondaryZ0,
-                                PrimaryToSecondaryXR1=_PrimaryToSecondaryXR1,
-                                PrimaryToSecondaryXR0=_PrimaryToSecondaryXR0,
-                                PrimaryToTertiaryZ1=_PrimaryToTertiaryZ1,
-                                PrimaryToTertiaryZ0=_PrimaryToTertiaryZ0,
-                                PrimaryToTertiaryXR1=_PrimaryToTertiaryXR1,
-                                PrimaryToTertiaryXR0=_PrimaryToTertiaryXR0,
-                                SecondaryToTertiaryZ1=_SecondaryToTertiaryZ1,
-                                SecondaryToTertiaryZ0=_SecondaryToTertiaryZ0,
-                            )
-                            new_transformer_object_line += ",{SecondaryToTertiaryXR1},{SecondaryToTertiaryXR0},{SecondaryCapacityLimit1},{SecondaryCapacityLimit2},{TertiaryCapacityLimit1},{TertiaryCapacityLimit2},{TertiaryConnection},{noloadloss}".format(
-                                SecondaryToTertiaryXR1=_SecondaryToTertiaryXR1,
-                                SecondaryToTertiaryXR0=_SecondaryToTertiaryXR0,
-                                SecondaryCapacityLimit1=0,
-                                SecondaryCapacityLimit2=0,
-                                TertiaryCapacityLimit1=0,
-                                TertiaryCapacityLimit2=0,
-                                TertiaryConnection=0,
-                                noloadloss=NOLOADLOSS,
-                            )
-
-                            found = False
-                            for k, d in self.three_windings_trans_codes.items():
-                                if d == new_transformer_object_line:
-                                    new_transformer_line += (
-                                        ",3_wdg_transformer_"
-                                        + str(k)
-                                        + ","
-                                        + new_section_ID
-                                    )
-                                    found = True
-                            if not found:
-                                ID_trans_3w += 1
-                                self.three_windings_trans_codes[
-                                    ID_trans_3w
-                                ] = new_transformer_object_line
-                                new_transformer_line += (
-                                    ",3_wdg_transformer_"
-                                    + str(ID_trans_3w)
-                                    + ","
-                                    + new_section_ID
-                                )
-
-                            new_transformer_line += ",{Location},{tertiarynodeID},{PrimaryFixedTapSetting},{SecondaryFixedTapSetting},{ConnectionStatus}".format(
-                                Location="M",
-                                tertiarynodeID=0,
-                                PrimaryFixedTapSetting=0,
-                                SecondaryFixedTapSetting=0,
-                                ConnectionStatus=0,
-                            )
-
-                            try:
-                                TAP = 1.0 / float(
-                                    transformer_object.windings[1]
-                                    .phase_windings[0]
-                                    .tap_position
-                                )
-                                new_transformer_line += ",{}".format(TAP)
-                            except:
-                                new_transformer_line += ","
-                                pass
-
-                            if new_transformer_line != "":
-                                three_windings_transformer_string_list.append(
-                                    new_transformer_line
-                                )
-
-            # Write everything to the network file
-            #
-            # HEADER
-            #
-            f.write("[GENERAL]\n")
-
-            # DATE
-            #
-            current_date = datetime.now().strftime("%B %d, %Y at %H:%M:%S")
-            f.write("DATE={}\n".format(current_date))
-
-            # CYME version
-            #
-            f.write("CYME_VERSION=8.02\n")
-
-            # Unit system
-            #
-            f.write("\n[SI]\n")
-
-            # Nodes
-            #
-            f.write("\n[NODE]\n")
-            f.write("FORMAT_NODE=NodeID,CoordX,CoordY\n")
-
-            for node_string in self.node_string_list:
-                f.write(node_string + "\n")
-
-            if len(self.bus_string_list) > 0:
-                f.write("FORMAT_NODE=NodeID,CoordX1,CoordY1,CoordX2,CoordY2,Width\n")
-                for bus_string in self.bus_string_list:
-                    f.write(bus_string + "\n")
-
-            # Intermediate nodes
-            #
-            f.write("\n[INTERMEDIATE NODES]\n")
-            f.write("FORMAT_INTERMEDIATENODE=SectionID,SeqNumber,CoordX,CoordY\n")
-
-            for inter in intermediate_nodes:
-                f.write(
-                    "{SectionID},{SegNumber},{CoordX},{CoordY}\n".format(
-                        SectionID=inter[0],
-                        SegNumber=inter[1],
-                        CoordX=inter[2],
-                        CoordY=inter[3],
-                    )
-                )
-
-            # Sources
-            #
-            f.write("\n[SOURCE]\n")
-            f.write("FORMAT_SOURCE=SourceID,DeviceNumber,NodeID,NetworkID\n")
-            k = 0
-            self.substation_IDs = {}
-
-            for _source, _voltage in self.sources.items():
-                # _source should be the name of the headnode for one feeder_metadata object
-                # TODO: Find a better way to find it
-                for obj in model.models:
-                    if isinstance(obj, Feeder_metadata) and obj.headnode == _source:
-                        sourceID = obj.headnode + "_src"
-                        nodeID = obj.headnode
-                        NetworkID = obj.name
-                k += 1
-                for j, sub in enumerate(self.substations):
-                    if sub["connecting_element"] == _source:
-                        self.substations[j]["sub_ID"] = "sub_" + str(k)
-                self.substation_IDs[_source] = "sub{}".format(k)
-                f.write(
-                    "sub_{k},sub_{k},{nodeID},{NetID}\n".format(
-                        sourceID=sourceID, k=k, nodeID=nodeID, NetID=NetworkID
-                    )
-                )
-
-            f.write("\n[HEADNODES]\n")
-            f.write("FORMAT_HEADNODES=NodeID,NetworkID\n")
-            # k=0
-            # for source_string in source_string_list:
-            #    k+=1
-            #    nodeID=source_string.split(',')[0]
-            #    f.write('{nodeID},{NetID}\n'.format(nodeID=nodeID, NetID=k))
-            for f_name, section_l in self.section_feeder_mapping.items():
-                #                for kk in model.models:
-                #                   if isinstance(kk,Feeder_metadata):
-                #                       print(kk.name, kk.headnode)
-                # import pdb;pdb.set_trace()
-                if f_name != "":
-                    head = model[
-                        f_name
-                    ].headnode  # self.section_headnode_mapping[f_name]
-                    f.write("{nodeID},{NetID}\n".format(nodeID=head, NetID=f_name))
-
-            # Source equivalent
-            #
-            f.write("\n[SOURCE EQUIVALENT]\n")
-            f.write(
-                "FORMAT_SOURCEEQUIVALENT=NodeID,Voltage,OperatingAngle1,OperatingAngle2,OperatingAngle3,PositiveSequenceResistance,PositiveSequenceReactance,ZeroSequenceResistance,ZeroSequenceReactance,NegativeSequenceResistance,NegativeSequenceReactance,OperatingVoltage1,OperatingVoltage2,OperatingVoltage3,ImpedanceUnit\n"
-            )
-
-            id_from_source = []
-            for source_string in source_string_list:
-                id_from_source.append(source_string.split(",")[0])
-                f.write(source_string + "\n")
-
-            for f_name, section_l in self.section_line_feeder_mapping.items():
-                if f_name != "subtransmission" and "substation" not in f_name:
-                    temp = model[f_name]
-                    if (
-                        hasattr(temp, "nominal_voltage")
-                        and temp.nominal_voltage is not None
-                    ):
-                        volt = temp.nominal_voltage * 10 ** -3
-                    else:
-                        volt = model[temp.headnode].nominal_voltage * 10 ** -3
-                    if temp.headnode not in id_from_source:
-                        f.write(
-                            "{node_id},{voltage},{angle1},{angle2},{angle3},{R1},{X1},{R0},{X0},{R2},{X2},{voltage},{voltage},{voltage},0\n".format(
-                                node_id=temp.headnode,
-                                voltage=volt,
-                                angle1=temp.operating_angle1,
-                                angle2=temp.operating_angle2,
-                                angle3=temp.operating_angle3,
-                                R1=temp.positive_sequence_resistance,
-                                X1=temp.positive_sequence_reactance,
-                                R0=temp.zero_sequence_resistance,
-                                X0=temp.zero_sequence_reactance,
-                                R2=temp.negative_sequence_resistance,
-                                X2=temp.negative_sequence_reactance,
-                            )
-                        )
-
-            # Sections
-            #
-            f.write("\n[SECTION]\n")
-
-            # Always write the SECTION format
-            f.write(
-                "FORMAT_SECTION=SectionID,FromNodeID,FromNodeIndex,ToNodeID,ToNodeIndex,Phase,SubNetworkId\n"
-            )
-
-            # Always write the FEEDER format
-            f.write("FORMAT_FEEDER=NetworkID,HeadNodeID,CoordSet\n")
-
-            # If we have subtransmission, then write the TRANSMISSIONLINE format
-            if "subtransmission" in self.section_line_feeder_mapping:
-                f.write("FORMAT_TRANSMISSIONLINE=NetworkID,HeadNodeID,CoordSet\n")
-
-            # If we have a substation (have to have "substation in the name...),
-            # then write the SUBSTATION format
-            if self.network_have_substations:
-                f.write("FORMAT_SUBSTATION=NetworkID,HeadNodeID,CoordSet\n")
-
-            #####################################
-            #  TO REMOVE ????????
-            ####################################
-            #
-            # k=0
-            # for source_string in source_string_list:
-            #    k+=1
-            #    f.write('FEEDER={NetID},{HeadNodeID},{coordset}\n'.format(NetID=k,HeadNodeID=source_string.split(',')[0],coordset=0))
-
-            #    section_list=self.merge_regulators(self.section_line_list)
-            #    for section_line in section_list:
-            #        f.write(section_line+'\n')
-            #######################################
-
-            for f_name, section_l in self.section_line_feeder_mapping.items():
-                if "substation" in f_name:
-                    head = ""
-                else:
-                    head = model[
-                        f_name
-                    ].headnode  # self.section_headnode_mapping[f_name]
-                # If we are considering the subtransmission network, use TRANSMISSIONLINE
-                if f_name == "subtransmission":
-                    f.write(
-                        "TRANSMISSIONLINE={NetID},{HeadNodeID},{coordset}\n".format(
-                            NetID=f_name, HeadNodeID=head, coordset=1
-                        )
-                    )
-                    subnetID = ""
-                # If substation is in the name of the "feeder", then use SUBSTATION
-                elif "substation" in f_name:
-                    f.write(
-                        "SUBSTATION={NetID},{HeadNodeID},{coordset}\n".format(
-                            NetID=f_name.split("ation_")[1], HeadNodeID=head, coordset=1
-                        )
-                    )
-                    subnetID = f_name.split("ation_")[1]
-                # Otherwise, it should be an actual feeder, so use FEEDER
-                else:
-                    f.write(
-                        "FEEDER={NetID},{HeadNodeID},{coordset}\n".format(
-                            NetID=f_name, HeadNodeID=head, coordset=1
-                        )
-                    )
-                    subnetID = ""
-                # Then, write all the sections belonging to this subnetwork
-                for sec in section_l:
-                    f.write(sec + ",{}".format(subnetID) + "\n")
-
-            # Subnetworks
-            #
-            # Use subnetworks only for substations
-            # TODO: Let the user specify what should be subnetworked...
-            #
-            if self.network_have_substations:
-                f.write("\n[SUBNETWORKS]\n")
-                f.write(
-                    "FORMAT_SUBNETWORKS=SubNetID,Angle,X,Y,Height,Length,SymbolID,SubNetTypeID,Version,SymbolReferenceSize,TextReferenceSize,CoordSet\n"
-                )
-                for f_name, section_l in self.section_line_feeder_mapping.items():
-                    if "substation" in f_name:
-                        # We need to find the X,Y coordinates for the subnetwork
-                        # (CASE 1) - First, we try setting these coordinates as the average of the LV elements.
-                        # (CASE 2) - If this does not work, we try using the average of all the substation elements.
-                        # (CASE 3) - If this does not work either, we try using the global average (all Nodes in the system), such that
-                        # the subnetwork is more or less in the middle of the system.
-                        # (CASE 4) - Finally, if nothing works, set the coordinates as (0,0)...
-                        defaultX = []
-                        defaultY = []
-                        by_nominal_voltage_X = {}
-                        by_nominal_voltage_Y = {}
-                        all_coordsX = []
-                        all_coordsY = []
-                        #
-                        # TODO: Better way to do this???
-                        #
-                        for obj in model.models:
-                            # (CASE 3) - Just append all Node's valid coordinates to all_coordsX and all_coordsY
-                            if (
-                                isinstance(obj, Node)
-                                and len(obj.positions) > 0
-                                and obj.positions[0] is not None
-                                and obj.positions[0].lat is not None
-                                and obj.positions[0].long is not None
-                            ):
-                                all_coordsX.append(obj.positions[0].long)
-                                all_coordsY.append(obj.positions[0].lat)
-                            # (CASE 1) - Since we don't know what the LV value is beforehand, we store all coordinates by nominal voltage
-                            # in the dictionaries by_nominal_voltage_X and by_nominal_voltage_Y.
-                            if (
-                                isinstance(obj, Node)
-                                and obj.substation_name == f_name.split("ation_")[1]
-                                and obj.is_substation_connection == 1
-                            ):
-                                if obj.nominal_voltage is not None:
-                                    if (
-                                        len(obj.positions) > 0
-                                        and obj.positions[0] is not None
-                                    ):
-                                        if (
-                                            obj.positions[0].lat is not None
-                                            and obj.positions[0].long is not None
-                                        ):
-                                            if (
-                                                obj.nominal_voltage
-                                                in by_nominal_voltage_X
-                                                and obj.nominal_voltage
-                                                in by_nominal_voltage_Y
-                                            ):
-                                                by_nominal_voltage_X[
-                                                    obj.nominal_voltage
-                                                ].append(obj.positions[0].long)
-                                                by_nominal_voltage_Y[
-                                                    obj.nominal_voltage
-                                                ].append(obj.positions[0].lat)
-                                            else:
-                                                by_nominal_voltage_X[
-                                                    obj.nominal_voltage
-                                                ] = [obj.positions[0].long]
-                                                by_nominal_voltage_Y[
-                                                    obj.nominal_voltage
-                                                ] = [obj.positions[0].lat]
-                                # (CASE 2) - If the nominal voltage was None, then add the coordinates to the default list
-                                else:
-                                    if (
-                                        len(obj.positions) > 0
-                                        and obj.positions[0] is not None
-                                    ):
-                                        if (
-                                            obj.positions[0].lat is not None
-                                            and obj.positions[0].long is not None
-                                        ):
-                                            defaultX.append(obj.positions[0].long)
-                                            defaultY.append(obj.positions[0].lat)
-                        # (CASE 1)
-                        if len(list(by_nominal_voltage_X.keys())) > 0:
-                            low_voltage = min(list(by_nominal_voltage_X.keys()))
-                            Xs = by_nominal_voltage_X[low_voltage]
-                            Ys = by_nominal_voltage_Y[low_voltage]
-                        # (CASE 2)
-                        else:
-                            Xs = defaultX
-                            Ys = defaultY
-                        # If we were able to sample some coordinates, take the average
-                        if len(Xs) > 0 and len(Ys) > 0:
-                            X = np.mean(Xs)
-                            Y = np.mean(Ys) + 50 / 2.0
-                        # (CASE 3)
-                        elif len(all_coordsX) > 0 and len(all_coordsY) > 0:
-                            X = np.mean(all_coordsX)
-                            Y = np.mean(all_coordsY)
-                        # (CASE 4) - Otherwise, set to 0,0 (best effort...)
-                        else:
-                            logger.warning(
-                                "Could not find any coordinate for substation {s}. Setting the subnetwork coordinates to (0,0)...".format(
-                                    s=f_name
-                                )
-                            )
-                            X = 0
-                            Y = 0
-                        f.write(
-                            "{NetID},0,{X},{Y},{Height},{Length},-1,Geographically Referenced,-1,5,0.251957,1\n".format(
-                                NetID=f_name.split("ation_")[1],
-                                X=X,
-                                Y=Y,
-                                Height=50.00,
-                                Length=50.00,
-                            )
-                        )
-
-            # Subnetwork Connections
-            #
-            # Use subnetwork connections only for substations
-            # TODO: Let the user specify what should be subnetworked
-            if self.network_have_substations:
-                f.write("\n[SUBNETWORK CONNECTIONS]\n")
-                f.write(
-                    "FORMAT_SUBNETWORKCONNECTIONS=SubNetID,NodeID,ConnectorCoordX,ConnectorCoordY\n"
-                )
-                for f_name, section_l in self.section_line_feeder_mapping.items():
-                    if "substation" in f_name:
-                        # We need to find all the connections between the subnetwork and the rest of the system
-                        # Use the "is_substation_connection" attribute of Node objects
-                        #
-                        # TODO: Better way to do this???
-                        for obj in model.models:
-                            if (
-                                isinstance(obj, Node)
-                                and obj.is_substation_connection == 1
-                                and obj.substation_name == f_name.split("ation_")[1]
-                            ):
-                                # We also need the coordinates of this connection.
-                                # Use the coordinates of the Node
-                                if obj.positions is not None and len(obj.positions) > 0:
-                                    X = obj.positions[0].long
-                                    Y = obj.positions[0].lat
-                                # If we don't have coordinates, then set to (0,0)....
+                    # We have ZHL=(RH+RL)+XHLj
+                    #
+                    # Compute the X over R ratio
+                    try:
+                        XR = (XHL) / (RH + RL)
+                        XR0 = XR
+                    except:
+                        XR = 0
+                        XR0 = 0
+                        pass
+                    #
+                    # |ZHL|=sqrt((RH+RL)^2 + XHL^2)
+                    try:
+                        _ZHL_ = math.sqrt((RH + RL) ** 2 + XHL ** 2)
+                    except:
+                        _ZHL_ = 0
+                        pass
+
+                    #
+                    # Expressed in percentage of the KVA base
+                    try:
+                        Z1 = (
+                            _ZHL_
+                            * 100.0
+                            / (transformer_object.windings[0].rated_power * 10 ** -3)
+                        )
+                    except:
+                        Z1 = 0
+                        pass
+                    Z0 = Z1
+
+                # Total kva
+                try:
+                    KVA = transformer_object.windings[0].rated_power * 10 ** -3
+                except:
+                    KVA = "DEFAULT"
+                    pass
+
+                for w, winding in enumerate(transformer_object.windings):
+                    # try:
+                    #    KVA+=winding.rated_power*10**-3
+                    # except:
+                    #    pass
+
+                    if hasattr(winding, "nominal_voltage"):
+                        # If we have a one phase transformer or a delta transformer, we specify voltage in KV, not in KVLL
+                        # This is done by setting the voltageUnit keyword to 1
+                        if (
+                            len(transformer_object.windings[0].phase_windings) <= 1
+                            or len(transformer_object.windings[0].phase_windings) == 2
+                        ):
+                            if w == 0:
+                                KVLLprim = winding.nominal_voltage * 10 ** -3
+                                # if transformer_object.is_center_tap == True:
+                                #     KVLLprim = round(
+                                #         KVLLprim / (3 ** 0.5), 2
+                                #     )  # produces output in L-N format if center-tap rather than L-L
+                                voltageUnit = 1  # Voltage declared in KV, not in KVLL
+                            elif w == 1:
+                                # In addition, if we have a center tap, we need to add the secondary and tertiary voltages here
+                                if TYPE == 4:
+                                    try:
+                                        KVLLsec = (
+                                            winding.nominal_voltage * 10 ** -3
+                                            + transformer_object.windings[
+                                                2
+                                            ].nominal_voltage
+                                            * 10 ** -3
+                                        )
+                                        voltageUnit = (
+                                            1  # Voltage declared in KV, not in KVLL
+                                        )
+                                    except:
+                                        KVLLsec = "DEFAULT"
+                                        pass
                                 else:
-                                    X = 0
-                                    Y = 0
-                                f.write(
-                                    "{NetID},{NodeID},{X},{Y}\n".format(
-                                        NetID=f_name.split("ation_")[1],
-                                        NodeID=obj.name,
-                                        X=X,
-                                        Y=Y,
+                                    KVLLsec = winding.nominal_voltage * 10 ** -3
+                                    voltageUnit = (
+                                        1  # Voltage declared in KV, not in KVLL
                                     )
-                                )
-
-            # Overhead lines
-            #
-            if len(overhead_string_list) > 0:
-                f.write("\n[OVERHEADLINE SETTING]\n")
-                f.write(
-                    "FORMAT_OVERHEADLINESETTING=SectionID,LineCableID,Length,ConnectionStatus\n"
+                        # If we have a three phase transformer, we need to specify the voltage in KVLL.
+                        # This is done by setting the voltageUnit to 0, and multiplying the voltage by sqrt(3)
+                        # Note: If we have three phases, the transformer shouln't be a center tap
+                        elif len(transformer_object.windings[0].phase_windings) == 3:
+                            if w == 0:
+                                KVLLprim = (
+                                    winding.nominal_voltage * 10 ** -3
+                                )  # *math.sqrt(3)
+                                if transformer_object.is_center_tap == True:
+                                    KVLLprim = round(
+                                        KVLLprim / (3 ** 0.5), 2
+                                    )  # produces output in L-N format if center-tap rather than L-L
+                                voltageUnit = 0
+                            if w == 1:
+                                KVLLsec = (
+                                    winding.nominal_voltage * 10 ** -3
+                                )  # *math.sqrt(3)
+                                voltageUnit = 0
+
+                # NoLoadLosses
+                if (
+                    hasattr(transformer_object, "noload_loss")
+                    and transformer_object.noload_loss is not None
+                ):
+                    # TODO: Make sure noloadlosses is in % in DiTTo, or change what is next.
+                    NOLOADLOSS = transformer_object.noload_loss / 100.0 * KVA
+                else:
+                    NOLOADLOSS = ""
+
+                new_transformer_object_line += "{type},{kva},{voltageUnit},{kvllprim},{kvllsec},{Z1},{Z0},{XR},{XR0},{Conn},{WindingType},{noloadloss},{phaseshift},{isltc}".format(
+                    phaseshift=phase_shift,
+                    type=TYPE,
+                    kva=KVA,
+                    voltageUnit=voltageUnit,
+                    kvllprim=KVLLprim,
+                    kvllsec=KVLLsec,
+                    Conn=CONN,
+                    Z1=Z1,
+                    Z0=Z0,
+                    XR=XR,
+                    XR0=XR0,
+                    WindingType=1,
+                    noloadloss=NOLOADLOSS,
+                    isltc=is_ltc,
                 )
-                for overhead_string in overhead_string_list:
-                    f.write(overhead_string + "\n")
 
-            # Overhead by phase lines
-            #
-            if len(overhead_byphase_string_list) > 0:
-                f.write("\n[OVERHEAD BYPHASE SETTING]\n")
-                f.write(
-                    "FORMAT_OVERHEADBYPHASESETTING=SectionID,DeviceNumber,CondID_A,CondID_B,CondID_C,CondID_N1,CondID_N2,SpacingID,Length,ConnectionStatus\n"
+                new_transformer_line += (
+                    ",transformer_"
+                    + str(
+                        self.equipment_ID(
+                            "two_windings_trans_codes", new_transformer_object_line
+                        )
+                    )
+                    + ","
+                    + new_section_ID
                 )
-                for overhead_byphase_string in overhead_byphase_string_list:
-                    f.write(overhead_byphase_string + "\n")
 
-            # Underground lines
-            #
-            if len(underground_string_list) > 0:
-                f.write("\n[UNDERGROUNDLINE SETTING]\n")
-                f.write(
-                    "FORMAT_UNDERGROUNDLINESETTING=SectionID,LineCableID,Length,ConnectionStatus,DistanceBetweenConductors,CableConfiguration\n"
-                )
-                for underground_string in underground_string_list:
-                    f.write(underground_string + "\n")
+                new_transformer_line += ",{PhaseShiftType},M,100,100,None,0".format(
+                    PhaseShiftType=phase_shift
+                )  # Phase shift, Location, PrimTap,SecondaryTap, ODPrimPh, and ConnectionStatus
 
-            # Switches
-            #
-            if len(switch_string_list) > 0:
-                f.write("\n[SWITCH SETTING]\n")
-                f.write(
-                    "FORMAT_SWITCHSETTING=SectionID,EqID,Location,ClosedPhase,Locked,ConnectionStatus,DeviceNumber\n"
+                try:
+                    TAP = 1.0 / float(
+                        transformer_object.windings[1].phase_windings[0].tap_position
+                    )
+                    new_transformer_line += ",{}".format(TAP)
+                except:
+                    new_transformer_line += ","
+                    pass
+
+                # Apply the LTC settings. These are empty if it's just a transformer
+                new_transformer_line += ",{setpoint},{controltype},{lowerbandwidth},{upperbandwidth},{maxbuck},{maxboost}".format(
+                    setpoint=Setpoint,
+                    controltype=ControlType,
+                    lowerbandwidth=LowerBandwidth,
+                    upperbandwidth=UpperBandwidth,
+                    maxbuck=MaxBuck,
+                    maxboost=MaxBoost,
                 )
-                for switch_string in switch_string_list:
-                    f.write(switch_string + "\n")
 
-            # Fuses
-            #
-            if len(fuse_string_list) > 0:
-                f.write("\n[FUSE SETTING]\n")
-                f.write(
-                    "FORMAT_FUSESETTING=SectionID,EqID,Location,ClosedPhase,Locked,ConnectionStatus,DeviceNumber\n"
-                )
-                for fuse_string in fuse_string_list:
-                    f.write(fuse_string + "\n")
+                if new_transformer_line != "":
+                    self.append_line("two_windings_transformer", new_transformer_line)
 
-            # Reclosers
+            # Case 2: Three Windings
             #
-            if len(recloser_string_list) > 0:
-                f.write("\n[RECLOSER SETTING]\n")
-                f.write(
-                    "FORMAT_RECLOSERSETTING=SectionID,EqID,Location,ClosedPhase,Locked,ConnectionStatus,DeviceNumber\n"
-                )
-                for recloser_string in recloser_string_list:
-                    f.write(recloser_string + "\n")
+            elif len(transformer_object.windings) == 3:
+                # Empty new transformer string
+                new_transformer_line = ""
+                new_transformer_object_line = ""
 
-            # Breakers
-            #
-            if len(breaker_string_list) > 0:
-                f.write("\n[BREAKER SETTING]\n")
-                f.write(
-                    "FORMAT_BREAKERSETTING=SectionID,EqID,Location,ClosedPhase,Locked,ConnectionStatus,DeviceNumber\n"
-                )
-                for breaker_string in breaker_string_list:
-                    f.write(breaker_string + "\n")
+                # Name
+                if (
+                    hasattr(transformer_object, "name")
+                    and transformer_object.name is not None
+                ):
+                    try:
+                        new_transformer_line += new_section_ID
+                    except:
+                        pass
 
-            # Capacitors
-            #
-            if len(capacitor_string_list) > 0:
-                f.write("\n[SHUNT CAPACITOR SETTING]\n")
-                f.write(
-                    "FORMAT_SHUNTCAPACITORSETTING=SectionID,Connection,SwitchedKVARA,SwitchedKVARB,SwitchedKVARC,KV,Control,OnValueA,OnValueB,OnValueC,OffValueA,OffValueB,OffValueC,DeviceNumber,ShuntCapacitorID,Location,ConnectionStatus\n"
-                )
-                for capacitor_string in capacitor_string_list:
-                    f.write(capacitor_string + "\n")
+                # CoordX and CoordY
+                if (
+                    hasattr(transformer_object, "positions")
+                    and transformer_object.positions is not None
+                ):
+                    try:
+                        new_transformer_line += "," + str(
+                            transformer_object.positions[0].long
+                        )
+                        new_transformer_line += "," + str(
+                            transformer_object.positions[0].lat
+                        )
+                    except:
+                        new_transformer_line += ",,"
+                        pass
 
-            # Transformers
-            #
-            # 2 WINDINGS
-            #
-            if len(two_windings_transformer_string_list) > 0:
-                f.write("\n[TRANSFORMER SETTING]\n")
-                f.write(
-                    "FORMAT_TRANSFORMERSETTING=SectionID,CoordX,CoordY,Conn,PhaseON,EqID,DeviceNumber,PhaseShiftType,Location,PrimTap,SecondaryTap,ODPrimPh,ConnectionStatus,Tap,SetPoint,ControlType,LowerBandwidth,UpperBandwidth,Maxbuck,Maxboost\n"
-                )
-                for transformer_string in two_windings_transformer_string_list:
-                    f.write(transformer_string + "\n")
+                _primary_rated_capacity = None
+                _secondary_rated_capacity = None
+                _tertiary_rated_capacity = None
+                _primary_voltage = None
+                _secondary_voltage = None
+                _tertiary_voltage = None
+                _primary_connection = None
+                _secondary_connection = None
+                _tertiary_connection = None
+                R = {}
+                XHL_perct, XLT_perct, XHT_perct = None, None, None
+                XHL, XLT, XHT = None, None, None
+                _PrimaryToSecondaryZ1 = _PrimaryToSecondaryZ0 = ""
+                _PrimaryToSecondaryXR1 = _PrimaryToSecondaryXR0 = ""
+                _PrimaryToTertiaryZ1 = _PrimaryToTertiaryZ0 = ""
+                _PrimaryToTertiaryXR1 = _PrimaryToTertiaryXR0 = ""
+                _SecondaryToTertiaryZ1 = _SecondaryToTertiaryZ0 = ""
+                _SecondaryToTertiaryXR1 = _SecondaryToTertiaryXR0 = ""
+                try:
+                    KVA = transformer_object.windings[0].rated_power * 10 ** -3
+                except:
+                    KVA = 0
+                for w, winding in enumerate(transformer_object.windings):
+                    if (
+                        hasattr(winding, "rated_power")
+                        and winding.rated_power is not None
+                    ):
+                        if w == 0:
+                            _primary_rated_capacity = str(
+                                winding.rated_power * 10 ** -3
+                            )
+                        if w == 1:
+                            _secondary_rated_capacity = str(
+                                winding.rated_power * 10 ** -3
+                            )
+                        if w == 2:
+                            _tertiary_rated_capacity = str(
+                                winding.rated_power * 10 ** -3
+                            )
 
-            # 3 WINDINGS
-            #
-            if len(three_windings_transformer_string_list) > 0:
-                f.write("\n[THREE WINDING TRANSFORMER SETTING]\n")
-                f.write(
-                    "FORMAT_THREEWINDINGTRANSFORMERSETTING=SectionID,CoordX,CoordY,PrimaryBaseVoltage,SecondaryBaseVoltage,TertiaryBaseVoltage,EqID,DeviceNumber,Location,TertiaryNodeID,PrimaryFixedTapSetting,SecondaryFixedTapSetting,ConnectionStatus,Tap\n"
-                )
-                for transformer_string in three_windings_transformer_string_list:
-                    f.write(transformer_string + "\n")
+                    if (
+                        hasattr(winding, "connection_type")
+                        and winding.connection_type is not None
+                    ):
+                        if w == 0:
+                            _primary_connection = winding.connection_type
+                        if w == 1:
+                            _secondary_connection = winding.connection_type
+                        if w == 2:
+                            _tertiary_connection = winding.connection_type
 
-            # Regulators
-            if len(regulator_string_list) > 0:
-                # Merge the Regulators
-                regulator_string_list_merged = self.merge_regulators(
-                    regulator_string_list
-                )
-                f.write("\n[REGULATOR SETTING]\n")
-                f.write(
-                    "FORMAT_REGULATORSETTING=SectionID,CoordX,CoordY,PhaseON,BandWidth,CT,PT,VsetA,VsetB,VsetC,EqID,DeviceNumber,Location,MaxBuck,MaxBoost,SettingOption,RsetA,RsetB,RsetC,XsetA,XsetB,XsetC,TapA,TapB,TapC,ConnectionStatus\n"
-                )
-                for regulator_string in regulator_string_list_merged:
-                    f.write(regulator_string + "\n")
+                    if (
+                        hasattr(winding, "nominal_voltage")
+                        and winding.nominal_voltage is not None
+                    ):
+                        try:
+                            new_transformer_line += "," + str(
+                                winding.nominal_voltage * 10 ** -3
+                            )
+                        except:
+                            new_transformer_line += ","
+                            pass
+                        if w == 0:
+                            _primary_voltage = str(winding.nominal_voltage * 10 ** -3)
+                        if w == 1:
+                            _secondary_voltage = str(winding.nominal_voltage * 10 ** -3)
+                        if w == 2:
+                            _tertiary_voltage = str(winding.nominal_voltage * 10 ** -3)
 
-            if len(converter_string_list) > 0:
-                f.write("\n[CONVERTER]\n")
-                f.write(
-                    "FORMAT_CONVERTER=DeviceNumber,DeviceType,ConverterRating,ActivePowerRating,ReactivePowerRating,MinimumPowerFactor,PowerFallLimit,PowerRiseLimit,RiseFallUnit\n"
-                )
-                for i in converter_string_list:
-                    f.write(i)
-                    f.write("\n")
+                    else:
+                        new_transformer_line += ","
 
-            if len(converter_control_string_list) > 0:
-                f.write("\n[CONVERTER CONTROL SETTING]\n")
-                f.write(
-                    "FORMAT_CONVERTERCONTROLSETTING=DeviceNumber,DeviceType,ControlIndex,TimeTriggerIndex,ControlType,FixedVarInjection,InjectionReference,ConverterControlID,PowerReference,PowerFactor\n"
+                    if (
+                        hasattr(winding, "resistance")
+                        and winding.resistance is not None
+                    ):
+                        try:
+                            R[w] = winding.resistance * winding.rated_power * 10 ** -3
+                        except:
+                            R[w] = None
+                            pass
+
+                if (
+                    hasattr(transformer_object, "reactances")
+                    and i.reactances is not None
+                ):
+                    try:
+                        XHL_perct, XLT_perct, XHT_perct = i.reactances
+                    except:
+                        pass
+
+                if XHL_perct is not None:
+                    try:
+                        XHL = (
+                            XHL_perct
+                            * 10 ** -2
+                            * transformer_object.windings[0].rated_power
+                            * 10 ** -3
+                        )
+                    except:
+                        XHL = None
+                        pass
+                if XLT_perct is not None:
+                    try:
+                        XLT = (
+                            XLT_perct
+                            * 10 ** -2
+                            * transformer_object.windings[0].rated_power
+                            * 10 ** -3
+                        )
+                    except:
+                        XLT = None
+                        pass
+                if XHT_perct is not None:
+                    try:
+                        XHT = (
+                            XHT_perct
+                            * 10 ** -2
+                            * transformer_object.windings[0].rated_power
+                            * 10 ** -3
+                        )
+                    except:
+                        XHT = None
+                        pass
+
+                if (
+                    sum([x is None for x in R]) == 0
+                    and XHL is not None
+                    and XLT is not None
+                    and XHT is not None
+                ):
+                    ZHL = complex(R[0] + R[1], XHL)
+                    ZLT = complex(R[1] + R[2], XLT)
+                    ZHT = complex(R[0] + R[2], XHT)
+
+                    _PrimaryToSecondaryXR1 = ZHL.imag / ZHL.real
+                    _PrimaryToSecondaryXR0 = _PrimaryToSecondaryXR1
+
+                    _PrimaryToTertiaryXR1 = ZHT.imag / ZHT.real
+                    _PrimaryToTertiaryXR0 = _PrimaryToTertiaryXR1
+
+                    _SecondaryToTertiaryXR1 = ZLT.imag / ZLT.real
+                    _SecondaryToTertiaryXR0 = _SecondaryToTertiaryXR1
+
+                    _PrimaryToSecondaryZ1 = (
+                        math.sqrt(ZHL.real ** 2 + ZHL.imag ** 2)
+                        * 100.0
+                        / (transformer_object.windings[0].rated_power * 10 ** -3)
+                    )
+                    _PrimaryToSecondaryZ0 = _PrimaryToSecondaryZ1
+
+                    _PrimaryToTertiaryZ1 = (
+                        math.sqrt(ZHT.real ** 2 + ZHT.imag ** 2)
+                        * 100.0
+                        / (transformer_object.windings[0].rated_power * 10 ** -3)
+                    )
+                    _PrimaryToTertiaryZ0 = _PrimaryToTertiaryZ1
+
+                    _SecondaryToTertiaryZ1 = (
+                        math.sqrt(ZLT.real ** 2 + ZLT.imag ** 2)
+                        * 100.0
+                        / (transformer_object.windings[0].rated_power * 10 ** -3)
+                    )
+                    _SecondaryToTertiaryZ0 = _SecondaryToTertiaryZ1
+
+                # NoLoadLosses
+                if (
+                    hasattr(transformer_object, "noload_loss")
+                    and transformer_object.noload_loss is not None
+                ):
+                    # TODO: Make sure noloadlosses is in % in DiTTo, or change what is next.
+                    NOLOADLOSS = transformer_object.noload_loss / 100.0 * KVA
+                else:
+                    NOLOADLOSS = ""
+
+                new_transformer_object_line = "{kva1},{kv1},{conn1},,,,,,,{kva2},{kv2},{conn2},{kva3},{kv3},{conn3},".format(
+                    kva1=_primary_rated_capacity,
+                    kv1=_primary_voltage,
+                    conn1=_primary_connection,
+                    kva2=_secondary_rated_capacity,
+                    kv2=_secondary_voltage,
+                    conn2=_secondary_connection,
+                    kva3=_tertiary_rated_capacity,
+                    kv3=_tertiary_voltage,
+                    conn3=_tertiary_connection,
+                )
+                new_transformer_object_line += "{PrimaryToSecondaryZ1},{PrimaryToSecondaryZ0},{PrimaryToSecondaryXR1},{PrimaryToSecondaryXR0},{PrimaryToTertiaryZ1},{PrimaryToTertiaryZ0},{PrimaryToTertiaryXR1},{PrimaryToTertiaryXR0},{SecondaryToTertiaryZ1},{SecondaryToTertiaryZ0}".format(
+                    PrimaryToSecondaryZ1=_PrimaryToSecondaryZ1,
+                    PrimaryToSecondaryZ0=_PrimaryToSecondaryZ0,
+                    PrimaryToSecondaryXR1=_PrimaryToSecondaryXR1,
+                    PrimaryToSecondaryXR0=_PrimaryToSecondaryXR0,
+                    PrimaryToTertiaryZ1=_PrimaryToTertiaryZ1,
+                    PrimaryToTertiaryZ0=_PrimaryToTertiaryZ0,
+                    PrimaryToTertiaryXR1=_PrimaryToTertiaryXR1,
+                    PrimaryToTertiaryXR0=_PrimaryToTertiaryXR0,
+                    SecondaryToTertiaryZ1=_SecondaryToTertiaryZ1,
+                    SecondaryToTertiaryZ0=_SecondaryToTertiaryZ0,
+                )
+                new_transformer_object_line += ",{SecondaryToTertiaryXR1},{SecondaryToTertiaryXR0},{SecondaryCapacityLimit1},{SecondaryCapacityLimit2},{TertiaryCapacityLimit1},{TertiaryCapacityLimit2},{TertiaryConnection},{noloadloss}".format(
+                    SecondaryToTertiaryXR1=_SecondaryToTertiaryXR1,
+                    SecondaryToTertiaryXR0=_SecondaryToTertiaryXR0,
+                    SecondaryCapacityLimit1=0,
+                    SecondaryCapacityLimit2=0,
+                    TertiaryCapacityLimit1=0,
+                    TertiaryCapacityLimit2=0,
+                    TertiaryConnection=0,
+                    noloadloss=NOLOADLOSS,
                 )
-                for i in converter_control_string_list:
-                    f.write(i)
-                    f.write("\n")
 
-            if len(pv_settings_string_list) > 0:
-                f.write("\n[PHOTOVOLTAIC SETTINGS]\n")
-                f.write(
-                    "FORMAT_PHOTOVOLTAICSETTING=SectionID,Location,DeviceNumber,EquipmentID,NS,NP,AmbientTemperature,Phase,ConstantInsolation,InsolationModelID\n"
+                new_transformer_line += (
+                    ",3_wdg_transformer_"
+                    + str(
+                        self.equipment_ID(
+                            "three_windings_trans_codes", new_transformer_object_line
+                        )
+                    )
+                    + ","
+                    + new_section_ID
                 )
-                for i in pv_settings_string_list:
-                    f.write(i)
-                    f.write("\n")
 
-            if len(dg_generation_string_list) > 0:
-                f.write("\n[DGGENERATIONMODEL]\n")
-                f.write(
-                    "FORMAT_DGGENERATIONMODEL=DeviceNumber,DeviceType,LoadModelName,ActiveGeneration,PowerFactor\n"
+                new_transformer_line += ",{Location},{tertiarynodeID},{PrimaryFixedTapSetting},{SecondaryFixedTapSetting},{ConnectionStatus}".format(
+                    Location="M",
+                    tertiarynodeID=0,
+                    PrimaryFixedTapSetting=0,
+                    SecondaryFixedTapSetting=0,
+                    ConnectionStatus=0,
                 )
-                for i in dg_generation_string_list:
-                    f.write(i)
-                    f.write("\n")
 
-            if len(self.node_connector_string_list) > 0:
-                f.write("\n[NODE CONNECTOR]\n")
-                f.write("FORMAT_NODECONNECTOR=NodeID,CoordX,CoordY,SectionID\n")
-                for i in self.node_connector_string_list:
-                    f.write(i)
-                    f.write("\n")
+                try:
+                    TAP = 1.0 / float(
+                        transformer_object.windings[1].phase_windings[0].tap_position
+                    )
+                    new_transformer_line += ",{}".format(TAP)
+                except:
+                    new_transformer_line += ","
+                    pass
 
-            if len(bess_settings_string_list) > 0:
-                f.write("\n[BESS SETTINGS]\n")
-                f.write(
-                    "FORMAT_BESSSETTING=SectionID,Location,DeviceNumber,EquipmentID,Phase,InitialSOC\n"
-                )
-                for i in bess_settings_string_list:
-                    f.write(i)
-                    f.write("\n")
+                if new_transformer_line != "":
+                    self.append_line("three_windings_transformer", new_transformer_line)
 
     def write_equipment_file(self, model, **kwargs):
         """Write the equipment file."""
@@ -4874,8 +4568,8 @@ class Writer(AbstractWriter):
         # Output load file
         output_file = self.output_path + "/loads.txt"
 
-        customer_load_string_list = []
-        load_string_list = []
+        customer_load_string_list = self.string_lists["customer_load"]
+        load_string_list = self.string_lists["load"]
 
         with open(output_file, "w") as f:
 
@@ -4907,28 +4601,16 @@ class Writer(AbstractWriter):
                                 f=i.connecting_element, t=i.name
                             )
                         )
-                        if hasattr(i, "feeder_name") and i.feeder_name is not None:
-                            if i.feeder_name in self.section_feeder_mapping:
-                                self.section_feeder_mapping[i.feeder_name].append(
-                                    new_section_ID
-                                )
-                            else:
-                                self.section_feeder_mapping[i.feeder_name] = [
-                                    new_section_ID
-                                ]
-                            if (
-                                hasattr(i, "substation_name")
-                                and i.substation_name is not None
-                            ):
-                                self.section_headnode_mapping[
-                                    i.feeder_name
-                                ] = i.substation_name
+                        self.add_feeder_section_ID(
+                            new_section_ID,
+                            getattr(i, "feeder_name", None),
+                            getattr(i, "substation_name", None),
+                        )
                         new_customer_load_string += (
                             new_section_ID + "," + new_section_ID
                         )
                         new_load_string += new_section_ID + "," + new_section_ID
-                        if i.name not in self.nodeID_list:
-                            self.nodeID_list.append(i.name)
+                        if i.name not in self.node_IDs:
                             if hasattr(i, "positions") and i.positions is not None:
                                 try:
                                     X = i.positions[0].long
@@ -4940,8 +4622,8 @@ class Writer(AbstractWriter):
                             else:
                                 X = 0
                                 Y = 0
-                            self.node_string_list.append(
-                                "{name},{X},{Y}".format(name=i.name, X=X, Y=Y)
+                            self.add_missing_node(
+                                i.name, "{name},{X},{Y}".format(name=i.name, X=X, Y=Y)
                             )
                         # except:
                         #    continue
@@ -5104,16 +4786,9 @@ class Writer(AbstractWriter):
                         load_string_list.append(new_load_string)
 
                     if new_section is not None:
-                        self.section_line_list.append(new_section)
-                        if hasattr(i, "feeder_name") and i.feeder_name is not None:
-                            if i.feeder_name in self.section_line_feeder_mapping:
-                                self.section_line_feeder_mapping[i.feeder_name].append(
-                                    new_section
-                                )
-                            else:
-                                self.section_line_feeder_mapping[i.feeder_name] = [
-                                    new_section
-                                ]
+                        self.add_section(
+                            new_section, getattr(i, "feeder_name", None), carry=False
+                        )
 
             f.write("[GENERAL]\n")
             current_date = datetime.now().strftime("%B %d, %Y at %H:%M:%S")
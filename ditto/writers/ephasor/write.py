@@ -143,39 +143,36 @@ class Writer(AbstractWriter):
             "Normal Status": [],
         }
 
-        for line in self._lines:
-            if hasattr(line, "is_switch") and line.is_switch == 1:
-
-                if (
-                    hasattr(line, "from_element")
-                    and line.from_element is not None
-                    and hasattr(line, "to_element")
-                    and line.to_element is not None
-                ):
-                    logger.debug(" bus1={from_el}".format(from_el=line.from_element))
-                    if hasattr(line, "wires") and line.wires is not None:
-                        for wire in line.wires:
-                            if (
-                                hasattr(wire, "phase")
-                                and wire.phase is not None
-                                and wire.phase != "N"
-                            ):
-                                # logger.debug('.{p}'.format(p=self.phase_mapping(wire.phase)))
-                                obj_dict["From Bus"].append(
-                                    line.from_element + "_" + wire.phase.lower()
-                                )
-                                obj_dict["To Bus"].append(
-                                    line.to_element + "_" + wire.phase.lower()
-                                )
-                                obj_dict["Switch Name"].append(
-                                    line.name + "_" + wire.phase.lower()
-                                )
-                                if hasattr(wire, "is_open") and wire.is_open == 1:
-                                    obj_dict["Normal Status"].append("0")
-                                else:
-                                    obj_dict["Normal Status"].append("1")
-
-                                # obj_dict['bus1' + wire.phase.lower()][index] = line.to_element+ "_" + wire.phase.lower()
+        # One row per phase of the switches, from the tables of the model
+        tables = self.m.get_tables()
+        if "Line" in tables and "Wire" in tables and "parent_id" in tables["Wire"]:
+            lines = tables["Line"]
+            switches = lines[
+                (lines["is_switch"] == True).fillna(False)
+                & lines["from_element"].notna()
+                & lines["to_element"].notna()
+            ]
+            wires = tables["Wire"]
+            wires = wires[
+                (wires["parent_class"] == "Line").fillna(False)
+                & (wires["parent_trait"] == "wires").fillna(False)
+                & wires["phase"].notna()
+                & (wires["phase"] != "N").fillna(False)
+            ].join(
+                switches[["from_element", "to_element", "name"]],
+                on="parent_id",
+                how="inner",
+            )
+            wires = wires.sort_values(["parent_id", "parent_index"], kind="stable")
+
+            phases = "_" + wires["phase"].str.lower()
+            obj_dict["From Bus"] = list(wires["from_element"].astype(str) + phases)
+            obj_dict["To Bus"] = list(wires["to_element"].astype(str) + phases)
+            obj_dict["Switch Name"] = list(wires["name"] + phases)
+            obj_dict["Normal Status"] = [
+                "0" if is_open else "1"
+                for is_open in (wires["is_open"] == True).fillna(False)
+            ]
 
         df2 = pd.DataFrame(obj_dict)
         return df2
@@ -4,6 +4,7 @@ from __future__ import absolute_import, division, print_function
 from builtins import super, range, zip, round, map
 
 import os
+import gzip
 import json_tricks
 from datetime import datetime
 
@@ -75,6 +76,12 @@ class Writer(AbstractWriter):
 
     .. TODO:: Better format?
 
+    With streaming=True (the default for .jsonl and .jsonl.gz files), the writer
+    produces instead one line with {"metadata": {...}} followed by one object per
+    line. Each object is written as soon as it is serialized, so the memory used does
+    not grow with the size of the model. With compress=True (the default for .gz
+    files), the output is gzipped on the fly.
+
     Author: Nicolas Gensollen. January 2018.
     """
     register_names = ["json", "Json", "JSON"]
@@ -91,171 +98,196 @@ class Writer(AbstractWriter):
         else:
             self.filename = "Model.json"
 
+        # Streaming format: one JSON object per line (.jsonl or .jsonl.gz files by default)
+        name = self.filename
+        if name.endswith(".gz"):
+            name = name[:-3]
+        if "streaming" in kwargs:
+            self.streaming = kwargs["streaming"]
+        else:
+            self.streaming = name.endswith(".jsonl")
+
+        # Gzip compression (.gz files by default)
+        if "compress" in kwargs:
+            self.compress = kwargs["compress"]
+        else:
+            self.compress = self.filename.endswith(".gz")
+
+    def open_output_file(self):
+        """Open the output file for writing, compressing it on the fly if needed."""
+        path = os.path.join(self.output_path, self.filename)
+        if self.compress:
+            return gzip.open(path, "wt")
+        return open(path, "w")
+
     def write(self, model):
         """
         Write a given DiTTo model to a JSON file.
         The output file is configured in the constructor.
         """
+        metadata = {
+            # Set timestamp in metadata
+            "time": str(datetime.now()),
+            # Set the size of the model in metadata
+            "model_size": len(model.models),
+        }
+
+        if self.streaming:
+            with self.open_output_file() as f:
+                f.write(
+                    json_tricks.dumps(
+                        {"metadata": metadata}, allow_nan=True, sort_keys=True
+                    )
+                )
+                f.write("\n")
+                for obj in model.models:
+                    json_obj = self.serialize_object(obj)
+                    if json_obj is not None:
+                        f.write(
+                            json_tricks.dumps(json_obj, allow_nan=True, sort_keys=True)
+                        )
+                        f.write("\n")
+            return
 
         # Initialize json_dump
-        json_dump = {"model": [], "metadata": {}}
-
-        # Set timestamp in metadata
-        json_dump["metadata"]["time"] = str(datetime.now())
-
-        # Set the size of the model in metadata
-        json_dump["metadata"]["model_size"] = len(model.models)
+        json_dump = {"model": [], "metadata": metadata}
 
         for obj in model.models:
-            _class = type(obj).__name__
-            if _class in [
-                Winding,
-                PhaseWinding,
-                Wire,
-                PhaseCapacitor,
-                Position,
-                PhaseLoad,
-            ]:
-                continue
-            json_dump["model"].append({})
-            json_dump["model"][-1]["class"] = _class
-
-            try:
-                json_dump["model"][-1]["name"] = {"class": "str", "value": obj.name}
-            except:
-                json_dump["model"][-1]["name"] = {"class": "str", "value": None}
-                pass
-
-            for key, value in obj._trait_values.items():
-                if key in ["capacitance_matrix", "impedance_matrix", "reactances"]:
-                    json_dump["model"][-1][key] = {"class": "list", "value": []}
-                    for v in value:
-                        if isinstance(v, complex):
-                            json_dump["model"][-1][key]["value"].append(
-                                {"class": "complex", "value": [v.real, v.imag]}
-                            )
-                        elif isinstance(v, list):
-                            json_dump["model"][-1][key]["value"].append(
-                                {"class": "list", "value": []}
-                            )
-                            for vv in v:
-                                if isinstance(vv, complex):
-                                    json_dump["model"][-1][key]["value"][-1][
-                                        "value"
-                                    ].append(
-                                        {
-                                            "class": "complex",
-                                            "value": [vv.real, vv.imag],
-                                        }
-                                    )
-                                else:
-                                    json_dump["model"][-1][key]["value"][-1][
-                                        "value"
-                                    ].append(
-                                        {
-                                            "class": str(type(vv)).split("'")[1],
-                                            "value": vv,
-                                        }
-                                    )
-                        else:
-                            json_dump["model"][-1][key]["value"].append(
-                                {"class": str(type(v)).split("'")[1], "value": v}
-                            )
-                    continue
-                if isinstance(value, list):
-                    json_dump["model"][-1][key] = {"class": "list", "value": []}
-                    for v in value:
-
-                        if isinstance(v, complex):
-                            json_dump["model"][-1][key]["value"].append(
-                                {"class": "complex", "value": [v.real, v.imag]}
-                            )
-
-                        elif isinstance(v, Position):
-                            json_dump["model"][-1][key]["value"].append(
-                                {"class": "Position"}
-                            )
-                            for kkk, vvv in v._trait_values.items():
-                                json_dump["model"][-1][key]["value"][-1][kkk] = {
-                                    "class": str(type(vvv)).split("'")[1],
-                                    "value": vvv,
-                                }
+            json_obj = self.serialize_object(obj)
+            if json_obj is not None:
+                json_dump["model"].append(json_obj)
 
-                        elif isinstance(v, Unicode):
-                            json_dump["model"][-1][key]["value"].append(
-                                {"class": "Unicode", "value": v.default_value}
-                            )
-
-                        elif isinstance(v, Wire):
-                            json_dump["model"][-1][key]["value"].append(
-                                {"class": "Wire"}
-                            )
-                            for kkk, vvv in v._trait_values.items():
-                                json_dump["model"][-1][key]["value"][-1][kkk] = {
-                                    "class": str(type(vvv)).split("'")[1],
-                                    "value": vvv,
-                                }
+        with self.open_output_file() as f:
+            f.write(
+                json_tricks.dumps(json_dump, allow_nan=True, sort_keys=True, indent=4)
+            )
 
-                        elif isinstance(v, PhaseCapacitor):
-                            json_dump["model"][-1][key]["value"].append(
-                                {"class": "PhaseCapacitor"}
-                            )
-                            for kkk, vvv in v._trait_values.items():
-                                json_dump["model"][-1][key]["value"][-1][kkk] = {
+    def serialize_object(self, obj):
+        """Return the JSON object of a DiTTo object, as a dictionary."""
+        _class = type(obj).__name__
+        if _class in [
+            Winding,
+            PhaseWinding,
+            Wire,
+            PhaseCapacitor,
+            Position,
+            PhaseLoad,
+        ]:
+            return None
+        json_obj = {"class": _class}
+
+        try:
+            json_obj["name"] = {"class": "str", "value": obj.name}
+        except:
+            json_obj["name"] = {"class": "str", "value": None}
+            pass
+
+        for key, value in obj._trait_values.items():
+            if key in ["capacitance_matrix", "impedance_matrix", "reactances"]:
+                json_obj[key] = {"class": "list", "value": []}
+                for v in value:
+                    if isinstance(v, complex):
+                        json_obj[key]["value"].append(
+                            {"class": "complex", "value": [v.real, v.imag]}
+                        )
+                    elif isinstance(v, list):
+                        json_obj[key]["value"].append({"class": "list", "value": []})
+                        for vv in v:
+                            if isinstance(vv, complex):
+                                json_obj[key]["value"][-1]["value"].append(
+                                    {"class": "complex", "value": [vv.real, vv.imag]}
+                                )
+                            else:
+                                json_obj[key]["value"][-1]["value"].append(
+                                    {"class": str(type(vv)).split("'")[1], "value": vv}
+                                )
+                    else:
+                        json_obj[key]["value"].append(
+                            {"class": str(type(v)).split("'")[1], "value": v}
+                        )
+                continue
+            if isinstance(value, list):
+                json_obj[key] = {"class": "list", "value": []}
+                for v in value:
+
+                    if isinstance(v, complex):
+                        json_obj[key]["value"].append(
+                            {"class": "complex", "value": [v.real, v.imag]}
+                        )
+
+                    elif isinstance(v, Position):
+                        json_obj[key]["value"].append({"class": "Position"})
+                        for kkk, vvv in v._trait_values.items():
+                            json_obj[key]["value"][-1][kkk] = {
+                                "class": str(type(vvv)).split("'")[1],
+                                "value": vvv,
+                            }
+
+                    elif isinstance(v, Unicode):
+                        json_obj[key]["value"].append(
+                            {"class": "Unicode", "value": v.default_value}
+                        )
+
+                    elif isinstance(v, Wire):
+                        json_obj[key]["value"].append({"class": "Wire"})
+                        for kkk, vvv in v._trait_values.items():
+                            json_obj[key]["value"][-1][kkk] = {
+                                "class": str(type(vvv)).split("'")[1],
+                                "value": vvv,
+                            }
+
+                    elif isinstance(v, PhaseCapacitor):
+                        json_obj[key]["value"].append({"class": "PhaseCapacitor"})
+                        for kkk, vvv in v._trait_values.items():
+                            json_obj[key]["value"][-1][kkk] = {
+                                "class": str(type(vvv)).split("'")[1],
+                                "value": vvv,
+                            }
+
+                    elif isinstance(v, Winding):
+                        json_obj[key]["value"].append({"class": "Winding"})
+                        for kkk, vvv in v._trait_values.items():
+                            if kkk != "phase_windings":
+                                json_obj[key]["value"][-1][kkk] = {
                                     "class": str(type(vvv)).split("'")[1],
                                     "value": vvv,
                                 }
-
-                        elif isinstance(v, Winding):
-                            json_dump["model"][-1][key]["value"].append(
-                                {"class": "Winding"}
-                            )
-                            for kkk, vvv in v._trait_values.items():
-                                if kkk != "phase_windings":
-                                    json_dump["model"][-1][key]["value"][-1][kkk] = {
-                                        "class": str(type(vvv)).split("'")[1],
-                                        "value": vvv,
-                                    }
-                            json_dump["model"][-1][key]["value"][-1][
-                                "phase_windings"
-                            ] = {"class": "list", "value": []}
-                            for phw in v.phase_windings:
-                                json_dump["model"][-1][key]["value"][-1][
-                                    "phase_windings"
-                                ]["value"].append({"class": "PhaseWinding"})
-                                for kkkk, vvvv in phw._trait_values.items():
-                                    json_dump["model"][-1][key]["value"][-1][
-                                        "phase_windings"
-                                    ]["value"][-1][kkkk] = {
-                                        "class": str(type(vvvv)).split("'")[1],
-                                        "value": vvvv,
-                                    }
-
-                        elif isinstance(v, PhaseLoad):
-                            json_dump["model"][-1][key]["value"].append(
-                                {"class": "PhaseLoad"}
-                            )
-                            for kkk, vvv in v._trait_values.items():
-                                json_dump["model"][-1][key]["value"][-1][kkk] = {
-                                    "class": str(type(vvv)).split("'")[1],
-                                    "value": vvv,
+                        json_obj[key]["value"][-1]["phase_windings"] = {
+                            "class": "list",
+                            "value": [],
+                        }
+                        for phw in v.phase_windings:
+                            json_obj[key]["value"][-1]["phase_windings"][
+                                "value"
+                            ].append({"class": "PhaseWinding"})
+                            for kkkk, vvvv in phw._trait_values.items():
+                                json_obj[key]["value"][-1]["phase_windings"]["value"][
+                                    -1
+                                ][kkkk] = {
+                                    "class": str(type(vvvv)).split("'")[1],
+                                    "value": vvvv,
                                 }
 
-                    continue
+                    elif isinstance(v, PhaseLoad):
+                        json_obj[key]["value"].append({"class": "PhaseLoad"})
+                        for kkk, vvv in v._trait_values.items():
+                            json_obj[key]["value"][-1][kkk] = {
+                                "class": str(type(vvv)).split("'")[1],
+                                "value": vvv,
+                            }
 
-                if isinstance(value, complex):
-                    json_dump["model"][-1][key] = {
-                        "class": "complex",
-                        "value": [value.real, value.imag],
-                    }
-                    continue
+                continue
 
-                json_dump["model"][-1][key] = {
-                    "class": str(type(value)).split("'")[1],
-                    "value": value,
+            if isinstance(value, complex):
+                json_obj[key] = {
+                    "class": "complex",
+                    "value": [value.real, value.imag],
                 }
+                continue
 
-        with open(os.path.join(self.output_path, self.filename), "w") as f:
-            f.write(
-                json_tricks.dumps(json_dump, allow_nan=True, sort_keys=True, indent=4)
-            )
+            json_obj[key] = {
+                "class": str(type(value)).split("'")[1],
+                "value": value,
+            }
+
+        return json_obj
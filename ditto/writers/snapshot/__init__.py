@@ -0,0 +1 @@
+from .write import Writer as SnapshotWriter
@@ -0,0 +1,144 @@
+# coding: utf8
+
+from __future__ import absolute_import, division, print_function
+from builtins import super, range, zip, round, map
+
+import os
+import shutil
+import logging
+import tempfile
+from datetime import datetime
+
+import numpy as np
+
+from ditto.writers.abstract_writer import AbstractWriter
+from ditto.models.base import LightweightModel
+from ditto.formats.snapshot import (
+    VERSION,
+    MISSING,
+    StringTable,
+    encode_column,
+    is_snapshot,
+    write_header,
+)
+
+logger = logging.getLogger(__name__)
+
+
+def model_class(obj):
+    """Return the DiTTo model class of obj (the traitlets class for lightweight models)."""
+    if isinstance(obj, LightweightModel):
+        return obj._traits_class
+    return type(obj)
+
+
+class Writer(AbstractWriter):
+    """DiTTo--->snapshot Writer class
+
+    The writer dumps a Store in the columnar snapshot format (see ditto.formats.snapshot),
+    which can be read back with the snapshot reader much faster than the source model.
+
+    >>> Writer(output_path="./", filename="Model.snapshot").write(model)
+
+    The snapshot is a directory named filename, created in output_path. An existing
+    snapshot is replaced, but any other existing directory is left untouched.
+    The traits of the models are saved. Other attributes set on the objects are not.
+    """
+
+    register_names = ["snapshot", "Snapshot"]
+
+    def __init__(self, **kwargs):
+        """Class CONSTRUCTOR"""
+        super().__init__(**kwargs)
+
+        if "filename" in kwargs:
+            self.filename = kwargs["filename"]
+        else:
+            self.filename = "Model.snapshot"
+
+    def write(self, model):
+        """Write a given DiTTo model to a snapshot.
+        The output directory is configured in the constructor.
+        """
+        path = os.path.join(self.output_path, self.filename)
+        if os.path.isdir(path) and os.listdir(path) and not is_snapshot(path):
+            raise ValueError(
+                "Unable to write a snapshot in {}: not empty and not a snapshot".format(
+                    path
+                )
+            )
+
+        # Write the snapshot in a temporary directory, then replace the previous one
+        parent = os.path.dirname(os.path.abspath(path))
+        if not os.path.isdir(parent):
+            os.makedirs(parent)
+        tmp = tempfile.mkdtemp(dir=parent)
+        try:
+            self.write_snapshot(model, tmp)
+            if os.path.isdir(path):
+                old = tempfile.mkdtemp(dir=parent)
+                os.rename(path, os.path.join(old, "snapshot"))
+                try:
+                    os.rename(tmp, path)
+                except OSError:
+                    os.rename(os.path.join(old, "snapshot"), path)
+                    raise
+                finally:
+                    shutil.rmtree(old, ignore_errors=True)
+            else:
+                os.rename(tmp, path)
+        except BaseException:
+            shutil.rmtree(tmp, ignore_errors=True)
+            raise
+        logger.debug(
+            "Wrote a snapshot of {} models to {}".format(len(model.models), path)
+        )
+
+    def write_snapshot(self, model, path):
+        """Write the snapshot of a given DiTTo model in the empty directory path."""
+        models = model.models
+        ids = {id(obj): i for i, obj in enumerate(models)}
+
+        # Group the objects by class, in insertion order
+        classes = {}
+        objects = np.zeros(len(models), dtype=np.int32)
+        for i, obj in enumerate(models):
+            objects[i] = classes.setdefault(model_class(obj), len(classes))
+        np.save(os.path.join(path, "objects.npy"), objects)
+
+        strings = StringTable()
+        header = {
+            "version": VERSION,
+            "time": str(datetime.now()),
+            "model_size": len(models),
+            "classes": [],
+        }
+        for c, cls in enumerate(classes):
+            rows = [models[i] for i in np.flatnonzero(objects == c).tolist()]
+            trait_values = [obj._trait_values for obj in rows]
+            columns = {}
+            for name in sorted(cls.class_trait_names()):
+                spec, arrays = encode_column(
+                    [values.get(name, MISSING) for values in trait_values],
+                    ids,
+                    strings,
+                )
+                if spec["kind"] == "none" and spec.get("masks") == ["missing"]:
+                    # Never set
+                    continue
+                for part, array in arrays.items():
+                    np.save(
+                        os.path.join(path, "{}.{}.{}.npy".format(c, name, part)), array
+                    )
+                columns[name] = spec
+            header["classes"].append(
+                {
+                    "module": cls.__module__,
+                    "name": cls.__name__,
+                    "size": len(rows),
+                    "columns": columns,
+                }
+            )
+
+        strings.save(path)
+        write_header(path, header)
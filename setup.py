@@ -79,6 +79,7 @@ setup(
             "demo=ditto.readers.demo:DemoReader",
             "json=ditto.readers.json:JsonReader",
             "synergi=ditto.readers.synergi:SynergiReader",
+            "snapshot=ditto.readers.snapshot:SnapshotReader",
         ],
         "ditto.writers": [
             "gridlabd=ditto.writers.gridlabd:GridLABDWriter",
@@ -87,6 +88,7 @@ setup(
             "demo=ditto.writers.demo:DemoWriter",
             "json=ditto.writers.json:JsonWriter",
             "ephasor=ditto.writers.ephasor:EphasorWriter",
+            "snapshot=ditto.writers.snapshot:SnapshotWriter",
         ],
     },
     include_package_data=True,
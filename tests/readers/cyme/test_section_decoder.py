@@ -0,0 +1,110 @@
+from ditto.readers.cyme.read import Reader
+from ditto.readers.cyme.section_decoder import SectionRows, decode_section
+
+SECTION = [
+    "FORMAT_NODE=NodeID,CoordX,CoordY,RatedVoltage\n",
+    "n1,1.0,2.0,12.47\n",
+    "n2,3.0,4.0\n",
+    "n1,5.0,6.0,4.16\n",
+    "FORMAT_NODE=NodeID,CoordX1,CoordY1,CoordX2,CoordY2\n",
+    "bus1,0.0,0.0,1.0,1.0\n",
+    "\n",
+    "[SECTION]\n",
+]
+
+
+def test_decode_section_columns():
+    content = iter(SECTION)
+    table = decode_section(
+        content,
+        ["nodeid", "coordx", "coordy", "ratedvoltage"],
+        {},
+        ["nodeid", "coordx1", "coordy1", "coordx2", "coordy2"],
+    )
+    assert list(table.ids) == ["n1", "n2", "n1*", "bus1"]
+    assert list(table["coordx"]) == ["1.0", "3.0", "5.0", None]
+    assert list(table["ratedvoltage"]) == ["12.47\n", None, "4.16\n", None]
+    assert list(table["coordy2"]) == [None, None, None, "1.0\n"]
+    # The iterator stops right after the blank line
+    assert next(content) == "[SECTION]\n"
+
+
+def test_parser_helper_adapter():
+    reader = Reader()
+    reader.content = iter(SECTION)
+    result = reader.parser_helper(
+        "[NODE]\n",
+        ["node"],
+        ["nodeid", "coordx", "coordy", "ratedvoltage"],
+        {},
+        {"feeder": "f1"},
+    )
+    assert result == {
+        "n1": {
+            "nodeid": "n1",
+            "coordx": "1.0",
+            "coordy": "2.0",
+            "ratedvoltage": "12.47\n",
+            "feeder": "f1",
+        },
+        "n2": {"nodeid": "n2", "coordx": "3.0", "coordy": "4.0\n", "feeder": "f1"},
+        "n1*": {
+            "nodeid": "n1",
+            "coordx": "5.0",
+            "coordy": "6.0",
+            "ratedvoltage": "4.16\n",
+            "feeder": "f1",
+        },
+        # Without additional attributes, the second format line is ignored
+        "bus1": {
+            "nodeid": "bus1",
+            "coordx": "0.0",
+            "coordy": "0.0",
+            "ratedvoltage": "1.0",
+            "feeder": "f1",
+        },
+    }
+
+
+def test_section_rows_views():
+    table = decode_section(
+        iter(SECTION), ["nodeid", "coordx", "coordy", "ratedvoltage"], {}
+    )
+    table.constants = {"feeder": "f1"}
+    rows = table.rows()
+    assert list(rows) == ["n1", "n2", "n1*", "bus1"]
+    assert dict(rows["n2"]) == {
+        "nodeid": "n2",
+        "coordx": "3.0",
+        "coordy": "4.0\n",
+        "feeder": "f1",
+    }
+    assert "ratedvoltage" not in rows["n2"]
+    assert rows["n1"]["ratedvoltage"] == "12.47\n"
+
+
+def test_section_rows_merge():
+    first = decode_section(
+        iter(["s1,1.0\n", "s2,2.0\n", "\n"]), ["id", "length"], {"id": 0, "length": 1}
+    )
+    first.constants = {"type": "overhead"}
+    second = decode_section(
+        iter(["s2,sw\n", "\n"]), ["id", "eqid"], {"id": 0, "eqid": 1}
+    )
+    second.constants = {"type": "switch"}
+
+    rows = SectionRows()
+    rows.add_table(first).add_table(second, merge=True)
+    # Same as Reader.update_dict
+    assert dict(rows["s2"]) == {
+        "id": "s2",
+        "length": "2.0\n",
+        "type": "switch",
+        "eqid": "sw\n",
+    }
+    assert rows["s1"]["type"] == "overhead"
+
+    # Without merge, the rows are replaced as with dict.update
+    rows.add_table(second)
+    assert dict(rows["s2"]) == {"id": "s2", "eqid": "sw\n", "type": "switch"}
+    assert len(rows) == 2
@@ -0,0 +1,67 @@
+import os
+
+import pytest
+
+from ditto.readers.cyme.read import Reader
+from ditto.readers.cyme.section_index import SectionIndex
+
+current_directory = os.path.realpath(os.path.dirname(__file__))
+data_folder = os.path.join(
+    current_directory, "..", "..", "data", "small_cases", "cyme", "ieee_13node"
+)
+
+
+def test_section_index_headers():
+    index = SectionIndex(os.path.join(data_folder, "network.txt"))
+    headers = index.headers()
+    assert headers[:4] == ["[GENERAL]", "[SI]", "[NODE]", "[HEADNODES]"]
+    assert "[SECTION]" in headers
+
+
+def test_section_index_iter_lines():
+    index = SectionIndex(os.path.join(data_folder, "network.txt"))
+    lines = list(index.iter_lines(["[HEADNODES]"]))
+    assert lines[0] == "[HEADNODES]\n"
+    assert lines[1].lower().startswith("format_headnodes")
+    assert lines[-1].strip() == ""
+    assert list(index.iter_lines(["[DOES NOT EXIST]"])) == []
+
+
+def test_section_index_line_endings(tmpdir):
+    path = str(tmpdir.join("network.txt"))
+    with open(path, "wb") as f:
+        f.write(b"[SI]\r\n\r\n[NODE]\r\nFORMAT_NODE=NodeID\r\nn1\r\n\r\n[SECTION]\r\n")
+    index = SectionIndex(path)
+    assert list(index.iter_lines(["[NODE]"])) == [
+        "[NODE]\n",
+        "FORMAT_NODE=NodeID\n",
+        "n1\n",
+        "\n",
+    ]
+    assert list(index.iter_lines(["[SECTION]"])) == ["[SECTION]\n"]
+
+
+def test_section_index_streams_by_blocks():
+    index = SectionIndex(os.path.join(data_folder, "network.txt"))
+    headers = ["[NODE]", "[SECTION]", "[OVERHEADLINE SETTING]"]
+    expected = list(index.iter_lines(headers))
+    # Blocks smaller than the lines
+    index.chunk_size = 7
+    assert list(index.iter_lines(headers)) == expected
+
+
+def test_get_file_content_restricted_to_objects():
+    reader = Reader(data_folder_path=data_folder)
+    reader.get_file_content("network", ["headnodes", "source"])
+    headers = [line.strip() for line in reader.content if line.startswith("[")]
+    assert headers == ["[HEADNODES]", "[SOURCE]"]
+    # The file is only indexed once
+    reader.get_file_content("network", ["node"])
+    assert len(reader.section_indexes) == 1
+
+
+def test_parser_helper_rejects_objects_not_requested():
+    reader = Reader(data_folder_path=data_folder)
+    reader.get_file_content("network", ["headnodes"])
+    with pytest.raises(ValueError):
+        reader.parser_helper("[NODE]\n", ["node"], ["nodeid"], {"nodeid": 0})
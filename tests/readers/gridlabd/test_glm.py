@@ -0,0 +1,119 @@
+import pytest
+
+from ditto.store import Store
+from ditto.readers.gridlabd.glm import GLMReader
+from ditto.readers.gridlabd.read import Reader
+
+
+@pytest.fixture
+def glm(tmpdir):
+    """Write a model whose nodes are in an included file, which includes its lines."""
+    tmpdir.join("model.glm").write(
+        "// Model\n"
+        "clock {\n"
+        "    timezone EST+5EDT;\n"
+        "}\n"
+        "module powerflow;\n"
+        "#define VNOM=2401.7771\n"
+        '#include "network/nodes.glm"\n'
+        "schedule load_shape {\n"
+        "    weekday {\n"
+        "        * 0-5 * * 1-5 0.5;\n"
+        "        * 6-23 * * 1-5 0.8;\n"
+        "    }\n"
+        "}\n"
+    )
+    tmpdir.mkdir("network").join("nodes.glm").write(
+        "object node:1 {\n"
+        "    name n1; // Source\n"
+        "    phases ABCN;\n"
+        "    nominal_voltage ${VNOM};\n"
+        "    bustype SWING;\n"
+        "}\n"
+        "object node:2\n"
+        "{\n"
+        "    name n2;\n"
+        '    groupid "feeder 1";\n'
+        '    phases "ABCN";\n'
+        "    nominal_voltage ${VNOM};\n"
+        "    object load {\n"
+        "        name l2; phases ABCN;\n"
+        "        nominal_voltage ${VNOM};\n"
+        "    };\n"
+        "}\n"
+        '#include "lines.glm"\n'
+    )
+    tmpdir.join("network", "lines.glm").write(
+        "object switch {\n"
+        "    phases ABCN;\n"
+        "    from n1;\n"
+        "    to n2;\n"
+        "    status CLOSED;\n"
+        "}\n"
+    )
+    return str(tmpdir.join("model.glm"))
+
+
+def test_blocks(glm):
+    blocks = list(GLMReader(glm).blocks())
+    assert [(b.kind, b.name) for b in blocks] == [
+        ("object", "node:1"),
+        ("object", "node:2"),
+        ("object", "load"),
+        ("object", "switch"),
+        ("schedule", "load_shape"),
+    ]
+    n1, n2, load, line, schedule = blocks
+    assert n1.properties == [
+        ("name", "n1"),
+        ("phases", "ABCN"),
+        ("nominal_voltage", "2401.7771"),
+        ("bustype", "SWING"),
+    ]
+    # The quoted values keep their quotes, and their white spaces
+    assert n2.get("groupid") == '"feeder 1"'
+    assert n2.get("phases") == '"ABCN"'
+    # The properties of the nested objects are not the ones of their parent
+    assert n2.get("object") is None
+    assert load.properties == [
+        ("parent", "n2"),
+        ("name", "l2"),
+        ("phases", "ABCN"),
+        ("nominal_voltage", "2401.7771"),
+    ]
+    assert line.get("to") == "n2"
+    assert schedule.rows == [
+        ["*", "0-5", "*", "*", "1-5", "0.5"],
+        ["*", "6-23", "*", "*", "1-5", "0.8"],
+    ]
+
+
+def test_macros(tmpdir):
+    tmpdir.join("model.glm").write(
+        "#set VNOM=7200\n"
+        "object node {\n"
+        "    name n1;\n"
+        "    nominal_voltage ${VNOM};\n"
+        "    phases ${PHASES};\n"
+        "}\n"
+    )
+    (node,) = GLMReader(str(tmpdir.join("model.glm")), {"PHASES": "AN"}).blocks()
+    assert node.get("nominal_voltage") == "7200"
+    assert node.get("phases") == "AN"
+
+
+def test_include_loop(tmpdir):
+    tmpdir.join("model.glm").write('#include "model.glm"\n')
+    with pytest.raises(ValueError):
+        list(GLMReader(str(tmpdir.join("model.glm"))).blocks())
+
+
+def test_reader(glm):
+    m = Store()
+    reader = Reader(input_file=glm)
+    reader.parse(m)
+    assert set(reader.all_gld_objects) == {"n1", "n2", "l2", "n1-n2"}
+    assert reader.all_gld_objects["l2"]["parent"] == "n2"
+    assert m["n1"].nominal_voltage == 2401.7771
+    assert m["l2"].connecting_element == "n2"
+    assert m["n1-n2"].is_switch
@@ -0,0 +1,104 @@
+import io
+import threading
+
+import pytest
+import pandas as pd
+
+from ditto.readers.synergi import db_parser
+from ditto.readers.synergi.db_parser import DbParser
+
+TABLES = {
+    "model.mdb": {
+        "Node": "NodeId,X,Y\nN1,1.0,2.0\nN2,3.0,4.0\n",
+        "InstSection": (
+            "SectionId,FromNodeId,ToNodeId,Length,Description\n"
+            "S1,N1,N2,10,\nS2,N2,N3,20,Line A\n"
+        ),
+    },
+    "warehouse.mdb": {"DevConductors": "ConductorName,Diameter_SUL\nACSR,0.5\n"},
+}
+
+
+@pytest.fixture
+def exports(monkeypatch, tmpdir):
+    """Replace the MDB tools by CSV strings, and count the table exports."""
+    exports = []
+    for name in TABLES:
+        tmpdir.join(name).write(name)
+
+    def list_tables(rdb_file):
+        return list(TABLES[rdb_file.basename])
+
+    def read_schema(rdb_file):
+        # The schemas are read before exporting the tables in parallel
+        assert threading.current_thread() is threading.main_thread()
+        return {}
+
+    def read_table(rdb_file, table, converters_from_schema=True, **kwargs):
+        exports.append(table)
+        return pd.read_csv(io.StringIO(TABLES[rdb_file.basename][table]), **kwargs)
+
+    monkeypatch.setattr(db_parser.mdb, "list_tables", list_tables)
+    monkeypatch.setattr(db_parser.mdb, "read_schema", read_schema)
+    monkeypatch.setattr(db_parser.mdb, "read_table", read_table)
+    return exports
+
+
+def test_tables_are_loaded_on_access(exports, tmpdir):
+    parser = DbParser(tmpdir.join("model.mdb"), warehouse=tmpdir.join("warehouse.mdb"))
+    assert exports == []
+    assert "DevConductors" in parser.SynergiDictionary
+    assert "Loads" not in parser.SynergiDictionary
+    assert list(parser.SynergiDictionary["Node"]["NodeId"]) == ["n1", "n2"]
+    assert list(parser.SynergiDictionary["Node"]["NodeId"]) == ["n1", "n2"]
+    assert exports == ["Node"]
+
+
+def test_declared_tables_and_cache(exports, tmpdir):
+    kwargs = {
+        "warehouse": tmpdir.join("warehouse.mdb"),
+        "tables": {"Node": ["NodeId", "X"], "DevConductors": None},
+        "cache_dir": str(tmpdir.join("cache")),
+        "processes": 2,
+    }
+    parser = DbParser(tmpdir.join("model.mdb"), **kwargs)
+    assert sorted(exports) == ["DevConductors", "Node"]
+    assert list(parser.SynergiDictionary["Node"].columns) == ["NodeId", "X"]
+    assert list(parser.SynergiDictionary["DevConductors"].columns) == [
+        "ConductorName",
+        "Diameter_SUL",
+    ]
+
+    parser = DbParser(tmpdir.join("model.mdb"), **kwargs)
+    assert sorted(exports) == ["DevConductors", "Node"]
+    assert list(parser.SynergiDictionary["Node"]["X"]) == [1.0, 3.0]
+
+    # Modifying the database invalidates its cache
+    tmpdir.join("model.mdb").write("modified")
+    parser = DbParser(tmpdir.join("model.mdb"), **kwargs)
+    assert sorted(exports) == ["DevConductors", "Node", "Node"]
+
+
+def test_cache_is_not_pickled(exports, tmpdir):
+    kwargs = {
+        "tables": {"Node": None, "InstSection": None},
+        "cache_dir": str(tmpdir.join("cache")),
+        "processes": 2,
+    }
+    tables = DbParser(tmpdir.join("model.mdb"), **kwargs).SynergiDictionary
+    assert sorted(exports) == ["InstSection", "Node"]
+    assert not [f for f in tmpdir.join("cache").visit() if f.ext == ".pkl"]
+
+    cached = DbParser(tmpdir.join("model.mdb"), **kwargs).SynergiDictionary
+    assert sorted(exports) == ["InstSection", "Node"]
+    for table in ("Node", "InstSection"):
+        pd.testing.assert_frame_equal(cached[table], tables[table])
+    assert list(cached["InstSection"]["Description"].isnull()) == [True, False]
+    assert cached["InstSection"]["Length"].dtype == "int64"
+
+    # A corrupted cache is exported again
+    for f in tmpdir.join("cache").visit("header.json"):
+        f.write("{}")
+    tables = DbParser(tmpdir.join("model.mdb"), **kwargs).SynergiDictionary
+    assert sorted(exports).count("Node") == 2
+    assert list(tables["Node"]["NodeId"]) == ["n1", "n2"]
@@ -0,0 +1,356 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from ditto.models.capacitor import Capacitor
+from ditto.models.line import Line
+from ditto.models.load import Load
+from ditto.models.powertransformer import PowerTransformer
+from ditto.models.regulator import Regulator
+from ditto.readers.synergi import db_parser
+from ditto.readers.synergi.read import Reader, SYNERGI_TABLES
+from ditto.store import Store
+
+
+def feeder_rows(n_sections):
+    """Rows of a feeder with a chain of n_sections sections, each with a load."""
+    nodes = ["N{}".format(k) for k in range(n_sections + 1)]
+    sections = ["S{}".format(k) for k in range(1, n_sections + 1)]
+    return {
+        "InstFeeders": [
+            dict(
+                FeederId="F1",
+                SubstationId="SUB1",
+                NominalKvll=12.47,
+                ConnectionType="Wye",
+                BusVoltageLevel=1.0,
+                PosSequenceResistance=0.1,
+                PosSequenceReactance=0.2,
+                ZeroSequenceResistance=0.1,
+                ZeroSequenceReactance=0.2,
+                ByPhVoltDegPh1=0.0,
+            )
+        ],
+        "SAI_Equ_Control": [dict(LengthUnits="English2")],
+        "Node": [dict(NodeId=node, X=float(k), Y=0.0) for k, node in enumerate(nodes)],
+        "InstSection": [
+            dict(
+                SectionId=section,
+                FromNodeId=nodes[k],
+                ToNodeId=nodes[k + 1],
+                FeederId="F1",
+                SectionPhases="ABC",
+                SectionLength_MUL=100.0,
+                PhaseConductorId="ACSR",
+                PhaseConductor2Id="ACSR",
+                PhaseConductor3Id="ACSR",
+                NeutralConductorId="ACSR",
+                ConfigurationId="CFG",
+                IsFromEndOpen=0,
+                IsToEndOpen=0,
+                AmpRating=400.0,
+                AveHeightAboveGround_MUL=30.0,
+                Note_="overhead",
+                Description="line-12.47",
+            )
+            for k, section in enumerate(sections)
+        ],
+        "DevConductors": [
+            dict(
+                ConductorName="ACSR",
+                ActualImpedance=0,
+                Diameter_SUL=0.5,
+                PosSequenceResistance_PerLUL=0.3,
+                PosSequenceReactance_PerLUL=0.6,
+                ZeroSequenceResistance_PerLUL=0.6,
+                ZeroSequenceReactance_PerLUL=1.2,
+                PosSequenceAdmittance_PerLUL=5.0,
+                ZeroSequenceAdmittance_PerLUL=3.0,
+                ContinuousCurrentRating=400.0,
+                InterruptCurrentRating=600.0,
+            )
+        ],
+        "DevConfig": [
+            dict(
+                ConfigName="CFG",
+                Position1_X_MUL=-1.0,
+                Position1_Y_MUL=30.0,
+                Position2_X_MUL=0.0,
+                Position2_Y_MUL=30.0,
+                Position3_X_MUL=1.0,
+                Position3_Y_MUL=30.0,
+                Neutral_X_MUL=0.0,
+                Neutral_Y_MUL=25.0,
+            )
+        ],
+        "Loads": [load_row(section, 10.0) for section in sections],
+    }
+
+
+def load_row(section, kw):
+    return dict(
+        SectionId=section,
+        Phase1Kw=kw,
+        Phase2Kw=0.0,
+        Phase3Kw=0.0,
+        Phase1Kvar=kw / 10,
+        Phase2Kvar=0.0,
+        Phase3Kvar=0.0,
+    )
+
+
+def large_cust_row(device, section, category, kw):
+    return dict(
+        UniqueDeviceId=device,
+        SectionId=section,
+        Category=category,
+        LoadPhase1Kw=kw,
+        LoadPhase2Kw=0.0,
+        LoadPhase3Kw=0.0,
+        LoadPhase1Kvar=kw / 10,
+        LoadPhase2Kvar=0.0,
+        LoadPhase3Kvar=0.0,
+    )
+
+
+@pytest.fixture
+def parse(monkeypatch, tmpdir):
+    """Parse a Synergi model from rows of the tables, replacing the MDB tools."""
+    tmpdir.join("model.mdb").write("model")
+
+    def parse(rows):
+        tables = {
+            table: pd.DataFrame(rows.get(table, []), columns=columns)
+            for table, columns in SYNERGI_TABLES.items()
+        }
+
+        def list_tables(rdb_file):
+            return list(tables) if rdb_file.endswith("model.mdb") else []
+
+        def read_schema(rdb_file):
+            return {}
+
+        def read_table(rdb_file, table, converters_from_schema=True, **kwargs):
+            return tables[table].copy()
+
+        monkeypatch.setattr(db_parser.mdb, "list_tables", list_tables)
+        monkeypatch.setattr(db_parser.mdb, "read_schema", read_schema)
+        monkeypatch.setattr(db_parser.mdb, "read_table", read_table)
+
+        model = Store()
+        Reader(input_file=str(tmpdir.join("model.mdb"))).parse(model)
+        return model
+
+    return parse
+
+
+def test_large_customer_loads(parse):
+    rows = feeder_rows(3)
+    # Zero loads are dropped
+    rows["Loads"][0] = load_row("S1", 0.0)
+    # Only the loads (L) and cogenerators (C) are added to the loads
+    rows["InstLargeCust"] = [
+        large_cust_row("LC1", "S3", "L", 20.0),
+        large_cust_row("LC2", "S3", "C", 30.0),
+        large_cust_row("LC3", "S3", np.nan, 40.0),
+        large_cust_row("LC4", "S3", "D", 50.0),
+        large_cust_row("LC5", "S3", "L", 0.0),
+    ]
+    model = parse(rows)
+
+    loads = {
+        load.name: (load.connecting_element, [pl.p for pl in load.phase_loads])
+        for load in model.iter_models(Load)
+    }
+    assert loads == {
+        "Load_s2": ("n2", [10000.0]),
+        "Load_s3": ("n3", [10000.0]),
+        "Load_lc1": ("n3", [20000.0]),
+        "Load_lc2": ("n3", [30000.0]),
+    }
+    assert model["Load_lc1"].feeder_name == "f1"
+
+
+def test_device_sections(parse):
+    rows = feeder_rows(4)
+    rows["Loads"] = [load_row("S2", 10.0)]
+    rows["InstPrimaryTransformers"] = [
+        dict(
+            UniqueDeviceId="T1",
+            SectionId="S1",
+            TransformerType="XFMR",
+            ConnectedPhases="ABC",
+            HighSideNearFromNode=1,
+            HighSideConnectionCode="Y",
+            LowSideConnectionCode="Y",
+            TertConnectCode="",
+        )
+    ]
+    rows["DevTransformers"] = [
+        dict(
+            TransformerName="XFMR",
+            HighSideRatedKv=12.47,
+            LowSideRatedKv=12.47,
+            TransformerRatedKva=500.0,
+            IsThreePhaseUnit=1,
+            NoLoadLosses=0.1,
+            EnableTertiary=0,
+            PercentImpedance=5.0,
+            PercentResistance=1.0,
+            HighVoltageConnectionCode="Y",
+            LowVoltageConnectionCode="Y",
+            TertiaryConnectionCode="",
+        )
+    ]
+    rows["InstRegulators"] = [
+        dict(
+            UniqueDeviceId="REG1",
+            SectionId="S4",
+            RegulatorType="REG",
+            ConnectedPhases="ABC",
+            NearFromNode=1,
+            TapsNearFromNode=1,
+            TimeDelaySec=30.0,
+            TapLimiterHighSetting=126.0,
+            TapLimiterLowSetting=114.0,
+            ForwardBWDialPhase1=2.0,
+            ForwardBWDialPhase2=2.0,
+            ForwardBWDialPhase3=2.0,
+            ForwardVoltageSettingPhase1=120.0,
+            ForwardVoltageSettingPhase2=120.0,
+            ForwardVoltageSettingPhase3=120.0,
+        )
+    ]
+    rows["DevRegulators"] = [
+        dict(
+            RegulatorName="REG",
+            PTRatio=60.0,
+            CTRating=100.0,
+            RegulatorRatedVoltage=7.2,
+            RegulatorRatedKva=500.0,
+            NoLoadLosses=0.1,
+            ConnectionCode="Y",
+            PercentZOnRegulatorBase=1.0,
+            RegulatorXRRatio=3.0,
+        )
+    ]
+    rows["InstCapacitors"] = [
+        dict(
+            SectionId=section,
+            UniqueDeviceId=device,
+            RatedKv=7.2,
+            ConnectionType="Wye",
+            ConnectedPhases="ABC",
+            MeteringPhase="A",
+            FixedKvarPhase1=100.0,
+            FixedKvarPhase2=100.0,
+            FixedKvarPhase3=100.0,
+            Module1KvarPerPhase=0.0,
+            PrimaryControlMode="Voltage",
+        )
+        for section, device in [("S3", "CAP1"), ("S9", "CAP2")]
+    ]
+    model = parse(rows)
+
+    # The sections of the transformers and regulators are not lines
+    assert sorted(line.name for line in model.iter_models(Line)) == ["s2", "s3"]
+    transformer = model["t1"]
+    assert isinstance(transformer, PowerTransformer)
+    assert (transformer.from_element, transformer.to_element) == ("n0", "n1")
+    regulator = model["reg1"]
+    assert isinstance(regulator, Regulator)
+    assert (regulator.from_element, regulator.to_element) == ("n3", "n4")
+    assert model["cap1"].connecting_element == "n3"
+    assert model["cap1"].feeder_name == "f1"
+    # A device on an unknown section is not connected
+    assert model["cap2"].connecting_element is None
+    assert len(list(model.iter_models(Capacitor))) == 2
+
+
+def device_rows(n_sections):
+    """Rows of a recloser, a switch or a fuse on each section of feeder_rows."""
+    rows = {"InstReclosers": [], "InstSwitches": [], "InstFuses": []}
+    for k in range(1, n_sections + 1):
+        section = "S{}".format(k)
+        if k % 3 == 0:
+            rows["InstReclosers"].append(
+                dict(
+                    SectionId=section,
+                    UniqueDeviceId="R{}".format(k),
+                    AmpRating=200.0,
+                    RecloserIsOpen=0,
+                    InterruptRatingAmps=400.0,
+                )
+            )
+        elif k % 3 == 1:
+            rows["InstSwitches"].append(
+                dict(
+                    SectionId=section,
+                    UniqueDeviceId="SW{}".format(k),
+                    SwitchType="SWITCH",
+                    SwitchIsOpen=0,
+                )
+            )
+        else:
+            rows["InstFuses"].append(
+                dict(
+                    SectionId=section,
+                    UniqueDeviceId="FU{}".format(k),
+                    AmpRating=100.0,
+                    CutoffAmps=150.0,
+                    ConnectedPhases="ABC",
+                    FuseIsOpen=0,
+                )
+            )
+    rows["DevSwitches"] = [
+        dict(
+            SwitchName="SWITCH",
+            ContinuousCurrentRating=300.0,
+            EmergencyCurrentRating=350.0,
+        )
+    ]
+    return rows
+
+
+def test_parsing_scales_linearly(parse, monkeypatch):
+    """The devices are matched to their sections without scanning all the sections."""
+    # Count the values iterated over, or scanned through their NumPy arrays,
+    # in the columns of the tables
+    iterated = [0]
+    series_iter = pd.Series.__iter__
+    series_values = pd.Series.values
+
+    def counting_iter(self):
+        for value in series_iter(self):
+            iterated[0] += 1
+            yield value
+
+    def counting_values(self):
+        iterated[0] += len(self)
+        return series_values.fget(self)
+
+    monkeypatch.setattr(pd.Series, "__iter__", counting_iter)
+    monkeypatch.setattr(pd.Series, "values", property(counting_values))
+
+    counts = []
+    for n_sections in (100, 800):
+        rows = feeder_rows(n_sections)
+        rows["InstLargeCust"] = [
+            large_cust_row("LC{}".format(k), "S{}".format(k), "L", 20.0)
+            for k in range(1, n_sections + 1)
+        ]
+        rows.update(device_rows(n_sections))
+        iterated[0] = 0
+        model = parse(rows)
+        counts.append(iterated[0])
+        assert len(list(model.iter_models(Load))) == 2 * n_sections
+        lines = {line.name: line for line in model.iter_models(Line)}
+        assert lines["s3"].is_recloser
+        assert lines["s4"].is_switch
+        assert lines["s5"].is_fuse
+        assert sum(bool(line.is_switch) for line in lines.values()) == len(
+            rows["InstSwitches"]
+        )
+
+    # Scanning the sections for each device would iterate 64 times more values
+    assert counts[1] <= 8 * counts[0]
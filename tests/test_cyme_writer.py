@@ -7,10 +7,16 @@ test_cyme_writer
 Tests for cyme writer
 """
 import os
+import six
 import pytest as pt
 from ditto.store import Store
 from ditto.writers.cyme.write import Writer
 
+if six.PY2:
+    from backports import tempfile
+else:
+    import tempfile
+
 current_directory = os.path.realpath(os.path.dirname(__file__))
 
 
@@ -47,3 +53,276 @@ def test_center_tap_load_writing():
     os.remove(os.path.join(current_directory, "loads.txt"))
     os.remove(os.path.join(current_directory, "equipment.txt"))
     os.remove(os.path.join(current_directory, "network.txt"))
+
+
+def test_equipment_catalog():
+    """
+    Tests the lookup of the equipment codes by value.
+    """
+    from ditto.writers.cyme.write import EquipmentCatalog
+
+    catalog = EquipmentCatalog()
+    catalog["line_1"] = {"R1": 0.1, "X1": 0.2}
+    catalog["line_2"] = {"R1": 0.3, "X1": 0.4}
+    catalog["line_3"] = {"X1": 0.2, "R1": 0.1}
+
+    assert catalog.find({"R1": 0.1, "X1": 0.2}) == ["line_1", "line_3"]
+    assert catalog.find({"R1": 0.5, "X1": 0.2}) == []
+
+    # Overwriting a code moves its ID, and keeps the insertion order
+    catalog["line_1"] = {"R1": 0.3, "X1": 0.4}
+    assert catalog.find({"R1": 0.1, "X1": 0.2}) == ["line_3"]
+    assert catalog.find({"R1": 0.3, "X1": 0.4}) == ["line_1", "line_2"]
+    assert list(catalog) == ["line_1", "line_2", "line_3"]
+
+
+def transformer_model():
+    """Return a feeder with a transformer followed by a regulator modelled as a transformer."""
+    from ditto.models.feeder_metadata import Feeder_metadata
+    from ditto.models.node import Node
+    from ditto.models.phase_winding import PhaseWinding
+    from ditto.models.powertransformer import PowerTransformer
+    from ditto.models.regulator import Regulator
+    from ditto.models.winding import Winding
+
+    def windings(m, voltages, rated_power=1e6):
+        result = []
+        for voltage in voltages:
+            w = Winding(
+                m,
+                nominal_voltage=voltage,
+                rated_power=rated_power,
+                resistance=1.0,
+                connection_type="Y",
+            )
+            w.phase_windings = [PhaseWinding(m, phase=p) for p in "ABC"]
+            result.append(w)
+        return result
+
+    m = Store()
+    Feeder_metadata(m, name="f1", headnode="n1", substation="n1")
+    for name in ("n1", "n2", "n3"):
+        Node(m, name=name, feeder_name="f1", nominal_voltage=12470.0)
+    t = PowerTransformer(
+        m, name="t1", from_element="n1", to_element="n2", feeder_name="f1"
+    )
+    t.reactances = [8.0]
+    t.windings = windings(m, [12470.0, 4160.0])
+    r = Regulator(m, name="r1", from_element="n2", to_element="n3", feeder_name="f1")
+    r.reactances = [1.0]
+    r.windings = windings(m, [4160.0, 4000.0])
+    return m
+
+
+def three_windings_transformer(m, name="t2", from_element="n3", to_element="n4"):
+    """Add a three-winding transformer of 2 MVA to the model."""
+    from ditto.models.node import Node
+    from ditto.models.phase_winding import PhaseWinding
+    from ditto.models.powertransformer import PowerTransformer
+    from ditto.models.winding import Winding
+
+    Node(m, name=to_element, feeder_name="f1", nominal_voltage=4000.0)
+    t = PowerTransformer(
+        m,
+        name=name,
+        from_element=from_element,
+        to_element=to_element,
+        feeder_name="f1",
+    )
+    t.noload_loss = 1.0
+    for voltage in (4000.0, 240.0, 240.0):
+        w = Winding(
+            m,
+            nominal_voltage=voltage,
+            rated_power=2e6,
+            resistance=1.0,
+            connection_type="Y",
+        )
+        w.phase_windings = [PhaseWinding(m, phase="A")]
+        t.windings.append(w)
+    return t
+
+
+def equipment_lines(m, section):
+    """Write the model and return the lines of a section of the equipment file."""
+    output_path = tempfile.TemporaryDirectory()
+    Writer(output_path=output_path.name).write(m)
+    with open(os.path.join(output_path.name, "equipment.txt"), "r") as fp:
+        content = fp.read()
+    output_path.cleanup()
+    lines = content.split("[{}]\n".format(section))[1].split("\n\n")[0]
+    return [l.split(",") for l in lines.splitlines()[1:]]
+
+
+def test_regulator_reactance():
+    """
+    Tests that a regulator modelled as a transformer uses its own reactance.
+    """
+    transformer, regulator = equipment_lines(transformer_model(), "TRANSFORMER")
+    # Z1 and XR of the transformer: R=2%, X=8%
+    assert float(transformer[6]) == pt.approx(8.246211, rel=1e-6)
+    assert float(transformer[8]) == pt.approx(4.0)
+    # Z1 and XR of the regulator: R=2%, X=1%
+    assert float(regulator[6]) == pt.approx(2.236068, rel=1e-6)
+    assert float(regulator[8]) == pt.approx(0.5)
+    assert regulator[4] == "4.16"
+
+    # Nor the center tap of the transformer
+    m = transformer_model()
+    m["t1"].is_center_tap = True
+    regulator = equipment_lines(m, "TRANSFORMER")[-1]
+    assert float(regulator[6]) == pt.approx(2.236068, rel=1e-6)
+    assert regulator[4] == "4.16"
+
+
+def test_three_windings_transformer_kva():
+    """
+    Tests that a three-winding transformer uses its own KVA for its no load losses.
+    """
+    m = transformer_model()
+    three_windings_transformer(m)
+    (transformer,) = equipment_lines(m, "THREE WINDING TRANSFORMER")
+    # 1% of 2000 kVA
+    assert float(transformer[-1]) == pt.approx(20.0)
+
+
+def test_transformer_undefined_impedances():
+    """
+    Tests that the impedances a transformer does not define are left empty.
+    """
+    m = transformer_model()
+    t = three_windings_transformer(m)
+    t.reactances = [8.0, 8.0, 8.0]
+    three_windings_transformer(m, name="t3", from_element="n4", to_element="n5")
+    first, second = equipment_lines(m, "THREE WINDING TRANSFORMER")
+    # Impedances between the windings
+    assert first[16:28] != [""] * 12
+    assert second[16:28] == [""] * 12
+
+    # The transformer of the regulator has no reactance
+    m = transformer_model()
+    m["r1"].reactances = []
+    transformer, regulator = equipment_lines(m, "TRANSFORMER")
+    assert float(transformer[6]) == pt.approx(8.246211, rel=1e-6)
+    # Z1, Z0, XR and XR0
+    assert [float(v) for v in regulator[6:10]] == [0, 0, 0, 0]
+
+
+def test_section_buffer():
+    """
+    Tests that the section buffers spill to disk past their size.
+    """
+    from ditto.writers.cyme.write import SectionBuffer
+
+    lines = ["{},0,0".format(n) for n in range(100)]
+    for max_size, rolled in [(0, True), (64, True), (1024 * 1024, False)]:
+        buffer = SectionBuffer(max_size)
+        for line in lines:
+            buffer.append(line)
+        assert buffer.file._rolled == rolled
+        assert len(buffer) == len(lines)
+        assert list(buffer) == lines
+        buffer.close()
+
+    with pt.raises(ValueError):
+        Writer(output_path=current_directory, section_buffer_size=-1)
+
+
+@pt.mark.parametrize("section_buffer_size", [0, 64])
+def test_section_buffer_network_file(section_buffer_size):
+    """
+    Tests that buffering the sections on disk does not change the network file.
+    """
+    from ditto.readers.opendss.read import Reader
+
+    m = Store()
+    r = Reader(
+        master_file=os.path.join(
+            current_directory, "data/small_cases/opendss/ieee_13node/master.dss"
+        ),
+        buscoordinates_file=os.path.join(
+            current_directory, "data/small_cases/opendss/ieee_13node/buscoord.dss"
+        ),
+    )
+    r.parse(m)
+
+    outputs = []
+    for kwargs in ({}, {"section_buffer_size": section_buffer_size}):
+        output_path = tempfile.TemporaryDirectory()
+        Writer(output_path=output_path.name, **kwargs).write(m)
+        with open(os.path.join(output_path.name, "network.txt"), "r") as fp:
+            outputs.append([l for l in fp.readlines() if not l.startswith("DATE=")])
+        output_path.cleanup()
+
+    assert outputs[0] == outputs[1]
+
+
+def two_feeder_model():
+    """Return the IEEE 13 and 4 node feeders read from the same master file."""
+    from ditto.readers.opendss.read import Reader
+
+    opendss_models_dir = os.path.join(
+        current_directory, "data", "small_cases", "opendss"
+    )
+    input_path = tempfile.TemporaryDirectory()
+    master_file = os.path.join(input_path.name, "master.dss")
+    with open(master_file, "w") as f:
+        f.write("Clear\n")
+        for model in ["ieee_13node", "ieee_4node"]:
+            f.write(
+                "Redirect {}\n".format(
+                    os.path.join(opendss_models_dir, model, "master.dss")
+                )
+            )
+    m = Store()
+    Reader(
+        master_file=master_file, parallel=True, processes=2, prefix_feeder_names=True
+    ).parse(m)
+    input_path.cleanup()
+    return m
+
+
+def test_parallel_writing():
+    """
+    Tests that rendering the feeders in parallel does not change the files.
+    """
+    m = two_feeder_model()
+    outputs = []
+    for kwargs in (
+        {},
+        {"parallel": True, "processes": 2},
+        {"parallel": True, "processes": 2, "section_buffer_size": 64},
+    ):
+        output_path = tempfile.TemporaryDirectory()
+        Writer(output_path=output_path.name, **kwargs).write(m)
+        output = {}
+        for name in ["network.txt", "equipment.txt", "loads.txt"]:
+            with open(os.path.join(output_path.name, name), "r") as fp:
+                output[name] = [l for l in fp.readlines() if not l.startswith("DATE=")]
+        outputs.append(output)
+        output_path.cleanup()
+
+    assert (
+        "FEEDER=IEEE13Nodeckt,IEEE13Nodeckt_sourcebus,1\n" in outputs[0]["network.txt"]
+    )
+    assert "FEEDER=4BusYYbal,4BusYYbal_sourcebus,1\n" in outputs[0]["network.txt"]
+    assert outputs[1] == outputs[0]
+    assert outputs[2] == outputs[0]
+
+
+def test_parallel_writing_error():
+    """
+    Tests that the errors raised while rendering a feeder in a worker are raised again.
+    """
+    from ditto.models.line import Line
+
+    m = two_feeder_model()
+    line = next(l for l in m.iter_models(Line) if l.name == "4BusYYbal_line1")
+    line.is_switch = False
+    line.line_type = "underground"
+    line.capacitance_matrix = []
+
+    output_path = tempfile.TemporaryDirectory()
+    with pt.raises(ValueError, match="4BusYYbal_line1"):
+        Writer(output_path=output_path.name, parallel=True, processes=2).write(m)
+    output_path.cleanup()
@@ -0,0 +1,65 @@
+# -*- coding: utf-8 -*-
+
+"""
+test_gridlabd_formats
+----------------------------------
+
+Tests for the GridLAB-D objects generated from the schema
+"""
+
+import pytest
+
+from ditto.formats.gridlabd import gridlabd
+from ditto.formats.gridlabd.base import GridLABDObjects
+
+
+def test_properties_of_the_ancestors():
+    line = gridlabd.overhead_line(name="l1")
+    line["from"] = "n1"
+    line["length"] = "100"
+    assert line["name"] == "l1"
+    assert line["from"] == "n1"
+    assert line["length"] == "100"
+    assert "phases" in gridlabd.overhead_line._property_names
+
+    with pytest.raises(AttributeError):
+        line["configuration"]
+    with pytest.raises(AttributeError):
+        line["not_a_property"] = 1
+
+
+def test_no_schema_state_per_object():
+    node = gridlabd.node(name="n1", phases="ABC")
+    # The values are held by the slots of the classes
+    assert node.__dict__ == {}
+
+    # Properties which are not identifiers are kept in the __dict__ of the object
+    conductor = gridlabd.overhead_line_conductor()
+    conductor["rating.summer.continuous"] = "400"
+    assert conductor["rating.summer.continuous"] == "400"
+
+
+def test_objects_table():
+    objects = GridLABDObjects()
+    config = gridlabd.transformer_configuration(name="tc1", connect_type="WYE_WYE")
+    transformer = gridlabd.transformer(name="t1", configuration="tc1")
+    node = gridlabd.node(name="n1")
+    for obj in (config, transformer, node):
+        objects[obj["name"]] = obj
+    objects.resolve()
+
+    assert objects["t1"] is transformer
+    assert objects.classes["node"] == {"n1": node}
+    assert objects.reference(transformer, "configuration") is config
+    assert objects.reference(transformer, "spacing") is None
+    assert objects.reference(node, "configuration") is None
+
+    line_config = gridlabd.line_configuration(
+        name="lc1", conductor_A="c1", conductor_B="missing"
+    )
+    objects["lc1"] = line_config
+    objects["c1"] = gridlabd.overhead_line_conductor(name="c1")
+    objects.resolve()
+    assert objects.reference(line_config, "conductor_A") is objects["c1"]
+    assert objects.reference(line_config, "conductor_B") is None
+    assert objects.reference(line_config, "conductor_C") is None
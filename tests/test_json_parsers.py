@@ -130,6 +130,38 @@ def test_json_serialize_deserialize():
         os.remove("./Model.json")
 
 
+@pt.mark.parametrize("filename", ["Model.jsonl", "Model.jsonl.gz", "Model.json.gz"])
+def test_json_streaming_serialize_deserialize(filename):
+    """Write a model to a streamed or gzipped JSON file, read it back in, and test that both models match."""
+    from ditto.readers.opendss.read import Reader
+    from ditto.store import Store
+    from ditto.writers.json.write import Writer
+    from ditto.readers.json.read import Reader as json_reader
+
+    m = Store()
+    r = Reader(
+        master_file=os.path.join(
+            current_directory, "data/small_cases/opendss/ieee_13node/master.dss"
+        ),
+        buscoordinates_file=os.path.join(
+            current_directory, "data/small_cases/opendss/ieee_13node/buscoord.dss"
+        ),
+    )
+    r.parse(m)
+    m.set_names()
+    output_path = tempfile.TemporaryDirectory()
+    w = Writer(output_path=output_path.name, filename=filename)
+    w.write(m)
+    jr = json_reader(input_file=os.path.join(output_path.name, filename))
+    jr.parse(Store())
+    jr.model.set_names()
+
+    names = [obj.name for obj in m.models if hasattr(obj, "name")]
+    assert names == [obj.name for obj in jr.model.models if hasattr(obj, "name")]
+    for name in names:
+        assert compare(m[name], jr.model[name])
+
+
 def compare(obj1, obj2):
     """
         Compare 2 objects.
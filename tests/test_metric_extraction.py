@@ -76,3 +76,87 @@ def test_metric_extraction():
 
         # Export them to JSON
         net.export_json(os.path.join(output_path, "metrics.json"))
+
+
+def test_distance_tree():
+    """
+        Checks the distances and paths read from a DistanceTree against networkx.
+    """
+    import networkx as nx
+    from ditto.metrics.network_analysis import DistanceTree
+
+    graph = nx.Graph()
+    graph.add_edge("source", "a", length=1.0)
+    graph.add_edge("a", "b", length=0.0)
+    graph.add_edge("b", "c", length=2.0)
+    graph.add_edge("a", "d", length=3.0)
+    graph.add_edge("d", "e", length=0.5)
+
+    tree = DistanceTree(graph, "source")
+    for node in graph.nodes():
+        assert tree.distance_to(node) == nx.shortest_path_length(
+            graph, "source", node, weight="length"
+        )
+    for node1, node2 in [("c", "e"), ("e", "source"), ("b", "b"), ("c", "b")]:
+        assert tree.path(node1, node2) == nx.shortest_path(graph, node1, node2)
+        assert tree.distance_between(node1, node2) == nx.shortest_path_length(
+            graph, node1, node2, weight="length"
+        )
+    assert "z" not in tree
+    with pytest.raises(nx.NetworkXNoPath):
+        tree.distance_to("z")
+
+
+def test_metric_extraction_per_feeder_in_parallel():
+    """
+        Checks that the per feeder metrics computed in parallel are the same as the serial ones.
+    """
+    import networkx as nx
+    from ditto.readers.opendss.read import Reader
+    from ditto.store import Store
+    from ditto.modify.system_structure import system_structure_modifier
+    from ditto.metrics.network_analysis import NetworkAnalyzer as network_analyzer
+
+    m = Store()
+    r = Reader(
+        master_file=os.path.join(
+            current_directory, "data/small_cases/opendss/ieee_13node/master.dss"
+        ),
+        buscoordinates_file=os.path.join(
+            current_directory, "data/small_cases/opendss/ieee_13node/buscoord.dss"
+        ),
+    )
+    r.parse(m)
+    m.set_names()
+    modifier = system_structure_modifier(m)
+    modifier.set_nominal_voltages_recur()
+    modifier.set_nominal_voltages_recur_line()
+
+    results = []
+    for processes in (None, 2):
+        net = network_analyzer(modifier.model, True, "sourcebus")
+        net.model.set_names()
+        # One feeder for each branch below the first node with several children
+        digraph = net.G.digraph
+        head = next(
+            n for n in nx.bfs_tree(digraph, "sourcebus") if digraph.out_degree(n) > 1
+        )
+        feeder_names = []
+        feeder_nodes = []
+        for i, child in enumerate(digraph.successors(head)):
+            feeder_names.append("feeder_{}".format(i))
+            feeder_nodes.append(list(nx.descendants(digraph, child) | {child, head}))
+        net.add_feeder_information(
+            feeder_names, feeder_nodes, {k: head for k in feeder_names}, "residential"
+        )
+        net.split_network_into_feeders()
+        net.compute_all_metrics_per_feeder(processes=processes)
+        results.append((json_dumps(net.results), net.load_distribution))
+
+    assert results[0] == results[1]
+
+
+def json_dumps(results):
+    import json
+
+    return json.dumps(results, sort_keys=True, default=repr)
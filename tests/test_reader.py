@@ -7,7 +7,9 @@ test_reader
 Tests for `ditto` module readers
 """
 import os
+import six
 import pytest as pt
+import networkx as nx
 from ditto.store import Store
 
 current_directory = os.path.realpath(os.path.dirname(__file__))
@@ -28,6 +30,22 @@ def test_gld_reader():
         r.parse(m)
 
 
+def test_gld_reader_objects_are_not_shared():
+    from ditto.readers.gridlabd.read import Reader
+
+    gridlabd_models_dir = os.path.join(
+        current_directory, "data", "small_cases", "gridlabd"
+    )
+    sizes = []
+    for model in ("ieee_4node", "ieee_13node", "ieee_4node"):
+        m = Store()
+        r = Reader(input_file=os.path.join(gridlabd_models_dir, model, "node.glm"))
+        r.parse(m)
+        sizes.append(len(m.models))
+    # The objects of the previous models are not read again
+    assert sizes[0] == sizes[2] < sizes[1]
+
+
 def test_cyme_reader():
     """
     TODO
@@ -70,6 +88,95 @@ def test_opendss_reader():
         print(">OpenDSS model {model} parsed.\n".format(model=model))
 
 
+def test_opendss_class_cache():
+    """The OpenDSS classes are extracted once per circuit."""
+    from ditto.readers.opendss.read import Reader
+
+    master_file = os.path.join(
+        current_directory, "data", "small_cases", "opendss", "ieee_13node", "master.dss"
+    )
+    r = Reader(master_file=master_file)
+    r.build_opendssdirect(master_file)
+    lines = r.dss_class_to_dict("Line")
+    assert "Line.650632" in lines
+    assert r.dss_class_to_dict("Line") is lines
+
+    # Running the circuit again invalidates the cache
+    r.build_opendssdirect(master_file)
+    assert r.dss_class_to_dict("Line") is not lines
+    assert r.dss_class_to_dict("Line") == lines
+
+
+def test_opendss_reader_parallel_feeders():
+    """Independent feeders of a master file are parsed in parallel and merged."""
+    from ditto.readers.opendss.read import Reader
+    from ditto.models.feeder_metadata import Feeder_metadata
+    from ditto.models.line import Line
+
+    if six.PY2:
+        from backports import tempfile
+    else:
+        import tempfile
+
+    opendss_models_dir = os.path.join(
+        current_directory, "data", "small_cases", "opendss"
+    )
+    output_path = tempfile.TemporaryDirectory()
+    master_file = os.path.join(output_path.name, "master.dss")
+    with open(master_file, "w") as f:
+        f.write("Clear\n")
+        for model in ["ieee_13node", "ieee_4node"]:
+            f.write(
+                "Redirect {}\n".format(
+                    os.path.join(opendss_models_dir, model, "master.dss")
+                )
+            )
+
+    r = Reader(master_file=master_file, parallel=True, processes=2)
+    assert len(r.find_feeder_master_files(master_file)) == 2
+    # Both feeders have a sourcebus
+    with pt.raises(ValueError, match="sourcebus"):
+        r.parse(Store())
+
+    r = Reader(
+        master_file=master_file, parallel=True, processes=2, prefix_feeder_names=True
+    )
+    m = Store()
+    r.parse(m)
+
+    size = 0
+    for model, prefix in [
+        ("ieee_13node", "IEEE13Nodeckt_"),
+        ("ieee_4node", "4BusYYbal_"),
+    ]:
+        feeder = Store()
+        Reader(
+            master_file=os.path.join(opendss_models_dir, model, "master.dss"),
+            buscoordinates_file=os.path.join(opendss_models_dir, model, "buscoord.dss"),
+        ).parse(feeder)
+        size += len(feeder.models)
+        for line in feeder.iter_models(Line):
+            merged = m[prefix + line.name]
+            assert merged.length == line.length
+            assert merged.from_element == prefix + line.from_element
+            assert merged.to_element == prefix + line.to_element
+    assert len(m.models) == size
+
+    assert [f.name for f in m.iter_models(Feeder_metadata)] == [
+        "IEEE13Nodeckt",
+        "4BusYYbal",
+    ]
+    assert m["IEEE13Nodeckt_650632"].feeder_name == "IEEE13Nodeckt"
+    assert m["4BusYYbal_line1"].feeder_name == "4BusYYbal"
+    assert m["4BusYYbal_line1"].substation_name == "4BusYYbal_sourcebus"
+    assert "sourcebus" not in m.model_names
+
+    # The feeders stay independent networks
+    graph = m.get_network("IEEE13Nodeckt_sourcebus").graph
+    assert nx.number_connected_components(graph) == 2
+    assert not nx.has_path(graph, "IEEE13Nodeckt_sourcebus", "4BusYYbal_sourcebus")
+
+
 def test_dew_reader():
     """
     TODO
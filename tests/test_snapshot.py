@@ -0,0 +1,146 @@
+# -*- coding: utf-8 -*-
+
+"""
+test_snapshot
+----------------------------------
+
+Tests for the snapshot reader and writer
+"""
+
+import os
+import six
+import pytest
+
+from ditto.store import Store
+from ditto.models.base import Unicode
+from ditto.readers.opendss.read import Reader
+from ditto.readers.snapshot.read import Reader as SnapshotReader
+from ditto.writers.snapshot.write import Writer as SnapshotWriter
+
+if six.PY2:
+    from backports import tempfile
+else:
+    import tempfile
+
+current_directory = os.path.realpath(os.path.dirname(__file__))
+
+
+def comparable(value, objects):
+    """Replace the DiTTo objects by their index, and the phases by their value."""
+    if isinstance(value, list):
+        return [comparable(v, objects) for v in value]
+    if isinstance(value, Unicode):
+        return value.default_value
+    return objects.get(id(value), value)
+
+
+def trait_values(obj, objects):
+    values = {}
+    for name, value in obj._trait_values.items():
+        values[name] = comparable(value, objects)
+    return type(obj).__name__, values
+
+
+@pytest.mark.parametrize("lightweight", [False, True])
+def test_snapshot_round_trip(lightweight):
+    m = Store(lightweight=lightweight)
+    r = Reader(
+        master_file=os.path.join(
+            current_directory, "data/small_cases/opendss/ieee_13node/master.dss"
+        ),
+        buscoordinates_file=os.path.join(
+            current_directory, "data/small_cases/opendss/ieee_13node/buscoord.dss"
+        ),
+    )
+    r.parse(m)
+    output_path = tempfile.TemporaryDirectory()
+    SnapshotWriter(output_path=output_path.name).write(m)
+
+    loaded = Store(lightweight=lightweight)
+    SnapshotReader(input_file=os.path.join(output_path.name, "Model.snapshot")).parse(
+        loaded
+    )
+
+    objects = {id(obj): i for i, obj in enumerate(m.models)}
+    loaded_objects = {id(obj): i for i, obj in enumerate(loaded.models)}
+    assert [trait_values(obj, objects) for obj in m.models] == [
+        trait_values(obj, loaded_objects) for obj in loaded.models
+    ]
+    assert set(loaded.model_names) == set(m.model_names)
+    for name, obj in m.model_names.items():
+        assert objects[id(obj)] == loaded_objects[id(loaded[name])]
+
+
+def test_snapshot_mixed_columns():
+    from ditto.formats.snapshot import (
+        MISSING,
+        StringTable,
+        decode_column,
+        encode_column,
+    )
+
+    objects = [object()]
+    ids = {id(objects[0]): 0}
+    values = [1, 2.5, "a", None, [Unicode("A"), 3], MISSING, objects[0], True]
+    strings = StringTable()
+    spec, arrays = encode_column(values, ids, strings)
+    assert spec["kind"] == "mixed"
+
+    decoded = decode_column(spec, arrays.get, len(values), objects, strings.strings)
+    assert comparable(decoded, {}) == comparable(values, {})
+    assert [type(v) for v in decoded[:3]] == [int, float, str]
+
+    with pytest.raises(ValueError, match="type dict"):
+        encode_column([{"a": 1}], ids, strings)
+
+
+def test_snapshot_only_loads_ditto_models():
+    import json
+    from ditto.models.node import Node
+
+    m = Store()
+    Node(m, name="n1", phases=[Unicode("A")])
+    output_path = tempfile.TemporaryDirectory()
+    SnapshotWriter(output_path=output_path.name).write(m)
+    path = os.path.join(output_path.name, "Model.snapshot")
+
+    loaded = Store()
+    SnapshotReader(input_file=path).parse(loaded)
+    assert [p.default_value for p in loaded["n1"].phases] == ["A"]
+
+    with open(os.path.join(path, "header.json")) as f:
+        header = json.load(f)
+    for module, name in [("os", "system"), ("ditto.models.base", "Unicode")]:
+        header["classes"][0].update(module=module, name=name)
+        with open(os.path.join(path, "header.json"), "w") as f:
+            json.dump(header, f)
+        with pytest.raises(ValueError, match="not a DiTTo model"):
+            SnapshotReader(input_file=path).parse(Store())
+
+
+def test_snapshot_only_replaces_snapshots():
+    from ditto.models.node import Node
+
+    m = Store()
+    Node(m, name="n1")
+    output_path = tempfile.TemporaryDirectory()
+    path = os.path.join(output_path.name, "Model.snapshot")
+
+    # An existing snapshot is replaced
+    SnapshotWriter(output_path=output_path.name).write(m)
+    Node(m, name="n2")
+    SnapshotWriter(output_path=output_path.name).write(m)
+    loaded = Store()
+    SnapshotReader(input_file=path).parse(loaded)
+    assert set(loaded.model_names) == {"n1", "n2"}
+    assert os.listdir(output_path.name) == ["Model.snapshot"]
+
+    # Any other directory is left untouched
+    other = os.path.join(output_path.name, "data")
+    os.makedirs(other)
+    for name in ("values.npy", "header.json"):
+        with open(os.path.join(other, name), "w") as f:
+            f.write("{}")
+    with pytest.raises(ValueError, match="not a snapshot"):
+        SnapshotWriter(output_path=output_path.name, filename="data").write(m)
+    assert sorted(os.listdir(other)) == ["header.json", "values.npy"]
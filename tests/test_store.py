@@ -0,0 +1,295 @@
+# -*- coding: utf-8 -*-
+
+"""
+test_store
+----------------------------------
+
+Tests for the Store model index
+"""
+
+import copy
+import os
+import pickle
+import subprocess
+import sys
+
+import pytest
+import networkx as nx
+from traitlets import TraitError
+
+from ditto.store import Store
+from ditto.models.node import Node
+from ditto.models.line import Line
+from ditto.models.wire import Wire
+from ditto.models.base import Unicode
+from ditto.modify.modify import Modifier
+
+
+def test_iter_models_keeps_insertion_order():
+    m = Store()
+    n1 = Node(m, name="n1")
+    l1 = Line(m, name="l1")
+    n2 = Node(m, name="n2")
+    w1 = Wire(m)
+
+    assert m.models == (n1, l1, n2, w1)
+    assert list(m.iter_models(Node)) == [n1, n2]
+    assert list(m.iter_models((Node, Line))) == [n1, l1, n2]
+    assert list(m.iter_models()) == [n1, l1, n2, w1]
+
+
+def test_name_index_is_kept_in_sync():
+    m = Store()
+    n1 = Node(m, name="n1")
+    n2 = Node(m)
+    n2.name = "n2"
+
+    # No call to set_names() needed
+    assert m["n1"] is n1
+    assert m["n2"] is n2
+
+    n1.name = "renamed"
+    assert "n1" not in m.model_names
+    assert m["renamed"] is n1
+
+
+def test_remove_element():
+    m = Store()
+    n1 = Node(m, name="duplicate")
+    n2 = Node(m, name="duplicate")
+    l1 = Line(m, name="l1")
+
+    # The last object named wins, as with set_names()
+    assert m["duplicate"] is n2
+
+    m.remove_element(n2)
+    assert m.models == (n1, l1)
+    assert list(m.iter_models(Node)) == [n1]
+    assert m["duplicate"] is n1
+
+    m.remove_element(l1)
+    assert "l1" not in m.model_names
+
+    # Renaming a removed object does not put it back in the index
+    l1.name = "l2"
+    assert "l2" not in m.model_names
+
+
+def test_delete_elements():
+    m = Store()
+    n1 = Node(m, name="n1")
+    w1 = Wire(m)
+    w2 = Wire(m)
+    l1 = Line(m, name="l1", wires=[w1, w2])
+    l2 = Line(m, name="l2", wires=[Wire(m)])
+    n2 = Node(m, name="n2")
+
+    # The wires owned by the lines are deleted with them
+    Modifier().delete_elements(m, [l2, n1, l2])
+    assert m.models == (w1, w2, l1, n2)
+    assert list(m.iter_models(Node)) == [n2]
+    assert "n1" not in m.model_names and "l2" not in m.model_names
+
+    # Nothing is deleted if one of the objects is not in the store
+    with pytest.raises(ValueError):
+        Modifier().delete_elements(m, [l1, n1])
+    assert m.models == (w1, w2, l1, n2)
+
+    Modifier().delete_element(m, l1)
+    assert m.models == (n2,)
+
+
+def test_delete_disconnected_nodes():
+    m = Store()
+    for name in ("sourcebus", "n1", "n2", "n3"):
+        Node(m, name=name)
+    Node(m)
+    Line(m, name="l1", from_element="sourcebus", to_element="n1")
+    Line(m, name="l2", from_element="n1", to_element="n3")
+    m.build_networkx("sourcebus")
+
+    # n2 is not connected to any line, and the last node has no name
+    m.delete_disconnected_nodes()
+    assert [node.name for node in m.iter_models(Node)] == ["sourcebus", "n1", "n3"]
+
+
+def test_delete_cycles():
+    m = Store()
+    for name in ("sourcebus", "n1", "n2", "n3", "n4", "n5"):
+        phases = ["A"] if name in ("n3", "n4", "n5") else ["A", "B", "C"]
+        Node(m, name=name, phases=[Unicode(p) for p in phases])
+    Line(m, name="l1", from_element="sourcebus", to_element="n1")
+    Line(m, name="l2", from_element="n1", to_element="n2")
+    Line(m, name="l3", from_element="n2", to_element="n3")
+    Line(m, name="l4", from_element="n3", to_element="n4")
+    Line(m, name="l5", from_element="n4", to_element="n5")
+    Line(m, name="l6", from_element="n5", to_element="n1")
+    m.build_networkx("sourcebus")
+
+    assert len(m.get_network().find_cycles()) == 1
+    m.delete_cycles()
+    # The loop is cut in the middle of its single phase section
+    assert "l4" not in m.model_names
+    assert nx.is_tree(m.get_network().graph)
+
+
+@pytest.mark.parametrize("seed", ["1", "3", "6", "42"])
+def test_delete_cycles_hash_seed(seed):
+    """The edge cut does not depend on the order the loop is found in."""
+    env = dict(os.environ, PYTHONHASHSEED=seed)
+    test = "{}::test_delete_cycles".format(__file__)
+    result = subprocess.run(
+        [sys.executable, "-m", "pytest", "-q", "-p", "no:cacheprovider", test],
+        env=env,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.STDOUT,
+    )
+    assert result.returncode == 0, result.stdout.decode()
+
+
+def test_middle_single_phase_rotation():
+    m = Store()
+    for name in ("n1", "n2", "n3", "n4", "n5"):
+        phases = ["A"] if name in ("n3", "n4", "n5") else ["A", "B", "C"]
+        Node(m, name=name, phases=[Unicode(p) for p in phases])
+    for i, (u, v) in enumerate(zip("12345", "23451")):
+        Line(m, name="l{}".format(i + 2), from_element="n" + u, to_element="n" + v)
+    m.build_networkx("n1")
+    network = m.get_network()
+
+    cycle = ["n1", "n2", "n3", "n4", "n5"]
+    for i in range(len(cycle)):
+        rotated = cycle[i:] + cycle[:i]
+        assert network.middle_single_phase(rotated) == "l4"
+        assert network.middle_single_phase(rotated[::-1]) == "l4"
+
+
+def test_delete_cycles_meshed_network():
+    m = Store()
+    size = 20
+    names = [["n{}_{}".format(i, j) for j in range(size)] for i in range(size)]
+    Node(m, name="sourcebus")
+    Line(m, name="source", from_element="sourcebus", to_element=names[0][0])
+    for i in range(size):
+        for j in range(size):
+            Node(m, name=names[i][j])
+            if i > 0:
+                Line(
+                    m,
+                    name="v" + names[i][j],
+                    from_element=names[i - 1][j],
+                    to_element=names[i][j],
+                )
+            if j > 0:
+                Line(
+                    m,
+                    name="h" + names[i][j],
+                    from_element=names[i][j - 1],
+                    to_element=names[i][j],
+                )
+    m.build_networkx("sourcebus")
+
+    assert len(m.get_network().find_cycles()) == (size - 1) ** 2
+    m.delete_cycles()
+    graph = m.get_network().graph
+    assert nx.is_tree(graph)
+    assert graph.number_of_nodes() == size * size + 1
+
+
+def test_lightweight_models():
+    m = Store(lightweight=True)
+    n1 = Node(m, name="n1", nominal_voltage=12470)
+    l1 = Line(m, name="l1")
+
+    assert isinstance(n1, Node)
+    assert type(n1).__name__ == "Node"
+    # The values are stored in slots
+    assert n1.__dict__ == {}
+    assert m.models == (n1, l1)
+    assert m["n1"] is n1
+
+    # Values are cast and validated by the traits of the model
+    assert isinstance(n1.nominal_voltage, float)
+    with pytest.raises(TraitError):
+        n1.nominal_voltage = "high"
+
+    # Mutable defaults are not shared between objects
+    l1.wires.append(Wire(m))
+    assert Line(m).wires == []
+
+    n1.name = "renamed"
+    assert m["renamed"] is n1
+    assert "n1" not in m.model_names
+    assert "nominal_voltage" in n1.traits()
+
+
+def test_lightweight_models_validated_on_demand():
+    m = Store(lightweight=True, validate_on_set=False)
+    n1 = Node(m, name="n1")
+    n1.nominal_voltage = "high"
+    with pytest.raises(TraitError):
+        m.validate_models()
+
+
+def test_lightweight_trait_values():
+    m = Store(lightweight=True)
+    n1 = Node(m, name="n1")
+    regular = Node(Store(), name="n1")
+
+    # As with traitlets, the lists are only initialized when accessed
+    assert sorted(n1._trait_values) == sorted(regular._trait_values)
+    assert "phases" not in n1._trait_values
+    assert n1.phases == []
+    assert n1._trait_values["phases"] == []
+
+    with pytest.warns(DeprecationWarning):
+        Node(m, "unexpected", unknown=1)
+
+
+def test_lightweight_copy_and_pickle():
+    m = Store(lightweight=True)
+    n1 = Node(m, name="n1", nominal_voltage=12470)
+    n1.feeder_name = "f1"
+
+    n2 = copy.copy(n1)
+    assert type(n2) is type(n1)
+    assert n2.name == "n1" and n2.nominal_voltage == 12470.0
+    assert n2._model is m
+
+    m2 = pickle.loads(pickle.dumps(m))
+    n3 = m2["n1"]
+    assert type(n3) is type(n1)
+    assert n3.feeder_name == "f1"
+    assert n3._model is m2
+
+
+@pytest.mark.parametrize("lightweight", [False, True])
+def test_network_kept_up_to_date(lightweight):
+    m = Store(lightweight=lightweight)
+    for name in ("sourcebus", "n1", "n2", "n3"):
+        Node(m, name=name)
+    Line(m, name="l1", from_element="sourcebus", to_element="n1", length=1.0)
+    l2 = Line(m, name="l2", from_element="n1", to_element="n2", length=2.0)
+    m.build_networkx()
+    network = m.get_network()
+
+    l3 = Line(m, name="l3", from_element="n2", to_element="n3")
+    assert network.graph.has_edge("n2", "n3")
+    assert network.digraph.has_edge("n2", "n3")
+    assert network.digraph["n2"]["n3"]["equipment_name"] == "l3"
+
+    l2.length = 5.0
+    assert network.graph["n1"]["n2"]["length"] == 5.0
+    assert network.digraph["n1"]["n2"]["length"] == 5.0
+
+    l3.from_element = "n1"
+    assert not network.graph.has_edge("n2", "n3")
+    assert network.digraph.has_edge("n1", "n3")
+
+    m.remove_element(l2)
+    assert "n2" not in network.graph
+    assert set(network.digraph.edges()) == {("sourcebus", "n1"), ("n1", "n3")}
+
+    m.model_store.network = None
+    assert m.get_network() is network
+    assert set(network.digraph.edges()) == {("sourcebus", "n1"), ("n1", "n3")}
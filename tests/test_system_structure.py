@@ -0,0 +1,105 @@
+# -*- coding: utf-8 -*-
+
+"""
+test_system_structure
+----------------------------------
+
+Tests for the system structure modifier
+"""
+
+from ditto.store import Store
+from ditto.models.node import Node
+from ditto.models.line import Line
+from ditto.models.wire import Wire
+from ditto.models.load import Load
+from ditto.models.phase_load import PhaseLoad
+from ditto.models.powertransformer import PowerTransformer
+from ditto.models.winding import Winding
+from ditto.models.phase_winding import PhaseWinding
+from ditto.models.power_source import PowerSource
+from ditto.modify.system_structure import system_structure_modifier
+
+
+def source(m):
+    Node(m, name="sourcebus")
+    PowerSource(
+        m,
+        name="vsource",
+        connecting_element="sourcebus",
+        is_sourcebus=True,
+        nominal_voltage=12470.0,
+    )
+
+
+def transformer(m, name, from_element, to_element, phases, is_center_tap=False):
+    t = PowerTransformer(
+        m,
+        name=name,
+        from_element=from_element,
+        to_element=to_element,
+        is_center_tap=is_center_tap,
+    )
+    t.windings = [
+        Winding(
+            m,
+            nominal_voltage=v,
+            phase_windings=[PhaseWinding(m, phase=p) for p in phases],
+        )
+        for v in (12470.0, 240.0)
+    ]
+    return t
+
+
+def test_nominal_voltages_long_feeder():
+    m = Store()
+    source(m)
+    for i in range(5000):
+        Node(m, name="n{}".format(i))
+        Line(
+            m,
+            name="l{}".format(i),
+            from_element="n{}".format(i - 1) if i > 0 else "sourcebus",
+            to_element="n{}".format(i),
+        )
+    # Longer than the recursion limit on both sides of the transformer
+    m["l2500"].from_element = "m2499"
+    Node(m, name="m2499")
+    transformer(m, "t1", "n2499", "m2499", "A")
+
+    modifier = system_structure_modifier(m, "sourcebus")
+    modifier.set_nominal_voltages_recur()
+    assert m["n0"].nominal_voltage == 12470.0
+    assert m["n2499"].nominal_voltage == 12470.0
+    assert m["m2499"].nominal_voltage == 240.0
+    assert m["n4999"].nominal_voltage == 240.0
+
+
+def test_center_tap_load_below_transformer():
+    m = Store()
+    source(m)
+    for name in ("n1", "n2", "n3"):
+        Node(m, name=name)
+    Line(m, name="l1", from_element="sourcebus", to_element="n1")
+    transformer(m, "t1", "n1", "n2", "A", is_center_tap=True)
+    Line(
+        m,
+        name="l2",
+        from_element="n2",
+        to_element="n3",
+        wires=[Wire(m, phase=p) for p in "AB"],
+    )
+    Load(
+        m,
+        name="load1",
+        connecting_element="n3",
+        phase_loads=[PhaseLoad(m, phase=p, p=1000.0, q=100.0) for p in "AB"],
+    )
+
+    modifier = system_structure_modifier(m, "sourcebus")
+    modifier.center_tap_load_preprocessing()
+    load = m["load1"]
+    assert load.upstream_transformer_name == "t1"
+    assert load.is_center_tap
+    assert [(pl.phase, pl.drop) for pl in load.phase_loads] == [("A", 0), ("B", 1)]
+    assert [(pl.p, pl.q) for pl in load.phase_loads if not pl.drop] == [(2000.0, 200.0)]
+    assert [(w.phase, w.drop) for w in m["l2"].wires] == [("A", 0), ("B", 1)]
@@ -0,0 +1,78 @@
+# -*- coding: utf-8 -*-
+
+"""
+test_tables
+----------------------------------
+
+Tests for the tables of the Store
+"""
+
+import pytest
+
+from ditto.store import Store
+from ditto.models.node import Node
+from ditto.models.line import Line
+from ditto.models.wire import Wire
+from ditto.models.base import Unicode
+
+
+def build_model(lightweight):
+    m = Store(lightweight=lightweight)
+    Node(m, name="n1", nominal_voltage=12470, phases=[Unicode("A"), Unicode("B")])
+    Node(m, name="n2")
+    wires = [Wire(m, phase="A", is_open=True), Wire(m, phase="B")]
+    Line(m, name="l1", from_element="n1", to_element="n2", length=10, wires=wires)
+    return m
+
+
+@pytest.mark.parametrize("lightweight", [False, True])
+def test_tables(lightweight):
+    m = build_model(lightweight)
+    tables = m.get_tables()
+    assert set(tables) == {"Node", "Wire", "Line"}
+
+    nodes = tables["Node"]
+    assert list(nodes.index) == [0, 1]
+    assert list(nodes["name"]) == ["n1", "n2"]
+    assert nodes["nominal_voltage"].dtype == "float64"
+    assert nodes["nominal_voltage"].isna().tolist() == [False, True]
+    assert list(nodes["phases"]) == [["A", "B"], []]
+    assert "positions" not in nodes
+
+    lines = tables[Line]
+    assert lines["name"].dtype == "string"
+    assert lines["is_switch"].dtype == "boolean"
+    assert lines["length"].tolist() == [10.0]
+    assert "wires" not in lines
+
+    # The wires refer to their line
+    wires = tables["Wire"]
+    assert list(wires.index) == [2, 3]
+    assert wires["parent_id"].tolist() == [4, 4]
+    assert wires["parent_class"].tolist() == ["Line", "Line"]
+    assert wires["parent_trait"].tolist() == ["wires", "wires"]
+    assert wires["parent_index"].tolist() == [0, 1]
+    joined = wires.join(lines[["name"]], on="parent_id")
+    assert joined["name"].tolist() == ["l1", "l1"]
+    assert joined["is_open"].tolist()[0] == True
+
+
+@pytest.mark.parametrize("lightweight", [False, True])
+def test_tables_kept_until_the_store_changes(lightweight):
+    m = build_model(lightweight)
+    tables = m.get_tables()
+    assert m.get_tables() is tables
+
+    m["l1"].length = 20
+    assert m.get_tables() is not tables
+    assert m.get_tables()["Line"]["length"].tolist() == [20.0]
+
+    tables = m.get_tables()
+    Node(m, name="n3")
+    assert m.get_tables() is not tables
+    assert m.get_tables()["Node"]["name"].tolist() == ["n1", "n2", "n3"]
+
+    tables = m.get_tables()
+    m.remove_element(m["n3"])
+    assert m.get_tables() is not tables
+    assert m.get_tables()["Node"]["name"].tolist() == ["n1", "n2"]
@@ -0,0 +1,114 @@
+# -*- coding: utf-8 -*-
+
+"""
+test_topology
+----------------------------------
+
+Tests for the array-backed topology, against the Network
+"""
+
+import pytest
+
+from ditto.store import Store
+from ditto.models.node import Node
+from ditto.models.line import Line
+from ditto.models.load import Load
+from ditto.models.powertransformer import PowerTransformer
+from ditto.network.network import Network
+from ditto.network.topology import Topology
+
+
+def build_model():
+    m = Store()
+    for name in ("sourcebus", "n1", "n2", "n3", "n4", "n5"):
+        Node(m, name=name)
+    Line(m, name="l1", from_element="sourcebus", to_element="n1", length=1.0)
+    PowerTransformer(m, name="t1", from_element="n1", to_element="n2")
+    Line(m, name="l2", from_element="n2", to_element="n3", length=2.0)
+    Line(m, name="l3", from_element="n2", to_element="n4")
+    # Loop
+    Line(m, name="l4", from_element="n3", to_element="n5")
+    Line(m, name="l5", from_element="n5", to_element="n4")
+    Load(m, name="load1", connecting_element="n5")
+    m.set_names()
+    return m
+
+
+def test_topology_matches_network():
+    m = build_model()
+    network = Network()
+    network.build(m)
+    topology = Topology()
+    topology.build(m)
+
+    assert topology.get_nodes() == list(network.graph.nodes())
+    assert topology.bfs_order() == network.bfs_order()
+    for node in ("sourcebus", "n1", "n2", "n3", "n4", "n5"):
+        assert topology.get_upstream_transformer(
+            m, node
+        ) == network.get_upstream_transformer(m, node)
+    assert topology.upstream_transformers() == network.upstream_transformers()
+    for node in ("sourcebus", "n2", "n3"):
+        assert set(topology.get_all_elements_downstream(m, node)) == set(
+            network.get_all_elements_downstream(m, node)
+        )
+    assert topology.find_internal_edges({"n2", "n3", "n4"}) == {"l2", "l3"}
+    assert topology.find_internal_edges(
+        {"n2", "n3", "n4"}
+    ) == network.find_internal_edges({"n2", "n3", "n4"})
+
+
+def test_upstream_transformers_kept_up_to_date():
+    m = build_model()
+    network = m.get_network(source="sourcebus")
+    transformers = network.upstream_transformers()
+    assert transformers["n1"] is None
+    assert all(transformers[n] == "t1" for n in ("n2", "n3", "n4", "n5", "load1"))
+    assert network.upstream_transformers() is transformers
+
+    PowerTransformer(m, name="t2", from_element="n3", to_element="n6")
+    assert network.get_upstream_transformer(m, "n6") == "t2"
+    assert network.get_upstream_transformer(m, "n3") == "t1"
+
+
+def test_topology_to_network():
+    m = build_model()
+    exported = Topology()
+    exported.build(m)
+    exported = exported.to_network()
+    network = Network()
+    network.build(m)
+
+    assert set(exported.digraph.edges()) == set(network.digraph.edges())
+    assert exported.graph["n2"]["n3"]["equipment_name"] == "l2"
+    assert exported.graph["n2"]["n3"]["length"] == 2.0
+    assert exported.graph["n1"]["n2"]["equipment"] == "PowerTransformer"
+
+
+def test_store_topology_backend():
+    from ditto.models.winding import Winding
+
+    m = build_model()
+    topology = m.get_network(backend="csr")
+    assert isinstance(topology, Topology)
+    assert m.get_network(backend="csr") is topology
+    assert topology.get_upstream_transformer(m, "n3") == "t1"
+
+    # The topology is built again once the model changes
+    PowerTransformer(m, name="t2", from_element="n3", to_element="n6")
+    topology = m.get_network(backend="csr")
+    assert topology.get_upstream_transformer(m, "n6") == "t2"
+
+    m["t1"].windings = [Winding(m, nominal_voltage=v) for v in (12470.0, 4160.0)]
+    m["t2"].windings = [Winding(m, nominal_voltage=v) for v in (4160.0, 480.0)]
+    m.get_network(source="sourcebus")
+    m.set_node_voltages()
+    voltages = {n.name: n.nominal_voltage for n in m.iter_models(Node)}
+    assert voltages["n4"] == 4160.0
+    for n in m.iter_models(Node):
+        n.nominal_voltage = None
+    m.set_node_voltages(backend="csr")
+    assert {n.name: n.nominal_voltage for n in m.iter_models(Node)} == voltages
+
+    with pytest.raises(ValueError, match="backend"):
+        m.get_network(backend="scipy")